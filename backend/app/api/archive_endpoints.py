@@ -42,6 +42,8 @@ class ArchiveStatsResponse(BaseModel):
     table_name: str
     active_records: int
     archived_records: int
+    file_archived_records: int = 0
+    archive_files: int = 0
     retention_months: int
     archive_method: str
 
@@ -167,6 +169,8 @@ async def get_archive_statistics(
                 table_name=table_name,
                 active_records=table_stats["active_records"],
                 archived_records=table_stats["archived_records"],
+                file_archived_records=table_stats.get("file_archived_records", 0),
+                archive_files=table_stats.get("archive_files", 0),
                 retention_months=table_stats["retention_months"],
                 archive_method=table_stats["archive_method"],
             )
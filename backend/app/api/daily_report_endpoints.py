@@ -69,12 +69,13 @@ async def submit_eod_report(
 async def get_my_daily_reports(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     current_user: User = Depends(get_current_user),  # Updated dependency
     report_service: DailyReportService = Depends(get_daily_report_service),
 ):
     """Get EOD reports for the currently authenticated user with pagination."""
     reports = await report_service.get_reports_for_user_paginated(
-        user_id=current_user.id, page=page, page_size=page_size
+        user_id=current_user.id, page=page, page_size=page_size, cursor=cursor
     )
     return reports
 
@@ -127,6 +128,7 @@ async def get_daily_report(
 async def get_all_daily_reports_admin(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     current_user: User = Depends(get_current_user),
     report_service: DailyReportService = Depends(get_daily_report_service),
 ):
@@ -135,7 +137,7 @@ async def get_all_daily_reports_admin(
     # Replace with actual admin role check
     if current_user.role != UserRole.ADMIN:  # Assumes an is_admin attribute on User model
         raise PermissionDeniedError(message="User does not have admin privileges")
-    return await report_service.get_all_reports_paginated(page=page, page_size=page_size)
+    return await report_service.get_all_reports_paginated(page=page, page_size=page_size, cursor=cursor)
 
 
 @router.put("/{report_id}", response_model=DailyReport)
@@ -205,6 +207,7 @@ async def get_user_daily_reports(
     user_id: UUID,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     current_user: User = Depends(get_current_user),
     report_service: DailyReportService = Depends(get_daily_report_service),
 ):
@@ -216,7 +219,9 @@ async def get_user_daily_reports(
 
     # TODO: Add check that the requested user is actually in the manager's team
 
-    reports = await report_service.get_reports_for_user_paginated(user_id=user_id, page=page, page_size=page_size)
+    reports = await report_service.get_reports_for_user_paginated(
+        user_id=user_id, page=page, page_size=page_size, cursor=cursor
+    )
     return reports
 
 
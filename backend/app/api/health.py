@@ -7,16 +7,25 @@ circuit breakers, rate limiters, and overall system status.
 
 import asyncio
 import logging
+import threading
 import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
 
+from app.auth.dependencies import get_admin_user
 from app.config.settings import settings
 from app.config.supabase_client import get_supabase_client
+from app.core.adaptive_concurrency import concurrency_manager
 from app.core.circuit_breaker import circuit_manager
+from app.core.loop_blocking import loop_monitor
 from app.core.rate_limiter import rate_limiter_manager
+from app.core.sampling_profiler import ProfilerBusyError, sampling_profiler
+from app.core.singleflight import singleflight_manager
+from app.integrations.llm_gateway import llm_metrics
+from app.integrations.prompt_assembly import prompt_cache_stats
 from supabase import Client
 
 logger = logging.getLogger(__name__)
@@ -186,6 +195,31 @@ class HealthChecker:
             logger.error(f"Rate limiter health check failed: {e}")
             return {"status": "unhealthy", "details": f"Rate limiter check failed: {str(e)}"}
 
+    def check_concurrency_limiters(self) -> Dict[str, Any]:
+        """Check adaptive concurrency limits for upstream APIs."""
+        try:
+            limiter_status = concurrency_manager.get_status()
+
+            if not limiter_status:
+                return {"status": "healthy", "details": "No concurrency limiters configured"}
+
+            # A limit pinned at its floor means the upstream is pushing back
+            throttled = [
+                name for name, status in limiter_status.items() if status["limit"] <= status["config"]["min_limit"]
+            ]
+
+            if throttled:
+                status = "degraded"
+                details = f"Concurrency throttled to minimum for: {', '.join(throttled)}"
+            else:
+                status = "healthy"
+                details = "All concurrency limiters operational"
+
+            return {"status": status, "details": details, "limiters": limiter_status}
+        except Exception as e:
+            logger.error(f"Concurrency limiter health check failed: {e}")
+            return {"status": "unhealthy", "details": f"Concurrency limiter check failed: {str(e)}"}
+
     # Documentation config checks removed with documentation agent cleanup
 
 
@@ -224,6 +258,7 @@ async def detailed_health(supabase: Client = Depends(get_supabase_client)):
     # Get synchronous checks
     circuit_breaker_status = health_checker.check_circuit_breakers()
     rate_limiter_status = health_checker.check_rate_limiters()
+    concurrency_status = health_checker.check_concurrency_limiters()
     # Documentation agent checks removed
 
     # Compile results
@@ -245,6 +280,7 @@ async def detailed_health(supabase: Client = Depends(get_supabase_client)):
         ),
         "circuit_breakers": circuit_breaker_status,
         "rate_limiters": rate_limiter_status,
+        "concurrency_limiters": concurrency_status,
         # Documentation config removed
     }
 
@@ -271,6 +307,7 @@ async def performance_metrics():
     try:
         circuit_breaker_status = circuit_manager.get_status()
         rate_limiter_status = rate_limiter_manager.get_status()
+        singleflight_status = singleflight_manager.get_status()
 
         # Calculate some basic metrics
         total_breakers = len(circuit_breaker_status)
@@ -300,6 +337,17 @@ async def performance_metrics():
                 "average_utilization": round(average_utilization * 100, 2),
                 "details": rate_limiter_status,
             },
+            "singleflight": {
+                "collapsed": sum(status["collapsed"] for status in singleflight_status.values()),
+                "details": singleflight_status,
+            },
+            "prompt_cache": prompt_cache_stats.get_status(),
+            "llm_gateway": llm_metrics.get_status(),
+            "event_loop": {
+                key: value
+                for key, value in loop_monitor.get_status(stalls=0, offenders=0).items()
+                if key in ("enabled", "lag_ms", "stalls")
+            },
         }
 
     except Exception as e:
@@ -307,6 +355,38 @@ async def performance_metrics():
         raise HTTPException(status_code=500, detail=f"Failed to get metrics: {str(e)}")
 
 
+@router.get("/loop-monitor", dependencies=[Depends(get_admin_user)])
+async def loop_monitor_status(
+    stalls: int = Query(20, ge=0, le=200, description="Most recent stalls to include"),
+    offenders: int = Query(10, ge=0, le=100, description="Top offenders by total blocked time to include"),
+):
+    """Event-loop lag histogram, recent stalls and their captured stacks (admin only)."""
+    return {"timestamp": datetime.now().isoformat(), **loop_monitor.get_status(stalls=stalls, offenders=offenders)}
+
+
+@router.post("/loop-monitor", dependencies=[Depends(get_admin_user)])
+async def configure_loop_monitor(
+    enabled: bool = Query(..., description="Start or stop the monitor"),
+    threshold_ms: Optional[float] = Query(None, gt=0, description="Capture stacks of stalls longer than this"),
+    interval_ms: Optional[float] = Query(None, gt=0, description="Heartbeat interval"),
+    reset: bool = Query(False, description="Clear recorded lag samples and stalls"),
+):
+    """Toggle the event-loop lag monitor at runtime (admin only)."""
+    if reset:
+        loop_monitor.reset()
+    if enabled:
+        loop_monitor.start(threshold_ms=threshold_ms, interval_ms=interval_ms)
+    else:
+        loop_monitor.stop()
+    return {
+        "status": "success",
+        "enabled": loop_monitor.enabled,
+        "threshold_ms": loop_monitor.threshold_ms,
+        "interval_ms": loop_monitor.interval_ms,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @router.post("/circuit-breakers/{breaker_name}/reset")
 async def reset_circuit_breaker(breaker_name: str):
     """Manually reset a circuit breaker."""
@@ -324,3 +404,32 @@ async def reset_circuit_breaker(breaker_name: str):
     except Exception as e:
         logger.error(f"Failed to reset circuit breaker {breaker_name}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to reset circuit breaker: {str(e)}")
+
+
+@router.post("/profile", dependencies=[Depends(get_admin_user)])
+async def profile_service(
+    seconds: float = Query(10.0, gt=0, le=120, description="How long to sample"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Sampling interval"),
+    route: Optional[str] = Query(None, description="Only keep samples from requests to this route or path"),
+    format: str = Query("collapsed", pattern="^(collapsed|svg)$", description="Collapsed stacks or flamegraph SVG"),
+    include_idle: bool = Query(False, description="Keep samples of threads that are only waiting"),
+):
+    """Sample the stacks of all threads for a while and return a profile (admin only)."""
+    try:
+        profile = await asyncio.to_thread(
+            sampling_profiler.profile,
+            seconds,
+            interval_ms=interval_ms,
+            route=route,
+            include_idle=include_idle,
+            loop=asyncio.get_running_loop(),
+            loop_thread_id=threading.get_ident(),
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    headers = {"X-Profile-Samples": str(profile.samples)}
+    if format == "svg":
+        title = f"{seconds:g}s profile" + (f" of {route}" if route else "") + f", {profile.samples} samples"
+        return Response(profile.flamegraph_svg(title), media_type="image/svg+xml", headers=headers)
+    return PlainTextResponse(profile.collapsed(), headers=headers)
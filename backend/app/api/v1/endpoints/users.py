@@ -1,7 +1,7 @@
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from pydantic import BaseModel, EmailStr
 
 # Removing this non-existent import
@@ -54,7 +54,10 @@ def get_user_service() -> UserService:
 
 @router.get("", response_model=List[User])
 async def list_users(
+    response: Response,
     role: Optional[UserRole] = Query(None, description="Filter users by role (e.g., DEVELOPER, MANAGER)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's X-Next-Cursor header"),
+    limit: int = Query(200, ge=1, le=1000, description="Maximum number of users to return"),
     current_user: User = Depends(get_current_user),  # Require authentication
     user_repo: UserRepository = Depends(get_user_repository),
 ):
@@ -71,10 +74,11 @@ async def list_users(
     if role:
         users = await user_repo.list_users_by_role(role)
     else:
-        # Default to a reasonable limit if no role is specified, or adjust as needed.
-        # list_all_users returns a tuple (users, total_count). We only need users here.
-        result = await user_repo.list_all_users(limit=200)  # Adjust limit as needed
-        users = result[0]
+        # Keyset pages; the cursor for the next page is returned in the X-Next-Cursor header
+        page = await user_repo.get_users_page(cursor=cursor, limit=limit)
+        users = page.items
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
 
     if not users:
         return []  # Return empty list if no users found, rather than 404 for a list endpoint
@@ -1,4 +0,0 @@
-# Make webhooks a package (Slack interactions removed)
-from fastapi import APIRouter
-
-router = APIRouter(prefix="/webhooks", tags=["webhooks"])
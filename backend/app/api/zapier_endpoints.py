@@ -2,17 +2,19 @@
 API endpoints for Zapier dashboard data integration.
 """
 
+import hmac
 import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from pydantic import BaseModel
 
 from app.auth.dependencies import get_current_user
+from app.config.settings import settings
 from app.config.supabase_client import get_supabase_client_safe as get_db
 from app.models.user import User
-from app.services.zapier_integration_service import ZapierIntegrationService
+from app.services.zapier_integration_service import ZapierIntegrationService, invalidate_dashboard_cache
 from supabase import Client
 
 logger = logging.getLogger(__name__)
@@ -58,11 +60,29 @@ class DashboardOverviewResponse(BaseModel):
     dashboard: Dict[str, Any]
 
 
+class IngestionNotification(BaseModel):
+    tables: List[str] = []
+
+
+class IngestionAckResponse(BaseModel):
+    invalidated: int
+    timestamp: datetime
+
+
 def get_zapier_service(db: Client = Depends(get_db)) -> ZapierIntegrationService:
     """Dependency to get Zapier integration service."""
     return ZapierIntegrationService(db)
 
 
+def verify_zapier_api_key(x_zapier_api_key: Optional[str] = Header(None)) -> None:
+    """Check the X-Zapier-Api-Key header against ZAPIER_API_KEYS (skipped when ZAPIER_REQUIRE_AUTH is off)."""
+    if not settings.ZAPIER_REQUIRE_AUTH:
+        return
+    valid_keys = [key.strip() for key in (settings.ZAPIER_API_KEYS or "").split(",") if key.strip()]
+    if not x_zapier_api_key or not any(hmac.compare_digest(x_zapier_api_key, key) for key in valid_keys):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Zapier API key")
+
+
 @router.get("/weekly-data", response_model=WeeklyDataResponse)
 async def get_weekly_data(
     zapier_service: ZapierIntegrationService = Depends(get_zapier_service),
@@ -234,3 +254,20 @@ async def get_dashboard_overview(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while fetching dashboard overview",
         )
+
+
+@router.post("/ingestion-events", response_model=IngestionAckResponse)
+async def notify_ingestion(
+    notification: IngestionNotification,
+    _: None = Depends(verify_zapier_api_key),
+):
+    """
+    Called by Zapier flows after they write new rows (wins, feedback, social metrics, analytics, objectives).
+
+    Drops the cached weekly data and dashboard overview so the next read reflects the new rows.
+    """
+    invalidated = invalidate_dashboard_cache()
+    logger.info(
+        f"Zapier ingestion for {notification.tables or 'unspecified tables'}: invalidated {invalidated} entries"
+    )
+    return IngestionAckResponse(invalidated=invalidated, timestamp=datetime.now())
@@ -0,0 +1,128 @@
+"""
+Direct asyncpg connection pool for the hot repositories.
+
+Used instead of the supabase-py PostgREST client when DATA_BACKEND=asyncpg.
+Queries then run on the event loop over a pooled binary-protocol connection,
+with no worker-thread hop, HTTP round trip or JSON encoding per call.
+asyncpg is an optional dependency (requirements-batch2.txt) and is only
+imported when the pool is first used.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Optional
+
+from app.config.settings import settings
+from app.core.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[Any] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+# Connection of the transaction open in the current task, if any
+_current_connection: ContextVar[Optional[Any]] = ContextVar("pg_current_connection", default=None)
+
+
+def use_asyncpg_backend() -> bool:
+    """Whether the hot repositories should use the asyncpg pool instead of PostgREST."""
+    return (settings.DATA_BACKEND or "postgrest").lower() == "asyncpg"
+
+
+def normalize_dsn(dsn: str) -> str:
+    # Accept SQLAlchemy-style DSNs
+    return dsn.replace("postgresql+asyncpg://", "postgresql://").replace("postgres+asyncpg://", "postgres://")
+
+
+async def _init_connection(connection: Any) -> None:
+    # Binary jsonb codec (version byte + UTF-8 JSON) so jsonb works for queries and binary COPY alike
+    await connection.set_type_codec(
+        "jsonb",
+        encoder=lambda value: b"\x01" + json.dumps(value, default=str).encode(),
+        decoder=lambda data: json.loads(data[1:].decode()),
+        schema="pg_catalog",
+        format="binary",
+    )
+    await connection.set_type_codec(
+        "json", encoder=lambda value: json.dumps(value, default=str), decoder=json.loads, schema="pg_catalog"
+    )
+
+
+async def create_pg_pool(dsn: Optional[str] = None, **overrides: Any) -> Any:
+    """Create an asyncpg pool configured from settings (used by get_pg_pool, tests and benchmarks)."""
+    try:
+        import asyncpg
+    except ImportError as e:
+        raise ConfigurationError("DATA_BACKEND=asyncpg requires the asyncpg package") from e
+
+    options = {
+        "min_size": settings.PG_POOL_MIN_SIZE,
+        "max_size": settings.PG_POOL_MAX_SIZE,
+        # Statements are prepared and cached per connection; repeated queries skip parse/plan
+        "statement_cache_size": settings.PG_STATEMENT_CACHE_SIZE,
+        "command_timeout": settings.PG_COMMAND_TIMEOUT,
+        "init": _init_connection,
+    }
+    options.update(overrides)
+    pool = await asyncpg.create_pool(normalize_dsn(dsn or settings.DATABASE_URL), **options)
+    logger.info(f"asyncpg pool created (min={options['min_size']}, max={options['max_size']})")
+    return pool
+
+
+async def get_pg_pool() -> Any:
+    """Get the shared asyncpg pool, creating it on first use."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await create_pg_pool()
+    return _pool
+
+
+async def close_pg_pool() -> None:
+    """Close the shared pool (application shutdown)."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+        logger.info("asyncpg pool closed")
+
+
+@asynccontextmanager
+async def pg_connection() -> AsyncIterator[Any]:
+    """Yield the current transaction's connection, or a pooled connection for a single operation."""
+    current = _current_connection.get()
+    if current is not None:
+        yield current
+        return
+    pool = await get_pg_pool()
+    async with pool.acquire() as connection:
+        yield connection
+
+
+@asynccontextmanager
+async def pg_transaction() -> AsyncIterator[Any]:
+    """
+    Run repository calls in one database transaction.
+
+    Usage:
+        async with pg_transaction():
+            await commit_repo.save_commit(commit)
+            await report_repo.update_daily_report(report_id, update)
+
+    Repository calls made inside the block (in this task) share the connection;
+    nested blocks become savepoints.
+    """
+    async with pg_connection() as connection:
+        token = _current_connection.set(connection)
+        try:
+            async with connection.transaction():
+                yield connection
+        finally:
+            _current_connection.reset(token)
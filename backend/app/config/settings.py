@@ -33,6 +33,12 @@ class Settings(BaseSettings):
 
     # PostgreSQL Database URL (for SQLAlchemy)
     DATABASE_URL: str = Field(...)
+    # Data layer for the hot repositories: "postgrest" (supabase-py) or "asyncpg" (direct pool on DATABASE_URL)
+    DATA_BACKEND: str = Field("postgrest")
+    PG_POOL_MIN_SIZE: int = Field(1)
+    PG_POOL_MAX_SIZE: int = Field(10)
+    PG_STATEMENT_CACHE_SIZE: int = Field(100)  # Set to 0 behind a transaction-mode pooler (pgbouncer/Supavisor)
+    PG_COMMAND_TIMEOUT: float = Field(30.0)
 
     # General App Settings
     TESTING_MODE: bool = Field(False)  # Added for testing purposes
@@ -58,6 +64,7 @@ class Settings(BaseSettings):
 
     # Integration Keys
     GITHUB_TOKEN: Optional[str] = Field(None)  # Legacy PAT, prefer GitHub App
+    GITHUB_API_URL: str = Field("https://api.github.com")  # e.g. a local GitHub fake for load tests
     # Legacy AI service key removed
 
     # GitHub App Configuration (preferred over PAT)
@@ -76,9 +83,22 @@ class Settings(BaseSettings):
     OPENAI_MODEL: Optional[str] = Field("gpt-5-2025-08-07")
     # Doc agent model removed
     OPENAI_REASONING_EFFORT: str = Field("medium")
+    # LLM gateway: one pooled client for every OpenAI call (see app/integrations/llm_gateway.py)
+    OPENAI_BASE_URL: Optional[str] = Field(None)  # e.g. a local OpenAI-compatible fake for load tests
+    OPENAI_REQUEST_TIMEOUT_SECONDS: float = Field(120.0)  # per HTTP attempt
+    OPENAI_CALL_DEADLINE_SECONDS: float = Field(300.0)  # per call, retries and backoff included
+    OPENAI_MAX_RETRIES: int = Field(4)  # retries on 429/5xx/connection errors, with full jitter
+    OPENAI_RETRY_BASE_DELAY: float = Field(1.0)
+    OPENAI_RETRY_MAX_DELAY: float = Field(30.0)
+    OPENAI_HEDGE_ENABLED: bool = Field(False)  # duplicate calls still running after the observed p95
+    OPENAI_HEDGE_MIN_SAMPLES: int = Field(20)  # latency samples per model/prompt before hedging starts
+    OPENAI_STREAM_STRUCTURED_OUTPUT: bool = Field(False)  # stream JSON analyses, stop once required fields arrive
 
     # Service-specific AI models
     COMMIT_ANALYSIS_MODEL: Optional[str] = Field("gpt-5-2025-08-07")
+    # "split": separate hours and impact calls; "fused": one call scoring both (half the diff input tokens)
+    COMMIT_ANALYSIS_MODE: str = Field("split")
+    COMMIT_HEURISTIC_TRIAGE: bool = Field(True)  # score trivial commits locally (model_used="heuristic-vN")
     CODE_QUALITY_MODEL: Optional[str] = Field("gpt-5-2025-08-07")
 
     # Health check toggles
@@ -94,6 +114,9 @@ class Settings(BaseSettings):
     # Docs retention removed with doc agent
     ENABLE_AUTO_ARCHIVE: bool = Field(True)
     ARCHIVE_SCHEDULE_HOUR: int = Field(2)  # Run at 2 AM daily
+    ARCHIVE_BATCH_SIZE: int = Field(1000)  # rows per primary-key batch
+    ARCHIVE_BATCH_SLEEP_SECONDS: float = Field(0.5)  # pause between batches to bound database load
+    ARCHIVE_DIR: str = Field("archives")  # NDJSON.gz part files, manifests and checkpoints
 
     # Zapier Integration Settings
     ZAPIER_WEEKLY_ANALYTICS_URL: Optional[str] = Field(None)
@@ -104,13 +127,40 @@ class Settings(BaseSettings):
     ZAPIER_API_KEYS: Optional[str] = Field(None)  # Comma-separated list of valid API keys
     ZAPIER_WEBHOOK_SECRET: Optional[str] = Field(None)  # For HMAC signature verification
     ZAPIER_REQUIRE_AUTH: bool = Field(True)  # Require authentication for webhooks
+    # Dashboard reads: parallel Supabase queries per request and per-ISO-week stale-while-revalidate cache
+    ZAPIER_QUERY_CONCURRENCY: int = Field(6)
+    ZAPIER_CACHE_FRESH_SECONDS: float = Field(60.0)
+    ZAPIER_CACHE_STALE_SECONDS: float = Field(900.0)
     ENVIRONMENT: str = Field("production")  # development, staging, production
+    # Debug aid: run the event loop in asyncio debug mode and log callbacks that block it
+    LOOP_BLOCKING_DETECTION: bool = Field(False)
+    LOOP_BLOCKING_THRESHOLD_MS: float = Field(100.0)
+    # Production loop lag monitor: heartbeat every interval, stack capture of callbacks over the threshold above
+    LOOP_MONITOR_ENABLED: bool = Field(False)
+    LOOP_MONITOR_INTERVAL_MS: float = Field(50.0)
 
     # API Gateway Settings
     ENABLE_API_AUTH: bool = Field(True)
     ENABLE_RATE_LIMITING: bool = Field(True)
     API_KEY_HEADER: str = Field("X-API-Key")
     DEFAULT_RATE_LIMIT: int = Field(60)  # requests per minute
+    RATE_LIMIT_MAX_TRACKED_CLIENTS: int = Field(10000)  # hard cap on in-memory limiter keys
+    # Outbound (GitHub/OpenAI) limiter state: memory, sqlite (same host) or redis (shared)
+    RATE_LIMIT_BACKEND: str = Field("memory")
+    RATE_LIMIT_SQLITE_PATH: Optional[str] = Field(None)
+    RATE_LIMIT_REDIS_URL: Optional[str] = Field(None)
+    RATE_LIMIT_LEASE_SIZE: int = Field(1)  # tokens reserved per backend round trip
+    OPENAI_TOKENS_PER_MINUTE: int = Field(500000)  # TPM quota charged by the LLM gateway (0 disables)
+    OPENAI_TOKEN_WAIT_TIMEOUT_SECONDS: float = Field(30.0)  # longest a request queues for TPM quota
+    # Adaptive (AIMD) in-flight limits for upstream APIs
+    OPENAI_CONCURRENCY_INITIAL: int = Field(4)
+    OPENAI_CONCURRENCY_MAX: int = Field(16)
+    GITHUB_CONCURRENCY_INITIAL: int = Field(4)
+    GITHUB_CONCURRENCY_MAX: int = Field(16)
+    # Where commit diffs come from: "github" (REST API) or "git_mirror" (local bare mirrors)
+    COMMIT_DIFF_SOURCE: str = Field("github")
+    GIT_MIRROR_ROOT: str = Field(".git-mirrors")
+    GIT_MIRROR_FETCH_INTERVAL: float = Field(60.0)  # seconds between incremental fetches
     AUTH_EXCLUDE_PATHS: str = Field(
         "/docs,/redoc,/openapi.json,/health,/auth/login"
     )  # Adjusted exclude paths
@@ -311,6 +361,12 @@ class Settings(BaseSettings):
     # Daily Batch Analysis Settings
     ENABLE_DAILY_BATCH_ANALYSIS: bool = True
     SKIP_INDIVIDUAL_COMMIT_ANALYSIS: bool = False  # Keep individual analysis by default for backward compatibility
+    # Submit the midnight analysis through the OpenAI Batch API (about half the cost, results within 24h)
+    DAILY_ANALYSIS_USE_OPENAI_BATCH: bool = False
+    # Reanalysis sends only new commits (with the previous day result) when at most this many were added
+    DAILY_ANALYSIS_MAX_DELTA_COMMITS: int = 3
+    OPENAI_BATCH_STATE_PATH: str = ".openai_batches.db"  # Local state used to resume batch jobs
+    OPENAI_BATCH_POLL_INTERVAL: float = 30.0
 
     # EOD Reminder Settings
     ENABLE_EOD_REMINDERS: bool = True
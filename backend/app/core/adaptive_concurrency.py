@@ -0,0 +1,335 @@
+"""
+Adaptive concurrency limiting for upstream APIs.
+
+Bounds the number of in-flight calls to an upstream (OpenAI, GitHub) with a
+limit that adapts to how the upstream is coping. The limit grows additively
+while latency stays close to the best latency observed recently and shrinks
+multiplicatively on 429s, timeouts or latency inflation (AIMD). Latency is
+smoothed (EWMA) before it is compared with the baseline, and at most one
+decrease is applied per round trip, so the normal spread of LLM latencies
+doesn't ratchet the limit down. Calls can be routed through a circuit breaker
+so both protections apply.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from app.core.circuit_breaker import CircuitBreaker, circuit_manager
+from app.core.exceptions import RateLimitExceededError
+
+logger = logging.getLogger(__name__)
+
+# Set by callers that want to know when their work first holds an upstream permit
+_permit_signal: contextvars.ContextVar[Optional[asyncio.Event]] = contextvars.ContextVar(
+    "adaptive_permit_signal", default=None
+)
+
+
+@dataclass
+class AdaptiveConcurrencyConfig:
+    """Configuration for adaptive concurrency limiting."""
+
+    initial_limit: int = 4
+    min_limit: int = 1
+    max_limit: int = 32
+    # Smoothed latency above min_latency * tolerance counts as inflation
+    latency_tolerance: float = 2.0
+    # Weight of the newest sample in the smoothed (EWMA) latency
+    latency_smoothing: float = 0.2
+    # Multiplicative decrease on overload (429/timeout) and on latency inflation
+    overload_backoff: float = 0.5
+    latency_backoff: float = 0.9
+    # Seconds after which the baseline (lowest smoothed latency) is re-learned
+    min_latency_window: float = 300.0
+    name: str = "default"
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Return True for errors that signal upstream overload (429s and timeouts)."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, RateLimitExceededError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    if status_code == 429:
+        return True
+    # openai.APITimeoutError and friends don't carry a status code
+    if "Timeout" in type(error).__name__:
+        return True
+    # Integrations often re-raise upstream errors as generic exceptions
+    cause = error.__cause__
+    return cause is not None and cause is not error and is_overload_error(cause)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter with a FIFO queue of waiting callers.
+
+    Usage:
+        async with limiter.permit():
+            await call_upstream()
+
+    or ``await limiter.call(func, *args, **kwargs)`` which also records the
+    outcome and routes through the attached circuit breaker, if any.
+    """
+
+    def __init__(self, config: AdaptiveConcurrencyConfig, breaker: Optional[CircuitBreaker] = None):
+        self.config = config
+        self.breaker = breaker
+        self.limit: float = float(config.initial_limit)
+        self.in_flight = 0
+        self.min_latency: Optional[float] = None
+        self.smoothed_latency: Optional[float] = None
+        self._min_latency_at = 0.0
+        self._last_decrease_at: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Counters for status reporting
+        self.successes = 0
+        self.overloads = 0
+        self.inflations = 0
+        self.max_queue_depth = 0
+        self._recent_latencies: Deque[float] = deque(maxlen=200)
+
+        logger.info(
+            f"Initialized adaptive concurrency limiter '{config.name}' with "
+            f"limit={config.initial_limit} (min={config.min_limit}, max={config.max_limit})"
+        )
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.config.min_limit, int(self.limit))
+
+    async def acquire(self) -> None:
+        """Wait for an in-flight permit."""
+        if self.in_flight < self.current_limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Permit was handed over just before cancellation; pass it on
+                self.release()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self) -> None:
+        """Return a permit and hand free slots to queued callers in FIFO order."""
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < self.current_limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def record_success(self, latency: float) -> None:
+        """Adjust the limit after a successful call that took `latency` seconds."""
+        now = time.monotonic()
+        self.successes += 1
+        self._recent_latencies.append(latency)
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency
+        else:
+            weight = self.config.latency_smoothing
+            self.smoothed_latency = weight * latency + (1 - weight) * self.smoothed_latency
+        if (
+            self.min_latency is None
+            or self.smoothed_latency < self.min_latency
+            or now - self._min_latency_at > self.config.min_latency_window
+        ):
+            self.min_latency = self.smoothed_latency
+            self._min_latency_at = now
+
+        if self.smoothed_latency > self.min_latency * self.config.latency_tolerance:
+            self.inflations += 1
+            self._decrease(self.config.latency_backoff, f"smoothed latency {self.smoothed_latency:.2f}s inflated")
+        elif self.in_flight >= self.current_limit - 1:
+            # Only grow when the current limit is actually being used
+            self.limit = min(float(self.config.max_limit), self.limit + 1.0 / self.limit)
+            self._wake_waiters()
+
+    def record_overload(self, error: Optional[BaseException] = None) -> None:
+        """Shrink the limit after a 429 or timeout."""
+        self.overloads += 1
+        self._decrease(self.config.overload_backoff, f"overload ({type(error).__name__ if error else 'signal'})")
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        now = time.monotonic()
+        if (
+            self._last_decrease_at is not None
+            and self.smoothed_latency is not None
+            and now - self._last_decrease_at < self.smoothed_latency
+        ):
+            # Calls completing within one round trip of the last decrease saw the same congestion
+            return
+        self._last_decrease_at = now
+        previous = self.current_limit
+        self.limit = max(float(self.config.min_limit), self.limit * factor)
+        if self.current_limit != previous:
+            logger.warning(
+                f"Concurrency limit for '{self.config.name}' reduced {previous} -> {self.current_limit}: {reason}"
+            )
+
+    def permit(self) -> "_Permit":
+        """Async context manager holding one permit and recording the outcome."""
+        return _Permit(self)
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Execute `func` under a permit (and the attached breaker, if any)."""
+
+        async def invoke() -> Any:
+            # Wrapped client methods aren't always detectable as coroutine functions
+            result = func(*args, **kwargs)
+            if asyncio.iscoroutine(result):
+                return await result
+            return result
+
+        async with self.permit():
+            if self.breaker is not None:
+                return await self.breaker.call(invoke)
+            return await invoke()
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Get current limiter status."""
+        recent = sorted(self._recent_latencies)
+        return {
+            "name": self.config.name,
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "min_latency_ms": round(self.min_latency * 1000, 1) if self.min_latency is not None else None,
+            "smoothed_latency_ms": (
+                round(self.smoothed_latency * 1000, 1) if self.smoothed_latency is not None else None
+            ),
+            "p50_latency_ms": round(recent[len(recent) // 2] * 1000, 1) if recent else None,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "latency_inflations": self.inflations,
+            "breaker": self.breaker.config.name if self.breaker else None,
+            "config": {
+                "min_limit": self.config.min_limit,
+                "max_limit": self.config.max_limit,
+                "latency_tolerance": self.config.latency_tolerance,
+            },
+        }
+
+
+class _Permit:
+    """Context manager returned by AdaptiveConcurrencyLimiter.permit()."""
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter):
+        self._limiter = limiter
+        self._started = 0.0
+
+    async def __aenter__(self) -> "_Permit":
+        await self._limiter.acquire()
+        self._started = time.monotonic()
+        signal = _permit_signal.get()
+        if signal is not None:
+            signal.set()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if exc is None:
+                self._limiter.record_success(time.monotonic() - self._started)
+            elif is_overload_error(exc):
+                self._limiter.record_overload(exc)
+        finally:
+            self._limiter.release()
+        return False
+
+
+def watch_first_permit() -> asyncio.Event:
+    """
+    Return an event set as soon as work started from the current context holds any upstream permit.
+
+    Tasks created afterwards inherit the signal, so callers can start a timeout
+    only once their work is actually running against an upstream:
+
+        started = watch_first_permit()
+        task = asyncio.create_task(process_commit(payload))
+    """
+    event = asyncio.Event()
+    _permit_signal.set(event)
+    return event
+
+
+class ConcurrencyLimiterManager:
+    """
+    Manages adaptive concurrency limiters for different upstreams.
+    """
+
+    def __init__(self):
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def create_limiter(
+        self, name: str, config: AdaptiveConcurrencyConfig, breaker: Optional[CircuitBreaker] = None
+    ) -> AdaptiveConcurrencyLimiter:
+        """Create and register a new limiter."""
+        config.name = name
+        limiter = AdaptiveConcurrencyLimiter(config, breaker=breaker)
+        self._limiters[name] = limiter
+        return limiter
+
+    def get_limiter(self, name: str) -> Optional[AdaptiveConcurrencyLimiter]:
+        """Get limiter by name."""
+        return self._limiters.get(name)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get status of all limiters."""
+        return {name: limiter.status for name, limiter in self._limiters.items()}
+
+
+# Global concurrency limiter manager instance
+concurrency_manager = ConcurrencyLimiterManager()
+
+
+def get_github_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    """Get (or lazily create) the shared adaptive limiter for GitHub API calls."""
+    limiter = concurrency_manager.get_limiter("github_api")
+    if limiter is None:
+        from app.config.settings import settings
+        from app.core.circuit_breaker import create_github_circuit_breaker
+
+        breaker = circuit_manager.get_breaker("github_api") or create_github_circuit_breaker()
+        config = AdaptiveConcurrencyConfig(
+            initial_limit=getattr(settings, "GITHUB_CONCURRENCY_INITIAL", 4),
+            max_limit=getattr(settings, "GITHUB_CONCURRENCY_MAX", 16),
+        )
+        limiter = concurrency_manager.create_limiter("github_api", config, breaker=breaker)
+    return limiter
+
+
+def get_openai_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    """Get (or lazily create) the shared adaptive limiter for OpenAI API calls."""
+    limiter = concurrency_manager.get_limiter("openai_api")
+    if limiter is None:
+        from app.config.settings import settings
+        from app.core.circuit_breaker import create_openai_circuit_breaker
+
+        breaker = circuit_manager.get_breaker("openai_api") or create_openai_circuit_breaker()
+        config = AdaptiveConcurrencyConfig(
+            initial_limit=getattr(settings, "OPENAI_CONCURRENCY_INITIAL", 4),
+            max_limit=getattr(settings, "OPENAI_CONCURRENCY_MAX", 16),
+            # Reasoning model latency varies a lot with diff size
+            latency_tolerance=3.0,
+        )
+        limiter = concurrency_manager.create_limiter("openai_api", config, breaker=breaker)
+    return limiter
@@ -0,0 +1,297 @@
+"""
+Event-loop blocking detection.
+
+Built on asyncio debug mode: the loop times every callback it runs and logs
+``Executing <handle> took X seconds`` for any callback slower than
+``slow_callback_duration``. A synchronous HTTP call, ``time.sleep`` or a CPU
+heavy loop inside ``async def`` shows up here with the coroutine that ran it.
+
+Enable for the server with LOOP_BLOCKING_DETECTION=true (debug only; asyncio
+debug mode adds per-callback overhead). Tests use ``detect_blocking`` to
+assert that code never holds the loop longer than a threshold.
+
+For production, ``LoopLagMonitor`` measures scheduling lag continuously with a
+heartbeat task and a watchdog thread: when the heartbeat is overdue by more
+than the threshold, the watchdog samples the loop thread's stack, so the
+offending call is recorded while it is still blocking. Enable it with
+LOOP_MONITOR_ENABLED=true or at runtime through /health/loop-monitor.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_ASYNCIO_LOGGER = "asyncio"
+_SLOW_CALLBACK_PREFIX = "Executing "
+
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_MAX_STACK_FRAMES = 30
+
+
+@dataclass
+class BlockingCallback:
+    """One callback that held the event loop longer than the threshold."""
+
+    callback: str
+    duration_ms: float
+
+
+class BlockingCallbackRecorder(logging.Handler):
+    """Collects asyncio's slow-callback warnings."""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.events: List[BlockingCallback] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not str(record.msg).startswith(_SLOW_CALLBACK_PREFIX) or len(record.args or ()) < 2:
+            return
+        handle, seconds = record.args[0], record.args[1]
+        self.events.append(BlockingCallback(callback=repr(handle), duration_ms=float(seconds) * 1000))
+
+
+def enable_blocking_detection(
+    loop: Optional[asyncio.AbstractEventLoop] = None, threshold_ms: Optional[float] = None
+) -> asyncio.AbstractEventLoop:
+    """Put ``loop`` (default: the running loop) in debug mode with a slow-callback threshold."""
+    if threshold_ms is None:
+        from app.config.settings import settings
+
+        threshold_ms = settings.LOOP_BLOCKING_THRESHOLD_MS
+    loop = loop or asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold_ms / 1000
+    logging.getLogger(_ASYNCIO_LOGGER).setLevel(logging.WARNING)
+    logger.info(f"Event loop blocking detection enabled (threshold {threshold_ms:.0f} ms)")
+    return loop
+
+
+@asynccontextmanager
+async def detect_blocking(threshold_ms: float = 50.0) -> AsyncIterator[BlockingCallbackRecorder]:
+    """
+    Record callbacks that block the running loop for longer than ``threshold_ms``.
+
+    Usage:
+        async with detect_blocking(threshold_ms=20) as recorder:
+            await repo.get_by_id(analysis_id)
+        assert recorder.events == []
+    """
+    loop = asyncio.get_running_loop()
+    previous_debug, previous_duration = loop.get_debug(), loop.slow_callback_duration
+    asyncio_logger = logging.getLogger(_ASYNCIO_LOGGER)
+    previous_level = asyncio_logger.level
+    recorder = BlockingCallbackRecorder()
+    asyncio_logger.addHandler(recorder)
+    enable_blocking_detection(loop, threshold_ms)
+    try:
+        # Debug timing applies from the next callback; yield once so the block body is measured
+        await asyncio.sleep(0)
+        yield recorder
+        # Let the loop finish timing the callback that is still running
+        await asyncio.sleep(0)
+    finally:
+        loop.set_debug(previous_debug)
+        loop.slow_callback_duration = previous_duration
+        asyncio_logger.removeHandler(recorder)
+        asyncio_logger.setLevel(previous_level)
+
+
+@dataclass
+class LoopStall:
+    """One stretch during which the loop could not run the monitor's heartbeat."""
+
+    started_at: str
+    duration_ms: float
+    location: str
+    stack: List[str] = field(default_factory=list)
+
+
+def _stall_location(stack: traceback.StackSummary) -> str:
+    """Innermost frame in application code, falling back to the innermost frame."""
+    for frame in reversed(stack):
+        if frame.filename.startswith(_APP_ROOT):
+            return f"{os.path.relpath(frame.filename, os.path.dirname(_APP_ROOT))}:{frame.lineno} in {frame.name}"
+    if not stack:
+        return "unknown"
+    return f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}"
+
+
+class LoopLagMonitor:
+    """
+    Continuous event-loop lag measurement with stack capture of blocking calls.
+
+    A heartbeat task sleeps ``interval_ms`` and records how late it woke up. A
+    daemon thread checks the heartbeat's deadline every ``threshold_ms / 2``;
+    once it is overdue by more than ``threshold_ms`` the loop is stuck in one
+    callback, and the thread snapshots that callback's stack with
+    ``sys._current_frames``. When idle the cost is one timer per interval and
+    one thread wake-up per half threshold; nothing runs while stopped.
+    """
+
+    def __init__(self, max_stalls: int = 50, window: int = 1000):
+        self.interval_ms = 50.0
+        self.threshold_ms = 100.0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[threading.Event] = None
+        self._loop_thread_id: Optional[int] = None
+        self._deadline: Optional[float] = None
+        self._pending: Optional[LoopStall] = None
+        self._started_at: Optional[str] = None
+        self._max_stalls = max_stalls
+        self._window = window
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def reset(self) -> None:
+        """Clear recorded lag samples and stalls."""
+        with self._lock:
+            self._lags: Deque[float] = deque(maxlen=self._window)
+            self._buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+            self._samples = 0
+            self._max_lag_ms = 0.0
+            self._stalls: Deque[LoopStall] = deque(maxlen=self._max_stalls)
+            self._stall_count = 0
+            self._offenders: Dict[str, Dict[str, Any]] = {}
+
+    def start(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        threshold_ms: Optional[float] = None,
+        interval_ms: Optional[float] = None,
+    ) -> None:
+        """Start monitoring ``loop`` (default: the running loop); restarts with new settings if running."""
+        from app.config.settings import settings
+
+        self.stop()
+        self.threshold_ms = threshold_ms if threshold_ms is not None else settings.LOOP_BLOCKING_THRESHOLD_MS
+        self.interval_ms = interval_ms if interval_ms is not None else settings.LOOP_MONITOR_INTERVAL_MS
+        loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = None
+        self._pending = None
+        self._started_at = datetime.now().isoformat()
+        self._task = loop.create_task(self._heartbeat())
+        self._stop_event = threading.Event()
+        threading.Thread(target=self._watch, args=(self._stop_event,), name="loop-lag-watchdog", daemon=True).start()
+        logger.info(
+            f"Event loop lag monitor started (interval {self.interval_ms:.0f} ms, threshold {self.threshold_ms:.0f} ms)"
+        )
+
+    def stop(self) -> None:
+        """Stop the heartbeat and watchdog; recorded data is kept until ``reset``."""
+        if self._task is None:
+            return
+        if not self._task.get_loop().is_closed():
+            self._task.cancel()
+        self._task = None
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+        self._deadline = None
+        logger.info("Event loop lag monitor stopped")
+
+    async def _heartbeat(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            self._deadline = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            self._record_lag(max(0.0, (time.monotonic() - self._deadline) * 1000))
+
+    def _record_lag(self, lag_ms: float) -> None:
+        with self._lock:
+            self._samples += 1
+            self._lags.append(lag_ms)
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+            bucket = next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))
+            self._buckets[bucket] += 1
+            if self._pending is not None:
+                # The stall ends when the heartbeat finally runs
+                stall, self._pending = self._pending, None
+                stall.duration_ms = round(lag_ms, 1)
+                offender = self._offenders.setdefault(
+                    stall.location, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stall.stack}
+                )
+                offender["count"] += 1
+                offender["total_ms"] += lag_ms
+                if lag_ms >= offender["max_ms"]:
+                    offender["max_ms"] = lag_ms
+                    offender["stack"] = stall.stack
+
+    def _watch(self, stop_event: threading.Event) -> None:
+        poll = max(self.threshold_ms / 2, 5.0) / 1000
+        captured_deadline = None
+        while not stop_event.wait(poll):
+            deadline = self._deadline
+            if deadline is None or deadline == captured_deadline:
+                continue
+            overdue_ms = (time.monotonic() - deadline) * 1000
+            if overdue_ms < self.threshold_ms:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=_MAX_STACK_FRAMES)
+            captured_deadline = deadline
+            stall = LoopStall(
+                started_at=datetime.fromtimestamp(time.time() - overdue_ms / 1000).isoformat(),
+                duration_ms=round(overdue_ms, 1),
+                location=_stall_location(stack),
+                stack=[line.rstrip() for line in stack.format()],
+            )
+            with self._lock:
+                self._pending = stall
+                self._stalls.append(stall)
+                self._stall_count += 1
+            logger.warning(f"Event loop blocked for over {overdue_ms:.0f} ms at {stall.location}")
+
+    def get_status(self, stalls: int = 20, offenders: int = 10) -> Dict[str, Any]:
+        """Lag percentiles and histogram, the most recent stalls and the worst offenders by total time."""
+        with self._lock:
+            lags = sorted(self._lags)
+            recent = [asdict(stall) for stall in reversed(self._stalls)][:stalls]
+            top = sorted(self._offenders.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:offenders]
+
+            def quantile(q: float) -> Optional[float]:
+                return round(lags[min(len(lags) - 1, int(q * len(lags)))], 1) if lags else None
+
+            return {
+                "enabled": self.enabled,
+                "started_at": self._started_at,
+                "interval_ms": self.interval_ms,
+                "threshold_ms": self.threshold_ms,
+                "samples": self._samples,
+                "lag_ms": {"p50": quantile(0.5), "p99": quantile(0.99), "max": round(self._max_lag_ms, 1)},
+                "lag_ms_buckets": dict(zip([str(bound) for bound in LAG_BUCKETS_MS] + ["+Inf"], self._buckets)),
+                "stalls": self._stall_count,
+                "recent_stalls": recent,
+                "top_offenders": [
+                    {
+                        "location": location,
+                        "count": offender["count"],
+                        "total_ms": round(offender["total_ms"], 1),
+                        "max_ms": round(offender["max_ms"], 1),
+                        "stack": offender["stack"],
+                    }
+                    for location, offender in top
+                ],
+            }
+
+
+# Global monitor, started by app.main when LOOP_MONITOR_ENABLED is set or via /health/loop-monitor
+loop_monitor = LoopLagMonitor()
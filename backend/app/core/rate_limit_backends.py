@@ -0,0 +1,332 @@
+"""
+Storage backends for token bucket rate limiter state.
+
+The default backend keeps buckets in process memory. The SQLite backend shares
+buckets between workers on the same host through a single database file, and
+the Redis backend shares them between hosts using an atomic Lua script over
+the Redis protocol. Every backend exposes the same atomic ``take`` operation so
+limiters can lease tokens in batches and avoid a round trip per request.
+"""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.exceptions import ConfigurationError, ExternalServiceError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BucketTakeResult:
+    """Outcome of an atomic take against a shared token bucket."""
+
+    granted: int
+    remaining: float
+    retry_after: float = 0.0
+
+
+def _take_from_bucket(
+    tokens: float,
+    updated: float,
+    now: float,
+    minimum: int,
+    maximum: int,
+    capacity: int,
+    refill_rate: float,
+) -> Tuple[int, float, float]:
+    """Refill a bucket and take between `minimum` and `maximum` whole tokens.
+
+    Returns (granted, tokens_left, retry_after). Nothing is taken when fewer
+    than `minimum` tokens are available.
+    """
+    if now > updated:
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= minimum:
+        granted = max(minimum, min(maximum, int(tokens)))
+        return granted, tokens - granted, 0.0
+    retry_after = (minimum - tokens) / refill_rate if refill_rate > 0 else float("inf")
+    return 0, tokens, retry_after
+
+
+class RateLimitBackend(ABC):
+    """Interface for token bucket state storage."""
+
+    name = "base"
+
+    @abstractmethod
+    async def take(self, key: str, minimum: int, maximum: int, capacity: int, refill_rate: float) -> BucketTakeResult:
+        """
+        Atomically refill the bucket at `key` and take tokens from it.
+
+        Args:
+            key: Bucket identifier shared by all processes using the same limit
+            minimum: Tokens required for the take to succeed
+            maximum: Upper bound on tokens granted (for leasing extra tokens)
+            capacity: Bucket capacity
+            refill_rate: Tokens added per second
+
+        Returns:
+            BucketTakeResult with the number of granted tokens (0 when denied)
+        """
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local bucket storage (the default)."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, minimum: int, maximum: int, capacity: int, refill_rate: float) -> BucketTakeResult:
+        now = time.time()
+        state = self._buckets.get(key)
+        tokens, updated = (state[0], state[1]) if state else (float(capacity), now)
+        granted, left, retry_after = _take_from_bucket(tokens, updated, now, minimum, maximum, capacity, refill_rate)
+        self._buckets[key] = [left, now]
+        return BucketTakeResult(granted=granted, remaining=left, retry_after=retry_after)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Bucket storage in a SQLite file shared by workers on one host.
+
+    Each take runs inside a ``BEGIN IMMEDIATE`` transaction so concurrent
+    processes serialize on the database write lock.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._thread_lock = threading.Lock()
+
+    def _take_sync(self, key: str, minimum: int, maximum: int, capacity: int, refill_rate: float) -> BucketTakeResult:
+        with self._thread_lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = cur.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (float(capacity), now)
+                granted, left, retry_after = _take_from_bucket(
+                    tokens, updated, now, minimum, maximum, capacity, refill_rate
+                )
+                cur.execute(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, left, now),
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return BucketTakeResult(granted=granted, remaining=left, retry_after=retry_after)
+
+    async def take(self, key: str, minimum: int, maximum: int, capacity: int, refill_rate: float) -> BucketTakeResult:
+        return await asyncio.to_thread(self._take_sync, key, minimum, maximum, capacity, refill_rate)
+
+    async def close(self) -> None:
+        with self._thread_lock:
+            self._conn.close()
+
+
+# KEYS[1] = bucket key; ARGV = minimum, maximum, capacity, refill_rate
+# Uses the server clock so hosts with skewed clocks still agree.
+TOKEN_BUCKET_LUA = """
+local minimum = tonumber(ARGV[1])
+local maximum = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local rate = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+if now > updated then
+  tokens = math.min(capacity, tokens + (now - updated) * rate)
+end
+local granted = 0
+local retry_after = 0
+if tokens >= minimum then
+  granted = math.max(minimum, math.min(maximum, math.floor(tokens)))
+  tokens = tokens - granted
+elseif rate > 0 then
+  retry_after = (minimum - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / math.max(rate, 0.000001) * 1000) + 1000)
+return {granted, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RedisProtocolError(ExternalServiceError):
+    """Raised when a Redis server returns an error reply."""
+
+    def __init__(self, message: str):
+        self.reply = message
+        super().__init__("redis", message)
+
+
+class _RespConnection:
+    """Minimal single-connection Redis protocol (RESP2) client."""
+
+    def __init__(self, host: str, port: int, password: Optional[str] = None, db: int = 0, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.db = db
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+
+    @staticmethod
+    def _encode(args: Tuple[Any, ...]) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        assert self._reader is not None
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise RedisProtocolError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2].decode()
+        if prefix == b"*":
+            count = int(body)
+            if count == -1:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"Unexpected reply prefix {prefix!r}")
+
+    async def _roundtrip(self, *args: Any) -> Any:
+        assert self._writer is not None
+        self._writer.write(self._encode(args))
+        await self._writer.drain()
+        return await asyncio.wait_for(self._read_reply(), timeout=self.timeout)
+
+    async def execute(self, *args: Any) -> Any:
+        """Send one command and return its parsed reply, reconnecting once on connection loss."""
+        async with self._lock:
+            for attempt in range(2):
+                if self._writer is None:
+                    await self._connect()
+                try:
+                    return await self._roundtrip(*args)
+                except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    await self._close_unlocked()
+                    if attempt:
+                        raise
+
+    async def _close_unlocked(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = None
+        self._writer = None
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close_unlocked()
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Bucket storage in Redis (or any server speaking the Redis protocol).
+
+    Takes are evaluated server-side by a Lua script, so they are atomic across
+    every process and host sharing the server.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "ratelimit:", timeout: float = 2.0):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "tcp"):
+            raise ConfigurationError(f"Unsupported rate limit backend URL scheme: {parsed.scheme}")
+        db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix
+        self._conn = _RespConnection(
+            parsed.hostname or "localhost", parsed.port or 6379, password=parsed.password, db=db, timeout=timeout
+        )
+        self._script_sha = hashlib.sha1(TOKEN_BUCKET_LUA.encode()).hexdigest()
+
+    async def take(self, key: str, minimum: int, maximum: int, capacity: int, refill_rate: float) -> BucketTakeResult:
+        full_key = f"{self.key_prefix}{key}"
+        args = (1, full_key, minimum, maximum, capacity, repr(refill_rate))
+        try:
+            reply = await self._conn.execute("EVALSHA", self._script_sha, *args)
+        except RedisProtocolError as e:
+            if not e.reply.startswith("NOSCRIPT"):
+                raise
+            reply = await self._conn.execute("EVAL", TOKEN_BUCKET_LUA, *args)
+        granted, remaining, retry_after = reply
+        return BucketTakeResult(granted=int(granted), remaining=float(remaining), retry_after=float(retry_after))
+
+    async def close(self) -> None:
+        await self._conn.close()
+
+
+def create_rate_limit_backend(
+    kind: str, sqlite_path: Optional[str] = None, redis_url: Optional[str] = None
+) -> RateLimitBackend:
+    """Build a backend from configuration values."""
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return InMemoryRateLimitBackend()
+    if kind == "sqlite":
+        if not sqlite_path:
+            raise ConfigurationError("RATE_LIMIT_SQLITE_PATH is required for the sqlite rate limit backend")
+        return SQLiteRateLimitBackend(sqlite_path)
+    if kind == "redis":
+        if not redis_url:
+            raise ConfigurationError("RATE_LIMIT_REDIS_URL is required for the redis rate limit backend")
+        return RedisRateLimitBackend(redis_url)
+    raise ConfigurationError(f"Unknown rate limit backend: {kind}")
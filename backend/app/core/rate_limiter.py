@@ -8,9 +8,10 @@ exceeding API quotas and maintain service reliability.
 import asyncio
 import logging
 import time
+from collections import OrderedDict, deque
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Literal, Optional, Union, overload
+from typing import Any, Deque, Dict, Literal, Optional, Union, overload
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class RateLimitConfig:
 
 
 from app.core.exceptions import RateLimitExceededError
+from app.core.rate_limit_backends import InMemoryRateLimitBackend, RateLimitBackend, create_rate_limit_backend
 
 
 class TokenBucketRateLimiter:
@@ -37,73 +39,162 @@ class TokenBucketRateLimiter:
     Token bucket rate limiter implementation.
 
     Allows for burst requests up to bucket capacity while maintaining
-    an average rate over time.
+    an average rate over time. Bucket state lives in a pluggable backend so
+    several workers or instances can enforce one shared quota; with a shared
+    backend, tokens are leased `lease_size` at a time and handed out locally.
     """
 
-    def __init__(self, config: RateLimitConfig):
+    def __init__(self, config: RateLimitConfig, backend: Optional[RateLimitBackend] = None, lease_size: int = 1):
         self.config = config
         self.capacity = config.burst_limit or max(10, config.requests_per_hour // 60)
-        self.tokens = self.capacity
-        self.last_refill = time.time()
         self.refill_rate = config.requests_per_hour / 3600  # tokens per second
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.lease_size = max(1, min(lease_size, self.capacity))
+        # Last observed bucket level plus tokens leased to this process
+        self.tokens: float = self.capacity
+        self._leased = 0
         self._lock = asyncio.Lock()
+        # asyncio.Lock wakes waiters in FIFO order, which makes the queue fair
+        self._waiter_lock = asyncio.Lock()
+        self._waiting = 0
+        # Queue wait metrics
+        self.waits = 0
+        self.wait_timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=500)
 
         logger.info(
             f"Initialized rate limiter '{config.name}' with "
             f"{config.requests_per_hour} requests/hour, "
-            f"burst capacity: {self.capacity}"
+            f"burst capacity: {self.capacity}, backend: {self.backend.name}"
         )
 
-    async def acquire(self, tokens: int = 1) -> None:
+    async def acquire(self, tokens: int = 1, wait: bool = False, timeout: Optional[float] = None) -> None:
         """
         Acquire tokens from the bucket.
 
         Args:
-            tokens: Number of tokens to acquire
+            tokens: Number of tokens to acquire (weight of the call)
+            wait: Queue until tokens are available instead of failing fast.
+                Waiters are served in FIFO order and sleep exactly until the
+                bucket has refilled enough for the head of the queue.
+            timeout: Maximum seconds to wait when `wait` is True (None = no limit)
 
         Raises:
-            RateLimitExceededError: When insufficient tokens available
+            RateLimitExceededError: When insufficient tokens available (or the
+                wait would exceed `timeout`)
+            ValueError: When `tokens` exceeds the bucket capacity
         """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from '{self.config.name}' (capacity {self.capacity})")
+
+        if not wait:
+            # Don't let fail-fast callers jump ahead of queued waiters
+            if self._waiting:
+                raise self._exceeded(self._estimated_wait(tokens))
+            retry_after = await self._try_acquire(tokens)
+            if retry_after is not None:
+                logger.warning(f"Rate limit exceeded for '{self.config.name}', need {tokens} tokens")
+                raise self._exceeded(retry_after)
+            return
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = None if timeout is None else started + timeout
+        self._waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._waiter_lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.wait_timeouts += 1
+                raise self._exceeded(self._estimated_wait(tokens))
+            try:
+                throttled = False
+                while True:
+                    retry_after = await self._try_acquire(tokens)
+                    if retry_after is None:
+                        break
+                    if deadline is not None and loop.time() + retry_after > deadline:
+                        self.wait_timeouts += 1
+                        raise self._exceeded(retry_after)
+                    if not throttled:
+                        throttled = True
+                        logger.info(
+                            f"Rate limit reached for '{self.config.name}', waiting {retry_after:.2f}s "
+                            f"for {tokens} tokens ({self._waiting} queued)"
+                        )
+                    await asyncio.sleep(retry_after)
+            finally:
+                self._waiter_lock.release()
+        finally:
+            self._waiting -= 1
+
+        waited = loop.time() - started
+        self.waits += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        self._recent_waits.append(waited)
+
+    async def _try_acquire(self, tokens: int) -> Optional[float]:
+        """Take tokens from the lease or backend; return seconds to wait if denied."""
         async with self._lock:
-            self._refill_bucket()
+            if self._leased >= tokens:
+                self._leased -= tokens
+                logger.debug(f"Acquired {tokens} leased tokens for '{self.config.name}', leased: {self._leased}")
+                return None
+
+            needed_tokens = tokens - self._leased
+            result = await self.backend.take(
+                self.config.name,
+                minimum=needed_tokens,
+                maximum=max(needed_tokens, self.lease_size),
+                capacity=self.capacity,
+                refill_rate=self.refill_rate,
+            )
+            self.tokens = result.remaining
 
-            if self.tokens >= tokens:
-                self.tokens -= tokens
+            if result.granted:
+                self._leased += result.granted - tokens
                 logger.debug(f"Acquired {tokens} tokens for '{self.config.name}', " f"remaining: {self.tokens}")
-            else:
-                # Calculate when enough tokens will be available
-                needed_tokens = tokens - self.tokens
-                wait_time = needed_tokens / self.refill_rate
-                reset_time = time.time() + wait_time
-
-                logger.warning(f"Rate limit exceeded for '{self.config.name}', need {needed_tokens} more tokens")
-                retry_after = max(0, reset_time - time.time())
-                raise RateLimitExceededError(
-                    message=(f"Rate limit exceeded for '{self.config.name}'. Retry after {retry_after:.1f} seconds."),
-                    retry_after=retry_after,
-                    service_name=self.config.name,
-                )
+                return None
 
-    def _refill_bucket(self):
-        """Refill tokens based on elapsed time."""
-        now = time.time()
-        elapsed = now - self.last_refill
+            logger.debug(f"Denied {tokens} tokens for '{self.config.name}', need {needed_tokens} more")
+            return max(0.0, result.retry_after)
 
-        # Add tokens based on elapsed time
-        tokens_to_add = elapsed * self.refill_rate
-        self.tokens = min(self.capacity, self.tokens + tokens_to_add)
-        self.last_refill = now
+    def _estimated_wait(self, tokens: int) -> float:
+        """Rough wait for `tokens` behind the current queue, from the last observed level."""
+        deficit = tokens - (self.tokens + self._leased)
+        return max(0.0, deficit / self.refill_rate) if self.refill_rate > 0 else 0.0
+
+    def _exceeded(self, retry_after: float) -> RateLimitExceededError:
+        return RateLimitExceededError(
+            message=(f"Rate limit exceeded for '{self.config.name}'. Retry after {retry_after:.1f} seconds."),
+            retry_after=retry_after,
+            service_name=self.config.name,
+        )
 
     @property
     def status(self) -> Dict[str, Any]:
         """Get current rate limiter status."""
-        self._refill_bucket()
+        recent = sorted(self._recent_waits)
         return {
             "name": self.config.name,
-            "available_tokens": self.tokens,
+            "available_tokens": self.tokens + self._leased,
             "capacity": self.capacity,
             "refill_rate": self.refill_rate,
             "requests_per_hour": self.config.requests_per_hour,
+            "backend": self.backend.name,
+            "leased_tokens": self._leased,
+            "queue": {
+                "waiting": self._waiting,
+                "waits": self.waits,
+                "timeouts": self.wait_timeouts,
+                "total_wait_seconds": round(self.wait_time_total, 3),
+                "max_wait_seconds": round(self.wait_time_max, 3),
+                "p50_wait_seconds": round(recent[len(recent) // 2], 3) if recent else 0.0,
+                "p95_wait_seconds": round(recent[int(len(recent) * 0.95)], 3) if recent else 0.0,
+            },
         }
 
 
@@ -185,13 +276,159 @@ class SlidingWindowRateLimiter:
         }
 
 
+@dataclass
+class RateLimitDecision:
+    """Outcome of a single keyed rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+@dataclass(slots=True)
+class _WindowCounter:
+    """Constant-size per-key state for the sliding window counter."""
+
+    window_start: float
+    last_seen: float
+    current: int = 0
+    previous: int = 0
+
+
+class KeyedSlidingWindowLimiter:
+    """
+    Sliding window counter rate limiter for many independent keys.
+
+    Each key keeps two integer counters (current and previous fixed window)
+    and the estimated request count is the current count plus the previous
+    count weighted by how much of the previous window still overlaps the
+    sliding window. State and cost per check are O(1) per key.
+
+    Keys live in an LRU table with a hard cap; keys idle for longer than two
+    windows are dropped since their state is indistinguishable from a fresh
+    key. Checks never await, so no locking is needed under asyncio.
+    """
+
+    def __init__(self, window_seconds: int = 60, max_keys: int = 10000, name: str = "keyed"):
+        if max_keys < 1:
+            raise ValueError("max_keys must be at least 1")
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self.name = name
+        self._entries: "OrderedDict[str, _WindowCounter]" = OrderedDict()
+        self.evictions = 0
+
+    def hit(self, key: str, limit: int, cost: int = 1, now: Optional[float] = None) -> RateLimitDecision:
+        """
+        Record `cost` requests for `key` if they fit within `limit` per window.
+
+        Args:
+            key: Client identifier (IP address, API key, ...)
+            limit: Maximum requests per sliding window for this key
+            cost: Number of requests to charge
+            now: Monotonic timestamp override (for tests)
+
+        Returns:
+            RateLimitDecision describing whether the requests were admitted
+        """
+        now = time.monotonic() if now is None else now
+        window = self.window_seconds
+        self._expire_idle(now)
+
+        entry = self._entries.get(key)
+        aligned_start = now - (now % window)
+        if entry is None:
+            entry = _WindowCounter(window_start=aligned_start, last_seen=now)
+            self._entries[key] = entry
+            if len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+            if aligned_start > entry.window_start:
+                # Roll windows; anything older than one full window carries no weight
+                entry.previous = entry.current if aligned_start - entry.window_start <= window else 0
+                entry.current = 0
+                entry.window_start = aligned_start
+        entry.last_seen = now
+
+        elapsed = now - entry.window_start
+        previous_weight = 1.0 - elapsed / window
+        estimated = entry.previous * previous_weight + entry.current
+
+        if estimated + cost > limit:
+            return RateLimitDecision(
+                allowed=False,
+                limit=limit,
+                remaining=max(0, int(limit - estimated)),
+                retry_after=self._retry_after(entry, limit, cost, elapsed),
+            )
+
+        entry.current += cost
+        return RateLimitDecision(
+            allowed=True,
+            limit=limit,
+            remaining=max(0, int(limit - (estimated + cost))),
+        )
+
+    def _retry_after(self, entry: _WindowCounter, limit: int, cost: int, elapsed: float) -> float:
+        """Seconds until `cost` more requests would be admitted for this entry."""
+        window = self.window_seconds
+        if entry.current + cost > limit or entry.previous == 0:
+            # Need the current window to roll over
+            return max(0.0, window - elapsed)
+        # Wait for the previous window's weight to decay enough
+        required_weight = (limit - entry.current - cost) / entry.previous
+        return max(0.0, window * (1.0 - required_weight) - elapsed)
+
+    def _expire_idle(self, now: float) -> None:
+        """Drop least-recently-used keys that have been idle for two windows."""
+        cutoff = now - 2 * self.window_seconds
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.last_seen > cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Get current rate limiter status."""
+        return {
+            "name": self.name,
+            "tracked_keys": len(self._entries),
+            "max_keys": self.max_keys,
+            "window_size": self.window_seconds,
+            "evictions": self.evictions,
+        }
+
+
 class RateLimiterManager:
     """
     Manages multiple rate limiters for different services.
     """
 
-    def __init__(self):
+    def __init__(self, backend: Optional[RateLimitBackend] = None, lease_size: int = 1):
         self._limiters: Dict[str, Union[TokenBucketRateLimiter, SlidingWindowRateLimiter]] = {}
+        self._backend = backend
+        self.lease_size = lease_size
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        """Shared token bucket backend, built from settings on first use."""
+        if self._backend is None:
+            from app.config.settings import settings
+
+            self._backend = create_rate_limit_backend(
+                settings.RATE_LIMIT_BACKEND,
+                sqlite_path=settings.RATE_LIMIT_SQLITE_PATH,
+                redis_url=settings.RATE_LIMIT_REDIS_URL,
+            )
+            self.lease_size = settings.RATE_LIMIT_LEASE_SIZE
+        return self._backend
 
     @overload
     def create_limiter(
@@ -216,7 +453,7 @@ class RateLimiterManager:
 
         limiter: Union[TokenBucketRateLimiter, SlidingWindowRateLimiter]
         if limiter_type == "token_bucket":
-            limiter = TokenBucketRateLimiter(config)
+            limiter = TokenBucketRateLimiter(config, backend=self.backend, lease_size=self.lease_size)
         elif limiter_type == "sliding_window":
             limiter = SlidingWindowRateLimiter(config)
         else:
@@ -234,11 +471,9 @@ class RateLimiterManager:
         return {name: limiter.status for name, limiter in self._limiters.items()}
 
     @asynccontextmanager
-    async def acquire(self, service_name: str, tokens: int = 1):
+    async def acquire(self, service_name: str, tokens: int = 1, wait: bool = False, timeout: Optional[float] = None):
         """Context manager for acquiring rate limit tokens."""
-        limiter = self.get_limiter(service_name)
-        if limiter:
-            await limiter.acquire(tokens)
+        await _acquire_from(self.get_limiter(service_name), tokens, wait, timeout)
 
         try:
             yield
@@ -247,6 +482,19 @@ class RateLimiterManager:
             pass
 
 
+async def _acquire_from(
+    limiter: Optional[Union[TokenBucketRateLimiter, SlidingWindowRateLimiter]],
+    tokens: int,
+    wait: bool,
+    timeout: Optional[float],
+) -> None:
+    """Acquire from a limiter, queueing only where the limiter supports it."""
+    if isinstance(limiter, TokenBucketRateLimiter):
+        await limiter.acquire(tokens, wait=wait, timeout=timeout)
+    elif limiter:
+        await limiter.acquire(tokens)
+
+
 # Global rate limiter manager instance
 rate_limiter_manager = RateLimiterManager()
 
@@ -275,14 +523,34 @@ def create_openai_rate_limiter() -> TokenBucketRateLimiter:
     return rate_limiter_manager.create_limiter("openai_api", config)
 
 
+def create_openai_token_rate_limiter() -> TokenBucketRateLimiter:
+    """Create a limiter that charges OpenAI calls by estimated tokens (TPM quota)."""
+    from app.config.settings import settings
+
+    tokens_per_minute = getattr(settings, "OPENAI_TOKENS_PER_MINUTE", 500000)
+    config = RateLimitConfig(
+        requests_per_hour=tokens_per_minute * 60,
+        burst_limit=tokens_per_minute,  # A full minute of quota can be spent at once
+        name="openai_tokens",
+    )
+    return rate_limiter_manager.create_limiter("openai_tokens", config)
+
+
+def estimate_openai_tokens(prompt: str, max_output_tokens: int = 0) -> int:
+    """Cheap token estimate (~4 characters per token) for weighting limiter acquisitions."""
+    return max(1, len(prompt) // 4 + max_output_tokens)
+
+
 # Decorator for automatic rate limiting
-def rate_limited(service_name: str, tokens: int = 1):
+def rate_limited(service_name: str, tokens: int = 1, wait: bool = False, timeout: Optional[float] = None):
     """
     Decorator for applying rate limiting to functions.
 
     Args:
         service_name: Name of the rate limiter to use
         tokens: Number of tokens to acquire
+        wait: Queue for tokens instead of failing fast
+        timeout: Maximum seconds to queue when `wait` is True
 
     Example:
         @rate_limited("github_api", tokens=1)
@@ -293,9 +561,7 @@ def rate_limited(service_name: str, tokens: int = 1):
 
     def decorator(func):
         async def wrapper(*args, **kwargs):
-            limiter = rate_limiter_manager.get_limiter(service_name)
-            if limiter:
-                await limiter.acquire(tokens)
+            await _acquire_from(rate_limiter_manager.get_limiter(service_name), tokens, wait, timeout)
             return await func(*args, **kwargs)
 
         return wrapper
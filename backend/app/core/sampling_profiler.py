@@ -0,0 +1,275 @@
+"""
+On-demand statistical profiler for the running service.
+
+A sampler thread snapshots the stack of every thread with
+``sys._current_frames`` at a fixed interval, so the event loop, ``to_thread``
+executor workers and anyio threadpool workers are all covered without
+instrumenting any code. Results come back as collapsed stacks (one
+``frame;frame;frame count`` line per unique stack, the input format of
+flamegraph tools) or as a self-contained flamegraph SVG.
+
+Samples are tagged with the HTTP route being served. ``RouteTaggingMiddleware``
+calls ``tag_request`` for every request: the loop thread's samples are matched
+through the running task, and worker thread samples through the
+``contextvars.Context`` that ``asyncio.to_thread`` and anyio copy into the
+worker, so blocking work offloaded by an endpoint is attributed to it.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hashlib
+import html
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_request_scope: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "profiled_request_scope", default=None
+)
+_task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Leaf frames of threads that are waiting rather than working (selector poll, lock/queue waits, idle executor)
+_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait"), ("thread.py", "_worker")}
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+@contextmanager
+def tag_request(scope: Dict[str, Any]) -> Iterator[None]:
+    """Attribute samples taken while this request is handled to its route."""
+    token = _request_scope.set(scope)
+    task = asyncio.current_task()
+    if task is not None:
+        _task_scopes[task] = scope
+    try:
+        yield
+    finally:
+        _request_scope.reset(token)
+        if task is not None:
+            _task_scopes.pop(task, None)
+
+
+def _route_of(scope: Dict[str, Any]) -> Tuple[str, str]:
+    """(route template, request path); the router fills in ``scope["route"]`` once it has matched."""
+    path = scope.get("path", "")
+    return getattr(scope.get("route"), "path", None) or path, path
+
+
+def _worker_codes() -> Dict[Any, str]:
+    """Code objects of the thread pool loops whose frames hold the submitted call's context."""
+    from concurrent.futures.thread import _WorkItem
+
+    codes = {_WorkItem.run.__code__: "work_item"}
+    try:
+        from anyio._backends._asyncio import WorkerThread
+
+        codes[WorkerThread.run.__code__] = "anyio"
+    except (ImportError, AttributeError):
+        pass
+    return codes
+
+
+def _worker_context(frame: Any, kind: str) -> Optional[contextvars.Context]:
+    if kind == "anyio":
+        context = frame.f_locals.get("context")
+    else:
+        # asyncio.to_thread submits functools.partial(context.run, func, ...)
+        fn = getattr(frame.f_locals.get("self"), "fn", None)
+        context = getattr(fn.func, "__self__", None) if isinstance(fn, functools.partial) else None
+    return context if isinstance(context, contextvars.Context) else None
+
+
+def _frame_label(code: Any) -> str:
+    filename = code.co_filename
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    elif filename.startswith(_BACKEND_ROOT):
+        filename = os.path.relpath(filename, _BACKEND_ROOT)
+    return f"{code.co_name} ({filename})"
+
+
+@dataclass
+class Profile:
+    """Aggregated samples of one profiling run."""
+
+    seconds: float
+    interval_ms: float
+    route: Optional[str] = None
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, heaviest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def flamegraph_svg(self, title: str = "Flame graph") -> str:
+        return render_flamegraph(self.stacks, title)
+
+
+class SamplingProfiler:
+    """Samples all thread stacks for a fixed duration; one profile at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+        self._worker_codes = _worker_codes()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+        self,
+        seconds: float,
+        interval_ms: float = 10.0,
+        route: Optional[str] = None,
+        include_idle: bool = False,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread_id: Optional[int] = None,
+    ) -> Profile:
+        """
+        Sample every thread for ``seconds``; blocks the calling thread, so run it via ``asyncio.to_thread``.
+
+        Args:
+            route: Keep only samples attributed to this route (template such as
+                ``/api/v1/users/{user_id}`` or a concrete request path)
+            include_idle: Keep samples of threads that are only waiting
+            loop, loop_thread_id: Event loop serving requests, used to tag its samples by route
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            result = Profile(seconds=seconds, interval_ms=interval_ms, route=route)
+            interval = interval_ms / 1000
+            own_thread = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            next_sample = time.monotonic()
+            while next_sample < deadline:
+                self._sample(result, own_thread, include_idle, loop, loop_thread_id)
+                next_sample += interval
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind (e.g. the GIL was held); skip missed ticks instead of bursting
+                    next_sample = time.monotonic()
+            return result
+        finally:
+            self._lock.release()
+
+    def _sample(
+        self,
+        result: Profile,
+        own_thread: int,
+        include_idle: bool,
+        loop: Optional[asyncio.AbstractEventLoop],
+        loop_thread_id: Optional[int],
+    ) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            frames = []
+            scope = None
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()
+
+            leaf = frames[-1].f_code
+            if not include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                continue
+
+            if thread_id == loop_thread_id and loop is not None:
+                task = asyncio.current_task(loop)
+                scope = _task_scopes.get(task) if task is not None else None
+            else:
+                for candidate in frames:
+                    kind = self._worker_codes.get(candidate.f_code)
+                    if kind is not None:
+                        context = _worker_context(candidate, kind)
+                        scope = context.get(_request_scope) if context is not None else None
+                        break
+
+            template, path = _route_of(scope) if scope is not None else (None, None)
+            if result.route is not None and result.route not in (template, path):
+                continue
+
+            labels = [names.get(thread_id, f"thread-{thread_id}")]
+            if template is not None:
+                labels.insert(0, f"{scope.get('method', '')} {template}".strip())
+            for entry in frames:
+                label = self._labels.get(entry.f_code)
+                if label is None:
+                    label = self._labels[entry.f_code] = _frame_label(entry.f_code)
+                labels.append(label)
+            result.stacks[";".join(labels)] += 1
+        result.samples += 1
+
+
+def render_flamegraph(stacks: Dict[str, int], title: str = "Flame graph", width: int = 1200) -> str:
+    """Render collapsed stacks as a standalone SVG flame graph (root at the bottom, hover for details)."""
+    frame_height, font_size, header = 16, 11, 28
+    root: Dict[str, Any] = {"value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"value": 0, "children": {}})
+            node["value"] += count
+
+    def depth_of(node: Dict[str, Any]) -> int:
+        return 1 + max((depth_of(child) for child in node["children"].values()), default=0)
+
+    total = root["value"] or 1
+    height = header + (depth_of(root) - 1) * frame_height + 8
+    scale = (width - 20) / total
+    rects: List[str] = []
+
+    def layout(node: Dict[str, Any], x: float, depth: int) -> None:
+        for name, child in sorted(node["children"].items()):
+            child_width = child["value"] * scale
+            if child_width >= 0.5:
+                y = height - 8 - (depth + 1) * frame_height
+                digest = hashlib.md5(name.encode()).digest()
+                color = f"rgb({205 + digest[0] % 50},{digest[1] % 180 + 40},{digest[2] % 55})"
+                label = html.escape(name)
+                percent = 100 * child["value"] / total
+                text = name[: int(child_width / (font_size * 0.6))]
+                rects.append(
+                    f'<g><title>{label} ({child["value"]} samples, {percent:.2f}%)</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{child_width:.1f}" height="{frame_height - 1}" fill="{color}"/>'
+                    + (
+                        f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">{html.escape(text)}</text>'
+                        if len(text) >= 3
+                        else ""
+                    )
+                    + "</g>"
+                )
+                layout(child, x, depth + 1)
+            x += child_width
+
+    layout(root, 10.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="Verdana" font-size="{font_size}">'
+        f'<rect width="100%" height="100%" fill="#f8f8f8"/>'
+        f'<text x="{width / 2}" y="18" text-anchor="middle" font-size="14">{html.escape(title)}</text>'
+        + "".join(rects)
+        + "</svg>"
+    )
+
+
+# Global profiler used by the /health/profile endpoint
+sampling_profiler = SamplingProfiler()
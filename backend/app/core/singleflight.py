@@ -0,0 +1,137 @@
+"""
+Singleflight request coalescing.
+
+When several coroutines ask for the same expensive operation at the same
+moment (two webhook deliveries for one commit, parallel author lookups during
+a push, dashboards loading the same KPI range), only the first call runs.
+Later callers with the same key await the in-flight call and receive its
+result or exception. When a call was shared, every caller gets its own deep
+copy of the result, so one caller mutating it cannot affect the others.
+Nothing is cached once the call completes.
+"""
+
+import asyncio
+import copy
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(operation: str, *args: Any, **kwargs: Any) -> Hashable:
+    """Build a hashable key from an operation name and its arguments."""
+    return (operation, tuple(str(arg) for arg in args), tuple(sorted((k, str(v)) for k, v in kwargs.items())))
+
+
+@dataclass
+class _Call:
+    """An in-flight call and how many callers are waiting on it."""
+
+    task: asyncio.Task
+    callers: int = 1
+
+
+class SingleFlight:
+    """
+    Group of coalesced calls sharing one key space.
+
+    Usage:
+        flight = SingleFlight("user_lookup")
+        user = await flight.do(key, repo.get_user_by_github_username, username)
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._in_flight: Dict[Hashable, _Call] = {}
+        # Counters for status reporting
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+        self.failures = 0
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run `func(*args, **kwargs)` unless a call with the same key is in flight.
+
+        The shared call runs in its own task, so a caller that is cancelled
+        (e.g. by a timeout) does not cancel the work for the other callers.
+        """
+        self.calls += 1
+        call = self._in_flight.get(key)
+        if call is not None:
+            call.callers += 1
+            self.collapsed += 1
+            logger.debug(f"Singleflight '{self.name}' joined in-flight call for {key!r}")
+        else:
+            self.executions += 1
+            call = _Call(asyncio.ensure_future(func(*args, **kwargs)))
+            self._in_flight[key] = call
+            call.task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        result = await asyncio.shield(call.task)
+        # Nobody can join once the task is done, so the count is final here; the first
+        # caller to resume may mutate what it gets before the others resume
+        return copy.deepcopy(result) if call.callers > 1 else result
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        call = self._in_flight.get(key)
+        if call is not None and call.task is task:
+            del self._in_flight[key]
+        # Retrieve the exception so it is not reported as unhandled when every caller gave up
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return True if a call for `key` is currently running."""
+        return key in self._in_flight
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Get current singleflight counters."""
+        return {
+            "name": self.name,
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "failures": self.failures,
+            "collapse_ratio": round(self.collapsed / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+class SingleFlightManager:
+    """
+    Manages named singleflight groups.
+    """
+
+    def __init__(self):
+        self._groups: Dict[str, SingleFlight] = {}
+
+    def get_group(self, name: str) -> SingleFlight:
+        """Get a group by name, creating it on first use."""
+        group = self._groups.get(name)
+        if group is None:
+            group = SingleFlight(name)
+            self._groups[name] = group
+        return group
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get counters of all groups."""
+        return {name: group.status for name, group in self._groups.items()}
+
+
+# Global singleflight manager instance
+singleflight_manager = SingleFlightManager()
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """Get (or lazily create) a shared singleflight group."""
+    return singleflight_manager.get_group(name)
+
+
+async def coalesce(
+    operation: str, func: Callable[..., Awaitable[Any]], *args: Any, key: Optional[Hashable] = None, **kwargs: Any
+) -> Any:
+    """Run `func` through the `operation` group, keyed on its arguments unless `key` is given."""
+    flight = get_singleflight(operation)
+    return await flight.do(key if key is not None else make_key(operation, *args, **kwargs), func, *args, **kwargs)
@@ -0,0 +1,117 @@
+"""
+In-process stale-while-revalidate cache.
+
+A value is *fresh* for ``fresh_ttl`` seconds and is returned as-is. After
+that it is *stale* for up to ``stale_ttl`` more seconds: callers still get it
+immediately while one background task reloads it. Past that window (or on
+a miss) callers wait for the load. Loads for the same key are coalesced
+through a singleflight group, so a cold dashboard hit by ten browsers runs
+the underlying queries once.
+
+``invalidate`` bumps a generation counter as well as dropping entries, so a
+reload that started before the invalidation cannot write its (now outdated)
+result back into the cache.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from app.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    loaded_at: float
+
+
+class StaleWhileRevalidateCache:
+    """
+    Keyed cache of coroutine results with background refresh.
+
+    Usage:
+        cache = StaleWhileRevalidateCache("dashboard", fresh_ttl=60, stale_ttl=600)
+        data = await cache.get_or_load(("weekly", 2025, 3), load_week)
+    """
+
+    def __init__(self, name: str, fresh_ttl: float, stale_ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._flight = SingleFlight(f"swr:{name}")
+        self._refreshing: Set[Hashable] = set()
+        self._generation = 0
+        # Counters for status reporting
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, loading or revalidating it with ``loader`` as needed."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.loaded_at
+            if age < self.fresh_ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.fresh_ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._schedule_refresh(key, loader)
+                return entry.value
+
+        self.misses += 1
+        return await self._flight.do(key, self._load, key, loader)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        value = await loader()
+        if generation == self._generation:
+            self._entries[key] = _Entry(value=value, loaded_at=self._clock())
+        return value
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing or self._flight.in_flight(key):
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._flight.do(key, self._load, key, loader)
+            except Exception as e:
+                # Keep serving the stale value; the next stale hit retries
+                self.refresh_failures += 1
+                logger.warning(f"Background refresh of {self.name} cache key {key!r} failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        asyncio.ensure_future(refresh())
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop all entries (or those whose key matches ``predicate``). Returns the number dropped."""
+        self._generation += 1
+        keys = [key for key in self._entries if predicate is None or predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        if keys:
+            logger.info(f"Invalidated {len(keys)} {self.name} cache entries")
+        return len(keys)
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Get current cache counters."""
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_failures": self.refresh_failures,
+        }
@@ -8,14 +8,34 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 
 from app.config.settings import settings
+from app.integrations.llm_gateway import get_llm_gateway
+from app.integrations.prompt_assembly import PromptTemplate
+from app.integrations.prompts import DAILY_WORK_DELTA_PROMPT, DAILY_WORK_PROMPT
 from app.models.daily_report import ClarificationStatus
 
 logger = logging.getLogger(__name__)
 
+# Fields of the previous daily result sent with an incremental (delta) update
+DAILY_DELTA_PREVIOUS_FIELDS = (
+    "total_estimated_hours",
+    "initial_anchor",
+    "final_anchor",
+    "base_hours",
+    "multipliers_applied",
+    "average_complexity",
+    "average_seniority",
+    "risk_level",
+    "work_summary",
+    "key_achievements",
+    "hour_estimation_reasoning",
+    "impact_summary",
+    "consistency_with_report",
+    "eod_hours_reported",
+)
+
 
 class AIIntegrationV2:
     """Standardized integration with OpenAI API using consistent patterns."""
@@ -25,9 +45,12 @@ class AIIntegrationV2:
         self.api_key = settings.OPENAI_API_KEY
         if not self.api_key:
             logger.error("OpenAI API key not configured in settings")
+            self.gateway = None
             self.client = None
         else:
-            self.client = AsyncOpenAI(api_key=self.api_key)
+            # Shared OpenAI client with retries, deadlines, concurrency limiting and per-prompt metrics
+            self.gateway = get_llm_gateway()
+            self.client = self.gateway.client
 
         # Use standardized models
         self.model = settings.OPENAI_MODEL or "gpt-4-turbo-preview"
@@ -42,6 +65,7 @@ class AIIntegrationV2:
         response_format: Optional[Dict[str, str]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        prompt_template: Optional[PromptTemplate] = None,
     ) -> Optional[str]:
         """
         Make a standardized completion request to OpenAI.
@@ -52,9 +76,10 @@ class AIIntegrationV2:
             response_format: Response format (e.g., {"type": "json_object"})
             temperature: Temperature for sampling
             max_tokens: Maximum tokens in response
+            prompt_template: Template the messages were built from; its cached-token usage is recorded
 
         Returns:
-            Response content as string
+            Response content as string, or None when the request failed after the gateway's retries
         """
         if not self.client:
             logger.error("OpenAI client not initialized")
@@ -73,7 +98,7 @@ class AIIntegrationV2:
                 params["max_tokens"] = max_tokens
 
             # Make request
-            response = await self.client.chat.completions.create(**params)
+            response = await self.gateway.chat(prompt=prompt_template, **params)
 
             # Extract content
             if response.choices and response.choices[0].message:
@@ -746,188 +771,68 @@ Respond with JSON:
         Returns:
             Daily analysis
         """
+        messages = self.build_daily_work_messages(context)
+
+        response = await self._make_completion_request(
+            messages, response_format={"type": "json_object"}, temperature=0.4, prompt_template=DAILY_WORK_PROMPT
+        )
+
+        return self.parse_daily_work_response(response, context)
+
+    async def analyze_daily_work_delta(
+        self, previous: Dict[str, Any], context: Dict[str, Any], new_commit_hashes: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Update an earlier daily analysis with commits added since.
+
+        Only the previous result and the new commits are sent; the response
+        is the complete day-level analysis, parsed like analyze_daily_work.
+        """
+        messages = self.build_daily_work_delta_messages(previous, context, new_commit_hashes)
+
+        response = await self._make_completion_request(
+            messages,
+            response_format={"type": "json_object"},
+            temperature=0.4,
+            prompt_template=DAILY_WORK_DELTA_PROMPT,
+        )
+
+        return self.parse_daily_work_response(response, context)
+
+    def build_daily_work_messages(self, context: Dict[str, Any]) -> List[ChatCompletionMessageParam]:
+        """Build the chat messages for a daily work analysis (shared by the direct and batch paths)."""
+        commits_lines = ["\nCommits:"] + self._daily_commit_lines(context.get("commits", []))
+
+        # Static header, rubric and output schema lead the prompt (cacheable prefix); the day's data follows
+        return DAILY_WORK_PROMPT.chat_messages(
+            self._daily_work_header(context) + self._daily_report_section(context) + "\n\n" + "\n".join(commits_lines)
+        )
+
+    def build_daily_work_delta_messages(
+        self, previous: Dict[str, Any], context: Dict[str, Any], new_commit_hashes: List[str]
+    ) -> List[ChatCompletionMessageParam]:
+        """Chat messages for an incremental update: the previous result plus only the new commits."""
+        new_hashes = {h[:8] for h in new_commit_hashes}
+        new_commits = [c for c in context.get("commits", []) if c.get("hash") in new_hashes]
+        previous_summary = {key: previous.get(key) for key in DAILY_DELTA_PREVIOUS_FIELDS if key in previous}
+        sections = [
+            self._daily_work_header(context),
+            self._daily_report_section(context),
+            "## Previous Analysis\n\n" + json.dumps(previous_summary, indent=1, default=str),
+            "\nNew Commits:",
+            *self._daily_commit_lines(new_commits),
+        ]
+        return DAILY_WORK_DELTA_PROMPT.chat_messages("\n".join(sections))
+
+    @staticmethod
+    def _daily_work_header(context: Dict[str, Any]) -> str:
         user_name = context.get("user_name", "Unknown")
         analysis_date = context.get("analysis_date", "Unknown")
         total_commits = context.get("total_commits", 0)
         repositories = context.get("repositories", [])
         total_lines = context.get("total_lines_changed", 0)
 
-        # Build the comprehensive daily prompt (parallel to individual, adapted for day-level analysis)
-        header = (
-            "You are a senior engineering manager analyzing a developer’s entire day of work across one or more repositories. "
-            "Output only valid JSON with no additional commentary."
-        )
-
-        scoring = """
-## Scoring Guidelines
-
-### 1. HOURS-BASED DAILY SCORING
-
-Estimate total productive engineering time for the day considering:
-- Actual development time (not AI-assisted time)
-- Code review and refinement cycles
-- Mental effort, context switching, and architecture decisions
-- Cross-repo/component coordination
-
-#### Reference Anchors — DAILY CLASSIFICATION
-Select a base anchor using day-level totals (sum across all commits):
-
-STEP 1: Initial Classification (use total lines = additions + deletions)
-- Under 50 lines → Start with Anchor A
-- 50–199 lines → Start with Anchor B
-- 200–499 lines → Start with Anchor C
-- 500–1499 lines → Start with Anchor D
-- 1500+ lines → Consider Anchor D or E (see Step 2)
-
-STEP 2: Refinement Checks (apply IN ORDER; day-level evidence)
-1) Major Change Detection (can upgrade D→E):
-   □ Commit messages signal "new system/service/framework" or "breaking change"
-   □ 5+ new files created in new top-level directories
-   □ 20+ files changed across 3+ top-level directories
-   □ New technology/dependency introduced (new language, DB, framework)
-   If 2+ checked → Upgrade to Anchor E
-
-2) File Count Override (supersedes Step 1):
-   □ 25+ unique files changed during the day
-   If checked → Set to Anchor E
-
-3) Simplicity Reduction (can downgrade by one level):
-   □ >70% of changes are tests, docs, or comments
-   □ Messages emphasize "refactor", "rename", "move", or "cleanup"
-   □ Only config/constants/data files changed
-   If any checked → Downgrade one anchor level (but never below A)
-
-ANCHOR VALUES (base for the day before multipliers):
-- A: Minimal (0.5h) — Typos/configs/small fixes
-- B: Simple (2.5h) — Small, focused changes
-- C: Standard (6.0h) — Multi-file features or several moderate changes
-- D: Complex (12.0h) — Cross-component/day-spanning work
-- E: Major (20.0h) — New subsystems/architecture-level changes
-
-#### Daily Multipliers (apply to base hours)
-• High context switching (4+ distinct areas/repos): +30%
-• Multi-repo or cross-service coordination: +20%
-• Modifies critical path (messages indicate): +30%
-• Includes comprehensive tests (>50% of changes): +20%
-• Performance-critical work: +20%
-• Security-sensitive changes: +30%
-• Documentation-only day: -50%
-• Formatting/refactor-only day: -30%
-
-Daily sanity bounds:
-- Round final hours to nearest 0.5h
-- Typical days range 0.5–12h; rarely exceed 14h; hard cap at 16h unless overwhelming evidence suggests otherwise
-
-### 2. COMPLEXITY SCORING (1–10)
-
-Compute an average complexity for the day (weighted by significance/size). Count these factors:
-□ Changes core functionality (+3)
-□ Modifies multiple components (+2)
-□ Adds new abstractions/patterns (+2)
-□ Requires algorithmic thinking (+2)
-□ Handles error cases (+1)
-Total: Min 1, Max 10
-
-### 3. SENIORITY SCORING (1–10)
-
-Assess the day’s implementation quality (average across the work):
-□ Comprehensive error handling (+2)
-□ Well-structured tests (+2)
-□ Follows established patterns (+2)
-□ Good abstractions (+2)
-□ Forward-thinking design (+2)
-Total: Min 1, Max 10
-
-For trivial days (<20 lines AND average per-commit complexity ≤ 2 AND minimal changes):
-- Do not automatically set seniority = 10
-- Use seniority 6–9 if quality signals are consistently strong; otherwise 4–6
-
-### 4. RISK LEVEL (low|medium|high)
-
-Day-level deployment risk:
-- low: Docs/tests/isolated changes
-- medium: Core features or integrations with some risk
-- high: Critical path, data migrations, security-sensitive
-
-### 5. DAILY IMPACT SUMMARY (optional but recommended)
-
-Provide a compact day-level impact summary using the same additive formula as individual commits:
-- business_value (1–10)
-- technical_complexity (1–10)
-- code_quality_points (0.5–1.5)
-- risk_penalty (0–3)
-- impact_score = (business_value × 2) + (technical_complexity × 1.5) + code_quality_points − risk_penalty
-Also include:
-- classification: primary_category (feature|maintenance|refactor|docs|infra), with brief rationale
-- category_breakdown: counts or percentages by category
-- top_repositories_by_impact: list of {repo, score}
-
-### 6. EOD REPORT ALIGNMENT (if available)
-
-- consistency_with_report: true|false
-- eod_hours_reported: number or null
-- consistency_notes: brief explanation of alignment or discrepancy
-"""
-
-        output_schema = """
-## Output Format (JSON only)
-
-{
-  "analysis_date": "<YYYY-MM-DD>",
-  "user_name": "<string>",
-  "repositories": ["<owner/repo>", "..."],
-  "commits_evaluated": <int>,
-  "totals": {
-    "total_lines": <int>,
-    "total_files": <int>,
-    "commit_count": <int>,
-    "repos_count": <int>,
-    "components_touched": <int>
-  },
-
-  "initial_anchor": "<A|B|C|D|E>",
-  "major_change_checks": ["<string>", "..."],
-  "major_change_count": <int>,
-  "file_count_override": <boolean>,
-  "simplicity_reduction_checks": ["<string>", "..."],
-  "final_anchor": "<A|B|C|D|E>",
-  "base_hours": <float>,
-  "multipliers_applied": ["<string>", "..."],
-  "total_estimated_hours": <float>,
-  "average_complexity": <int>,
-  "risk_level": "<low|medium|high>",
-  "average_seniority": <int>,
-  "seniority_rationale": "<string>",
-
-  "work_summary": "<concise paragraph>",
-  "key_achievements": ["<string>", "..."],
-  "hour_estimation_reasoning": "<brief explanation>",
-
-  "impact_summary": {
-    "business_value": <int>,
-    "technical_complexity": <int>,
-    "code_quality_points": <float>,
-    "risk_penalty": <int>,
-    "impact_score": <float>,
-    "classification": {
-      "primary_category": "<feature|maintenance|refactor|docs|infra>",
-      "rationale": "<string>"
-    },
-    "category_breakdown": {"feature": <int>, "maintenance": <int>, "refactor": <int>, "docs": <int>, "infra": <int>},
-    "top_repositories_by_impact": [{"repo": "<owner/repo>", "score": <float>}]
-  },
-
-  "consistency_with_report": <boolean>,
-  "eod_hours_reported": <float|null>,
-  "consistency_notes": "<string>",
-
-  "top_changes": ["<string>", "..."],
-  "warnings": ["<string>", "..."],
-  "method": "daily_batch_v2"
-}
-"""
-
-        context_header = f"""
+        return f"""
 ## Daily Work to Analyze
 
 Developer: {user_name}
@@ -942,31 +847,53 @@ Guidance for large days:
 - If file lists are partial, infer totals from additions/deletions and commit distribution; note any assumptions in "warnings".
 """
 
-        # Build the commits list (include all commits provided by context)
-        commits_lines: List[str] = ["\nCommits:"]
-        for i, commit in enumerate(context.get("commits", []), 1):
+    @staticmethod
+    def _daily_report_section(context: Dict[str, Any]) -> str:
+        report = context.get("daily_report")
+        if not report:
+            return ""
+        lines = [
+            "\n## Daily Report\n",
+            f"Hours reported (non-commit work): {report.get('hours_reported', 0)}",
+            f"Summary: {report.get('summary') or ''}",
+        ]
+        if context.get("deduplication_instruction"):
+            lines.append("\n" + context["deduplication_instruction"])
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _daily_commit_lines(commits: List[Dict[str, Any]]) -> List[str]:
+        """One entry per commit; commits with a stored per-commit analysis are summarised from it."""
+        lines: List[str] = []
+        for i, commit in enumerate(commits, 1):
             ts = commit.get("timestamp", "")
             repo = commit.get("repository", "")
             msg = commit.get("message", "")
             adds = commit.get("additions", 0)
             dels = commit.get("deletions", 0)
-            files = ", ".join(commit.get("files_changed", [])[:15])  # cap file list per entry to limit length
+            analysis = commit.get("analysis") or {}
+            # The per-commit analysis already describes the change, so fewer file names are needed
+            file_cap = 5 if analysis else 15
+            files = ", ".join(commit.get("files_changed", [])[:file_cap])
             line = f"{i}. [{ts}] {repo}\n   Message: {msg}\n   Changes: +{adds} -{dels}\n   Files: {files}"
-            commits_lines.append(line)
-
-        prompt = "\n\n".join([header, scoring, output_schema, context_header, "\n".join(commits_lines)])
-
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a senior engineering manager analyzing developer productivity. Output only valid JSON.",
-            },
-            {"role": "user", "content": prompt},
-        ]
-
-        response = await self._make_completion_request(
-            messages, response_format={"type": "json_object"}, temperature=0.4
-        )
+            if analysis:
+                parts = [f"{commit.get('ai_estimated_hours')}h"] if commit.get("ai_estimated_hours") is not None else []
+                parts += [f"{key} {analysis[key]}" for key in ("complexity", "risk", "impact") if key in analysis]
+                if analysis.get("category"):
+                    parts.append(f"category {analysis['category']}")
+                line += f"\n   Commit analysis: {', '.join(parts)}"
+                if analysis.get("key_changes"):
+                    line += f"\n   Key changes: {'; '.join(analysis['key_changes'][:5])}"
+            lines.append(line)
+        return lines
+
+    def parse_daily_work_response(self, response: Optional[str], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a daily work analysis response and fill in defaults from the context."""
+        user_name = context.get("user_name", "Unknown")
+        analysis_date = context.get("analysis_date", "Unknown")
+        total_commits = context.get("total_commits", 0)
+        repositories = context.get("repositories", [])
+        total_lines = context.get("total_lines_changed", 0)
 
         if not response:
             return {"total_estimated_hours": 0.0, "error": "Failed to analyze daily work"}
@@ -0,0 +1,54 @@
+"""
+Commit diff provider interface.
+
+Commit analysis needs per-commit metadata, file stats and patches. They can
+come from the GitHub REST API (GitHubIntegration) or from a local bare mirror
+of the repository (GitMirrorDiffProvider). Both return the same dictionary
+shape from ``get_commit_diff``, so callers can switch sources through the
+COMMIT_DIFF_SOURCE setting.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.core.exceptions import ConfigurationError
+
+
+class CommitDiffProvider(ABC):
+    """Source of commit diffs in the GitHubIntegration.get_commit_diff format."""
+
+    @abstractmethod
+    def get_commit_diff(self, repository: str, commit_hash: str) -> Dict[str, Any]:
+        """
+        Get the diff for a specific commit.
+
+        Args:
+            repository: Repository name (format: "owner/repo")
+            commit_hash: Commit hash/SHA
+
+        Returns:
+            Dictionary with commit metadata, totals, ``files_changed`` and a
+            ``files`` list of {filename, status, additions, deletions, changes, patch}
+        """
+
+
+def create_commit_diff_provider(github_integration: Optional[CommitDiffProvider] = None) -> CommitDiffProvider:
+    """Build the configured diff provider (GitHub REST API by default)."""
+    from app.config.settings import settings
+
+    source = (settings.COMMIT_DIFF_SOURCE or "github").lower()
+    if source == "github":
+        if github_integration is None:
+            from app.integrations.github_integration import GitHubIntegration
+
+            github_integration = GitHubIntegration()
+        return github_integration
+    if source == "git_mirror":
+        from app.integrations.git_mirror import GitMirrorDiffProvider
+
+        return GitMirrorDiffProvider(
+            settings.GIT_MIRROR_ROOT,
+            token=settings.github_token,
+            fetch_interval=settings.GIT_MIRROR_FETCH_INTERVAL,
+        )
+    raise ConfigurationError(f"Unknown commit diff source: {source}")
@@ -6,15 +6,16 @@ from typing import Any, Dict, List
 import requests
 
 from app.config.settings import settings
+from app.integrations.diff_provider import CommitDiffProvider
 
 
-class GitHubIntegration:
+class GitHubIntegration(CommitDiffProvider):
     """Integration with GitHub API for commit data."""
 
     def __init__(self):
         """Initialize the GitHub integration with token from settings."""
         self.token = settings.github_token
-        self.base_url = "https://api.github.com"
+        self.base_url = settings.GITHUB_API_URL.rstrip("/")
         self.headers = {"Authorization": f"token {self.token}", "Accept": "application/vnd.github.v3+json"}
 
     def get_commit_diff(self, repository: str, commit_hash: str) -> Dict[str, Any]:
@@ -99,7 +100,7 @@ class GitHubIntegration:
             }
 
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch commit diff: {str(e)}")
+            raise Exception(f"Failed to fetch commit diff: {str(e)}") from e
         except ValueError as e:
             raise Exception(f"Error processing repository: {str(e)}")
         except Exception as e:
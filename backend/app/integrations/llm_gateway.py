@@ -0,0 +1,719 @@
+"""
+Single entry point for OpenAI calls.
+
+Every OpenAI request made by the backend (commit analysis, the daily work
+and EOD analyses, Batch API jobs) goes through one ``LLMGateway``, which owns
+one ``AsyncOpenAI`` client and therefore one pool of keep-alive connections.
+On top of that client the gateway adds:
+
+- retries with full-jitter exponential backoff on 429s, 5xx responses and
+  connection errors (honouring ``Retry-After``); the SDK's own retries are
+  disabled so there is exactly one retry policy
+- a deadline per call that covers all attempts and backoff sleeps
+- optional hedging: when a call has not finished after the p95 latency
+  observed for the same model and prompt, an identical second request is
+  sent and whichever answers first wins
+- JSON / structured output parsing (markdown fences stripped, optional
+  pydantic validation), either on the full response or incrementally on a
+  stream: fields are validated as they arrive, the stream is closed once the
+  required fields are in, and truncated output is salvaged
+- metrics per model and prompt: latency histogram, tokens in/out, cached
+  tokens, estimated cost and, for streamed calls, time to first field,
+  reported under ``/health/metrics``
+
+Calls also pass through the shared adaptive concurrency limiter and circuit
+breaker for OpenAI, and every request sent is charged by estimated tokens
+against the ``OPENAI_TOKENS_PER_MINUTE`` quota. Requests queue for quota for
+at most ``OPENAI_TOKEN_WAIT_TIMEOUT_SECONDS``; the wait is not counted as
+model latency, and a hedge is only sent when quota is available right away. Point ``OPENAI_BASE_URL`` at an OpenAI-compatible server
+to run everything against a local fake.
+
+Usage:
+    gateway = get_llm_gateway()
+    result = await gateway.generate_json(api_params, prompt=COMMIT_HOURS_PROMPT)
+"""
+
+import asyncio
+import io
+import json
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple, Type, Union
+
+from openai import APIConnectionError, AsyncOpenAI
+from pydantic import BaseModel
+
+from app.core.adaptive_concurrency import AdaptiveConcurrencyLimiter, get_openai_concurrency_limiter
+from app.core.exceptions import RateLimitExceededError
+from app.core.rate_limiter import TokenBucketRateLimiter, create_openai_token_rate_limiter, estimate_openai_tokens
+from app.integrations.prompt_assembly import PromptTemplate, _usage_int, extract_usage, record_prompt_usage
+from app.integrations.streaming_json import IncrementalJSONParser
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; slower calls land in "+Inf"
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 20000, 40000, 60000, 120000)
+
+# USD per 1M tokens as (input, cached input, output), matched on the longest model name prefix
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4-turbo": (10.00, 10.00, 30.00),
+    "o3-mini": (1.10, 0.55, 4.40),
+    "o4-mini": (1.10, 0.275, 4.40),
+    "o3": (2.00, 0.50, 8.00),
+}
+
+PromptRef = Union[PromptTemplate, str, None]
+
+
+def estimate_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> Optional[float]:
+    """Estimated USD cost of one call, or None for models without a known price."""
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not matches:
+        return None
+    input_price, cached_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    uncached = max(input_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
+
+
+def response_text(response: Any) -> str:
+    """Model output text of a chat completions or responses API response."""
+    text = getattr(response, "output_text", None)
+    if not text and hasattr(response, "output") and hasattr(response.output, "text"):
+        text = response.output.text
+    if not text and getattr(response, "choices", None):
+        text = response.choices[0].message.content
+    if not isinstance(text, str) or not text:
+        raise ValueError("Unable to extract text from OpenAI response")
+    return text
+
+
+def parse_structured(text: str, schema: Optional[Type[BaseModel]] = None) -> Any:
+    """
+    Parse model output as JSON, tolerating a surrounding markdown code fence.
+
+    With ``schema`` the parsed object is validated and returned as a model
+    instance. Raises ``json.JSONDecodeError`` or ``pydantic.ValidationError``.
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned[7:] if cleaned.startswith("```json") else cleaned[3:]
+        if cleaned.rstrip().endswith("```"):
+            cleaned = cleaned.rstrip()[:-3]
+    data = json.loads(cleaned.strip())
+    if schema is not None:
+        return schema.model_validate(data)
+    return data
+
+
+def _stream_delta(event: Any) -> Tuple[Optional[str], Any]:
+    """``(text, usage)`` carried by one chat completion chunk or responses API stream event."""
+    event_type = getattr(event, "type", None)
+    if event_type is not None:
+        if event_type == "response.output_text.delta":
+            return event.delta, None
+        if event_type in ("response.completed", "response.incomplete"):
+            return None, getattr(getattr(event, "response", None), "usage", None)
+        return None, None
+    choices = getattr(event, "choices", None)
+    text = getattr(getattr(choices[0], "delta", None), "content", None) if choices else None
+    return text, getattr(event, "usage", None)
+
+
+async def _close_stream(stream: Any) -> None:
+    close = getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception as e:
+        logger.debug(f"Error closing OpenAI stream: {e}")
+
+
+def _prompt_key(prompt: PromptRef) -> str:
+    if isinstance(prompt, PromptTemplate):
+        return prompt.key
+    return prompt or "adhoc"
+
+
+def _request_tokens(params: Dict[str, Any]) -> int:
+    """Estimated tokens of a chat (``messages``) or responses (``input``) request, output budget included."""
+    if "input" in params:
+        text = params["input"] if isinstance(params["input"], str) else json.dumps(params["input"], default=str)
+    else:
+        text = "".join(str(message.get("content") or "") for message in params.get("messages", []))
+    text += params.get("instructions") or ""
+    max_output = params.get("max_output_tokens") or params.get("max_completion_tokens") or params.get("max_tokens")
+    return estimate_openai_tokens(text, max_output or 0)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class GatewayConfig:
+    """Retry, deadline and hedging policy for the LLM gateway."""
+
+    base_url: Optional[str] = None
+    # Per-attempt HTTP timeout, and the overall deadline of a call including retries
+    request_timeout: float = 120.0
+    deadline: float = 300.0
+    # Longest a request queues for TPM quota (never past the call deadline)
+    token_wait_timeout: float = 30.0
+    max_retries: int = 4
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 30.0
+    hedge_enabled: bool = False
+    # Latency samples needed for a (model, prompt) before its calls are hedged
+    hedge_min_samples: int = 20
+    hedge_quantile: float = 0.95
+    # Route generate_json through stream_json
+    stream_structured: bool = False
+
+
+@dataclass
+class StructuredStream:
+    """Outcome of ``LLMGateway.stream_json``."""
+
+    # Schema instance (or dict without a schema); None when required fields never arrived
+    value: Any
+    fields: Dict[str, Any] = field(default_factory=dict)
+    # The whole JSON object was received
+    complete: bool = False
+    # The stream was closed early because every required field had arrived
+    cut_off: bool = False
+    # Fields that arrived but failed schema validation, with the error
+    errors: Dict[str, str] = field(default_factory=dict)
+    first_field_seconds: Optional[float] = None
+    usage: Any = None
+
+
+class LLMGatewayMetrics:
+    """Latency histogram, token and cost counters per model and prompt."""
+
+    def __init__(self, window: int = 200):
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._first_fields: Dict[Tuple[str, str], Deque[float]] = {}
+        self._window = window
+
+    def _entry(self, model: str, prompt_key: str) -> Dict[str, Any]:
+        return self._stats.setdefault(
+            (model, prompt_key),
+            {
+                "requests": 0,
+                "failures": 0,
+                "retries": 0,
+                "hedged": 0,
+                "hedge_wins": 0,
+                "parse_errors": 0,
+                "streams": 0,
+                "early_cutoffs": 0,
+                "salvaged": 0,
+                "input_tokens": 0,
+                "cached_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+                "latency_ms_sum": 0.0,
+                "latency_buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            },
+        )
+
+    def record_success(self, model: str, prompt_key: str, latency: float, usage: Any = None) -> None:
+        stats = self._entry(model, prompt_key)
+        stats["requests"] += 1
+        latency_ms = latency * 1000
+        stats["latency_ms_sum"] += latency_ms
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound), len(LATENCY_BUCKETS_MS))
+        stats["latency_buckets"][bucket] += 1
+        self._latencies.setdefault((model, prompt_key), deque(maxlen=self._window)).append(latency)
+
+        extracted = extract_usage(usage)
+        if extracted is None:
+            return
+        input_tokens, cached_tokens = extracted
+        output_tokens = _usage_int(usage, "completion_tokens", "output_tokens") or 0
+        stats["input_tokens"] += input_tokens
+        stats["cached_tokens"] += cached_tokens
+        stats["output_tokens"] += output_tokens
+        cost = estimate_cost(model, input_tokens, cached_tokens, output_tokens)
+        if cost is not None:
+            stats["cost_usd"] += cost
+
+    def record_failure(self, model: str, prompt_key: str) -> None:
+        self._entry(model, prompt_key)["failures"] += 1
+
+    def record_retry(self, model: str, prompt_key: str) -> None:
+        self._entry(model, prompt_key)["retries"] += 1
+
+    def record_hedge(self, model: str, prompt_key: str, won: bool = False) -> None:
+        stats = self._entry(model, prompt_key)
+        if won:
+            stats["hedge_wins"] += 1
+        else:
+            stats["hedged"] += 1
+
+    def record_parse_error(self, model: str, prompt_key: str) -> None:
+        self._entry(model, prompt_key)["parse_errors"] += 1
+
+    def record_stream(
+        self, model: str, prompt_key: str, first_field: Optional[float], cut_off: bool, salvaged: bool
+    ) -> None:
+        stats = self._entry(model, prompt_key)
+        stats["streams"] += 1
+        stats["early_cutoffs"] += int(cut_off)
+        stats["salvaged"] += int(salvaged)
+        if first_field is not None:
+            self._first_fields.setdefault((model, prompt_key), deque(maxlen=self._window)).append(first_field)
+
+    def latency_quantile(self, model: str, prompt_key: str, quantile: float, min_samples: int = 1) -> Optional[float]:
+        """Latency (seconds) at ``quantile`` over the recent successful calls, or None with too few samples."""
+        samples = self._latencies.get((model, prompt_key))
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * quantile), len(ordered) - 1)]
+
+    def get_status(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Counters per model, then per prompt key, with latency percentiles."""
+        status: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (model, prompt_key), stats in self._stats.items():
+            p50 = self.latency_quantile(model, prompt_key, 0.5)
+            p95 = self.latency_quantile(model, prompt_key, 0.95)
+            buckets = dict(zip([str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"], stats["latency_buckets"]))
+            first_fields = sorted(self._first_fields.get((model, prompt_key), ()))
+            status.setdefault(model, {})[prompt_key] = {
+                **{k: v for k, v in stats.items() if k not in ("latency_buckets", "cost_usd", "latency_ms_sum")},
+                "cost_usd": round(stats["cost_usd"], 6),
+                "avg_latency_ms": round(stats["latency_ms_sum"] / stats["requests"], 1) if stats["requests"] else None,
+                "p50_latency_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "latency_ms_buckets": buckets,
+                "p50_first_field_ms": (round(first_fields[len(first_fields) // 2] * 1000, 1) if first_fields else None),
+            }
+        return status
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._latencies.clear()
+        self._first_fields.clear()
+
+
+# Global gateway metrics
+llm_metrics = LLMGatewayMetrics()
+
+
+class LLMGateway:
+    """
+    Pooled OpenAI client with retries, deadlines, hedging and per-prompt metrics.
+
+    ``client``, ``limiter`` and ``token_limiter`` can be injected (tests,
+    scripts); by default the gateway builds its own client from ``config`` and
+    calls it directly.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        config: Optional[GatewayConfig] = None,
+        client: Any = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        metrics: Optional[LLMGatewayMetrics] = None,
+        token_limiter: Optional[TokenBucketRateLimiter] = None,
+    ):
+        self.config = config or GatewayConfig()
+        self.client = client or AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.config.base_url,
+            timeout=self.config.request_timeout,
+            max_retries=0,  # retried here, with jitter and a deadline
+        )
+        self.limiter = limiter
+        self.token_limiter = token_limiter
+        self.metrics = metrics or llm_metrics
+
+    # Model calls
+
+    async def chat(
+        self,
+        prompt: PromptRef = None,
+        deadline: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        **params: Any,
+    ) -> Any:
+        """``chat.completions.create(**params)`` with the gateway policies applied."""
+        return await self._model_call(self.client.chat.completions.create, params, prompt, deadline, hedge)
+
+    async def respond(
+        self,
+        prompt: PromptRef = None,
+        deadline: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        **params: Any,
+    ) -> Any:
+        """``responses.create(**params)`` (reasoning models) with the gateway policies applied."""
+        return await self._model_call(self.client.responses.create, params, prompt, deadline, hedge)
+
+    async def generate_json(
+        self,
+        params: Dict[str, Any],
+        prompt: PromptRef = None,
+        schema: Optional[Type[BaseModel]] = None,
+        deadline: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        stream: Optional[bool] = None,
+    ) -> Any:
+        """
+        Run a chat (``messages``) or responses (``input``) request and parse its JSON output.
+
+        Returns a dict, or a ``schema`` instance when a schema is given. With
+        ``stream`` (default: ``config.stream_structured``) the output is parsed
+        as it arrives via ``stream_json``; streamed calls are never hedged.
+        Raises ``ValueError`` when the output cannot be parsed or validated.
+        """
+        if self.config.stream_structured if stream is None else stream:
+            result = await self.stream_json(params, prompt=prompt, schema=schema, deadline=deadline)
+            if result.value is None:
+                raise ValueError(
+                    f"Streamed output for {_prompt_key(prompt)} is incomplete or invalid "
+                    f"(fields: {sorted(result.fields)}, errors: {result.errors})"
+                )
+            return result.value
+
+        call = self.respond if "input" in params else self.chat
+        response = await call(prompt=prompt, deadline=deadline, hedge=hedge, **params)
+        try:
+            return parse_structured(response_text(response), schema)
+        except Exception:
+            self.metrics.record_parse_error(params.get("model", "unknown"), _prompt_key(prompt))
+            raise
+
+    async def stream_json(
+        self,
+        params: Dict[str, Any],
+        prompt: PromptRef = None,
+        schema: Optional[Type[BaseModel]] = None,
+        deadline: Optional[float] = None,
+        stop_early: bool = True,
+    ) -> StructuredStream:
+        """
+        Stream a chat or responses request and parse its JSON output incrementally.
+
+        Each top-level field is validated against ``schema`` as soon as it is
+        complete. With ``stop_early`` the stream is closed once every required
+        field has arrived, and as soon as a field fails validation. If the
+        stream ends before the object does (token limit, dropped connection),
+        whatever was received is salvaged into the result. Failures before the
+        first token are retried like any other call.
+        """
+        model = params.get("model", "unknown")
+        prompt_key = _prompt_key(prompt)
+        if "input" in params:
+            func = self.client.responses.create
+            stream_params = {**params, "stream": True}
+        else:
+            func = self.client.chat.completions.create
+            stream_params = {**params, "stream": True, "stream_options": {"include_usage": True}}
+
+        async def consume(**call_params: Any) -> StructuredStream:
+            parser = IncrementalJSONParser(schema, stop_when=None if stop_early else ())
+            stream = await func(**call_params)
+            usage = None
+            received = False
+            cut_off = False
+            try:
+                async for event in stream:
+                    text, event_usage = _stream_delta(event)
+                    usage = event_usage or usage
+                    if not text:
+                        continue
+                    received = True
+                    parser.feed(text)
+                    # Once the object has closed keep reading: the final chunk carries the usage
+                    if parser.failed or (parser.done and not parser.closed):
+                        cut_off = not parser.failed
+                        break
+            except Exception as e:
+                if not received:
+                    raise
+                logger.warning(f"Stream {prompt_key} ({model}) ended early: {type(e).__name__}: {e}")
+            finally:
+                await _close_stream(stream)
+            value, fields = parser.result()
+            return StructuredStream(
+                value=value,
+                fields=fields,
+                complete=parser.closed,
+                cut_off=cut_off,
+                errors=dict(parser.errors),
+                first_field_seconds=parser.first_field_seconds,
+                usage=usage,
+            )
+
+        result = await self._with_retries(
+            lambda: self._attempt(consume, stream_params),
+            model,
+            prompt_key,
+            deadline,
+            idempotent=True,
+            tokens=self._quota_for(params),
+        )
+        salvaged = not result.complete and not result.cut_off
+        self.metrics.record_stream(model, prompt_key, result.first_field_seconds, result.cut_off, salvaged)
+        if isinstance(prompt, PromptTemplate):
+            record_prompt_usage(prompt, result)
+        if result.value is None:
+            self.metrics.record_parse_error(model, prompt_key)
+        elif salvaged:
+            logger.warning(f"Salvaged truncated output for {prompt_key} ({model}): fields {sorted(result.fields)}")
+        return result
+
+    async def _model_call(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        params: Dict[str, Any],
+        prompt: PromptRef,
+        deadline: Optional[float],
+        hedge: Optional[bool],
+    ) -> Any:
+        model = params.get("model", "unknown")
+        prompt_key = _prompt_key(prompt)
+        hedge = self.config.hedge_enabled if hedge is None else hedge
+        tokens = self._quota_for(params)
+
+        async def attempt() -> Any:
+            if hedge:
+                return await self._hedged(func, params, model, prompt_key, tokens)
+            return await self._attempt(func, params)
+
+        response = await self._with_retries(attempt, model, prompt_key, deadline, idempotent=True, tokens=tokens)
+        if isinstance(prompt, PromptTemplate):
+            record_prompt_usage(prompt, response)
+        return response
+
+    # Batch API and files. These bypass the adaptive limiter: upload and download times
+    # depend on file size and would read as latency inflation of the model endpoints.
+
+    async def upload_file(self, file_bytes: bytes, filename: str = "requests.jsonl", purpose: str = "batch") -> Any:
+        return await self._with_retries(
+            lambda: self.client.files.create(file=(filename, io.BytesIO(file_bytes)), purpose=purpose),
+            "openai-files",
+            "files.create",
+            None,
+            idempotent=True,
+        )
+
+    async def create_batch(self, **params: Any) -> Any:
+        # Not idempotent: a 5xx may still have created the batch, so only rejected (429) calls are retried
+        return await self._with_retries(
+            lambda: self.client.batches.create(**params),
+            "openai-batch",
+            "batches.create",
+            None,
+            idempotent=False,
+        )
+
+    async def retrieve_batch(self, batch_id: str) -> Any:
+        return await self._with_retries(
+            lambda: self.client.batches.retrieve(batch_id),
+            "openai-batch",
+            "batches.retrieve",
+            None,
+            idempotent=True,
+        )
+
+    async def list_batches(self, **params: Any) -> Any:
+        return await self._with_retries(
+            lambda: self.client.batches.list(**params),
+            "openai-batch",
+            "batches.list",
+            None,
+            idempotent=True,
+        )
+
+    async def iter_file_lines(self, file_id: str) -> AsyncIterator[str]:
+        """Stream the lines of a stored file without holding it in memory."""
+        async with self.client.files.with_streaming_response.content(file_id) as response:
+            async for line in response.iter_lines():
+                yield line
+
+    # Policies
+
+    def _quota_for(self, params: Dict[str, Any]) -> int:
+        """Quota one request spends, or 0 without a token limiter."""
+        if self.token_limiter is None:
+            return 0
+        return min(_request_tokens(params), self.token_limiter.capacity)
+
+    async def _acquire_tokens(self, tokens: int, deadline_at: float) -> None:
+        """Queue for ``tokens`` of quota, for at most ``token_wait_timeout`` and never past the call deadline."""
+        if not tokens:
+            return
+        remaining = max(deadline_at - asyncio.get_running_loop().time(), 0)
+        await self.token_limiter.acquire(tokens, wait=True, timeout=min(self.config.token_wait_timeout, remaining))
+
+    async def _try_tokens(self, tokens: int) -> bool:
+        """Take ``tokens`` of quota only if available right now."""
+        if not tokens:
+            return True
+        try:
+            await self.token_limiter.acquire(tokens)
+        except RateLimitExceededError:
+            return False
+        return True
+
+    async def _attempt(self, func: Callable[..., Awaitable[Any]], params: Dict[str, Any]) -> Any:
+        if self.limiter is not None:
+            return await self.limiter.call(func, **params)
+        return await func(**params)
+
+    async def _hedged(
+        self, func: Callable[..., Awaitable[Any]], params: Dict[str, Any], model: str, prompt_key: str, tokens: int
+    ):
+        """
+        Send a duplicate request once the call outlives the recent p95 latency; first success wins.
+
+        The duplicate spends quota too, so it is skipped unless ``tokens`` are available immediately.
+        """
+        delay = self.metrics.latency_quantile(
+            model, prompt_key, self.config.hedge_quantile, min_samples=self.config.hedge_min_samples
+        )
+        if delay is None:
+            return await self._attempt(func, params)
+
+        primary = asyncio.ensure_future(self._attempt(func, params))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and await self._try_tokens(tokens):
+                self.metrics.record_hedge(model, prompt_key)
+                tasks.add(asyncio.ensure_future(self._attempt(func, params)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.metrics.record_hedge(model, prompt_key, won=True)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _should_retry(self, error: BaseException, idempotent: bool) -> bool:
+        status_code = _status_code(error)
+        if status_code == 429:
+            return True
+        if not idempotent:
+            return False
+        if status_code is not None:
+            return status_code >= 500
+        # Includes APITimeoutError; our own deadline (asyncio.TimeoutError) is final
+        return isinstance(error, APIConnectionError)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        delay = random.uniform(0, min(self.config.retry_max_delay, self.config.retry_base_delay * 2**attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.config.retry_max_delay))
+        return delay
+
+    async def _with_retries(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        model: str,
+        prompt_key: str,
+        deadline: Optional[float],
+        idempotent: bool,
+        tokens: int = 0,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline or self.config.deadline)
+        retries = 0
+        while True:
+            # Every request sent spends quota. Queueing for it is not model latency, and running out of
+            # it is final (a retry would only queue again)
+            try:
+                await self._acquire_tokens(tokens, deadline_at)
+            except RateLimitExceededError:
+                self.metrics.record_failure(model, prompt_key)
+                raise
+            started = loop.time()
+            try:
+                result = await asyncio.wait_for(attempt(), timeout=max(deadline_at - started, 0))
+            except Exception as e:
+                if retries < self.config.max_retries and self._should_retry(e, idempotent):
+                    delay = self._backoff(retries, e)
+                    if loop.time() + delay < deadline_at:
+                        retries += 1
+                        self.metrics.record_retry(model, prompt_key)
+                        logger.warning(
+                            f"OpenAI call {prompt_key} ({model}) failed with {type(e).__name__}; "
+                            f"retry {retries}/{self.config.max_retries} in {delay:.2f}s"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+                self.metrics.record_failure(model, prompt_key)
+                raise
+            self.metrics.record_success(model, prompt_key, loop.time() - started, getattr(result, "usage", None))
+            return result
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get (or lazily create) the shared gateway configured from settings."""
+    global _gateway
+    if _gateway is None:
+        from app.config.settings import settings
+
+        config = GatewayConfig(
+            base_url=settings.OPENAI_BASE_URL,
+            request_timeout=settings.OPENAI_REQUEST_TIMEOUT_SECONDS,
+            deadline=settings.OPENAI_CALL_DEADLINE_SECONDS,
+            token_wait_timeout=settings.OPENAI_TOKEN_WAIT_TIMEOUT_SECONDS,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            retry_base_delay=settings.OPENAI_RETRY_BASE_DELAY,
+            retry_max_delay=settings.OPENAI_RETRY_MAX_DELAY,
+            hedge_enabled=settings.OPENAI_HEDGE_ENABLED,
+            hedge_min_samples=settings.OPENAI_HEDGE_MIN_SAMPLES,
+            stream_structured=settings.OPENAI_STREAM_STRUCTURED_OUTPUT,
+        )
+        _gateway = LLMGateway(
+            api_key=settings.OPENAI_API_KEY,
+            config=config,
+            limiter=get_openai_concurrency_limiter(),
+            token_limiter=create_openai_token_rate_limiter() if settings.OPENAI_TOKENS_PER_MINUTE > 0 else None,
+        )
+        logger.info(
+            f"Initialized LLM gateway (base_url={config.base_url or 'default'}, hedging={config.hedge_enabled})"
+        )
+    return _gateway
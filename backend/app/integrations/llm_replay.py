@@ -0,0 +1,560 @@
+"""
+Record/replay of OpenAI traffic for offline benchmarks.
+
+``create_stub_app`` builds a local OpenAI-compatible server (chat completions
+and responses endpoints) that answers from a cassette: a JSONL file of
+recorded request/response pairs with their latency. Point ``OPENAI_BASE_URL``
+at it (``LLMStubServer`` runs it in a background thread) and the pipeline
+runs without the network:
+
+- replay: a request is answered with the response recorded for the same
+  request body; when the prompts changed since recording, with one recorded
+  for the same endpoint, model and system prompt (unless ``strict``)
+- record: requests are forwarded to the real API and every successful pair
+  is appended to the cassette with the observed latency
+- latency: as recorded, or drawn from a fixed, uniform or lognormal
+  distribution (see ``LatencyModel.parse``)
+- faults: a share of requests, and everything above a requests-per-minute
+  budget, is answered with 429 and ``Retry-After``, which exercises the
+  gateway retries and the adaptive concurrency limiter
+
+A cassette also holds the benchmark workload (the CommitAnalyzer inputs seen
+while recording), so a replay analyzes the same commits with the same
+prompts. ``measure_throughput`` runs a workload and reports items/s, latency
+percentiles and cost per item from the gateway metrics.
+
+Usage:
+    cassette = Cassette.load("benchmark_results/commits.cassette.jsonl")
+    with LLMStubServer(create_stub_app(cassette, latency=LatencyModel.parse("recorded*0.5"))) as server:
+        settings.OPENAI_BASE_URL = server.base_url
+        report = await measure_throughput(cassette.workload, analyzer.analyze_commit_diff, concurrency=8)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.integrations.llm_gateway import LLMGatewayMetrics, llm_metrics
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+STUB_ENDPOINTS = ("chat/completions", "responses")
+
+# Request fields that do not change the answer and are left out of the match key
+_VOLATILE_FIELDS = ("stream", "stream_options", "user", "metadata")
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+def request_key(endpoint: str, body: Dict[str, Any]) -> str:
+    """Exact match key of a request."""
+    return _digest([endpoint, {k: v for k, v in body.items() if k not in _VOLATILE_FIELDS}])
+
+
+def _system_prompt(body: Dict[str, Any]) -> str:
+    if body.get("instructions"):
+        return str(body["instructions"])
+    messages = body.get("messages") or (body.get("input") if isinstance(body.get("input"), list) else [])
+    for message in messages:
+        if isinstance(message, dict) and message.get("role") in ("system", "developer"):
+            content = message.get("content")
+            return content if isinstance(content, str) else json.dumps(content, sort_keys=True)
+    return ""
+
+
+def shape_key(endpoint: str, body: Dict[str, Any]) -> str:
+    """Fallback match key: endpoint, model and system prompt, i.e. the prompt template of a request."""
+    return _digest([endpoint, body.get("model"), _system_prompt(body)])
+
+
+@dataclass
+class Interaction:
+    """One recorded request/response pair."""
+
+    endpoint: str
+    request: Dict[str, Any]
+    status: int
+    # Seconds until the full response was received
+    latency: float
+    response: Optional[Dict[str, Any]] = None
+    # Raw server-sent events, when the request was streamed
+    stream: Optional[str] = None
+    recorded_at: float = field(default_factory=time.time)
+
+
+class Cassette:
+    """Recorded interactions plus the workload they were recorded for, stored as JSONL."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.interactions: List[Interaction] = []
+        self.workload: List[Dict[str, Any]] = []
+        self._workload_keys: set = set()
+        self._by_key: Dict[str, List[Interaction]] = {}
+        self._by_shape: Dict[str, List[Interaction]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls(path)
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.pop("kind", "interaction") == "workload":
+                    cassette._add_workload(record["item"])
+                else:
+                    cassette._index(Interaction(**record))
+        return cassette
+
+    def add(self, interaction: Interaction) -> None:
+        """Record an interaction (appended to the cassette file when it has one)."""
+        self._index(interaction)
+        self._append({"kind": "interaction", **asdict(interaction)})
+
+    def add_workload(self, item: Dict[str, Any]) -> None:
+        """Record a benchmark input; repeated inputs are stored once."""
+        if self._add_workload(item):
+            self._append({"kind": "workload", "item": item})
+
+    def match(self, endpoint: str, body: Dict[str, Any], strict: bool = False) -> Tuple[Optional[Interaction], bool]:
+        """
+        Recorded interaction answering a request, and whether it matched exactly.
+
+        Repeated recordings of the same request are served in rotation.
+        """
+        key = request_key(endpoint, body)
+        candidates = self._by_key.get(key)
+        exact = bool(candidates)
+        if not candidates and not strict:
+            key = shape_key(endpoint, body)
+            candidates = self._by_shape.get(key)
+        if not candidates:
+            return None, False
+        with self._lock:
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+        return candidates[cursor % len(candidates)], exact
+
+    def _index(self, interaction: Interaction) -> None:
+        with self._lock:
+            self.interactions.append(interaction)
+            self._by_key.setdefault(request_key(interaction.endpoint, interaction.request), []).append(interaction)
+            self._by_shape.setdefault(shape_key(interaction.endpoint, interaction.request), []).append(interaction)
+
+    def _add_workload(self, item: Dict[str, Any]) -> bool:
+        key = _digest(item)
+        with self._lock:
+            if key in self._workload_keys:
+                return False
+            self._workload_keys.add(key)
+            self.workload.append(item)
+        return True
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if not self.path:
+            return
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+@dataclass
+class LatencyModel:
+    """Response delay of the stub: ``recorded``, ``fixed``, ``uniform`` or ``lognormal``, times ``scale``."""
+
+    kind: str = "recorded"
+    params: Tuple[float, ...] = ()
+    scale: float = 1.0
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    _ARITY = {"recorded": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyModel":
+        """
+        Parse a latency spec; times in milliseconds.
+
+        ``recorded``, ``recorded*0.5``, ``fixed:800``, ``uniform:200,1500``,
+        ``lognormal:1800,0.6`` (median, sigma); any of them can take ``*scale``.
+        """
+        base, _, scale = spec.strip().partition("*")
+        kind, _, args = base.partition(":")
+        try:
+            params = tuple(float(arg) for arg in args.split(",")) if args else ()
+            factor = float(scale) if scale else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        if cls._ARITY.get(kind) != len(params) or factor < 0:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind, params, factor, random.Random(seed))
+
+    def sample(self, recorded: float = 0.0) -> float:
+        """Delay in seconds for a response recorded with ``recorded`` seconds of latency."""
+        if self.kind == "fixed":
+            value = self.params[0] / 1000
+        elif self.kind == "uniform":
+            value = self.rng.uniform(*self.params) / 1000
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = self.rng.lognormvariate(math.log(max(median, 1e-3) / 1000), sigma)
+        else:
+            value = recorded or 0.0
+        return max(0.0, value * self.scale)
+
+
+@dataclass
+class FaultInjector:
+    """429s for a random share of requests and for everything above a requests-per-minute budget."""
+
+    rate_limit_share: float = 0.0
+    requests_per_minute: int = 0
+    retry_after: float = 1.0
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+    _window: Deque[float] = field(default_factory=deque, repr=False)
+
+    def should_reject(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self.requests_per_minute:
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.requests_per_minute:
+                return True
+            self._window.append(now)
+        return self.rate_limit_share > 0 and self.rng.random() < self.rate_limit_share
+
+
+def _error(status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    body = {"error": {"message": message, "type": error_type, "code": error_type, "param": None}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def _sse(events: Iterable[Dict[str, Any]], typed: bool) -> str:
+    lines = []
+    for event in events:
+        if typed:
+            lines.append(f"event: {event['type']}")
+        lines.append(f"data: {json.dumps(event)}\n")
+    if not typed:
+        lines.append("data: [DONE]\n")
+    return "\n".join(lines) + "\n"
+
+
+def synthesize_stream(endpoint: str, response: Dict[str, Any]) -> str:
+    """Server-sent events for a recorded non-streamed response (one text delta, then usage)."""
+    if endpoint == "responses":
+        text = "".join(
+            part.get("text", "")
+            for item in response.get("output") or []
+            for part in item.get("content") or []
+            if part.get("type") == "output_text"
+        )
+        return _sse(
+            [
+                {"type": "response.created", "sequence_number": 0, "response": {**response, "status": "in_progress"}},
+                {"type": "response.output_text.delta", "sequence_number": 1, "delta": text},
+                {"type": "response.completed", "sequence_number": 2, "response": response},
+            ],
+            typed=True,
+        )
+    choice = (response.get("choices") or [{}])[0]
+    chunk = {key: response.get(key) for key in ("id", "created", "model")}
+    chunk["object"] = "chat.completion.chunk"
+    content = (choice.get("message") or {}).get("content") or ""
+    return _sse(
+        [
+            {**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": content}}]},
+            {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": choice.get("finish_reason", "stop")}]},
+            {**chunk, "choices": [], "usage": response.get("usage")},
+        ],
+        typed=False,
+    )
+
+
+def create_stub_app(
+    cassette: Cassette,
+    latency: Optional[LatencyModel] = None,
+    faults: Optional[FaultInjector] = None,
+    upstream: Optional[str] = None,
+    api_key: Optional[str] = None,
+    strict: bool = False,
+    responder: Optional[Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+) -> FastAPI:
+    """
+    OpenAI-compatible stub serving ``cassette``, or recording into it when ``upstream`` is set.
+
+    ``responder(endpoint, body)`` answers requests the cassette has no match
+    for (load tests synthesize responses instead of recording them); its
+    responses are delayed by ``latency.sample()``.
+
+    Counters (requests, exact and fallback matches, synthesized responses,
+    misses, injected 429s, recorded pairs) are served under ``GET /stub/stats``.
+    """
+    latency = latency or LatencyModel()
+    stats = {
+        "requests": 0,
+        "exact": 0,
+        "fallback": 0,
+        "synthesized": 0,
+        "misses": 0,
+        "rate_limited": 0,
+        "recorded": 0,
+    }
+    client = httpx.AsyncClient(base_url=upstream, timeout=300.0) if upstream else None
+
+    app = FastAPI(title="LLM replay stub")
+    app.state.stats = stats
+    app.state.cassette = cassette
+
+    async def record(endpoint: str, request: Request, body: Dict[str, Any]) -> Response:
+        authorization = request.headers.get("authorization") or (f"Bearer {api_key}" if api_key else "")
+        started = time.monotonic()
+        upstream_response = await client.post(
+            f"/{endpoint}",
+            content=await request.body(),
+            headers={"authorization": authorization, "content-type": "application/json"},
+        )
+        elapsed = time.monotonic() - started
+        streamed = bool(body.get("stream"))
+        if upstream_response.is_success:
+            cassette.add(
+                Interaction(
+                    endpoint=endpoint,
+                    request=body,
+                    status=upstream_response.status_code,
+                    latency=round(elapsed, 4),
+                    response=None if streamed else upstream_response.json(),
+                    stream=upstream_response.text if streamed else None,
+                )
+            )
+            stats["recorded"] += 1
+        headers = {k: v for k, v in upstream_response.headers.items() if k.lower() == "retry-after"}
+        return Response(
+            upstream_response.content,
+            status_code=upstream_response.status_code,
+            media_type=upstream_response.headers.get("content-type"),
+            headers=headers,
+        )
+
+    @app.post("/v1/{endpoint:path}")
+    async def handle(endpoint: str, request: Request) -> Response:
+        stats["requests"] += 1
+        if endpoint not in STUB_ENDPOINTS:
+            return _error(404, f"Endpoint /v1/{endpoint} is not served by the replay stub", "not_found")
+        body = await request.json()
+        if faults is not None and faults.should_reject():
+            stats["rate_limited"] += 1
+            return _error(
+                429,
+                "Rate limit reached (injected by the replay stub)",
+                "rate_limit_exceeded",
+                headers={"retry-after": f"{faults.retry_after:g}"},
+            )
+        if client is not None:
+            return await record(endpoint, request, body)
+
+        interaction, exact = cassette.match(endpoint, body, strict=strict)
+        streamed = bool(body.get("stream"))
+        if interaction is None and responder is not None:
+            response = responder(endpoint, body)
+            if response is not None:
+                stats["synthesized"] += 1
+                await asyncio.sleep(latency.sample())
+                if streamed:
+                    return Response(synthesize_stream(endpoint, response), media_type="text/event-stream")
+                return JSONResponse(response)
+        if interaction is None or (interaction.response is None and not streamed):
+            stats["misses"] += 1
+            return _error(404, "No recorded response matches this request", "cassette_miss")
+        stats["exact" if exact else "fallback"] += 1
+
+        await asyncio.sleep(latency.sample(interaction.latency))
+        if streamed:
+            events = interaction.stream or synthesize_stream(endpoint, interaction.response)
+            return Response(events, media_type="text/event-stream")
+        return JSONResponse(interaction.response)
+
+    @app.get("/stub/stats")
+    async def get_stats() -> Dict[str, Any]:
+        return {**stats, "interactions": len(cassette.interactions), "workload": len(cassette.workload)}
+
+    return app
+
+
+class LLMStubServer:
+    """
+    Run a stub app with uvicorn in a background thread.
+
+    ``port=0`` picks a free port; ``base_url`` is what ``OPENAI_BASE_URL``
+    should be set to.
+    """
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(getattr(self.app.state, "stats", {}))
+
+    def start(self, timeout: float = 10.0) -> "LLMStubServer":
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="llm-stub", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"LLM stub server did not start on {self.host}:{self.port}")
+            time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        logger.info(f"LLM stub listening at {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "LLMStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def capture_workload(analyzer: Any, cassette: Cassette) -> None:
+    """Wrap ``analyzer.analyze_commit_diff`` so every input is also stored in the cassette workload."""
+    analyze_commit_diff = analyzer.analyze_commit_diff
+
+    async def capturing(commit_data: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        cassette.add_workload(dict(commit_data))
+        return await analyze_commit_diff(commit_data, *args, **kwargs)
+
+    analyzer.analyze_commit_diff = capturing
+
+
+def usage_totals(metrics: Optional[LLMGatewayMetrics] = None) -> Dict[str, float]:
+    """Gateway counters summed over all models and prompts."""
+    totals = {
+        "requests": 0,
+        "failures": 0,
+        "retries": 0,
+        "input_tokens": 0,
+        "cached_tokens": 0,
+        "output_tokens": 0,
+        "cost_usd": 0.0,
+    }
+    for prompts in (metrics or llm_metrics).get_status().values():
+        for stats in prompts.values():
+            for key in totals:
+                totals[key] += stats.get(key) or 0
+    return totals
+
+
+def _quantile(sorted_values: List[float], quantile: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(quantile * len(sorted_values)))]
+
+
+@dataclass
+class ThroughputReport:
+    """Outcome of ``measure_throughput``."""
+
+    items: int
+    succeeded: int
+    concurrency: int
+    elapsed_seconds: float
+    # Per-item latencies of successful items, in seconds
+    latencies: List[float] = field(default_factory=list)
+    # Gateway counters accumulated during the run
+    usage: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        p50, p99 = _quantile(latencies, 0.5), _quantile(latencies, 0.99)
+        return {
+            "items": self.items,
+            "succeeded": self.succeeded,
+            "failed": self.items - self.succeeded,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "items_per_second": round(self.succeeded / self.elapsed_seconds, 3) if self.elapsed_seconds else None,
+            "p50_latency_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_latency_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "cost_per_item_usd": (
+                round(self.usage.get("cost_usd", 0.0) / self.succeeded, 6) if self.succeeded else None
+            ),
+            "usage": {key: round(value, 6) for key, value in self.usage.items()},
+        }
+
+
+async def measure_throughput(
+    items: List[Dict[str, Any]],
+    run: Callable[[Dict[str, Any]], Awaitable[Any]],
+    concurrency: int = 8,
+    metrics: Optional[LLMGatewayMetrics] = None,
+) -> ThroughputReport:
+    """
+    Run ``run(item)`` over ``items`` with at most ``concurrency`` in flight.
+
+    An item fails when ``run`` raises or returns a dict with ``error`` set
+    (CommitAnalyzer reports failures that way). Cost comes from the gateway
+    metrics, so the pricing in ``MODEL_PRICES`` applies.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    before = usage_totals(metrics)
+
+    async def one(item: Dict[str, Any]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await run(item)
+            except Exception as e:
+                logger.warning(f"Benchmark item failed: {e}")
+                return
+            if isinstance(result, dict) and result.get("error"):
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(item) for item in items))
+    elapsed = time.perf_counter() - started
+    after = usage_totals(metrics)
+
+    return ThroughputReport(
+        items=len(items),
+        succeeded=len(latencies),
+        concurrency=concurrency,
+        elapsed_seconds=elapsed,
+        latencies=latencies,
+        usage={key: after[key] - before[key] for key in after},
+    )
@@ -0,0 +1,177 @@
+"""
+Prompt assembly with cache-friendly layout.
+
+OpenAI caches the longest previously seen prompt prefix (in 128-token steps
+beyond the first 1024 tokens) and bills/serves those tokens as
+``cached_tokens``. A cache hit requires the prefix to be byte-identical, so
+every prompt here is laid out as:
+
+    system message (static) → user message: [static blocks...] + variable data
+
+Static blocks are versioned. Editing a block's text means bumping its
+version (and the template version), which also makes the change visible in
+the per-version cache statistics. Token counts for blocks are computed once
+when the template is defined.
+
+Usage:
+    messages = COMMIT_HOURS_PROMPT.chat_messages(commit_section)
+    response = await client.chat.completions.create(model=model, messages=messages)
+    record_prompt_usage(COMMIT_HOURS_PROMPT, response)
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # tiktoken is optional; fall back to the usual ~4 characters per token estimate
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of ``text`` (exact with tiktoken installed, estimated otherwise)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class PromptBlock:
+    """A static, versioned piece of prompt text."""
+
+    name: str
+    version: int
+    text: str
+    token_count: int = field(init=False)
+    digest: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "token_count", count_tokens(self.text))
+        object.__setattr__(self, "digest", _digest(self.text))
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """System message plus static prefix blocks; the per-call text always goes last."""
+
+    name: str
+    version: int
+    system: str
+    blocks: Tuple[PromptBlock, ...]
+    prefix: str = field(init=False)
+    prefix_tokens: int = field(init=False)
+    digest: str = field(init=False)
+
+    def __post_init__(self):
+        prefix = "".join(block.text for block in self.blocks)
+        object.__setattr__(self, "prefix", prefix)
+        object.__setattr__(self, "prefix_tokens", count_tokens(self.system) + sum(b.token_count for b in self.blocks))
+        object.__setattr__(self, "digest", _digest(self.system + prefix))
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}.v{self.version}"
+
+    def user_content(self, variable: str) -> str:
+        return self.prefix + variable
+
+    def chat_messages(self, variable: str) -> List[Dict[str, str]]:
+        """Messages for the chat completions API."""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user_content(variable)},
+        ]
+
+    def responses_input(self, variable: str) -> List[Dict[str, str]]:
+        """Input for the responses API (reasoning models), with the system text leading the user turn."""
+        return [{"role": "user", "content": f"{self.system}\n\n{self.user_content(variable)}"}]
+
+
+def _usage_int(obj: Any, *names: str) -> Optional[int]:
+    for name in names:
+        value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def extract_usage(usage: Any) -> Optional[Tuple[int, int]]:
+    """(prompt_tokens, cached_tokens) from chat completions or responses API usage, or None."""
+    if usage is None:
+        return None
+    prompt_tokens = _usage_int(usage, "prompt_tokens", "input_tokens")
+    if prompt_tokens is None:
+        return None
+    details = None
+    for name in ("prompt_tokens_details", "input_tokens_details"):
+        details = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        if details is not None:
+            break
+    cached_tokens = _usage_int(details, "cached_tokens") if details is not None else None
+    return prompt_tokens, cached_tokens or 0
+
+
+class PromptCacheStats:
+    """Prompt and cached input tokens per prompt template version."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, template: PromptTemplate, usage: Any) -> None:
+        extracted = extract_usage(usage)
+        if extracted is None:
+            return
+        prompt_tokens, cached_tokens = extracted
+        stats = self._stats.setdefault(
+            template.key,
+            {
+                "requests": 0,
+                "requests_with_cache_hit": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "prefix_tokens": template.prefix_tokens,
+                "prefix_digest": template.digest,
+            },
+        )
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_tokens"] += cached_tokens
+        if cached_tokens:
+            stats["requests_with_cache_hit"] += 1
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Counters per template version, with the share of input tokens served from cache."""
+        return {
+            key: {
+                **stats,
+                "cached_token_rate": round(stats["cached_tokens"] / stats["prompt_tokens"], 4)
+                if stats["prompt_tokens"]
+                else 0.0,
+            }
+            for key, stats in self._stats.items()
+        }
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+# Global prompt cache statistics
+prompt_cache_stats = PromptCacheStats()
+
+
+def record_prompt_usage(template: PromptTemplate, response: Any) -> None:
+    """Record the usage block of an API response against ``template``; never raises."""
+    try:
+        prompt_cache_stats.record(template, getattr(response, "usage", None))
+    except Exception as e:
+        logger.debug(f"Could not record prompt usage for {template.key}: {e}")
@@ -0,0 +1,607 @@
+"""
+Versioned static prompt text for commit and daily-work analysis.
+
+Everything here is sent byte-for-byte as the leading part of a prompt; the
+per-commit or per-day data is appended after it (see prompt_assembly). Do not
+edit a block in place: add a new version and point the template at it.
+"""
+
+from app.integrations.prompt_assembly import PromptBlock, PromptTemplate
+
+# Commit hours estimation (CommitAnalyzer.analyze_commit_diff)
+
+COMMIT_HOURS_SYSTEM = """You are a senior software engineer with deep expertise in effort estimation and code quality assessment. Your task is to analyze commits with extreme consistency by following the provided guidelines exactly. Always compare scores against the examples provided. Be conservative in scoring - when in doubt, score lower. Output only valid JSON with no additional commentary."""
+
+COMMIT_HOURS_RUBRIC_V1 = PromptBlock(
+    name="commit_hours_rubric",
+    version=1,
+    text="""You are a senior software engineer with expertise in code analysis. Analyze the following commit and provide both hours-based estimation and impact points scoring.
+
+## Scoring Guidelines
+
+### 1. HOURS-BASED TRADITIONAL SCORING
+
+Estimate engineering effort considering:
+- Actual development time (not AI-assisted time)
+- Code review and refinement cycles
+- Mental effort and architecture decisions
+
+#### Reference Anchors - STRUCTURED SELECTION
+
+**STEP 1: Initial Classification**
+Based on total lines (additions + deletions):
+- Under 50 lines → Start with Anchor A
+- 50-199 lines → Start with Anchor B  
+- 200-499 lines → Start with Anchor C
+- 500-1499 lines → Start with Anchor D
+- 1500+ lines → Consider Anchor D or E (see Step 2)
+
+**STEP 2: Refinement Checks**
+Apply these checks IN ORDER:
+
+1. **Major Change Detection** (can upgrade D→E):
+   □ Commit message says "new system", "new service", "new framework", or "breaking change"?
+   □ Creates 5+ new files in a new top-level directory?
+   □ Changes 20+ files across 3+ different top-level directories?
+   □ Adds new technology/dependency to the project (new language, database, framework)?
+   If 2+ checked → Upgrade to Anchor E
+
+2. **File Count Override** (supersedes Step 1):
+   □ Changes 25+ files regardless of content?
+   If checked → Set to Anchor E
+
+3. **Simplicity Reduction** (can downgrade by one level):
+   □ >70% of changes are tests, docs, or comments?
+   □ Commit message contains "refactor", "rename", "move", "cleanup"?
+   □ Only changes configs, constants, or data files?
+   If any checked → Downgrade one anchor level (but never below A)
+
+**ANCHOR VALUES:**
+- A: Minimal (0.5h) - Typos, configs, small fixes
+- B: Simple (2.5h) - Single-purpose changes, basic features
+- C: Standard (6.0h) - Multi-file features, moderate complexity
+- D: Complex (12.0h) - Cross-component changes, significant logic
+- E: Major (20.0h) - Architectural changes, new subsystems
+
+#### Universal Multipliers:
+• Involves concurrent/parallel code: +40%
+• Modifies critical path (commit message indicates): +30%
+• Includes comprehensive tests (>50% of changes): +20%
+• Performance-critical changes: +20%
+• Security-sensitive code: +30%
+• Documentation only: -50%
+• Formatting/refactoring only: -30%
+
+#### Final Calculation:
+1. Select anchor from table (no averaging needed)
+2. Multiply by applicable multipliers
+3. Round to nearest 0.5 hour
+
+Example: 1200 lines in 8 files with parallel code
+- Anchor D: 12.0 hours (from table)
+- Multiplier: ×1.4 (parallel code)
+- Final: 16.8 → 17.0 hours
+
+### 2. COMPLEXITY SCORING (1-10)
+
+Count these objective factors:
+□ Changes core functionality (+3)
+□ Modifies multiple components (+2)
+□ Adds new abstractions/patterns (+2)
+□ Requires algorithmic thinking (+2)
+□ Handles error cases (+1)
+Total: Min 1, Max 10
+
+### 3. SENIORITY SCORING (1-10)
+
+Score implementation quality:
+□ Comprehensive error handling (+2)
+□ Well-structured tests (+2)
+□ Follows established patterns (+2)
+□ Good abstractions (+2)
+□ Forward-thinking design (+2)
+Total: Min 1, Max 10
+
+For trivial changes (<20 lines AND complexity ≤ 2 AND no tests):
+Set seniority = 10 with rationale "Trivial change"
+
+### 4. RISK LEVEL
+
+Assess deployment risk:
+• low: Unlikely to cause issues (tests, docs, isolated changes)
+• medium: Some risk (core features, integrations)
+• high: Significant risk (critical path, data changes, security)
+
+## Scoring Process - COMPLETE ALL STEPS
+
+HOURS ESTIMATION:
+1. Total lines changed: ___ (additions + deletions from diff)
+2. Total files changed: ___ (count from files list)
+3. Initial anchor from Step 1: ___ (based on lines)
+4. Major change detection:
+   □ Message has "new system/service/framework/breaking"? ___
+   □ Creates 5+ files in new directory? ___
+   □ Changes 20+ files across 3+ directories? ___
+   □ Adds new technology/dependency? ___
+   COUNT: ___/4 (if 2+, upgrade D→E)
+5. File count override: 25+ files? ___ (if yes, force E)
+6. Simplicity checks:
+   □ >70% tests/docs/comments? ___
+   □ Message has "refactor/rename/move/cleanup"? ___
+   □ Only configs/constants/data? ___
+   ANY TRUE? ___ (if yes, downgrade one level)
+7. Final anchor: ___
+8. Base hours: ___
+9. Multipliers: ___ Final hours: ___
+
+VALUE & COMPLEXITY:
+10. Primary beneficiary: END USERS or DEVELOPERS? ___
+11. Value score (with cap if applicable): ___
+12. Check for complexity caps:
+    - Message contains tool/script/benchmark keywords? ___
+    - >50% files in tool/script folders? ___
+    - Apply cap? ___ Final complexity: ___
+
+## Output Format
+
+Provide a JSON response with this exact structure:
+{
+  "total_lines": <int>,
+  "total_files": <int>,
+  "initial_anchor": "<A/B/C/D/E>",
+  "major_change_checks": ["<specific checks that were true>"],
+  "major_change_count": <int>,
+  "file_count_override": <boolean>,
+  "simplicity_reduction_checks": ["<specific checks that were true>"],
+  "final_anchor": "<A/B/C/D/E>",
+  "base_hours": <float>,
+  "multipliers_applied": ["<multiplier1>", "<multiplier2>"],
+  "complexity_score": <int 1-10>,
+  "complexity_cap_applied": "<none|tooling|test|doc>",
+  "estimated_hours": <float>,
+  "risk_level": "<low|medium|high>",
+  "seniority_score": <int 1-10>,
+  "seniority_rationale": "<explanation>",
+  "key_changes": ["<change1>", "<change2>", ...]
+}
+
+""",
+)
+
+COMMIT_HOURS_PROMPT = PromptTemplate(
+    name="commit_hours",
+    version=1,
+    system=COMMIT_HOURS_SYSTEM,
+    blocks=(COMMIT_HOURS_RUBRIC_V1,),
+)
+
+# Impact points (CommitAnalyzer.analyze_commit_impact)
+
+COMMIT_IMPACT_SYSTEM = """You are a senior engineering manager with extensive experience evaluating developer contributions. Your task is to apply the Impact Points System with extreme consistency. Always compare scores to canonical examples. Be conservative - when uncertain, score lower. Focus on concrete evidence from the diff. Output only valid JSON with no additional commentary."""
+
+COMMIT_IMPACT_RUBRIC_V2 = PromptBlock(
+    name="commit_impact_rubric",
+    version=2,
+    text="""You are a senior engineering manager evaluating developer contributions using the NEW Impact Points System (v2.0) with ADDITIVE scoring for better consistency.
+
+## CRITICAL CHANGES IN V2.0
+1. Impact Score is now ADDITIVE, not multiplicative
+2. Code Quality is now a points checklist (0-5), not a multiplier
+3. Use decision trees for scoring - no guessing
+4. Two-pass scoring with self-justification required
+
+## PASS 1: Initial Analysis
+
+### STEP 1: Commit Classification
+
+Primary type:
+- capability: New functionality
+- fix: Repairing broken functionality
+- improvement: Enhancing existing functionality
+- foundation: Tests, refactoring, infrastructure
+- maintenance: Docs, configs, cleanup
+
+Heuristic subtypes (to guide conservative scoring):
+- deletions-heavy cleanup: predominately deletions, minimal additions, few or no new files, no new capabilities
+
+Check ALL that apply:
+□ Test code >80% of changes
+□ Modifies critical path (per commit message)
+□ Changes security-related code
+□ Alters data structures/storage
+□ Updates interfaces/contracts
+□ Emergency/hotfix
+
+### STEP 2: Value Assessment (1-10)
+
+Universal Decision Tree:
+```
+START: Who benefits from this change?
+├─ END USERS (those who use the software's primary purpose)
+│   ├─ Critical to core functionality?
+│   │   ├─ YES → Score 8-10
+│   │   └─ NO → Score 5-7
+│   └─ Nice to have?
+│       └─ Score 3-4
+└─ DEVELOPERS/MAINTAINERS ONLY
+    ├─ Pure cleanup (deletions-heavy, no new capability) → Score 1-2
+    ├─ Refactor that improves structure/maintainability (no new capability) → Score 2-4
+    └─ Clear improvements to development velocity/operational efficiency → Score 4-5
+```
+
+HARD CAPS:
+- Test-only commits (>80% test code): MAX 4
+- Documentation-only commits: MAX 3
+- Refactoring with no new functionality: MAX 4
+
+Deletions-heavy maintenance caps (apply when the work is predominately deletions with little/no new code):
+- Business Value: MAX 2
+- Technical Complexity: MAX 2
+- Overall Impact: MAX 8
+
+NOTE: Developer productivity tools, CI/CD improvements, monitoring, and infrastructure 
+changes provide measurable business value through reduced costs, faster delivery, 
+and improved system reliability. Do not penalize changes for being "internal-only."
+
+### STEP 3: Technical Complexity (1-10)
+
+Base Complexity Scale:
+1: Trivial (configs, constants, single-line changes)
+2: Simple (basic logic, single function/method)
+3: Standard (common patterns, single module)
+4: Moderate (multiple modules, standard integration)
+5: Substantial (complex logic, multiple integrations)
+6: Challenging (concurrent/async, performance-critical)
+7: Complex (distributed systems, complex algorithms)
+8: Very Complex (novel approaches, system architecture)
+9: Extremely Complex (breakthrough algorithms)
+10: Exceptional (paradigm-shifting implementation)
+
+AUTOMATIC CAPS (check in order):
+1. If commit message contains "test", "benchmark", "script", "tool", "CI", "CD": CAP AT 5
+2. If >50% of changed files are in folders named "test", "tests", "scripts", "tools", "benchmarks", "ci", ".github": CAP AT 5
+3. If primarily test code (>70% of changes): CAP AT 3
+4. If only documentation changes: CAP AT 2
+5. Apply the LOWER of: base score OR cap
+
+### STEP 4: Quality Indicators (0-5 points)
+
+Universal Quality Checklist:
+□ Includes tests (+1)
+□ Handles edge cases (+1)
+□ Well-documented (+1)
+□ Follows patterns (+1)
+□ Future-proof design (+1)
+
+### STEP 5: Risk Assessment (0-3 points)
+
+Universal Risk Factors:
+- 0: Standard, well-tested
+- 1: Some untested paths
+- 2: Limited testing, rushed
+- 3: Emergency fix, high blast radius
+
+## PASS 2: Scoring Verification
+
+MANDATORY CHECKS:
+1. If primary beneficiary = DEVELOPERS ONLY → Business Value CANNOT exceed 5
+2. If commit message/files indicate tooling → Technical Complexity CANNOT exceed 5
+3. If >80% test code → Both Value and Complexity capped appropriately
+4. Verify all caps were applied correctly
+
+For deletions-heavy maintenance (predominately deletions and minimal/no new code), apply the specific caps above before computing final Impact.
+
+For EACH score, confirm:
+- Does it respect all applicable caps?
+- Is there specific evidence from the diff?
+
+## Final Formula
+
+Impact = (Value × 2) + (Complexity × 1.5) + Quality - Risk
+
+Range: 0.5 to 40 points
+
+""",
+)
+
+COMMIT_IMPACT_OUTPUT_V2 = PromptBlock(
+    name="commit_impact_output",
+    version=2,
+    text="""## Required JSON Output
+
+{
+  "classification": {
+    "primary_category": "<category>",
+    "is_test_heavy": <boolean>,
+    "special_flags": ["<flag1>", "<flag2>"]
+  },
+  "business_value": {
+    "score": <int 1-10>,
+    "decision_path": "<path taken in decision tree>",
+    "why_not_lower": "<specific reason>",
+    "why_not_higher": "<specific reason>",
+    "evidence": "<specific evidence from diff>"
+  },
+  "technical_complexity": {
+    "score": <int 1-10>,
+    "why_not_lower": "<specific reason>",
+    "why_not_higher": "<specific reason>",
+    "evidence": "<specific evidence from diff>"
+  },
+  "code_quality_points": {
+    "score": <int 0-5>,
+    "checklist": {
+      "tests_included": <boolean>,
+      "high_coverage": <boolean>,
+      "documentation_updated": <boolean>,
+      "follows_patterns": <boolean>,
+      "handles_errors": <boolean>
+    },
+    "evidence": "<specific evidence for each true item>"
+  },
+  "risk_penalty": {
+    "score": <int 0-3>,
+    "reasoning": "<specific risks identified>"
+  },
+  "impact_score": <calculated float>,
+  "calculation_breakdown": "<show the calculation>"
+}
+
+""",
+)
+
+COMMIT_IMPACT_PROMPT = PromptTemplate(
+    name="commit_impact",
+    version=2,
+    system=COMMIT_IMPACT_SYSTEM,
+    blocks=(COMMIT_IMPACT_RUBRIC_V2, COMMIT_IMPACT_OUTPUT_V2),
+)
+
+# Hours and impact in one call (CommitAnalyzer with COMMIT_ANALYSIS_MODE=fused). Reuses the
+# blocks of both prompts verbatim and only adds the combined output format at the end.
+
+COMMIT_FUSED_SYSTEM = """You are a senior software engineer and engineering manager with deep expertise in effort estimation, code quality assessment and evaluating developer contributions. Your task is to produce two independent assessments of the same commit: an hours estimate and an Impact Points score. Follow the provided guidelines exactly and compare scores against the examples provided. Be conservative - when uncertain, score lower. Focus on concrete evidence from the diff. Output only valid JSON with no additional commentary."""
+
+COMMIT_FUSED_OUTPUT_V1 = PromptBlock(
+    name="commit_fused_output",
+    version=1,
+    text="""## Combined Output
+
+This request covers BOTH assessments above. Score each one on its own rubric, as if the other did not exist.
+Respond with a single JSON object with exactly two keys:
+{
+  "hours": <object with the structure under "Output Format" (hours estimation)>,
+  "impact": <object with the structure under "Required JSON Output" (impact points)>
+}
+
+""",
+)
+
+COMMIT_FUSED_PROMPT = PromptTemplate(
+    name="commit_fused",
+    version=1,
+    system=COMMIT_FUSED_SYSTEM,
+    blocks=(COMMIT_HOURS_RUBRIC_V1, COMMIT_IMPACT_RUBRIC_V2, COMMIT_IMPACT_OUTPUT_V2, COMMIT_FUSED_OUTPUT_V1),
+)
+
+# Daily work analysis (AIIntegrationV2.analyze_daily_work and the batch path)
+
+DAILY_WORK_SYSTEM = "You are a senior engineering manager analyzing developer productivity. Output only valid JSON."
+
+DAILY_WORK_HEADER_V2 = PromptBlock(
+    name="daily_work_header",
+    version=2,
+    text=(
+        "You are a senior engineering manager analyzing a developer’s entire day of work across one or more "
+        "repositories. Output only valid JSON with no additional commentary.\n\n"
+    ),
+)
+
+DAILY_WORK_SCORING_V2 = PromptBlock(
+    name="daily_work_scoring",
+    version=2,
+    text="""
+## Scoring Guidelines
+
+### 1. HOURS-BASED DAILY SCORING
+
+Estimate total productive engineering time for the day considering:
+- Actual development time (not AI-assisted time)
+- Code review and refinement cycles
+- Mental effort, context switching, and architecture decisions
+- Cross-repo/component coordination
+
+#### Reference Anchors — DAILY CLASSIFICATION
+Select a base anchor using day-level totals (sum across all commits):
+
+STEP 1: Initial Classification (use total lines = additions + deletions)
+- Under 50 lines → Start with Anchor A
+- 50–199 lines → Start with Anchor B
+- 200–499 lines → Start with Anchor C
+- 500–1499 lines → Start with Anchor D
+- 1500+ lines → Consider Anchor D or E (see Step 2)
+
+STEP 2: Refinement Checks (apply IN ORDER; day-level evidence)
+1) Major Change Detection (can upgrade D→E):
+   □ Commit messages signal "new system/service/framework" or "breaking change"
+   □ 5+ new files created in new top-level directories
+   □ 20+ files changed across 3+ top-level directories
+   □ New technology/dependency introduced (new language, DB, framework)
+   If 2+ checked → Upgrade to Anchor E
+
+2) File Count Override (supersedes Step 1):
+   □ 25+ unique files changed during the day
+   If checked → Set to Anchor E
+
+3) Simplicity Reduction (can downgrade by one level):
+   □ >70% of changes are tests, docs, or comments
+   □ Messages emphasize "refactor", "rename", "move", or "cleanup"
+   □ Only config/constants/data files changed
+   If any checked → Downgrade one anchor level (but never below A)
+
+ANCHOR VALUES (base for the day before multipliers):
+- A: Minimal (0.5h) — Typos/configs/small fixes
+- B: Simple (2.5h) — Small, focused changes
+- C: Standard (6.0h) — Multi-file features or several moderate changes
+- D: Complex (12.0h) — Cross-component/day-spanning work
+- E: Major (20.0h) — New subsystems/architecture-level changes
+
+#### Daily Multipliers (apply to base hours)
+• High context switching (4+ distinct areas/repos): +30%
+• Multi-repo or cross-service coordination: +20%
+• Modifies critical path (messages indicate): +30%
+• Includes comprehensive tests (>50% of changes): +20%
+• Performance-critical work: +20%
+• Security-sensitive changes: +30%
+• Documentation-only day: -50%
+• Formatting/refactor-only day: -30%
+
+Daily sanity bounds:
+- Round final hours to nearest 0.5h
+- Typical days range 0.5–12h; rarely exceed 14h; hard cap at 16h unless overwhelming evidence suggests otherwise
+
+### 2. COMPLEXITY SCORING (1–10)
+
+Compute an average complexity for the day (weighted by significance/size). Count these factors:
+□ Changes core functionality (+3)
+□ Modifies multiple components (+2)
+□ Adds new abstractions/patterns (+2)
+□ Requires algorithmic thinking (+2)
+□ Handles error cases (+1)
+Total: Min 1, Max 10
+
+### 3. SENIORITY SCORING (1–10)
+
+Assess the day’s implementation quality (average across the work):
+□ Comprehensive error handling (+2)
+□ Well-structured tests (+2)
+□ Follows established patterns (+2)
+□ Good abstractions (+2)
+□ Forward-thinking design (+2)
+Total: Min 1, Max 10
+
+For trivial days (<20 lines AND average per-commit complexity ≤ 2 AND minimal changes):
+- Do not automatically set seniority = 10
+- Use seniority 6–9 if quality signals are consistently strong; otherwise 4–6
+
+### 4. RISK LEVEL (low|medium|high)
+
+Day-level deployment risk:
+- low: Docs/tests/isolated changes
+- medium: Core features or integrations with some risk
+- high: Critical path, data migrations, security-sensitive
+
+### 5. DAILY IMPACT SUMMARY (optional but recommended)
+
+Provide a compact day-level impact summary using the same additive formula as individual commits:
+- business_value (1–10)
+- technical_complexity (1–10)
+- code_quality_points (0.5–1.5)
+- risk_penalty (0–3)
+- impact_score = (business_value × 2) + (technical_complexity × 1.5) + code_quality_points − risk_penalty
+Also include:
+- classification: primary_category (feature|maintenance|refactor|docs|infra), with brief rationale
+- category_breakdown: counts or percentages by category
+- top_repositories_by_impact: list of {repo, score}
+
+### 6. EOD REPORT ALIGNMENT (if available)
+
+- consistency_with_report: true|false
+- eod_hours_reported: number or null
+- consistency_notes: brief explanation of alignment or discrepancy
+\n\n""",
+)
+
+DAILY_WORK_OUTPUT_V2 = PromptBlock(
+    name="daily_work_output",
+    version=2,
+    text="""
+## Output Format (JSON only)
+
+{
+  "analysis_date": "<YYYY-MM-DD>",
+  "user_name": "<string>",
+  "repositories": ["<owner/repo>", "..."],
+  "commits_evaluated": <int>,
+  "totals": {
+    "total_lines": <int>,
+    "total_files": <int>,
+    "commit_count": <int>,
+    "repos_count": <int>,
+    "components_touched": <int>
+  },
+
+  "initial_anchor": "<A|B|C|D|E>",
+  "major_change_checks": ["<string>", "..."],
+  "major_change_count": <int>,
+  "file_count_override": <boolean>,
+  "simplicity_reduction_checks": ["<string>", "..."],
+  "final_anchor": "<A|B|C|D|E>",
+  "base_hours": <float>,
+  "multipliers_applied": ["<string>", "..."],
+  "total_estimated_hours": <float>,
+  "average_complexity": <int>,
+  "risk_level": "<low|medium|high>",
+  "average_seniority": <int>,
+  "seniority_rationale": "<string>",
+
+  "work_summary": "<concise paragraph>",
+  "key_achievements": ["<string>", "..."],
+  "hour_estimation_reasoning": "<brief explanation>",
+
+  "impact_summary": {
+    "business_value": <int>,
+    "technical_complexity": <int>,
+    "code_quality_points": <float>,
+    "risk_penalty": <int>,
+    "impact_score": <float>,
+    "classification": {
+      "primary_category": "<feature|maintenance|refactor|docs|infra>",
+      "rationale": "<string>"
+    },
+    "category_breakdown": {"feature": <int>, "maintenance": <int>, "refactor": <int>, "docs": <int>, "infra": <int>},
+    "top_repositories_by_impact": [{"repo": "<owner/repo>", "score": <float>}]
+  },
+
+  "consistency_with_report": <boolean>,
+  "eod_hours_reported": <float|null>,
+  "consistency_notes": "<string>",
+
+  "top_changes": ["<string>", "..."],
+  "warnings": ["<string>", "..."],
+  "method": "daily_batch_v2"
+}
+\n\n""",
+)
+
+DAILY_WORK_PROMPT = PromptTemplate(
+    name="daily_work",
+    version=2,
+    system=DAILY_WORK_SYSTEM,
+    blocks=(DAILY_WORK_HEADER_V2, DAILY_WORK_SCORING_V2, DAILY_WORK_OUTPUT_V2),
+)
+
+# Incremental re-analysis of a day after new commits (DailyCommitAnalysisService). Shares the daily
+# prefix verbatim and only appends the update instructions, so the cached prefix is reused.
+
+DAILY_WORK_DELTA_V1 = PromptBlock(
+    name="daily_work_delta",
+    version=1,
+    text="""
+## Incremental Update
+
+This day was analyzed earlier. You receive the previous day-level result and ONLY the commits added since.
+- Treat the previous result as correct for the work it already covered; do not re-score that work.
+- Add the effort of the new commits. Recompute the anchor from the updated day totals and re-apply multipliers
+  only if the new work changes them (e.g. crosses a line threshold, adds a repository or context switch).
+- Update averages, risk, summary, achievements and the impact summary to cover the whole day.
+- Return the COMPLETE day-level JSON in the output format above, with "method": "daily_delta_v1".
+\n\n""",
+)
+
+DAILY_WORK_DELTA_PROMPT = PromptTemplate(
+    name="daily_work_delta",
+    version=1,
+    system=DAILY_WORK_SYSTEM,
+    blocks=(DAILY_WORK_HEADER_V2, DAILY_WORK_SCORING_V2, DAILY_WORK_OUTPUT_V2, DAILY_WORK_DELTA_V1),
+)
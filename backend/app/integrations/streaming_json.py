@@ -0,0 +1,274 @@
+"""
+Incremental parsing of a JSON object streamed by a model.
+
+The model output arrives as text deltas. ``IncrementalJSONParser`` scans
+them once, character by character, and every time a top-level member of the
+object is complete it is decoded and validated against the matching field
+of a pydantic schema (e.g. ``app.schemas.commit_analysis.HoursEstimate``).
+That gives callers:
+
+- the time until the first field was available
+- ``done`` as soon as the fields they need are present, so the stream can be
+  closed before the model writes the rest (trailing prose, closing fences)
+- ``failed`` as soon as a field violates the schema, so a doomed response
+  can be abandoned early
+- a salvaged result when the stream ends early: completed fields plus the
+  member that was being written, cut back to its last complete element
+
+Text before the opening ``{`` (a ```json fence, a preamble) and after the
+closing ``}`` is ignored.
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing_extensions import Annotated
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Scanner states at the top level of the object
+_BEFORE, _KEY, _IN_KEY, _COLON, _VALUE, _IN_VALUE, _AFTER, _CLOSED = range(8)
+
+
+class IncrementalJSONParser:
+    """
+    Parse one streamed JSON object, field by field.
+
+    Usage:
+        parser = IncrementalJSONParser(HoursEstimate)
+        async for text in deltas:
+            parser.feed(text)
+            if parser.done or parser.failed:
+                break
+        value, fields = parser.result()
+    """
+
+    def __init__(
+        self,
+        schema: Optional[Type[BaseModel]] = None,
+        stop_when: Optional[Iterable[str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.schema = schema
+        # Fields whose arrival ends the parse early; the schema's required fields by default
+        if stop_when is not None:
+            self.stop_when = set(stop_when)
+        elif schema is not None:
+            self.stop_when = {name for name, field in schema.model_fields.items() if field.is_required()}
+        else:
+            self.stop_when = set()
+        self.fields: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.field_times: Dict[str, float] = {}
+        self._clock = clock
+        self._started_at = clock()
+        self._adapters: Dict[str, TypeAdapter] = {}
+
+        # Received text from absolute position ``_base`` on, as chunks not yet joined
+        self._parts: List[str] = []
+        self._base = 0
+        self._length = 0
+        self._pos = 0
+        self._state = _BEFORE
+        self._key: Optional[str] = None
+        self._key_start = 0
+        self._value_start = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._scalar = False
+        # Last point in the current value where cutting and closing the open containers gives valid JSON
+        self._safe: Optional[Tuple[int, Tuple[str, ...]]] = None
+
+    # Feeding
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next piece of model output; only the new chunk is scanned."""
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        while self._pos < self._length and self._state != _CLOSED:
+            if self._step(chunk[self._pos - offset]):
+                self._pos += 1
+
+    def _slice(self, start: int, end: int) -> str:
+        """Text between two absolute positions; chunks are joined only when a member is sliced out."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0][start - self._base : end - self._base] if self._parts else ""
+
+    def _release(self, position: int) -> None:
+        """Drop text before ``position``: finished members are never sliced again."""
+        self._parts = [self._slice(position, self._length)]
+        self._base = position
+
+    def _step(self, c: str) -> bool:
+        """Process one character; returns False when the character must be looked at again."""
+        state = self._state
+        if state == _BEFORE:
+            if c == "{":
+                self._state = _KEY
+        elif state == _KEY:
+            if c == '"':
+                self._key_start = self._pos
+                self._in_string, self._escape = True, False
+                self._state = _IN_KEY
+            elif c == "}":
+                self._state = _CLOSED
+        elif state == _IN_KEY:
+            if self._string_char(c):
+                self._key = json.loads(self._slice(self._key_start, self._pos + 1))
+                self._state = _COLON
+        elif state == _COLON:
+            if c == ":":
+                self._state = _VALUE
+        elif state == _VALUE:
+            if c.isspace():
+                return True
+            self._value_start = self._pos
+            self._stack, self._safe = [], None
+            self._in_string, self._escape, self._scalar = False, False, False
+            self._state = _IN_VALUE
+            if c in _CLOSERS:
+                self._stack.append(c)
+                self._safe = (self._pos + 1, tuple(self._stack))
+            elif c == '"':
+                self._in_string = True
+            else:
+                self._scalar = True
+        elif state == _IN_VALUE:
+            return self._value_char(c)
+        elif state == _AFTER:
+            if c == ",":
+                self._state = _KEY
+            elif c == "}":
+                self._state = _CLOSED
+        return True
+
+    def _string_char(self, c: str) -> bool:
+        """Advance through a string; True when ``c`` is its closing quote."""
+        if self._escape:
+            self._escape = False
+        elif c == "\\":
+            self._escape = True
+        elif c == '"':
+            self._in_string = False
+            return True
+        return False
+
+    def _value_char(self, c: str) -> bool:
+        if self._in_string:
+            if self._string_char(c) and not self._stack:
+                self._finish_value(self._pos + 1)
+            return True
+        if self._scalar:
+            if c in ",}" or c.isspace():
+                self._finish_value(self._pos)
+                return False  # the delimiter belongs to the object
+            return True
+        if c == '"':
+            self._in_string = True
+        elif c in _CLOSERS:
+            self._stack.append(c)
+        elif c in "}]":
+            self._stack.pop()
+            if not self._stack:
+                self._finish_value(self._pos + 1)
+            else:
+                self._safe = (self._pos + 1, tuple(self._stack))
+        elif c == ",":
+            self._safe = (self._pos, tuple(self._stack))
+        return True
+
+    def _finish_value(self, end: int) -> None:
+        self._state = _AFTER
+        raw = self._slice(self._value_start, end)
+        self._release(end)
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.errors[self._key] = f"invalid JSON: {e}"
+            return
+        self._accept(self._key, value)
+
+    def _accept(self, name: str, value: Any) -> bool:
+        error = self._validate(name, value)
+        if error is not None:
+            self.errors[name] = error
+            return False
+        self.fields[name] = value
+        self.field_times.setdefault(name, self._clock() - self._started_at)
+        return True
+
+    def _validate(self, name: str, value: Any) -> Optional[str]:
+        if self.schema is None or name not in self.schema.model_fields:
+            return None
+        adapter = self._adapters.get(name)
+        if adapter is None:
+            field = self.schema.model_fields[name]
+            annotation = Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+            adapter = self._adapters[name] = TypeAdapter(annotation)
+        try:
+            adapter.validate_python(value)
+        except ValidationError as e:
+            return str(e.errors()[0].get("msg")) if e.errors() else str(e)
+        return None
+
+    # State
+
+    @property
+    def closed(self) -> bool:
+        """The whole object has been received."""
+        return self._state == _CLOSED
+
+    @property
+    def done(self) -> bool:
+        """Nothing more is needed: the object is complete or every ``stop_when`` field has arrived."""
+        return self.closed or (bool(self.stop_when) and self.stop_when.issubset(self.fields))
+
+    @property
+    def failed(self) -> bool:
+        """A field arrived that does not satisfy the schema."""
+        return bool(self.errors)
+
+    @property
+    def first_field_seconds(self) -> Optional[float]:
+        return min(self.field_times.values()) if self.field_times else None
+
+    def _salvage_partial(self) -> Optional[Any]:
+        """The member being written when the stream stopped, cut back to its last complete element."""
+        if self._state != _IN_VALUE or self._safe is None or self._key in self.fields:
+            return None
+        end, stack = self._safe
+        raw = self._slice(self._value_start, end).rstrip().rstrip(",")
+        try:
+            return json.loads(raw + "".join(_CLOSERS[opener] for opener in reversed(stack)))
+        except json.JSONDecodeError:
+            return None
+
+    def result(self) -> Tuple[Any, Dict[str, Any]]:
+        """
+        ``(value, fields)`` for everything received so far.
+
+        ``fields`` holds every valid member, plus the salvaged partial one.
+        ``value`` is the schema instance when the fields validate as a whole
+        (without a schema: the fields dict, unless nothing was received), otherwise None.
+        """
+        fields = dict(self.fields)
+        if not self.closed:
+            partial = self._salvage_partial()
+            if partial is not None:
+                fields[self._key] = partial
+        if self.schema is None:
+            return (fields if fields or self.closed else None), fields
+        try:
+            return self.schema.model_validate(fields), fields
+        except ValidationError:
+            return None, fields
+
+    @property
+    def salvaged(self) -> bool:
+        """The object was not received completely (truncated, cut off or abandoned)."""
+        return not self.closed
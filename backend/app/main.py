@@ -11,13 +11,16 @@ from app.api.auth_endpoints import router as auth_router
 from app.api.health import router as health_router
 from app.api.v1.api import api_v1_router
 from app.api.webhooks import router as webhooks_router
+from app.config.postgres_pool import close_pg_pool
 from app.config.settings import settings
 from app.config.supabase_client import get_supabase_client
 from app.core.error_handlers import add_exception_handlers
 from app.core.log_sanitizer import configure_secure_logging
+from app.core.loop_blocking import enable_blocking_detection, loop_monitor
 from app.middleware.api_key_auth import ApiKeyMiddleware
 from app.middleware.rate_limiter import RateLimiterMiddleware
 from app.middleware.request_metrics import RequestMetricsMiddleware
+from app.middleware.route_tagging import RouteTaggingMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -43,7 +46,8 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Middleware
+# Middleware (first added is innermost; route tagging must run in the endpoint's task)
+app.add_middleware(RouteTaggingMiddleware)
 app.add_middleware(RequestMetricsMiddleware)
 
 # API key auth middleware (conditional)
@@ -71,6 +75,7 @@ if settings.ENABLE_RATE_LIMITING:
     app.add_middleware(
         RateLimiterMiddleware,
         rate_limit_per_minute=settings.DEFAULT_RATE_LIMIT,
+        max_tracked_clients=settings.RATE_LIMIT_MAX_TRACKED_CLIENTS,
         exclude_paths=settings.RATE_LIMIT_EXCLUDE_PATHS.split(","),
     )
 
@@ -152,11 +157,23 @@ def startup_services():
         _ = get_supabase_client()
         logger.info("Supabase client initialized")
 
+        if settings.LOOP_BLOCKING_DETECTION:
+            enable_blocking_detection()
+        if settings.LOOP_MONITOR_ENABLED:
+            loop_monitor.start()
+
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_services():
+    loop_monitor.stop()
+    # Release pooled Postgres connections (only opened when DATA_BACKEND=asyncpg)
+    await close_pg_pool()
+
+
 # Mount static files (frontend) - MUST be after all other routes
 frontend_dist_path = "/app/frontend/dist"
 if os.path.exists(frontend_dist_path):
@@ -3,5 +3,6 @@
 from app.middleware.api_key_auth import ApiKeyMiddleware
 from app.middleware.rate_limiter import RateLimiterMiddleware
 from app.middleware.request_metrics import RequestMetricsMiddleware
+from app.middleware.route_tagging import RouteTaggingMiddleware
 
-__all__ = ["ApiKeyMiddleware", "RateLimiterMiddleware", "RequestMetricsMiddleware"]
+__all__ = ["ApiKeyMiddleware", "RateLimiterMiddleware", "RequestMetricsMiddleware", "RouteTaggingMiddleware"]
@@ -5,8 +5,7 @@ from typing import Callable, Dict, List, Optional
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.core.exceptions import RateLimitExceededError
-from app.core.rate_limiter import RateLimitConfig, SlidingWindowRateLimiter
+from app.core.rate_limiter import KeyedSlidingWindowLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +13,8 @@ logger = logging.getLogger(__name__)
 class RateLimiterMiddleware(BaseHTTPMiddleware):
     """
     Middleware for API rate limiting.
-    Uses a simple in-memory store for rate limiting with sliding window.
+    Uses an in-memory sliding window counter with O(1) state per client and
+    a bounded, LRU-evicted client table.
     """
 
     def __init__(
@@ -24,12 +24,15 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
         api_key_header: str = "X-API-Key",
         api_keys: Optional[Dict[str, int]] = None,
         exclude_paths: Optional[List[str]] = None,
+        max_tracked_clients: int = 10000,
     ):
         super().__init__(app)
         self.rate_limit_per_minute = rate_limit_per_minute
         self.window_size = 60  # seconds
-        # Per-identifier limiter instances using shared core implementation
-        self._limiters: Dict[str, SlidingWindowRateLimiter] = {}
+        # Shared keyed limiter; per-client state is two counters
+        self._limiter = KeyedSlidingWindowLimiter(
+            window_seconds=self.window_size, max_keys=max_tracked_clients, name="inbound"
+        )
         self.api_key_header = api_key_header
         self.api_keys = api_keys or {}  # Dict of {api_key: custom_rate_limit}
         self.exclude_paths = exclude_paths or []
@@ -49,33 +52,18 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
         # Determine rate limit for this identifier
         rate_limit = self.api_keys.get(api_key, self.rate_limit_per_minute) if api_key else self.rate_limit_per_minute
 
-        # Apply rate limiting using shared core sliding window limiter
-        limiter = self._get_limiter(identifier, rate_limit)
+        decision = self._limiter.hit(identifier, rate_limit)
         current_time = time.time()
-        retry_after: Optional[float] = None
-        try:
-            await limiter.acquire(1)
-            # If acquire succeeds, estimate current count for headers
-            # Count timestamps in window for header math
-            now = current_time
-            window_start = now - self.window_size
-            # Access internal state safely; this is a simple in-memory limiter
-            request_count = len([t for t in limiter.request_times if t > window_start])
-            is_allowed = True
-        except RateLimitExceededError as e:
-            is_allowed = False
-            request_count = limiter.config.requests_per_hour
-            retry_after = e.retry_after or self.window_size
 
         # Set rate limit headers
         headers = {
             "X-RateLimit-Limit": str(rate_limit),
-            "X-RateLimit-Remaining": str(max(0, rate_limit - request_count)),
-            "X-RateLimit-Reset": str(int(current_time + retry_after)) if retry_after else "0",
+            "X-RateLimit-Remaining": str(decision.remaining),
+            "X-RateLimit-Reset": str(int(current_time + decision.retry_after)) if not decision.allowed else "0",
         }
 
         # If rate limit exceeded, return 429 with headers
-        if not is_allowed:
+        if not decision.allowed:
             logger.warning(f"Rate limit exceeded for {identifier} on {request.url.path}")
             from fastapi.responses import JSONResponse
 
@@ -88,6 +76,7 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
             # Add rate limit headers to response
             for header_name, header_value in headers.items():
                 response.headers[header_name] = header_value
+            response.headers["Retry-After"] = str(max(1, int(decision.retry_after + 0.999)))
             return response
 
         # Rate limit not exceeded, proceed with request
@@ -98,21 +87,3 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
             response.headers[header_name] = header_value
 
         return response
-
-    def _get_limiter(self, identifier: str, per_minute_limit: int) -> SlidingWindowRateLimiter:
-        """Get or create a sliding window limiter for the identifier with a 60s window."""
-        limiter = self._limiters.get(identifier)
-        desired_limit = per_minute_limit  # treated as limit per 60s window
-        if (
-            limiter is None
-            or limiter.config.requests_per_hour != desired_limit
-            or limiter.config.window_seconds != self.window_size
-        ):
-            cfg = RateLimitConfig(
-                requests_per_hour=desired_limit,  # interpreted as requests per window
-                name=f"inbound:{identifier}",
-                window_seconds=self.window_size,
-            )
-            limiter = SlidingWindowRateLimiter(cfg)
-            self._limiters[identifier] = limiter
-        return limiter
@@ -0,0 +1,22 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.sampling_profiler import tag_request
+
+
+class RouteTaggingMiddleware:
+    """
+    Tags each HTTP request so profiler samples can be filtered by route.
+
+    Pure ASGI so the request runs in the same task as the router and the
+    endpoint; register it before any BaseHTTPMiddleware (innermost).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with tag_request(scope):
+            await self.app(scope, receive, send)
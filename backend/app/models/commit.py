@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
@@ -5,6 +6,49 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+ANALYSIS_VERSION = "2.0"
+
+# Analysis payload keys promoted to typed columns, mapped to their column names
+PROMOTED_ANALYSIS_FIELDS = {
+    "impact_score": "impact_score",
+    "impact_business_value": "business_value",
+    "impact_dominant_category": "impact_category",
+    "analysis_version": "analysis_version",
+}
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def split_analysis_payload(payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Split a commit analysis payload into typed column values and a compact JSONB remainder.
+
+    Returns keyword arguments for ``Commit``: impact_score, business_value,
+    impact_category, analysis_version and ai_analysis (the remaining non-null
+    detail with the promoted keys removed).
+    """
+    payload = dict(payload or {})
+    category = payload.get("impact_dominant_category")
+    classification = payload.get("impact_classification")
+    if not category and isinstance(classification, dict):
+        category = classification.get("primary_category")
+    business_value = _to_float(payload.get("impact_business_value"))
+    columns = {
+        "impact_score": _to_float(payload.get("impact_score")),
+        "business_value": int(round(business_value)) if business_value is not None else None,
+        "impact_category": category.lower() if isinstance(category, str) and category else None,
+        "analysis_version": str(payload["analysis_version"]) if payload.get("analysis_version") else None,
+    }
+    columns["ai_analysis"] = {
+        key: value for key, value in payload.items() if key not in PROMOTED_ANALYSIS_FIELDS and value is not None
+    }
+    return columns
+
 
 class Commit(BaseModel):
     id: Optional[UUID] = Field(None, description="Commit record ID, generated by DB if None")
@@ -24,8 +68,11 @@ class Commit(BaseModel):
     lines_deleted: Optional[int] = None
     changed_files: Optional[List[str]] = None
     ai_analysis_notes: Optional[str] = Field(
-        None, description="Raw text notes from AI analysis, potentially replaced by more structured fields below."
-    )  # Potentially JSON or Text in DB - Replaced by specific fields
+        None, description="Legacy stringified AI analysis; superseded by ai_analysis and the typed impact columns."
+    )
+    ai_analysis: Optional[Dict[str, Any]] = Field(
+        None, description="AI analysis detail (JSONB) not covered by a typed column"
+    )
     complexity_score: Optional[int] = None  # From AI analysis
     risk_level: Optional[str] = None  # Could be an Enum: LOW, MEDIUM, HIGH - From AI analysis
     risk_factor: Optional[float] = None  # Numeric factor contributing to risk
@@ -36,6 +83,12 @@ class Commit(BaseModel):
     model_used: Optional[str] = Field(None, description="AI model used for the analysis")
     analyzed_at: Optional[datetime] = Field(None, description="Timestamp of when the AI analysis was performed")
 
+    # Typed impact fields promoted out of the analysis payload for filtering and aggregation
+    impact_score: Optional[float] = Field(None, description="Final calculated impact score")
+    business_value: Optional[int] = Field(None, description="Business value score (1-10)")
+    impact_category: Optional[str] = Field(None, description="Dominant impact category")
+    analysis_version: Optional[str] = Field(None, description="Version of the analysis that produced the scores")
+
     # New fields for EOD and Code Quality integration
     eod_report_id: Optional[UUID] = Field(None, description="ID of the linked EOD report, if any")
     eod_report_summary: Optional[str] = Field(None, description="Summary or key points from the EOD report")
@@ -51,5 +104,21 @@ class Commit(BaseModel):
     created_at: Optional[datetime] = Field(None, description="Timestamp when the record was added to this DB")
     updated_at: Optional[datetime] = None
 
+    def analysis_details(self) -> Dict[str, Any]:
+        """Full analysis payload, rebuilt from ai_analysis and the typed columns (or legacy notes)."""
+        if self.ai_analysis is None and self.ai_analysis_notes:
+            try:
+                legacy = json.loads(self.ai_analysis_notes)
+            except json.JSONDecodeError:
+                legacy = None
+            return legacy if isinstance(legacy, dict) else {"raw_notes": self.ai_analysis_notes}
+
+        details = dict(self.ai_analysis or {})
+        for key, column in PROMOTED_ANALYSIS_FIELDS.items():
+            value = getattr(self, column)
+            if value is not None:
+                details[key] = value
+        return details
+
     class Config:
         from_attributes = True
@@ -0,0 +1,33 @@
+"""
+Base class for Supabase repositories.
+
+supabase-py's ``.execute()`` is a blocking HTTP call. Calling it directly in an
+``async def`` stalls the event loop for the whole round trip, so webhooks,
+health checks and every other request wait behind it. Repositories built on
+this base build queries as usual and hand them to ``_execute``, which runs the
+request in a worker thread.
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Optional
+
+from app.config.supabase_client import get_supabase_client
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSupabaseRepository:
+    """Supabase repository whose I/O runs off the event loop."""
+
+    def __init__(self, client: Optional[Client] = None):
+        self._client = client if client is not None else get_supabase_client()
+
+    async def _execute(self, query: Any) -> Any:
+        """Execute a built PostgREST query (or RPC) in a worker thread."""
+        return await asyncio.to_thread(query.execute)
+
+    async def _execute_all(self, *queries: Any) -> List[Any]:
+        """Execute independent queries concurrently; responses are returned in order."""
+        return list(await asyncio.gather(*(self._execute(query) for query in queries)))
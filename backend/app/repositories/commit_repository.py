@@ -1,20 +1,57 @@
 import asyncio
 import json
 import logging
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from decimal import ROUND_HALF_UP, Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from uuid import UUID
 
 from postgrest import APIResponse as PostgrestResponse
 
+from app.config.postgres_pool import use_asyncpg_backend
 from app.config.supabase_client import get_supabase_client_safe
 from app.core.exceptions import DatabaseError, ResourceNotFoundError
 from app.models.commit import Commit  # Pydantic model
+from app.repositories.pg_store import PgCommitStore
+from app.repositories.query_builder import KeysetQuery, Page
 from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Columns read by list/summary callers (daily analysis, reporting). Excludes the analysis payloads.
+COMMIT_SUMMARY_COLUMNS = (
+    "id",
+    "commit_hash",
+    "author_id",
+    "repository_name",
+    "branch",
+    "commit_message",
+    "commit_url",
+    "commit_timestamp",
+    "lines_added",
+    "lines_deleted",
+    "changed_files",
+    "ai_estimated_hours",
+    "complexity_score",
+    "seniority_score",
+    "risk_level",
+    "impact_score",
+    "business_value",
+    "impact_category",
+    "analysis_version",
+)
+
+# Summary columns plus what is needed to reuse a stored analysis
+COMMIT_ANALYSIS_COLUMNS = COMMIT_SUMMARY_COLUMNS + (
+    "key_changes",
+    "seniority_rationale",
+    "model_used",
+    "analyzed_at",
+    "ai_analysis",
+    "ai_analysis_notes",
+    "created_at",
+)
+
 
 def convert_datetimes_to_iso(obj: Any) -> Any:
     """Recursively convert all datetime objects in a dictionary/list to ISO format strings."""
@@ -32,6 +69,8 @@ class CommitRepository:
     def __init__(self, client: Client = None):
         self._client = client if client is not None else get_supabase_client_safe()
         self._table = "commits"
+        # Hot paths go straight to Postgres when DATA_BACKEND=asyncpg
+        self._pg = PgCommitStore() if use_asyncpg_backend() else None
 
     def _handle_supabase_error(self, response: PostgrestResponse, context_message: str):
         """Helper to log and raise DatabaseError from Supabase errors.
@@ -47,6 +86,66 @@ class CommitRepository:
             logger.error(f"{context_message}: Supabase error code {error_code} - {message}", exc_info=True)
             raise DatabaseError(f"{context_message}: {message}")
 
+    def _row_to_commit(self, row: Dict[str, Any]) -> Commit:
+        if row.get("ai_estimated_hours") is not None:
+            try:
+                row["ai_estimated_hours"] = Decimal(str(row["ai_estimated_hours"])).quantize(
+                    Decimal("0.1"), rounding=ROUND_HALF_UP
+                )
+            except Exception as conversion_exc:
+                logger.warning(
+                    f"Could not convert/round ai_estimated_hours: {row.get('ai_estimated_hours')}. "
+                    f"Error: {conversion_exc}"
+                )
+                row["ai_estimated_hours"] = None
+        return Commit(**row)
+
+    def _commit_query(
+        self,
+        author_id: Optional[UUID],
+        start_date: Optional[date],
+        end_date: Optional[date],
+        columns: Sequence[str],
+    ) -> KeysetQuery[Commit]:
+        query = KeysetQuery(
+            self._client,
+            self._table,
+            columns=columns,
+            timestamp_column="commit_timestamp",
+            row_factory=self._row_to_commit,
+        )
+        if author_id is not None:
+            query.where("eq", "author_id", str(author_id))
+        if start_date is not None:
+            query.where("gte", "commit_timestamp", datetime.combine(start_date, datetime.min.time()).isoformat())
+        if end_date is not None:
+            end_dt = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            query.where("lt", "commit_timestamp", end_dt.isoformat())
+        return query
+
+    async def get_commits_page(
+        self,
+        author_id: Optional[UUID] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        columns: Sequence[str] = COMMIT_SUMMARY_COLUMNS,
+    ) -> Page[Commit]:
+        """One keyset page of commits, newest first, optionally filtered by author and date range."""
+        return await self._commit_query(author_id, start_date, end_date, columns).fetch_page(cursor, limit)
+
+    def iter_commits(
+        self,
+        author_id: Optional[UUID] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        columns: Sequence[str] = COMMIT_SUMMARY_COLUMNS,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Commit]:
+        """Iterate over all matching commits, newest first, ``batch_size`` rows per request."""
+        return self._commit_query(author_id, start_date, end_date, columns).iterate(batch_size)
+
     def _format_log_result(self, operation: str, commit_hash: str, success: bool) -> str:
         """Format a standardized log message for database operations."""
         status = "✓" if success else "❌"
@@ -84,6 +183,13 @@ class CommitRepository:
                 f"eod_report_id={commit_dict.get('eod_report_id')}"
             )
 
+            if self._pg:
+                saved_row = await self._pg.upsert_commit(commit_dict)
+                if not saved_row:
+                    raise DatabaseError(f"Failed to save commit {commit_hash}: No data returned.")
+                logger.info(self._format_log_result("Saved commit", commit_hash, True))
+                return self._row_to_commit(saved_row)
+
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table).upsert(commit_dict, on_conflict="commit_hash").execute
             )
@@ -134,6 +240,12 @@ class CommitRepository:
                     commit_dict["commit_timestamp"] = commit_dict["commit_timestamp"].isoformat()
                 commits_dict_list.append(commit_dict)
 
+            if self._pg:
+                # Binary COPY; hashes that already exist are skipped instead of failing the batch
+                inserted_rows = await self._pg.bulk_insert(commits_dict_list)
+                logger.info(f"✓ Successfully inserted {len(inserted_rows)} of {len(commits_data)} commits")
+                return [self._row_to_commit(row) for row in inserted_rows]
+
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table).insert(commits_dict_list).execute
             )
@@ -171,13 +283,17 @@ class CommitRepository:
         """Retrieves a commit by its unique hash."""
         try:
             logger.info(f"Fetching commit: {commit_hash}")
+            if self._pg:
+                row = await self._pg.get_by_hash(commit_hash)
+                return self._row_to_commit(row) if row else None
+
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.from_(self._table).select("*").eq("commit_hash", commit_hash).maybe_single().execute
             )
 
-            if response is None:  # Should not happen with aiohttp/requests if execute ran
-                logger.error(f"Null response from database for commit query {commit_hash}")
-                raise DatabaseError(f"Received null response from database for commit {commit_hash}.")
+            if response is None:  # maybe_single() returns None when no row matches (supabase-py 2.x)
+                logger.info(f"Commit not found: {commit_hash}")
+                return None
 
             if response.data:
                 logger.info(f"✓ Found commit: {commit_hash}")
@@ -259,20 +375,32 @@ class CommitRepository:
             logger.error(f"Unexpected error updating commit analysis {commit_hash}: {e}", exc_info=True)
             raise DatabaseError(f"Unexpected error updating commit analysis {commit_hash}: {str(e)}")
 
-    async def get_commits_by_user_in_range(self, author_id: UUID, start_date: date, end_date: date) -> List[Commit]:
-        """Retrieves all commits by a specific user within a date range (inclusive)."""
+    async def get_commits_by_user_in_range(
+        self,
+        author_id: UUID,
+        start_date: date,
+        end_date: date,
+        columns: Sequence[str] = COMMIT_SUMMARY_COLUMNS,
+    ) -> List[Commit]:
+        """Retrieves all commits by a specific user within a date range (inclusive).
+
+        Only ``columns`` are selected (summary columns by default); pass ``("*",)`` for full rows.
+        """
         try:
             logger.info(f"Fetching commits for user {author_id} from {start_date} to {end_date}")
 
             start_dt = datetime.combine(start_date, datetime.min.time()).isoformat()
             # Add one day to end_date to make the range inclusive
-            from datetime import timedelta
-
             end_dt = datetime.combine(end_date + timedelta(days=1), datetime.min.time()).isoformat()
 
+            if self._pg:
+                rows = await self._pg.by_author_in_range(author_id, start_dt, end_dt, columns)
+                logger.info(f"✓ Found {len(rows)} commits for user {author_id}")
+                return [self._row_to_commit(row) for row in rows]
+
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table)
-                .select("*")
+                .select(",".join(columns))
                 .eq("author_id", str(author_id))
                 .gte("commit_timestamp", start_dt)
                 .lt("commit_timestamp", end_dt)
@@ -432,6 +560,12 @@ class CommitRepository:
         try:
             logger.info(f"Checking existence of {len(commit_hashes)} commits")
 
+            if self._pg:
+                # One round trip: the hash list is bound as a single array parameter
+                existing_hashes = await self._pg.existing_hashes(commit_hashes)
+                logger.info(f"✓ Found {len(existing_hashes)} existing commits out of {len(commit_hashes)} checked")
+                return existing_hashes
+
             # Split into chunks to avoid query size limits
             chunk_size = 100
             existing_hashes = []
@@ -487,7 +621,10 @@ class CommitRepository:
                 chunk = commit_hashes[i : i + chunk_size]
 
                 response: PostgrestResponse = await asyncio.to_thread(
-                    self._client.table(self._table).select("*").in_("commit_hash", chunk).execute
+                    self._client.table(self._table)
+                    .select(",".join(COMMIT_ANALYSIS_COLUMNS))
+                    .in_("commit_hash", chunk)
+                    .execute
                 )
 
                 self._handle_supabase_error(response, "Error fetching commits with analysis")
@@ -5,18 +5,18 @@ from uuid import UUID
 
 from postgrest import APIResponse as PostgrestResponse
 
-from app.config.supabase_client import get_supabase_client
 from app.core.exceptions import DatabaseError
 from app.models.daily_commit_analysis import DailyCommitAnalysis, DailyCommitAnalysisCreate, DailyCommitAnalysisUpdate
+from app.repositories.base import AsyncSupabaseRepository
 
 logger = logging.getLogger(__name__)
 
 
-class DailyCommitAnalysisRepository:
+class DailyCommitAnalysisRepository(AsyncSupabaseRepository):
     """Repository for daily commit analysis operations"""
 
     def __init__(self):
-        self._client = get_supabase_client()
+        super().__init__()
         self._table = "daily_commit_analysis"
 
     def _handle_supabase_error(self, response: PostgrestResponse, context_message: str):
@@ -43,7 +43,7 @@ class DailyCommitAnalysisRepository:
             if "analysis_date" in data_dict:
                 data_dict["analysis_date"] = data_dict["analysis_date"].isoformat()
 
-            response: PostgrestResponse = self._client.table(self._table).insert(data_dict).execute()
+            response: PostgrestResponse = await self._execute(self._client.table(self._table).insert(data_dict))
 
             self._handle_supabase_error(response, "Failed to create daily commit analysis")
 
@@ -64,8 +64,8 @@ class DailyCommitAnalysisRepository:
         try:
             logger.info(f"Fetching daily analysis: {analysis_id}")
 
-            response: PostgrestResponse = (
-                self._client.table(self._table).select("*").eq("id", str(analysis_id)).maybe_single().execute()
+            response: PostgrestResponse = await self._execute(
+                self._client.table(self._table).select("*").eq("id", str(analysis_id)).maybe_single()
             )
 
             if response.data:
@@ -84,13 +84,12 @@ class DailyCommitAnalysisRepository:
         try:
             logger.info(f"Fetching daily analysis for user {user_id} on {analysis_date}")
 
-            response: PostgrestResponse = (
+            response: PostgrestResponse = await self._execute(
                 self._client.table(self._table)
                 .select("*")
                 .eq("user_id", str(user_id))
                 .eq("analysis_date", analysis_date.isoformat())
                 .maybe_single()
-                .execute()
             )
 
             if response.data:
@@ -111,14 +110,13 @@ class DailyCommitAnalysisRepository:
         try:
             logger.info(f"Fetching daily analyses for user {user_id} from {start_date} to {end_date}")
 
-            response: PostgrestResponse = (
+            response: PostgrestResponse = await self._execute(
                 self._client.table(self._table)
                 .select("*")
                 .eq("user_id", str(user_id))
                 .gte("analysis_date", start_date.isoformat())
                 .lte("analysis_date", end_date.isoformat())
                 .order("analysis_date", desc=True)
-                .execute()
             )
 
             self._handle_supabase_error(response, f"Error fetching analyses for user {user_id}")
@@ -157,12 +155,11 @@ class DailyCommitAnalysisRepository:
             # For now, we'll use a different approach with existing Supabase client
 
             # Get all commits for the date
-            commits_response = (
+            commits_response = await self._execute(
                 self._client.table("commits")
                 .select("author_id")
                 .gte("commit_timestamp", f"{analysis_date.isoformat()}T00:00:00")
                 .lt("commit_timestamp", f"{analysis_date.isoformat()}T23:59:59")
-                .execute()
             )
 
             if not commits_response.data:
@@ -175,12 +172,11 @@ class DailyCommitAnalysisRepository:
                 return []
 
             # Get existing analyses for these users on this date
-            analyses_response = (
+            analyses_response = await self._execute(
                 self._client.table(self._table)
                 .select("user_id")
                 .eq("analysis_date", analysis_date.isoformat())
                 .in_("user_id", author_ids)
-                .execute()
             )
 
             analyzed_user_ids = set(analysis["user_id"] for analysis in (analyses_response.data or []))
@@ -210,8 +206,8 @@ class DailyCommitAnalysisRepository:
             if "total_estimated_hours" in data_dict:
                 data_dict["total_estimated_hours"] = str(data_dict["total_estimated_hours"])
 
-            response: PostgrestResponse = (
-                self._client.table(self._table).update(data_dict).eq("id", str(analysis_id)).execute()
+            response: PostgrestResponse = await self._execute(
+                self._client.table(self._table).update(data_dict).eq("id", str(analysis_id))
             )
 
             self._handle_supabase_error(response, f"Failed to update daily analysis {analysis_id}")
@@ -234,7 +230,9 @@ class DailyCommitAnalysisRepository:
         try:
             logger.info(f"Deleting daily analysis: {analysis_id}")
 
-            response: PostgrestResponse = self._client.table(self._table).delete().eq("id", str(analysis_id)).execute()
+            response: PostgrestResponse = await self._execute(
+                self._client.table(self._table).delete().eq("id", str(analysis_id))
+            )
 
             self._handle_supabase_error(response, f"Failed to delete daily analysis {analysis_id}")
 
@@ -2,14 +2,17 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 from uuid import UUID, uuid4
 
 from postgrest import APIResponse as PostgrestResponse
 
+from app.config.postgres_pool import use_asyncpg_backend
 from app.config.supabase_client import get_supabase_client_safe, retry_on_connection_error
 from app.core.exceptions import DatabaseError, ResourceNotFoundError
 from app.models.daily_report import AiAnalysis, ClarificationRequest, DailyReport, DailyReportCreate, DailyReportUpdate
+from app.repositories.pg_store import PgDailyReportStore
+from app.repositories.query_builder import KeysetQuery, Page, encode_cursor, project
 from supabase import Client
 
 logger = logging.getLogger(__name__)
@@ -23,6 +26,7 @@ class DailyReportRepository:
     def __init__(self, client: Client = None):
         self._client = client if client is not None else get_supabase_client_safe()
         self._table_name = "daily_reports"
+        self._pg = PgDailyReportStore() if use_asyncpg_backend() else None
 
     def _handle_supabase_error(self, response: PostgrestResponse, context_message: str):
         """Helper to log and raise DatabaseError from Supabase errors.
@@ -187,6 +191,9 @@ class DailyReportRepository:
             raise DatabaseError(f"Unexpected error creating daily report: {str(e)}")
 
     async def get_daily_report_by_id(self, report_id: UUID) -> Optional[DailyReport]:
+        if self._pg:
+            row = await self._pg.get_by_id(report_id)
+            return self._db_to_model(row) if row else None
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table_name).select("*").eq("id", str(report_id)).single().execute
@@ -213,6 +220,8 @@ class DailyReportRepository:
             raise DatabaseError(f"Unexpected error getting daily report by ID {report_id}: {str(e)}")
 
     async def get_daily_reports_by_user_id(self, user_id: UUID) -> List[DailyReport]:
+        if self._pg:
+            return [self._db_to_model(row) for row in await self._pg.by_user(user_id)]
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table_name)
@@ -295,6 +304,9 @@ class DailyReportRepository:
     async def get_reports_by_user_and_date_range(
         self, user_id: UUID, start_date: datetime, end_date: datetime
     ) -> List[DailyReport]:
+        if self._pg:
+            rows = await self._pg.by_user_in_range(user_id, start_date, end_date)
+            return [self._db_to_model(row) for row in rows]
         start_date_iso = start_date.isoformat()
         end_date_iso = end_date.isoformat()
         try:
@@ -414,13 +426,16 @@ class DailyReportRepository:
             raise DatabaseError(f"Unexpected error deleting daily report {report_id}: {str(e)}")
 
     @retry_on_connection_error(max_retries=3, backoff_factor=1.5)
-    async def get_all_daily_reports(self, limit: int = 100, offset: int = 0) -> List[DailyReport]:
+    async def get_all_daily_reports(
+        self, limit: int = 100, offset: int = 0, columns: Optional[Sequence[str]] = None
+    ) -> List[DailyReport]:
         """Retrieves all daily reports with pagination (for admin/debugging)."""
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table_name)
-                .select("*")
+                .select(project(columns))
                 .order("report_date", desc=True)
+                .order("id", desc=True)
                 .range(offset, offset + limit - 1)
                 .execute
             )
@@ -448,6 +463,7 @@ class DailyReportRepository:
                 .select("*")
                 .eq("user_id", str(user_id))
                 .order("report_date", desc=True)
+                .order("id", desc=True)
                 .range(offset, offset + limit - 1)
                 .execute
             )
@@ -459,6 +475,39 @@ class DailyReportRepository:
             logger.error(f"Unexpected error getting paginated daily reports for user {user_id}: {e}", exc_info=True)
             raise DatabaseError(f"Unexpected error getting paginated daily reports for user {user_id}: {str(e)}")
 
+    def _report_query(self, user_id: Optional[UUID], columns: Optional[Sequence[str]]) -> KeysetQuery[DailyReport]:
+        query = KeysetQuery(
+            self._client,
+            self._table_name,
+            columns=columns,
+            timestamp_column="report_date",
+            row_factory=self._db_to_model,
+        )
+        if user_id is not None:
+            query.where("eq", "user_id", str(user_id))
+        return query
+
+    async def get_daily_reports_page(
+        self,
+        user_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Page[DailyReport]:
+        """One keyset page of reports (newest first), optionally for a single user."""
+        return await self._report_query(user_id, columns).fetch_page(cursor, limit)
+
+    def iter_daily_reports(
+        self, user_id: Optional[UUID] = None, columns: Optional[Sequence[str]] = None, batch_size: int = 500
+    ) -> AsyncIterator[DailyReport]:
+        """Iterate over all reports (newest first), ``batch_size`` rows per request."""
+        return self._report_query(user_id, columns).iterate(batch_size)
+
+    @staticmethod
+    def cursor_after(report: DailyReport) -> str:
+        """Cursor that continues after ``report`` in report_date order."""
+        return encode_cursor(report.report_date, report.id)
+
     async def get_user_reports_count(self, user_id: UUID) -> int:
         """
         Get the total count of reports for a specific user.
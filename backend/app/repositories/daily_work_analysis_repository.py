@@ -4,18 +4,18 @@ from decimal import Decimal
 from typing import Any, Dict, Optional
 from uuid import UUID
 
-from app.config.supabase_client import get_supabase_client
 from app.core.exceptions import DatabaseError
 from app.models.daily_work_analysis import DailyWorkAnalysis
+from app.repositories.base import AsyncSupabaseRepository
 
 logger = logging.getLogger(__name__)
 
 
-class DailyWorkAnalysisRepository:
+class DailyWorkAnalysisRepository(AsyncSupabaseRepository):
     """Supabase-backed repository for daily work analyses (no SQLAlchemy)."""
 
     def __init__(self):
-        self._client = get_supabase_client()
+        super().__init__()
         self._table = "daily_work_analyses"
         self._work_items_table = "work_items"
         self._dedup_table = "deduplication_results"
@@ -47,7 +47,7 @@ class DailyWorkAnalysisRepository:
             work_items = data_dict.pop("work_items", [])
             dedup_results = data_dict.pop("deduplication_results", [])
 
-            resp = self._client.table(self._table).insert(data_dict).execute()
+            resp = await self._execute(self._client.table(self._table).insert(data_dict))
             self._handle_supabase_error(resp, "Failed to create daily work analysis")
             if not resp.data:
                 raise DatabaseError("Failed to create daily work analysis: No data returned")
@@ -57,13 +57,13 @@ class DailyWorkAnalysisRepository:
             if work_items:
                 for wi in work_items:
                     wi["daily_analysis_id"] = analysis_id
-                wi_resp = self._client.table(self._work_items_table).insert(work_items).execute()
+                wi_resp = await self._execute(self._client.table(self._work_items_table).insert(work_items))
                 self._handle_supabase_error(wi_resp, "Failed to create work items")
 
             if dedup_results:
                 for dr in dedup_results:
                     dr["daily_analysis_id"] = analysis_id
-                dr_resp = self._client.table(self._dedup_table).insert(dedup_results).execute()
+                dr_resp = await self._execute(self._client.table(self._dedup_table).insert(dedup_results))
                 self._handle_supabase_error(dr_resp, "Failed to create deduplication results")
 
             return await self.get_by_id(UUID(analysis_id))
@@ -75,24 +75,20 @@ class DailyWorkAnalysisRepository:
 
     async def get_by_id(self, analysis_id: UUID) -> Optional[DailyWorkAnalysis]:
         try:
-            resp = self._client.table(self._table).select("*").eq("id", str(analysis_id)).maybe_single().execute()
+            resp = await self._execute(
+                self._client.table(self._table).select("*").eq("id", str(analysis_id)).maybe_single()
+            )
             if not resp.data:
                 return None
 
             analysis_data = dict(resp.data)
 
-            wi_resp = (
-                self._client.table(self._work_items_table)
-                .select("*")
-                .eq("daily_analysis_id", str(analysis_id))
-                .execute()
+            wi_resp, dr_resp = await self._execute_all(
+                self._client.table(self._work_items_table).select("*").eq("daily_analysis_id", str(analysis_id)),
+                self._client.table(self._dedup_table).select("*").eq("daily_analysis_id", str(analysis_id)),
             )
             if wi_resp.data:
                 analysis_data["work_items"] = wi_resp.data
-
-            dr_resp = (
-                self._client.table(self._dedup_table).select("*").eq("daily_analysis_id", str(analysis_id)).execute()
-            )
             if dr_resp.data:
                 analysis_data["deduplication_results"] = dr_resp.data
 
@@ -103,13 +99,12 @@ class DailyWorkAnalysisRepository:
 
     async def get_by_user_and_date(self, user_id: UUID, analysis_date: date) -> Optional[DailyWorkAnalysis]:
         try:
-            resp = (
+            resp = await self._execute(
                 self._client.table(self._table)
                 .select("*")
                 .eq("user_id", str(user_id))
                 .eq("analysis_date", analysis_date.isoformat())
                 .maybe_single()
-                .execute()
             )
             if resp.data:
                 return DailyWorkAnalysis(**resp.data)
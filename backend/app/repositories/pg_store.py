@@ -0,0 +1,286 @@
+"""
+asyncpg fast path for the hot repositories.
+
+Each store issues a fixed set of SQL statements against one table over the
+shared pool from ``app.config.postgres_pool``. Statement text is constant per
+operation (only ``$n`` parameters vary), so asyncpg's per-connection statement
+cache turns them into prepared statements after the first call.
+
+Rows come back as plain dicts with the same keys PostgREST returns, so the
+repositories keep materializing models exactly as before. Values are coerced
+to the column's Postgres type before binding, using the column types read
+once from the catalog.
+"""
+
+import logging
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from app.config.postgres_pool import pg_connection, pg_transaction
+from app.core.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+_COLUMN_TYPES_SQL = """
+SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+FROM pg_attribute a
+WHERE a.attrelid = $1::regclass AND a.attnum > 0 AND NOT a.attisdropped
+"""
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.min)
+    return value
+
+
+def coerce_value(value: Any, pg_type: str) -> Any:
+    """Convert a Python/JSON value into what asyncpg expects for ``pg_type``."""
+    if value is None:
+        return None
+    if pg_type == "timestamp without time zone":
+        value = _parse_datetime(value)
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            # Naive columns store UTC wall-clock time
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if pg_type == "timestamp with time zone":
+        value = _parse_datetime(value)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+    if pg_type == "date" and isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if pg_type == "uuid" and not isinstance(value, UUID):
+        return UUID(str(value))
+    if pg_type in ("real", "double precision"):
+        return float(value)
+    if pg_type.startswith("numeric") and not isinstance(value, Decimal):
+        return Decimal(str(value))
+    if pg_type in ("integer", "smallint", "bigint") and not isinstance(value, bool):
+        return int(value)
+    if pg_type in ("jsonb", "json"):
+        return value
+    if hasattr(value, "value") and not isinstance(value, (str, bytes)):
+        # Enums bound to text/varchar columns
+        return value.value
+    return value
+
+
+def _row_to_dict(record: Any) -> Dict[str, Any]:
+    row = dict(record)
+    for key, value in row.items():
+        if isinstance(value, UUID):
+            row[key] = str(value)
+    return row
+
+
+class PgTable:
+    """Typed access to one table over the asyncpg pool."""
+
+    # Column types per table, loaded once per process
+    _column_types: Dict[str, Dict[str, str]] = {}
+
+    table: str = ""
+    schema: str = "public"
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{_quote_ident(self.schema)}.{_quote_ident(self.table)}"
+
+    async def column_types(self) -> Dict[str, str]:
+        cached = PgTable._column_types.get(self.qualified_name)
+        if cached is None:
+            async with pg_connection() as connection:
+                records = await connection.fetch(_COLUMN_TYPES_SQL, self.qualified_name)
+            cached = {name: pg_type for name, pg_type in records}
+            PgTable._column_types[self.qualified_name] = cached
+        return cached
+
+    async def prepare_row(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop keys that are not columns and coerce the rest to their column types."""
+        types = await self.column_types()
+        row = {}
+        for key, value in payload.items():
+            pg_type = types.get(key)
+            if pg_type is None:
+                logger.debug(f"Ignoring unknown column {key} for {self.table}")
+                continue
+            row[key] = coerce_value(value, pg_type)
+        return row
+
+    async def select_list(self, columns: Optional[Sequence[str]]) -> str:
+        if not columns or "*" in columns:
+            return "*"
+        types = await self.column_types()
+        return ", ".join(_quote_ident(column) for column in columns if column in types) or "*"
+
+    async def param(self, column: str, value: Any) -> Any:
+        return coerce_value(value, (await self.column_types()).get(column, ""))
+
+    async def fetch(self, sql: str, *args: Any) -> List[Dict[str, Any]]:
+        try:
+            async with pg_connection() as connection:
+                records = await connection.fetch(sql, *args)
+        except Exception as e:
+            logger.error(f"asyncpg query on {self.table} failed: {e}", exc_info=True)
+            raise DatabaseError(f"Error querying {self.table}: {str(e)}")
+        return [_row_to_dict(record) for record in records]
+
+    async def fetch_one(self, sql: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(sql, *args)
+        return rows[0] if rows else None
+
+    async def upsert(self, payload: Dict[str, Any], conflict_columns: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """INSERT ... ON CONFLICT DO UPDATE for one row, returning the stored row."""
+        row = await self.prepare_row(payload)
+        columns = list(row)
+        conflict = ", ".join(_quote_ident(column) for column in conflict_columns)
+        updates = [column for column in columns if column not in conflict_columns]
+        action = (
+            "DO UPDATE SET " + ", ".join(f"{_quote_ident(c)} = EXCLUDED.{_quote_ident(c)}" for c in updates)
+            if updates
+            else "DO NOTHING"
+        )
+        sql = (
+            f"INSERT INTO {self.qualified_name} ({', '.join(_quote_ident(c) for c in columns)}) "
+            f"VALUES ({', '.join(f'${i}' for i in range(1, len(columns) + 1))}) "
+            f"ON CONFLICT ({conflict}) {action} RETURNING *"
+        )
+        return await self.fetch_one(sql, *row.values())
+
+    async def copy_insert(
+        self, payloads: Iterable[Dict[str, Any]], conflict_columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Bulk insert with binary COPY.
+
+        Rows are copied into a temporary staging table and moved into the real
+        table with one INSERT ... SELECT, so conflicting rows can be skipped
+        (COPY on its own cannot) and the inserted rows are returned.
+        """
+        rows = [await self.prepare_row(payload) for payload in payloads]
+        if not rows:
+            return []
+        columns = sorted({column for row in rows for column in row})
+        records = [tuple(row.get(column) for column in columns) for row in rows]
+        column_list = ", ".join(_quote_ident(column) for column in columns)
+        staging = f"_stage_{self.table}"
+        on_conflict = ""
+        if conflict_columns:
+            on_conflict = f"ON CONFLICT ({', '.join(_quote_ident(c) for c in conflict_columns)}) DO NOTHING"
+
+        try:
+            async with pg_transaction() as connection:
+                await connection.execute(
+                    f"CREATE TEMP TABLE {staging} " f"(LIKE {self.qualified_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await connection.copy_records_to_table(staging, records=records, columns=columns)
+                inserted = await connection.fetch(
+                    f"INSERT INTO {self.qualified_name} ({column_list}) "
+                    f"SELECT {column_list} FROM {staging} {on_conflict} RETURNING *"
+                )
+                # Dropped explicitly too, so a second bulk insert in the same outer transaction starts empty
+                await connection.execute(f"DROP TABLE {staging}")
+        except Exception as e:
+            logger.error(f"asyncpg COPY into {self.table} failed: {e}", exc_info=True)
+            raise DatabaseError(f"Bulk insert into {self.table} failed: {str(e)}")
+        return [_row_to_dict(record) for record in inserted]
+
+
+class PgCommitStore(PgTable):
+    table = "commits"
+
+    async def get_by_hash(self, commit_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.fetch_one(f"SELECT * FROM {self.qualified_name} WHERE commit_hash = $1", commit_hash)
+
+    async def upsert_commit(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.upsert(payload, ("commit_hash",))
+
+    async def bulk_insert(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self.copy_insert(payloads, conflict_columns=("commit_hash",))
+
+    async def by_author_in_range(
+        self, author_id: UUID, start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Commits with start <= commit_timestamp < end, newest first."""
+        return await self.fetch(
+            f"SELECT {await self.select_list(columns)} FROM {self.qualified_name} "
+            "WHERE author_id = $1 AND commit_timestamp >= $2 AND commit_timestamp < $3 "
+            "ORDER BY commit_timestamp DESC",
+            await self.param("author_id", author_id),
+            await self.param("commit_timestamp", start),
+            await self.param("commit_timestamp", end),
+        )
+
+    async def existing_hashes(self, commit_hashes: List[str]) -> List[str]:
+        rows = await self.fetch(
+            f"SELECT commit_hash FROM {self.qualified_name} WHERE commit_hash = ANY($1::varchar[])",
+            list(commit_hashes),
+        )
+        return [row["commit_hash"] for row in rows]
+
+
+class PgPullRequestStore(PgTable):
+    table = "pull_requests"
+
+    async def by_authors_in_range(
+        self, author_ids: List[UUID], start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Pull requests with start <= activity_timestamp <= end, oldest first."""
+        return await self.fetch(
+            f"SELECT {await self.select_list(columns)} FROM {self.qualified_name} "
+            "WHERE author_id = ANY($1::uuid[]) AND activity_timestamp >= $2 AND activity_timestamp <= $3 "
+            "ORDER BY activity_timestamp ASC",
+            [await self.param("author_id", author_id) for author_id in author_ids],
+            await self.param("activity_timestamp", start),
+            await self.param("activity_timestamp", end),
+        )
+
+
+class PgDailyReportStore(PgTable):
+    table = "daily_reports"
+
+    async def get_by_id(self, report_id: UUID) -> Optional[Dict[str, Any]]:
+        return await self.fetch_one(
+            f"SELECT * FROM {self.qualified_name} WHERE id = $1", await self.param("id", report_id)
+        )
+
+    async def by_user(self, user_id: UUID) -> List[Dict[str, Any]]:
+        return await self.fetch(
+            f"SELECT * FROM {self.qualified_name} WHERE user_id = $1 ORDER BY report_date DESC",
+            await self.param("user_id", user_id),
+        )
+
+    async def by_user_in_range(self, user_id: UUID, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Reports with start <= report_date <= end, newest first."""
+        return await self.fetch(
+            f"SELECT * FROM {self.qualified_name} "
+            "WHERE user_id = $1 AND report_date >= $2 AND report_date <= $3 ORDER BY report_date DESC",
+            await self.param("user_id", user_id),
+            await self.param("report_date", start),
+            await self.param("report_date", end),
+        )
+
+
+class PgUserStore(PgTable):
+    table = "users"
+
+    async def get_by(self, column: str, value: Any) -> Optional[Dict[str, Any]]:
+        if column not in ("id", "email", "github_username", "slack_id"):
+            raise ValueError(f"Unsupported user lookup column: {column}")
+        return await self.fetch_one(
+            f"SELECT * FROM {self.qualified_name} WHERE {_quote_ident(column)} = $1 LIMIT 1",
+            await self.param(column, value),
+        )
+
+    async def by_role(self, role: str) -> List[Dict[str, Any]]:
+        return await self.fetch(f"SELECT * FROM {self.qualified_name} WHERE role = $1", await self.param("role", role))
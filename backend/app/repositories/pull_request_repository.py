@@ -2,19 +2,40 @@ import asyncio
 import logging
 from datetime import date, datetime, timezone
 from decimal import ROUND_HALF_UP, Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from uuid import UUID
 
 from postgrest import APIResponse as PostgrestResponse
 from postgrest.exceptions import APIError
 
+from app.config.postgres_pool import use_asyncpg_backend
 from app.config.supabase_client import get_supabase_client_safe
 from app.core.exceptions import DatabaseError
 from app.models.pull_request import PullRequest
+from app.repositories.pg_store import PgPullRequestStore
+from app.repositories.query_builder import KeysetQuery, project
 from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Columns needed for hours/impact rollups; skips descriptions, summaries and prompts
+PR_METRIC_COLUMNS = (
+    "id",
+    "pr_number",
+    "title",
+    "author_id",
+    "repository_name",
+    "status",
+    "opened_at",
+    "closed_at",
+    "merged_at",
+    "activity_timestamp",
+    "ai_estimated_hours",
+    "ai_analysis_notes",
+    "impact_score",
+    "impact_category",
+)
+
 
 class PullRequestRepository:
     """Repository wrapper for interacting with pull_requests stored in Supabase."""
@@ -22,6 +43,7 @@ class PullRequestRepository:
     def __init__(self, client: Optional[Client] = None):
         self._client = client or get_supabase_client_safe()
         self._table = "pull_requests"
+        self._pg = PgPullRequestStore() if use_asyncpg_backend() else None
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -83,13 +105,16 @@ class PullRequestRepository:
     # Public API
     # ------------------------------------------------------------------
     async def get_pull_requests_by_user_in_range(
-        self, user_id: UUID, start_date: date, end_date: date
+        self, user_id: UUID, start_date: date, end_date: date, columns: Optional[Sequence[str]] = None
     ) -> List[PullRequest]:
         bounds = self._date_bounds(start_date, end_date)
+        if self._pg:
+            records = await self._pg.by_authors_in_range([user_id], bounds["start"], bounds["end"], columns)
+            return self._materialize_pull_requests(records)
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table)
-                .select("*")
+                .select(project(columns))
                 .eq("author_id", str(user_id))
                 .gte("activity_timestamp", bounds["start"])
                 .lte("activity_timestamp", bounds["end"])
@@ -113,15 +138,21 @@ class PullRequestRepository:
             raise DatabaseError(f"Unexpected error fetching pull requests: {exc}")
 
     async def get_pull_requests_for_users_in_range(
-        self, user_ids: List[UUID], start_date: date, end_date: date
+        self, user_ids: List[UUID], start_date: date, end_date: date, columns: Optional[Sequence[str]] = None
     ) -> Dict[UUID, List[PullRequest]]:
         if not user_ids:
             return {}
         bounds = self._date_bounds(start_date, end_date)
+        if self._pg:
+            grouped_pg: Dict[UUID, List[PullRequest]] = {uid: [] for uid in user_ids}
+            records = await self._pg.by_authors_in_range(user_ids, bounds["start"], bounds["end"], columns)
+            for pull_request in self._materialize_pull_requests(records):
+                grouped_pg.setdefault(UUID(str(pull_request.author_id)), []).append(pull_request)
+            return grouped_pg
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table)
-                .select("*")
+                .select(project(columns))
                 .in_("author_id", [str(uid) for uid in user_ids])
                 .gte("activity_timestamp", bounds["start"])
                 .lte("activity_timestamp", bounds["end"])
@@ -160,6 +191,30 @@ class PullRequestRepository:
             logger.error("Unexpected error fetching pull requests for users: %s", exc, exc_info=True)
             raise DatabaseError(f"Unexpected error fetching pull requests for users: {exc}")
 
+    async def iter_pull_requests_in_range(
+        self,
+        user_ids: List[UUID],
+        start_date: date,
+        end_date: date,
+        columns: Optional[Sequence[str]] = PR_METRIC_COLUMNS,
+        batch_size: int = 500,
+    ) -> AsyncIterator[PullRequest]:
+        """Iterate over the users' pull requests in activity order, ``batch_size`` rows per request."""
+        bounds = self._date_bounds(start_date, end_date)
+        query = KeysetQuery(
+            self._client,
+            self._table,
+            columns=columns,
+            timestamp_column="activity_timestamp",
+            descending=False,
+        )
+        query.where("in_", "author_id", [str(uid) for uid in user_ids])
+        query.where("gte", "activity_timestamp", bounds["start"])
+        query.where("lte", "activity_timestamp", bounds["end"])
+        async for record in query.iterate(batch_size):
+            for pull_request in self._materialize_pull_requests([record]):
+                yield pull_request
+
     async def save_pull_request(self, pull_request: PullRequest) -> PullRequest:
         payload = pull_request.model_dump(exclude_unset=True, exclude_none=True)
         # Ensure UUIDs are strings for Supabase
@@ -0,0 +1,172 @@
+"""
+Shared query building for Supabase repositories.
+
+``KeysetQuery`` wraps a PostgREST table query with:
+- per-call column projection instead of ``select("*")``
+- keyset (cursor) pagination on ``(timestamp, id)`` instead of offset/limit,
+  so deep pages cost the same as the first one and concurrent inserts do not
+  shift rows between pages
+- async-generator iteration over large result sets, one page at a time
+
+Cursors are opaque URL-safe strings that encode the sort key of the last row
+of a page. Clients pass them back unchanged to get the next page.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from app.core.exceptions import BadRequestError, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results plus the cursor for the next page (None on the last page)."""
+
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _cursor_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(timestamp_value: Any, row_id: Any) -> str:
+    """Encode a row's sort key as an opaque cursor."""
+    payload = json.dumps([_cursor_value(timestamp_value), _cursor_value(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return timestamp_value, row_id
+    except Exception:
+        raise BadRequestError(message="Invalid pagination cursor")
+
+
+def project(columns: Optional[Sequence[str]], *required: Optional[str]) -> str:
+    """Build a select() column list, always including the columns the pagination needs."""
+    if not columns or "*" in columns:
+        return "*"
+    selected = list(columns)
+    selected.extend(column for column in required if column and column not in selected)
+    return ",".join(selected)
+
+
+def _quote(value: Any) -> str:
+    # Double quotes let PostgREST logic trees carry values with reserved characters (":", "+", ",")
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class KeysetQuery(Generic[T]):
+    """
+    Keyset-paginated query over one table.
+
+    Usage:
+        query = KeysetQuery(client, "commits", columns=("id", "commit_hash"), timestamp_column="commit_timestamp")
+        query.where("eq", "author_id", str(user_id))
+        page = await query.fetch_page(cursor=request_cursor, limit=50)
+        async for row in query.iterate(batch_size=500):
+            ...
+
+    ``timestamp_column`` may be None to paginate on the id column alone. The
+    timestamp column should be non-null: rows with a NULL sort key are never
+    returned past the first page.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        table: str,
+        columns: Optional[Sequence[str]] = None,
+        timestamp_column: Optional[str] = "created_at",
+        id_column: str = "id",
+        descending: bool = True,
+        row_factory: Optional[Callable[[Dict[str, Any]], T]] = None,
+    ):
+        self._client = client
+        self.table = table
+        self.columns = columns
+        self.timestamp_column = timestamp_column
+        self.id_column = id_column
+        self.descending = descending
+        self.row_factory = row_factory
+        self._filters: List[Tuple[str, Tuple[Any, ...]]] = []
+
+    def where(self, method: str, *args: Any) -> "KeysetQuery[T]":
+        """Add a PostgREST filter, e.g. ``where("gte", "commit_timestamp", start)``."""
+        self._filters.append((method, args))
+        return self
+
+    def _keyset_filter(self, cursor: str) -> Tuple[str, Tuple[Any, ...]]:
+        timestamp_value, row_id = decode_cursor(cursor)
+        op = "lt" if self.descending else "gt"
+        if self.timestamp_column is None:
+            return op, (self.id_column, row_id)
+        ts, pk = self.timestamp_column, self.id_column
+        condition = (
+            f"{ts}.{op}.{_quote(timestamp_value)},and({ts}.eq.{_quote(timestamp_value)},{pk}.{op}.{_quote(row_id)})"
+        )
+        return "or_", (condition,)
+
+    def _build(self, cursor: Optional[str], limit: int) -> Any:
+        builder = self._client.table(self.table).select(project(self.columns, self.timestamp_column, self.id_column))
+        filters = list(self._filters)
+        if cursor:
+            filters.append(self._keyset_filter(cursor))
+        for method, args in filters:
+            builder = getattr(builder, method)(*args)
+        if self.timestamp_column:
+            builder = builder.order(self.timestamp_column, desc=self.descending)
+        return builder.order(self.id_column, desc=self.descending).limit(limit)
+
+    def cursor_for(self, row: Dict[str, Any]) -> str:
+        """Cursor that continues after ``row``."""
+        timestamp_value = row.get(self.timestamp_column) if self.timestamp_column else None
+        return encode_cursor(timestamp_value, row.get(self.id_column))
+
+    async def fetch_page(self, cursor: Optional[str] = None, limit: int = 50) -> Page[T]:
+        """Fetch one page of up to ``limit`` rows after ``cursor``."""
+        # Ask for one extra row to learn whether another page exists without a count query
+        builder = self._build(cursor, limit + 1)
+        try:
+            response = await asyncio.to_thread(builder.execute)
+        except Exception as e:
+            logger.error(f"Keyset query on {self.table} failed: {e}", exc_info=True)
+            raise DatabaseError(f"Error querying {self.table}: {str(e)}")
+
+        rows = list(getattr(response, "data", None) or [])
+        next_cursor = self.cursor_for(rows[limit - 1]) if len(rows) > limit else None
+        rows = rows[:limit]
+        items = [self.row_factory(row) for row in rows] if self.row_factory else rows
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def iterate(self, batch_size: int = 500, cursor: Optional[str] = None) -> AsyncIterator[T]:
+        """Yield every matching row, fetching ``batch_size`` rows per round trip."""
+        while True:
+            page = await self.fetch_page(cursor=cursor, limit=batch_size)
+            for item in page.items:
+                yield item
+            if not page.has_next:
+                return
+            cursor = page.next_cursor
@@ -1,9 +1,11 @@
 import logging
+from collections import defaultdict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from app.config.supabase_client import get_supabase_client
+from postgrest.exceptions import APIError
+
 from app.core.exceptions import DatabaseError, ResourceNotFoundError
 from app.models.raci_matrix import (
     CreateRaciMatrixPayload,
@@ -14,33 +16,76 @@ from app.models.raci_matrix import (
     RaciRole,
     UpdateRaciMatrixPayload,
 )
+from app.repositories.base import AsyncSupabaseRepository
 
 logger = logging.getLogger(__name__)
 
-
-class RaciMatrixRepository:
+# Postgres function that saves a matrix and its rows in one transaction
+# (supabase/migrations/20251019_raci_matrix_save_rpc.sql)
+SAVE_MATRIX_RPC = "save_raci_matrix"
+
+
+def _activity_rows(matrix_id: Optional[str], activities: List[RaciActivity]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "matrix_id": matrix_id,
+            "activity_id": activity.id,
+            "name": activity.name,
+            "description": activity.description,
+            "order_index": activity.order,
+        }
+        for activity in activities
+    ]
+
+
+def _role_rows(matrix_id: Optional[str], roles: List[RaciRole]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "matrix_id": matrix_id,
+            "role_id": role.id,
+            "name": role.name,
+            "title": role.title,
+            "user_id": str(role.user_id) if role.user_id else None,
+            "is_person": role.is_person,
+            "order_index": role.order,
+        }
+        for role in roles
+    ]
+
+
+def _assignment_rows(matrix_id: Optional[str], assignments: List[RaciAssignment]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "matrix_id": matrix_id,
+            "activity_id": assignment.activity_id,
+            "role_id": assignment.role_id,
+            "role": assignment.role.value,
+            "notes": assignment.notes,
+        }
+        for assignment in assignments
+    ]
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def _is_missing_function(error: Exception) -> bool:
+    # PostgREST answers PGRST202 when the RPC has not been deployed yet
+    return isinstance(error, APIError) and getattr(error, "code", None) in ("PGRST202", "42883")
+
+
+class RaciMatrixRepository(AsyncSupabaseRepository):
     """Repository for RACI matrix data access operations using Supabase."""
 
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    # Cleared after the first PGRST202 so later saves go straight to the fallback
+    _save_rpc_available = True
 
     async def get_all_matrices(self) -> List[RaciMatrix]:
         """Get all active RACI matrices from database."""
         try:
-            # Get matrices
-            response = self.supabase.table("raci_matrices").select("*").eq("is_active", True).execute()
-            matrices_data = response.data
-
-            if not matrices_data:
-                return []
-
-            matrices = []
-            for matrix_data in matrices_data:
-                matrix = await self._build_complete_matrix(matrix_data)
-                if matrix:
-                    matrices.append(matrix)
-
-            return matrices
+            response = await self._execute(self._client.table("raci_matrices").select("*").eq("is_active", True))
+            return await self._build_matrices(response.data or [])
         except Exception as e:
             logger.error(f"Failed to fetch RACI matrices: {e}")
             raise DatabaseError("Failed to fetch RACI matrices")
@@ -48,14 +93,13 @@ class RaciMatrixRepository:
     async def get_matrix_by_id(self, matrix_id: UUID) -> Optional[RaciMatrix]:
         """Get a RACI matrix by ID from database."""
         try:
-            # Get matrix
-            response = self.supabase.table("raci_matrices").select("*").eq("id", str(matrix_id)).execute()
+            response = await self._execute(self._client.table("raci_matrices").select("*").eq("id", str(matrix_id)))
 
             if not response.data:
                 return None
 
-            matrix_data = response.data[0]
-            return await self._build_complete_matrix(matrix_data)
+            matrices = await self._build_matrices(response.data[:1])
+            return matrices[0] if matrices else None
 
         except Exception as e:
             logger.error(f"Failed to fetch RACI matrix {matrix_id}: {e}")
@@ -64,25 +108,13 @@ class RaciMatrixRepository:
     async def get_matrices_by_type(self, matrix_type: RaciMatrixType) -> List[RaciMatrix]:
         """Get RACI matrices by type from database."""
         try:
-            response = (
-                self.supabase.table("raci_matrices")
+            response = await self._execute(
+                self._client.table("raci_matrices")
                 .select("*")
                 .eq("matrix_type", matrix_type.value)
                 .eq("is_active", True)
-                .execute()
             )
-            matrices_data = response.data
-
-            if not matrices_data:
-                return []
-
-            matrices = []
-            for matrix_data in matrices_data:
-                matrix = await self._build_complete_matrix(matrix_data)
-                if matrix:
-                    matrices.append(matrix)
-
-            return matrices
+            return await self._build_matrices(response.data or [])
         except Exception as e:
             logger.error(f"Failed to fetch RACI matrices by type {matrix_type}: {e}")
             raise DatabaseError(f"Failed to fetch RACI matrices by type {matrix_type}")
@@ -90,7 +122,6 @@ class RaciMatrixRepository:
     async def create_matrix(self, payload: CreateRaciMatrixPayload, created_by: Optional[UUID]) -> RaciMatrix:
         """Create a new RACI matrix in database."""
         try:
-            # Create the main matrix record
             matrix_data = {
                 "name": payload.name,
                 "description": payload.description,
@@ -99,50 +130,10 @@ class RaciMatrixRepository:
                 "created_by": str(created_by) if created_by else None,
             }
 
-            response = self.supabase.table("raci_matrices").insert(matrix_data).execute()
-
-            if not response.data:
-                raise DatabaseError("Failed to create RACI matrix")
-
-            matrix_record = response.data[0]
-            matrix_id = matrix_record["id"]
-
-            # Create activities
-            for activity in payload.activities:
-                activity_data = {
-                    "matrix_id": matrix_id,
-                    "activity_id": activity.id,
-                    "name": activity.name,
-                    "description": activity.description,
-                    "order_index": activity.order,
-                }
-                self.supabase.table("raci_activities").insert(activity_data).execute()
-
-            # Create roles
-            for role in payload.roles:
-                role_data = {
-                    "matrix_id": matrix_id,
-                    "role_id": role.id,
-                    "name": role.name,
-                    "title": role.title,
-                    "user_id": str(role.user_id) if role.user_id else None,
-                    "is_person": role.is_person,
-                    "order_index": role.order,
-                }
-                self.supabase.table("raci_roles").insert(role_data).execute()
-
-            # Create assignments
-            for assignment in payload.assignments:
-                assignment_data = {
-                    "matrix_id": matrix_id,
-                    "activity_id": assignment.activity_id,
-                    "role_id": assignment.role_id,
-                    "role": assignment.role.value,
-                    "notes": assignment.notes,
-                }
-                self.supabase.table("raci_assignments").insert(assignment_data).execute()
+            matrix_id = await self._save_matrix(
+                None, matrix_data, payload.activities, payload.roles, payload.assignments
+            )
 
-            # Return the complete matrix
             created_matrix = await self.get_matrix_by_id(UUID(matrix_id))
 
             if not created_matrix:
@@ -158,12 +149,9 @@ class RaciMatrixRepository:
     async def update_matrix(self, matrix_id: UUID, payload: UpdateRaciMatrixPayload) -> Optional[RaciMatrix]:
         """Update an existing RACI matrix in database."""
         try:
-            # Check if matrix exists
-            existing = await self.get_matrix_by_id(matrix_id)
-            if not existing:
+            if not await self._matrix_exists(matrix_id):
                 return None
 
-            # Update main matrix record
             update_data = {}
             if payload.name is not None:
                 update_data["name"] = payload.name
@@ -174,60 +162,9 @@ class RaciMatrixRepository:
             if payload.is_active is not None:
                 update_data["is_active"] = payload.is_active
 
-            if update_data:
-                self.supabase.table("raci_matrices").update(update_data).eq("id", str(matrix_id)).execute()
-
-            # Update activities if provided
-            if payload.activities is not None:
-                # Delete existing activities
-                self.supabase.table("raci_activities").delete().eq("matrix_id", str(matrix_id)).execute()
-
-                # Insert new activities
-                for activity in payload.activities:
-                    activity_data = {
-                        "matrix_id": str(matrix_id),
-                        "activity_id": activity.id,
-                        "name": activity.name,
-                        "description": activity.description,
-                        "order_index": activity.order,
-                    }
-                    self.supabase.table("raci_activities").insert(activity_data).execute()
-
-            # Update roles if provided
-            if payload.roles is not None:
-                # Delete existing roles
-                self.supabase.table("raci_roles").delete().eq("matrix_id", str(matrix_id)).execute()
-
-                # Insert new roles
-                for role in payload.roles:
-                    role_data = {
-                        "matrix_id": str(matrix_id),
-                        "role_id": role.id,
-                        "name": role.name,
-                        "title": role.title,
-                        "user_id": str(role.user_id) if role.user_id else None,
-                        "is_person": role.is_person,
-                        "order_index": role.order,
-                    }
-                    self.supabase.table("raci_roles").insert(role_data).execute()
-
-            # Update assignments if provided
-            if payload.assignments is not None:
-                # Delete existing assignments
-                self.supabase.table("raci_assignments").delete().eq("matrix_id", str(matrix_id)).execute()
-
-                # Insert new assignments
-                for assignment in payload.assignments:
-                    assignment_data = {
-                        "matrix_id": str(matrix_id),
-                        "activity_id": assignment.activity_id,
-                        "role_id": assignment.role_id,
-                        "role": assignment.role.value,
-                        "notes": assignment.notes,
-                    }
-                    self.supabase.table("raci_assignments").insert(assignment_data).execute()
-
-            # Return the updated matrix
+            # Sections left as None are kept; provided sections replace the stored rows
+            await self._save_matrix(str(matrix_id), update_data, payload.activities, payload.roles, payload.assignments)
+
             updated_matrix = await self.get_matrix_by_id(matrix_id)
 
             if updated_matrix:
@@ -242,8 +179,8 @@ class RaciMatrixRepository:
     async def delete_matrix(self, matrix_id: UUID) -> bool:
         """Soft delete a RACI matrix by setting is_active to False."""
         try:
-            response = (
-                self.supabase.table("raci_matrices").update({"is_active": False}).eq("id", str(matrix_id)).execute()
+            response = await self._execute(
+                self._client.table("raci_matrices").update({"is_active": False}).eq("id", str(matrix_id))
             )
 
             if response.data:
@@ -259,31 +196,17 @@ class RaciMatrixRepository:
     async def update_assignments(self, matrix_id: UUID, assignments: List[RaciAssignment]) -> bool:
         """Update specific RACI assignments for a matrix."""
         try:
-            # Verify matrix exists
-            matrix_exists = self.supabase.table("raci_matrices").select("id").eq("id", str(matrix_id)).execute()
-            if not matrix_exists.data:
+            if not await self._matrix_exists(matrix_id):
                 raise ResourceNotFoundError(resource_name="RACI Matrix", resource_id=str(matrix_id))
 
-            # Update assignments
-            for assignment in assignments:
-                # Delete existing assignment if any
-                self.supabase.table("raci_assignments").delete().eq("matrix_id", str(matrix_id)).eq(
-                    "activity_id", assignment.activity_id
-                ).eq("role_id", assignment.role_id).execute()
-
-                # Insert new assignment
-                assignment_data = {
-                    "matrix_id": str(matrix_id),
-                    "activity_id": assignment.activity_id,
-                    "role_id": assignment.role_id,
-                    "role": assignment.role.value,
-                    "notes": assignment.notes,
-                }
-                self.supabase.table("raci_assignments").insert(assignment_data).execute()
+            # One upsert replaces each (activity, role) cell
+            await self._upsert_assignments(_assignment_rows(str(matrix_id), assignments))
 
             logger.info(f"Updated {len(assignments)} assignments for RACI matrix: {matrix_id}")
             return True
 
+        except ResourceNotFoundError:
+            raise
         except Exception as e:
             logger.error(f"Failed to update assignments for RACI matrix {matrix_id}: {e}")
             raise DatabaseError(f"Failed to update assignments for RACI matrix {matrix_id}")
@@ -299,108 +222,178 @@ class RaciMatrixRepository:
     ) -> int:
         """Bulk update assignments for multiple activity-role combinations."""
         try:
-            # Verify matrix exists
-            matrix_exists = self.supabase.table("raci_matrices").select("id").eq("id", str(matrix_id)).execute()
-            if not matrix_exists.data:
+            if not await self._matrix_exists(matrix_id):
                 raise ResourceNotFoundError(resource_name="RACI Matrix", resource_id=str(matrix_id))
 
-            updated_count = 0
-
-            # Clear existing assignments if requested
-            if clear_existing:
-                for activity_id in activity_ids:
-                    for role_id in role_ids:
-                        self.supabase.table("raci_assignments").delete().eq("matrix_id", str(matrix_id)).eq(
-                            "activity_id", activity_id
-                        ).eq("role_id", role_id).execute()
-
-            # Create new assignments
-            for activity_id in activity_ids:
-                for role_id in role_ids:
-                    # Delete existing assignment if any (in case clear_existing is False)
-                    if not clear_existing:
-                        self.supabase.table("raci_assignments").delete().eq("matrix_id", str(matrix_id)).eq(
-                            "activity_id", activity_id
-                        ).eq("role_id", role_id).execute()
-
-                    # Insert new assignment
-                    assignment_data = {
-                        "matrix_id": str(matrix_id),
-                        "activity_id": activity_id,
-                        "role_id": role_id,
-                        "role": role_type,
-                        "notes": notes,
-                    }
-                    self.supabase.table("raci_assignments").insert(assignment_data).execute()
-                    updated_count += 1
-
-            logger.info(f"Bulk updated {updated_count} assignments for RACI matrix: {matrix_id}")
-            return updated_count
+            # Every activity x role cell is overwritten whether or not clear_existing is set,
+            # so both cases are a single multi-row upsert.
+            rows = [
+                {
+                    "matrix_id": str(matrix_id),
+                    "activity_id": activity_id,
+                    "role_id": role_id,
+                    "role": role_type,
+                    "notes": notes,
+                }
+                for activity_id in activity_ids
+                for role_id in role_ids
+            ]
+            await self._upsert_assignments(rows)
+
+            logger.info(f"Bulk updated {len(rows)} assignments for RACI matrix: {matrix_id}")
+            return len(rows)
 
+        except ResourceNotFoundError:
+            raise
         except Exception as e:
             logger.error(f"Failed to bulk update assignments for RACI matrix {matrix_id}: {e}")
             raise DatabaseError(f"Failed to bulk update assignments for RACI matrix {matrix_id}")
 
-    async def _build_complete_matrix(self, matrix_data: Dict[str, Any]) -> Optional[RaciMatrix]:
-        """Build a complete RaciMatrix object with activities, roles, and assignments."""
-        try:
-            matrix_id = matrix_data["id"]
+    async def _matrix_exists(self, matrix_id: UUID) -> bool:
+        response = await self._execute(self._client.table("raci_matrices").select("id").eq("id", str(matrix_id)))
+        return bool(response.data)
 
-            # Get activities
-            activities_response = (
-                self.supabase.table("raci_activities")
-                .select("*")
-                .eq("matrix_id", matrix_id)
-                .order("order_index")
-                .execute()
+    async def _upsert_assignments(self, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            await self._execute(
+                self._client.table("raci_assignments").upsert(rows, on_conflict="matrix_id,activity_id,role_id")
             )
-            activities = []
-
-            for activity_data in activities_response.data:
-                activities.append(
-                    RaciActivity(
-                        id=activity_data["activity_id"],
-                        name=activity_data["name"],
-                        description=activity_data["description"],
-                        order=activity_data["order_index"],
-                    )
-                )
 
-            # Get roles
-            roles_response = (
-                self.supabase.table("raci_roles").select("*").eq("matrix_id", matrix_id).order("order_index").execute()
-            )
-            roles = []
-
-            for role_data in roles_response.data:
-                roles.append(
-                    RaciRole(
-                        id=role_data["role_id"],
-                        name=role_data["name"],
-                        title=role_data["title"],
-                        user_id=UUID(role_data["user_id"]) if role_data["user_id"] else None,
-                        is_person=role_data["is_person"],
-                        order=role_data["order_index"],
-                    )
+    async def _save_matrix(
+        self,
+        matrix_id: Optional[str],
+        matrix_data: Dict[str, Any],
+        activities: Optional[List[RaciActivity]],
+        roles: Optional[List[RaciRole]],
+        assignments: Optional[List[RaciAssignment]],
+    ) -> str:
+        """Insert (matrix_id None) or update a matrix and replace the provided row sections atomically."""
+        if RaciMatrixRepository._save_rpc_available:
+            params = {
+                "p_matrix_id": matrix_id,
+                "p_matrix": matrix_data,
+                "p_activities": _activity_rows(matrix_id, activities) if activities is not None else None,
+                "p_roles": _role_rows(matrix_id, roles) if roles is not None else None,
+                "p_assignments": _assignment_rows(matrix_id, assignments) if assignments is not None else None,
+            }
+            try:
+                response = await self._execute(self._client.rpc(SAVE_MATRIX_RPC, params))
+                saved_id = response.data[0] if isinstance(response.data, list) else response.data
+                return str(saved_id)
+            except Exception as e:
+                if not _is_missing_function(e):
+                    raise
+                logger.warning(f"{SAVE_MATRIX_RPC} RPC is not deployed; saving RACI matrix without a transaction")
+                RaciMatrixRepository._save_rpc_available = False
+
+        return await self._save_matrix_without_rpc(matrix_id, matrix_data, activities, roles, assignments)
+
+    async def _save_matrix_without_rpc(
+        self,
+        matrix_id: Optional[str],
+        matrix_data: Dict[str, Any],
+        activities: Optional[List[RaciActivity]],
+        roles: Optional[List[RaciRole]],
+        assignments: Optional[List[RaciAssignment]],
+    ) -> str:
+        # Same writes as the RPC, one multi-row request per table (not atomic)
+        if matrix_id is None:
+            response = await self._execute(self._client.table("raci_matrices").insert(matrix_data))
+            if not response.data:
+                raise DatabaseError("Failed to create RACI matrix")
+            matrix_id = response.data[0]["id"]
+        elif matrix_data:
+            await self._execute(self._client.table("raci_matrices").update(matrix_data).eq("id", matrix_id))
+
+        for table, section in (
+            ("raci_assignments", assignments),
+            ("raci_activities", activities),
+            ("raci_roles", roles),
+        ):
+            if section is not None:
+                await self._execute(self._client.table(table).delete().eq("matrix_id", matrix_id))
+
+        # Assignments reference activities and roles, so they are inserted last
+        for table, rows in (
+            ("raci_activities", _activity_rows(matrix_id, activities or [])),
+            ("raci_roles", _role_rows(matrix_id, roles or [])),
+            ("raci_assignments", _assignment_rows(matrix_id, assignments or [])),
+        ):
+            if rows:
+                await self._execute(self._client.table(table).insert(rows))
+
+        return matrix_id
+
+    async def _build_matrices(self, matrices_data: List[Dict[str, Any]]) -> List[RaciMatrix]:
+        """Load activities, roles and assignments for any number of matrices in three concurrent queries."""
+        if not matrices_data:
+            return []
+
+        matrix_ids = [matrix_data["id"] for matrix_data in matrices_data]
+        activities_response, roles_response, assignments_response = await self._execute_all(
+            self._client.table("raci_activities").select("*").in_("matrix_id", matrix_ids).order("order_index"),
+            self._client.table("raci_roles").select("*").in_("matrix_id", matrix_ids).order("order_index"),
+            self._client.table("raci_assignments").select("*").in_("matrix_id", matrix_ids),
+        )
+
+        children: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+        for key, response in (
+            ("activities", activities_response),
+            ("roles", roles_response),
+            ("assignments", assignments_response),
+        ):
+            for row in response.data or []:
+                children[row["matrix_id"]][key].append(row)
+
+        matrices = []
+        for matrix_data in matrices_data:
+            rows = children[matrix_data["id"]]
+            matrix = self._build_complete_matrix(matrix_data, rows["activities"], rows["roles"], rows["assignments"])
+            if matrix:
+                matrices.append(matrix)
+        return matrices
+
+    def _build_complete_matrix(
+        self,
+        matrix_data: Dict[str, Any],
+        activities_data: List[Dict[str, Any]],
+        roles_data: List[Dict[str, Any]],
+        assignments_data: List[Dict[str, Any]],
+    ) -> Optional[RaciMatrix]:
+        """Build a complete RaciMatrix object with activities, roles, and assignments."""
+        try:
+            activities = [
+                RaciActivity(
+                    id=activity_data["activity_id"],
+                    name=activity_data["name"],
+                    description=activity_data["description"],
+                    order=activity_data["order_index"],
                 )
-
-            # Get assignments
-            assignments_response = (
-                self.supabase.table("raci_assignments").select("*").eq("matrix_id", matrix_id).execute()
-            )
-            assignments = []
-
-            for assignment_data in assignments_response.data:
-                assignments.append(
-                    RaciAssignment(
-                        activity_id=assignment_data["activity_id"],
-                        role_id=assignment_data["role_id"],
-                        role=assignment_data["role"],
-                        notes=assignment_data["notes"],
-                    )
+                for activity_data in activities_data
+            ]
+
+            roles = [
+                RaciRole(
+                    id=role_data["role_id"],
+                    name=role_data["name"],
+                    title=role_data["title"],
+                    user_id=UUID(role_data["user_id"]) if role_data["user_id"] else None,
+                    is_person=role_data["is_person"],
+                    order=role_data["order_index"],
+                )
+                for role_data in roles_data
+            ]
+
+            assignments = [
+                RaciAssignment(
+                    activity_id=assignment_data["activity_id"],
+                    role_id=assignment_data["role_id"],
+                    role=assignment_data["role"],
+                    notes=assignment_data["notes"],
                 )
+                for assignment_data in assignments_data
+            ]
 
-            # Build the complete matrix
             return RaciMatrix(
                 id=UUID(matrix_data["id"]),
                 name=matrix_data["name"],
@@ -412,16 +405,8 @@ class RaciMatrixRepository:
                 metadata=matrix_data["metadata"] or {},
                 is_active=matrix_data["is_active"],
                 created_by=UUID(matrix_data["created_by"]) if matrix_data["created_by"] else None,
-                created_at=(
-                    datetime.fromisoformat(matrix_data["created_at"].replace("Z", "+00:00"))
-                    if matrix_data["created_at"]
-                    else None
-                ),
-                updated_at=(
-                    datetime.fromisoformat(matrix_data["updated_at"].replace("Z", "+00:00"))
-                    if matrix_data["updated_at"]
-                    else None
-                ),
+                created_at=_parse_timestamp(matrix_data["created_at"]),
+                updated_at=_parse_timestamp(matrix_data["updated_at"]),
             )
 
         except Exception as e:
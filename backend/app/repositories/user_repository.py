@@ -1,14 +1,18 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from uuid import UUID
 
 from postgrest import APIResponse as PostgrestResponse
 
+from app.config.postgres_pool import use_asyncpg_backend
 from app.config.supabase_client import get_supabase_client_safe
 from app.core.exceptions import DatabaseError, ResourceNotFoundError
+from app.core.singleflight import coalesce
 from app.models.user import User, UserRole
+from app.repositories.pg_store import PgUserStore
+from app.repositories.query_builder import KeysetQuery, Page, project
 from supabase import Client
 
 logger = logging.getLogger(__name__)
@@ -18,6 +22,7 @@ class UserRepository:
     def __init__(self, client: Client = None):
         self._client = client if client is not None else get_supabase_client_safe()
         self._table = "users"
+        self._pg = PgUserStore() if use_asyncpg_backend() else None
 
     def _handle_supabase_error(self, response: PostgrestResponse, context_message: str):
         """Helper to log and raise DatabaseError from Supabase errors."""
@@ -77,6 +82,9 @@ class UserRepository:
 
     async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
         """Retrieves a user by their UUID."""
+        if self._pg:
+            row = await self._pg.get_by("id", user_id)
+            return User(**row) if row else None
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table).select("*").eq("id", str(user_id)).maybe_single().execute
@@ -96,6 +104,23 @@ class UserRepository:
             logger.error(f"Unexpected error getting user by ID {user_id}: {e}", exc_info=True)
             raise DatabaseError(f"Unexpected error getting user by ID {user_id}: {str(e)}")
 
+    async def get_existing_user_ids(self, user_ids: Iterable[UUID]) -> Set[UUID]:
+        """Return which of ``user_ids`` exist, using one query for the whole set."""
+        unique_ids = {UUID(str(user_id)) for user_id in user_ids if user_id}
+        if not unique_ids:
+            return set()
+        try:
+            response: PostgrestResponse = await asyncio.to_thread(
+                self._client.table(self._table).select("id").in_("id", [str(uid) for uid in unique_ids]).execute
+            )
+            self._handle_supabase_error(response, "Error checking user existence")
+            return {UUID(row["id"]) for row in (response.data or [])}
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error checking existence of {len(unique_ids)} users: {e}", exc_info=True)
+            raise DatabaseError(f"Unexpected error checking user existence: {str(e)}")
+
     async def get_user_by_slack_id(self, slack_id: str) -> Optional[User]:
         """Retrieves a user by their Slack ID."""
         try:
@@ -118,6 +143,9 @@ class UserRepository:
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """Retrieves a user by their email address."""
+        if self._pg:
+            row = await self._pg.get_by("email", email)
+            return User(**row) if row else None
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.from_(self._table).select("*").eq("email", email).maybe_single().execute
@@ -143,7 +171,17 @@ class UserRepository:
             raise DatabaseError(f"Unexpected error getting user by email {email}: {str(e)}")
 
     async def get_user_by_github_username(self, github_username: str) -> Optional[User]:
-        """Retrieves a user by their GitHub username."""
+        """Retrieves a user by their GitHub username.
+
+        Concurrent lookups for the same username (e.g. several commits by one
+        author in a push) share a single query.
+        """
+        return await coalesce("user_by_github_username", self._fetch_user_by_github_username, github_username)
+
+    async def _fetch_user_by_github_username(self, github_username: str) -> Optional[User]:
+        if self._pg:
+            row = await self._pg.get_by("github_username", github_username)
+            return User(**row) if row else None
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table)
@@ -175,6 +213,8 @@ class UserRepository:
 
     async def list_users_by_role(self, role: UserRole) -> List[User]:
         """Lists all users with a specific role."""
+        if self._pg:
+            return [User(**row) for row in await self._pg.by_role(role.value)]
         try:
             response: PostgrestResponse = await asyncio.to_thread(
                 self._client.table(self._table).select("*").eq("role", role.value).execute
@@ -187,17 +227,19 @@ class UserRepository:
             logger.error(f"Unexpected error listing users by role {role.value}: {e}", exc_info=True)
             raise DatabaseError(f"Unexpected error listing users by role {role.value}: {str(e)}")
 
-    async def list_all_users(self, skip: int = 0, limit: int = 100) -> Tuple[List[User], int]:
+    async def list_all_users(
+        self, skip: int = 0, limit: int = 100, columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[User], int]:
         """Lists all users in the profile table with pagination."""
         try:
             count_response: PostgrestResponse = await asyncio.to_thread(
-                self._client.table(self._table).select("*", count="exact").limit(0).execute
+                self._client.table(self._table).select("id", count="exact").limit(0).execute
             )
             self._handle_supabase_error(count_response, "Error fetching total user count")
             total_count = count_response.count if count_response.count is not None else 0
 
             response: PostgrestResponse = await asyncio.to_thread(
-                self._client.table(self._table).select("*").range(skip, skip + limit - 1).execute
+                self._client.table(self._table).select(project(columns)).range(skip, skip + limit - 1).execute
             )
             self._handle_supabase_error(response, f"Error listing all users with skip={skip}, limit={limit}")
             users = [User(**item) for item in response.data] if response.data else []
@@ -208,6 +250,27 @@ class UserRepository:
             logger.error(f"Unexpected error listing all users: {e}", exc_info=True)
             raise DatabaseError(f"Unexpected error listing all users: {str(e)}")
 
+    def _user_query(self, columns: Optional[Sequence[str]]) -> KeysetQuery[User]:
+        # Users are not time-ordered data, so paginate on the primary key alone
+        return KeysetQuery(
+            self._client,
+            self._table,
+            columns=columns,
+            timestamp_column=None,
+            descending=False,
+            row_factory=User.model_validate,
+        )
+
+    async def get_users_page(
+        self, cursor: Optional[str] = None, limit: int = 100, columns: Optional[Sequence[str]] = None
+    ) -> Page[User]:
+        """One keyset page of users ordered by id."""
+        return await self._user_query(columns).fetch_page(cursor, limit)
+
+    def iter_users(self, columns: Optional[Sequence[str]] = None, batch_size: int = 500) -> AsyncIterator[User]:
+        """Iterate over every user, ``batch_size`` rows per request."""
+        return self._user_query(columns).iterate(batch_size)
+
     async def update_user(self, user_id: UUID, update_data: Dict[str, Any]) -> Optional[User]:
         """Updates a user's profile data."""
         try:
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -67,3 +67,53 @@ class CommitAnalysisWithStats(CommitAnalysis):
     average_hours_per_file: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class HoursEstimate(BaseModel):
+    """Traditional hours-based scoring as returned by the model"""
+
+    total_lines: Optional[int] = None
+    total_files: Optional[int] = None
+    initial_anchor: Optional[str] = None
+    major_change_checks: List[str] = Field(default_factory=list)
+    simplicity_reduction_checks: List[str] = Field(default_factory=list)
+    final_anchor: Optional[str] = None
+    base_hours: Optional[float] = None
+    multipliers_applied: List[str] = Field(default_factory=list)
+    complexity_score: int = Field(..., ge=1, le=10)
+    estimated_hours: float = Field(..., ge=0)
+    risk_level: str = Field(..., pattern="^(low|medium|high)$")
+    seniority_score: int = Field(..., ge=1, le=10)
+    seniority_rationale: Optional[str] = None
+    key_changes: List[str] = Field(default_factory=list)
+
+    model_config = ConfigDict(extra="allow")
+
+
+class ImpactDimension(BaseModel):
+    """One scored dimension of the Impact Points System (reasoning fields vary per dimension)"""
+
+    score: float = Field(..., ge=0, le=10)
+
+    model_config = ConfigDict(extra="allow")
+
+
+class ImpactAssessment(BaseModel):
+    """Impact Points v2.0 scoring as returned by the model"""
+
+    classification: Dict[str, Any] = Field(default_factory=dict)
+    business_value: ImpactDimension
+    technical_complexity: ImpactDimension
+    code_quality_points: ImpactDimension
+    risk_penalty: ImpactDimension
+    impact_score: Optional[float] = None
+    calculation_breakdown: Optional[str] = None
+
+    model_config = ConfigDict(extra="allow")
+
+
+class FusedCommitAnalysis(BaseModel):
+    """Hours and impact scoring produced by a single model call"""
+
+    hours: HoursEstimate
+    impact: ImpactAssessment
@@ -1,16 +1,19 @@
 """
 Archive Service for managing data lifecycle and retention policies.
-Handles soft deletion and archiving of old, irrelevant data.
+Handles soft deletion and archiving of old, irrelevant data in resumable
+primary-key batches.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from app.config.settings import settings
 from app.core.exceptions import ConfigurationError, DatabaseError
+from app.services.archive_storage import ArchiveCheckpoint, ArchiveStore
 from supabase import Client
 
 logger = logging.getLogger(__name__)
@@ -28,16 +31,28 @@ class RetentionPolicy:
 
     table_name: str
     retention_months: int
-    archive_method: str  # 'soft_delete' or 'move_to_archive'
+    archive_method: str  # 'soft_delete' or 'move_to_archive' (compressed NDJSON files under ARCHIVE_DIR)
     date_column: str = "created_at"
     additional_conditions: Optional[str] = None
+    primary_key: str = "id"
 
 
 class ArchiveService:
     """Service for managing data archiving and retention policies."""
 
-    def __init__(self, supabase: Client):
+    def __init__(
+        self,
+        supabase: Client,
+        store: Optional[ArchiveStore] = None,
+        batch_size: Optional[int] = None,
+        batch_sleep_seconds: Optional[float] = None,
+    ):
         self.supabase = supabase
+        self.store = store or ArchiveStore(settings.ARCHIVE_DIR)
+        self.batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        self.batch_sleep_seconds = (
+            settings.ARCHIVE_BATCH_SLEEP_SECONDS if batch_sleep_seconds is None else batch_sleep_seconds
+        )
 
         # Default retention policies (configurable via environment)
         self.retention_policies = {
@@ -84,6 +99,10 @@ class ArchiveService:
         """
         Archive old data based on retention policies.
 
+        Rows are processed in primary-key order, ``batch_size`` at a time, with a
+        pause between batches and a checkpoint after each one. An interrupted run
+        picks up from its checkpoint on the next call.
+
         Args:
             table_name: Optional specific table to archive. If None, archives all tables.
             dry_run: If True, only simulates the archiving process without making changes.
@@ -117,34 +136,92 @@ class ArchiveService:
 
         return results
 
+    async def _execute(self, query):
+        """Run a blocking Supabase query in a worker thread."""
+        return await asyncio.to_thread(query.execute)
+
+    @staticmethod
+    def _apply_conditions(query, policy: RetentionPolicy):
+        if policy.additional_conditions and "status = 'completed'" in policy.additional_conditions:
+            query = query.eq("status", "completed")
+        return query
+
+    async def _count_eligible(self, policy: RetentionPolicy, cutoff: str, active_only: bool) -> int:
+        query = (
+            self.supabase.table(policy.table_name)
+            .select("count", count="exact")
+            .filter(policy.date_column, "lt", cutoff)
+        )
+        if active_only:
+            query = query.is_("archived_at", "null")
+        result = await self._execute(self._apply_conditions(query, policy))
+        return result.count if result.count else 0
+
+    async def _fetch_batch(
+        self, policy: RetentionPolicy, cutoff: str, last_id: Optional[str], columns: str, active_only: bool
+    ) -> List[Dict[str, Any]]:
+        """Next ``batch_size`` eligible rows after ``last_id`` in primary-key order."""
+        query = self.supabase.table(policy.table_name).select(columns).filter(policy.date_column, "lt", cutoff)
+        if active_only:
+            query = query.is_("archived_at", "null")
+        if last_id is not None:
+            query = query.gt(policy.primary_key, last_id)
+        query = self._apply_conditions(query, policy).order(policy.primary_key).limit(self.batch_size)
+        result = await self._execute(query)
+        return result.data or []
+
+    def _start_or_resume(self, policy: RetentionPolicy, action: str, cutoff_date: datetime) -> ArchiveCheckpoint:
+        checkpoint = self.store.load_checkpoint(policy.table_name)
+        if checkpoint and not checkpoint.completed and checkpoint.action == action:
+            logger.info(
+                f"Resuming {action} of {policy.table_name} after id {checkpoint.last_id} "
+                f"({checkpoint.rows} rows in {checkpoint.batches} batches so far)"
+            )
+            return checkpoint
+        return ArchiveCheckpoint(table_name=policy.table_name, action=action, cutoff=cutoff_date.isoformat())
+
+    async def _run_batches(
+        self,
+        policy: RetentionPolicy,
+        checkpoint: ArchiveCheckpoint,
+        columns: str,
+        active_only: bool,
+        process_batch: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+    ) -> ArchiveCheckpoint:
+        """Walk eligible rows batch by batch, checkpointing after each and sleeping in between."""
+        while True:
+            rows = await self._fetch_batch(policy, checkpoint.cutoff, checkpoint.last_id, columns, active_only)
+            if not rows:
+                break
+
+            await process_batch(rows)
+
+            checkpoint.last_id = str(rows[-1][policy.primary_key])
+            checkpoint.batches += 1
+            checkpoint.rows += len(rows)
+            await asyncio.to_thread(self.store.save_checkpoint, checkpoint)
+            logger.info(f"Archived batch {checkpoint.batches} of {policy.table_name}: {checkpoint.rows} rows so far")
+
+            if len(rows) < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_sleep_seconds)
+
+        checkpoint.completed = True
+        await asyncio.to_thread(self.store.save_checkpoint, checkpoint)
+        return checkpoint
+
     async def _soft_delete_records(
         self, policy: RetentionPolicy, cutoff_date: datetime, dry_run: bool
     ) -> Dict[str, Any]:
-        """Soft delete records by setting archived_at timestamp."""
+        """Soft delete records by setting archived_at timestamp, one primary-key batch at a time."""
 
         try:
             # First, check if archived_at column exists, if not create it
             await self._ensure_archive_columns_exist(policy.table_name)
 
-            # Build the query conditions
-            query_conditions = f"{policy.date_column} < '{cutoff_date.isoformat()}' AND archived_at IS NULL"
-            if policy.additional_conditions:
-                query_conditions += f" AND {policy.additional_conditions}"
-
             if dry_run:
                 # Count records that would be archived
-                response = (
-                    self.supabase.table(policy.table_name)
-                    .select("count", count="exact")
-                    .filter(policy.date_column, "lt", cutoff_date.isoformat())
-                    .is_("archived_at", "null")
-                )
-
-                if policy.additional_conditions and "status = 'completed'" in policy.additional_conditions:
-                    response = response.eq("status", "completed")
-
-                result = response.execute()
-                count = result.count if result.count else 0
+                count = await self._count_eligible(policy, cutoff_date.isoformat(), active_only=True)
 
                 return {
                     "action": "soft_delete",
@@ -154,29 +231,31 @@ class ArchiveService:
                     "policy": policy.__dict__,
                 }
             else:
-                # Perform the soft deletion
-                update_data = {
-                    "archived_at": datetime.now().isoformat(),
-                    "archive_status": ArchiveStatus.ARCHIVED.value,
-                }
-
-                response = (
-                    self.supabase.table(policy.table_name)
-                    .update(update_data)
-                    .filter(policy.date_column, "lt", cutoff_date.isoformat())
-                    .is_("archived_at", "null")
+                checkpoint = self._start_or_resume(policy, "soft_delete", cutoff_date)
+                resumed = checkpoint.batches > 0
+                rows_before = checkpoint.rows
+
+                async def mark_archived(rows: List[Dict[str, Any]]) -> None:
+                    update_data = {
+                        "archived_at": datetime.now().isoformat(),
+                        "archive_status": ArchiveStatus.ARCHIVED.value,
+                    }
+                    ids = [row[policy.primary_key] for row in rows]
+                    await self._execute(
+                        self.supabase.table(policy.table_name).update(update_data).in_(policy.primary_key, ids)
+                    )
+
+                checkpoint = await self._run_batches(
+                    policy, checkpoint, policy.primary_key, active_only=True, process_batch=mark_archived
                 )
 
-                if policy.additional_conditions and "status = 'completed'" in policy.additional_conditions:
-                    response = response.eq("status", "completed")
-
-                result = response.execute()
-
                 return {
                     "action": "soft_delete",
                     "dry_run": False,
-                    "records_archived": len(result.data) if result.data else 0,
-                    "cutoff_date": cutoff_date.isoformat(),
+                    "records_archived": checkpoint.rows - rows_before,
+                    "batches": checkpoint.batches,
+                    "resumed": resumed,
+                    "cutoff_date": checkpoint.cutoff,
                     "policy": policy.__dict__,
                 }
 
@@ -187,41 +266,55 @@ class ArchiveService:
     async def _move_to_archive_table(
         self, policy: RetentionPolicy, cutoff_date: datetime, dry_run: bool
     ) -> Dict[str, Any]:
-        """Move records to a separate archive table."""
+        """
+        Move records out of the table into compressed NDJSON archive files.
 
-        archive_table_name = f"{policy.table_name}_archive"
+        Each batch is written to its own part file before its rows are deleted,
+        so a crash between the two steps leaves the rows in place (and possibly
+        archived twice) rather than lost.
+        """
 
-        try:
-            # Ensure archive table exists
-            await self._ensure_archive_table_exists(policy.table_name, archive_table_name)
+        archive_location = str(self.store.root / policy.table_name)
 
+        try:
             if dry_run:
                 # Count records that would be moved
-                response = (
-                    self.supabase.table(policy.table_name)
-                    .select("count", count="exact")
-                    .filter(policy.date_column, "lt", cutoff_date.isoformat())
-                )
-
-                if policy.additional_conditions and "status = 'completed'" in policy.additional_conditions:
-                    response = response.eq("status", "completed")
-
-                result = response.execute()
-                count = result.count if result.count else 0
+                count = await self._count_eligible(policy, cutoff_date.isoformat(), active_only=False)
 
                 return {
                     "action": "move_to_archive",
                     "dry_run": True,
                     "records_to_archive": count,
-                    "archive_table": archive_table_name,
+                    "archive_location": archive_location,
                     "cutoff_date": cutoff_date.isoformat(),
                     "policy": policy.__dict__,
                 }
             else:
-                # This would require more complex logic to copy and delete records
-                # For now, we'll use soft delete as the primary method
-                logger.warning(f"Move to archive table not fully implemented for {policy.table_name}")
-                return await self._soft_delete_records(policy, cutoff_date, dry_run)
+                checkpoint = self._start_or_resume(policy, "move_to_archive", cutoff_date)
+                resumed = checkpoint.batches > 0
+                rows_before = checkpoint.rows
+
+                async def move_rows(rows: List[Dict[str, Any]]) -> None:
+                    await asyncio.to_thread(
+                        self.store.write_part, policy.table_name, rows, policy.primary_key, checkpoint.cutoff
+                    )
+                    ids = [row[policy.primary_key] for row in rows]
+                    await self._execute(self.supabase.table(policy.table_name).delete().in_(policy.primary_key, ids))
+
+                checkpoint = await self._run_batches(
+                    policy, checkpoint, "*", active_only=False, process_batch=move_rows
+                )
+
+                return {
+                    "action": "move_to_archive",
+                    "dry_run": False,
+                    "records_archived": checkpoint.rows - rows_before,
+                    "batches": checkpoint.batches,
+                    "resumed": resumed,
+                    "archive_location": archive_location,
+                    "cutoff_date": checkpoint.cutoff,
+                    "policy": policy.__dict__,
+                }
 
         except Exception as e:
             logger.error(f"Error in move to archive for {policy.table_name}: {str(e)}")
@@ -247,21 +340,14 @@ class ArchiveService:
             logger.error(f"Error ensuring archive columns exist for {table_name}: {str(e)}")
             # Don't raise here as this might be a permissions issue
 
-    async def _ensure_archive_table_exists(self, original_table: str, archive_table: str):
-        """Ensure that the archive table exists with the same structure as the original."""
-
-        try:
-            # This would create an archive table with the same structure
-            # In practice, this should be handled by database migrations
-            logger.info(f"Archive table {archive_table} should be created via migration")
-
-        except Exception as e:
-            logger.error(f"Error ensuring archive table exists: {str(e)}")
-
     async def restore_archived_data(self, table_name: str, record_ids: List[str]) -> Dict[str, Any]:
         """
         Restore previously archived records.
 
+        Soft-deleted rows are reactivated in place. Rows moved to archive files
+        are streamed back from only the parts that can contain them and
+        re-inserted in batches.
+
         Args:
             table_name: Name of the table containing archived records
             record_ids: List of record IDs to restore
@@ -273,15 +359,37 @@ class ArchiveService:
         try:
             if table_name not in self.retention_policies:
                 raise ConfigurationError(f"No retention policy found for table: {table_name}")
+            policy = self.retention_policies[table_name]
 
-            update_data = {"archived_at": None, "archive_status": ArchiveStatus.ACTIVE.value}
-
-            response = self.supabase.table(table_name).update(update_data).in_("id", record_ids).execute()
+            restored = 0
+            if policy.archive_method == "move_to_archive":
+                rows = await asyncio.to_thread(
+                    lambda: list(self.store.iter_rows(table_name, record_ids, policy.primary_key))
+                )
+                for row in rows:
+                    if "archived_at" in row:
+                        row["archived_at"] = None
+                    if "archive_status" in row:
+                        row["archive_status"] = ArchiveStatus.ACTIVE.value
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start : start + self.batch_size]
+                    response = await self._execute(
+                        self.supabase.table(table_name).upsert(batch, on_conflict=policy.primary_key)
+                    )
+                    restored += len(response.data) if response.data else 0
+            else:
+                update_data = {"archived_at": None, "archive_status": ArchiveStatus.ACTIVE.value}
+                for start in range(0, len(record_ids), self.batch_size):
+                    batch_ids = record_ids[start : start + self.batch_size]
+                    response = await self._execute(
+                        self.supabase.table(table_name).update(update_data).in_(policy.primary_key, batch_ids)
+                    )
+                    restored += len(response.data) if response.data else 0
 
             return {
                 "action": "restore",
                 "table_name": table_name,
-                "records_restored": len(response.data) if response.data else 0,
+                "records_restored": restored,
                 "record_ids": record_ids,
             }
 
@@ -292,29 +400,29 @@ class ArchiveService:
     async def get_archive_statistics(self) -> Dict[str, Any]:
         """Get statistics about archived data across all tables."""
 
-        stats = {}
-
         try:
-            for policy in self.retention_policies.values():
-                # Count active records
-                active_response = (
-                    self.supabase.table(policy.table_name)
-                    .select("count", count="exact")
-                    .is_("archived_at", "null")
-                    .execute()
-                )
+            policies = list(self.retention_policies.values())
 
-                # Count archived records
-                archived_response = (
-                    self.supabase.table(policy.table_name)
-                    .select("count", count="exact")
-                    .not_.is_("archived_at", "null")
-                    .execute()
-                )
+            def count_query(policy: RetentionPolicy, archived: bool):
+                query = self.supabase.table(policy.table_name).select("count", count="exact")
+                return query.not_.is_("archived_at", "null") if archived else query.is_("archived_at", "null")
+
+            # All counts run concurrently instead of two round trips per table in sequence
+            responses = await asyncio.gather(
+                *(self._execute(count_query(policy, archived)) for policy in policies for archived in (False, True))
+            )
+            file_stats = await asyncio.gather(
+                *(asyncio.to_thread(self.store.statistics, policy.table_name) for policy in policies)
+            )
 
+            stats = {}
+            for index, policy in enumerate(policies):
+                active_response, archived_response = responses[2 * index], responses[2 * index + 1]
                 stats[policy.table_name] = {
                     "active_records": active_response.count if active_response.count else 0,
                     "archived_records": archived_response.count if archived_response.count else 0,
+                    "file_archived_records": file_stats[index]["rows"],
+                    "archive_files": file_stats[index]["parts"],
                     "retention_months": policy.retention_months,
                     "archive_method": policy.archive_method,
                 }
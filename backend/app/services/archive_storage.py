@@ -0,0 +1,159 @@
+"""
+File storage for the batched archiver.
+
+Archived rows are written as gzip-compressed NDJSON part files, one per
+batch, under ``<ARCHIVE_DIR>/<table>/``. Each table directory also holds:
+
+- ``manifest.json``: every part with its first/last primary key and row
+  count, so a restore only opens the parts whose key range can contain the
+  requested IDs.
+- ``checkpoint.json``: progress of the current run (cutoff, last primary key
+  processed, totals). A crashed or interrupted run resumes from it.
+
+Part files are written to a temporary name and renamed into place, so a
+part is either complete or absent. All functions here are blocking and are
+meant to be called through ``asyncio.to_thread``.
+"""
+
+import gzip
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PART_SUFFIX = ".ndjson.gz"
+
+
+@dataclass
+class ArchiveCheckpoint:
+    """Progress of one archiving run over a table."""
+
+    table_name: str
+    action: str
+    cutoff: str
+    last_id: Optional[str] = None
+    batches: int = 0
+    rows: int = 0
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    updated_at: Optional[str] = None
+    completed: bool = False
+
+
+@dataclass
+class ArchivePart:
+    """One compressed NDJSON file of archived rows."""
+
+    file: str
+    first_id: str
+    last_id: str
+    rows: int
+    cutoff: str
+    written_at: str
+
+
+class ArchiveStore:
+    """Part files, manifest and checkpoint for every archived table under one root directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _table_dir(self, table_name: str) -> Path:
+        path = self.root / table_name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _write_json(path: Path, data: Any) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2, default=str))
+        os.replace(tmp, path)
+
+    # Checkpoints
+
+    def load_checkpoint(self, table_name: str) -> Optional[ArchiveCheckpoint]:
+        path = self._table_dir(table_name) / "checkpoint.json"
+        if not path.exists():
+            return None
+        try:
+            return ArchiveCheckpoint(**json.loads(path.read_text()))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable archive checkpoint {path}: {e}")
+            return None
+
+    def save_checkpoint(self, checkpoint: ArchiveCheckpoint) -> None:
+        checkpoint.updated_at = datetime.now().isoformat()
+        self._write_json(self._table_dir(checkpoint.table_name) / "checkpoint.json", asdict(checkpoint))
+
+    # Parts and manifest
+
+    def load_manifest(self, table_name: str) -> List[ArchivePart]:
+        path = self._table_dir(table_name) / "manifest.json"
+        if not path.exists():
+            return []
+        return [ArchivePart(**part) for part in json.loads(path.read_text())]
+
+    def write_part(self, table_name: str, rows: List[Dict[str, Any]], primary_key: str, cutoff: str) -> ArchivePart:
+        """Write ``rows`` (ordered by primary key) to a new part file and record it in the manifest."""
+        table_dir = self._table_dir(table_name)
+        manifest = self.load_manifest(table_name)
+        # Numbered after the manifest, never after the checkpoint: a batch written but not yet
+        # checkpointed must not be overwritten when the run resumes
+        file_name = f"part-{len(manifest) + 1:06d}{PART_SUFFIX}"
+        tmp = table_dir / (file_name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(json.dumps(row, default=str, separators=(",", ":")))
+                fh.write("\n")
+        os.replace(tmp, table_dir / file_name)
+
+        part = ArchivePart(
+            file=file_name,
+            first_id=str(rows[0][primary_key]),
+            last_id=str(rows[-1][primary_key]),
+            rows=len(rows),
+            cutoff=cutoff,
+            written_at=datetime.now().isoformat(),
+        )
+        manifest.append(part)
+        self._write_json(table_dir / "manifest.json", [asdict(p) for p in manifest])
+        return part
+
+    def iter_rows(
+        self, table_name: str, record_ids: Iterable[str], primary_key: str = "id"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream archived rows whose primary key is in ``record_ids``.
+
+        Only parts whose [first_id, last_id] range covers a requested ID are
+        opened, and each part is decompressed line by line. If a row was
+        archived more than once (a batch retried after a crash), the copy from
+        the newest part wins.
+        """
+        wanted: Set[str] = {str(record_id) for record_id in record_ids}
+        found: Dict[str, Dict[str, Any]] = {}
+        table_dir = self._table_dir(table_name)
+        for part in self.load_manifest(table_name):
+            if not any(part.first_id <= record_id <= part.last_id for record_id in wanted):
+                continue
+            with gzip.open(table_dir / part.file, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    row = json.loads(line)
+                    if str(row.get(primary_key)) in wanted:
+                        found[str(row[primary_key])] = row
+        yield from found.values()
+
+    def statistics(self, table_name: str) -> Dict[str, Any]:
+        manifest = self.load_manifest(table_name)
+        table_dir = self._table_dir(table_name)
+        return {
+            "parts": len(manifest),
+            "rows": sum(part.rows for part in manifest),
+            "bytes": sum(
+                (table_dir / part.file).stat().st_size for part in manifest if (table_dir / part.file).exists()
+            ),
+        }
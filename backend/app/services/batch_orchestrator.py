@@ -0,0 +1,467 @@
+"""
+Async, resumable orchestration of OpenAI Batch API jobs.
+
+Builds on OpenAIBatchService. A named job is split into shards that respect
+the Batch API per-file limits, every shard's batch ID and every request's
+custom_id -> reference mapping (e.g. a commit SHA or a user/date pair) is
+persisted in a local SQLite file, and result files are streamed line by line
+into a caller supplied handler. Re-running a job with the same name after a
+crash reuses batches that were already created and skips result lines that
+were already handled. Requests left unanswered by a failed, expired or
+cancelled batch are requeued and submitted again.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.services.batch_service import TERMINAL_BATCH_STATUSES, OpenAIBatchService
+
+logger = logging.getLogger(__name__)
+
+# OpenAI Batch API limits per input file
+MAX_REQUESTS_PER_BATCH = 50000
+MAX_BATCH_FILE_BYTES = 200 * 1024 * 1024
+
+# (reference, request) pairs; the request carries its own custom_id
+BatchItem = Tuple[str, Dict[str, Any]]
+ResultHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class BatchShard:
+    """One uploaded batch within a job."""
+
+    job_name: str
+    shard_index: int
+    batch_id: Optional[str]
+    status: str
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    processed: bool = False
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_BATCH_STATUSES
+
+
+@dataclass
+class _ShardPayload:
+    file_bytes: bytes
+    mappings: List[Tuple[str, str]]  # (custom_id, reference)
+
+
+def shard_requests(
+    items: Iterable[BatchItem],
+    max_requests: int = MAX_REQUESTS_PER_BATCH,
+    max_bytes: int = MAX_BATCH_FILE_BYTES,
+) -> Iterator[_ShardPayload]:
+    """Serialize requests to JSONL and split them into files within the per-file limits."""
+    lines: List[bytes] = []
+    mappings: List[Tuple[str, str]] = []
+    size = 0
+    for ref, request in items:
+        line = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+        if len(line) > max_bytes:
+            raise ValueError(f"Batch request {request.get('custom_id')} exceeds the {max_bytes} byte file limit")
+        if lines and (len(lines) >= max_requests or size + len(line) > max_bytes):
+            yield _ShardPayload(b"".join(lines), mappings)
+            lines, mappings, size = [], [], 0
+        lines.append(line)
+        mappings.append((request["custom_id"], ref))
+        size += len(line)
+    if lines:
+        yield _ShardPayload(b"".join(lines), mappings)
+
+
+class BatchJobStore:
+    """SQLite persistence for batch jobs, their shards and request mappings."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS batch_jobs (
+                name TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS batch_shards (
+                job_name TEXT NOT NULL,
+                shard_index INTEGER NOT NULL,
+                batch_id TEXT,
+                status TEXT NOT NULL,
+                output_file_id TEXT,
+                error_file_id TEXT,
+                processed INTEGER NOT NULL DEFAULT 0,
+                submission_id TEXT,
+                PRIMARY KEY (job_name, shard_index)
+            );
+            CREATE TABLE IF NOT EXISTS batch_requests (
+                job_name TEXT NOT NULL,
+                custom_id TEXT NOT NULL,
+                shard_index INTEGER NOT NULL,
+                ref TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                PRIMARY KEY (job_name, custom_id)
+            );
+            """
+        )
+        shard_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(batch_shards)")}
+        if "submission_id" not in shard_columns:
+            # Stores created before submission markers were recorded
+            self._conn.execute("ALTER TABLE batch_shards ADD COLUMN submission_id TEXT")
+        self._lock = threading.Lock()
+
+    def _write(self, sql: str, params: Tuple = ()) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def _read(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def ensure_job(self, name: str) -> bool:
+        """Create the job if needed; returns True when an existing job is being resumed."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT status FROM batch_jobs WHERE name = ?", (name,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE batch_jobs SET updated_at = ? WHERE name = ?", (now, name))
+                return True
+            self._conn.execute(
+                "INSERT INTO batch_jobs (name, status, created_at, updated_at) VALUES (?, 'submitting', ?, ?)",
+                (name, now, now),
+            )
+            return False
+
+    def job_status(self, name: str) -> Optional[str]:
+        rows = self._read("SELECT status FROM batch_jobs WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def set_job_status(self, name: str, status: str) -> None:
+        self._write("UPDATE batch_jobs SET status = ?, updated_at = ? WHERE name = ?", (status, time.time(), name))
+
+    def unsubmitted_shards(self, name: str) -> List[Tuple[int, Optional[str]]]:
+        """(shard_index, submission_id) of shards whose batch ID was never recorded (e.g. crash mid-submit)."""
+        return self._read(
+            "SELECT shard_index, submission_id FROM batch_shards WHERE job_name = ? AND batch_id IS NULL", (name,)
+        )
+
+    def discard_shard(self, name: str, index: int) -> None:
+        """Drop a shard that never produced a batch so its requests are submitted again."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM batch_requests WHERE job_name = ? AND shard_index = ? AND state IN ('pending', 'requeued')",
+                (name, index),
+            )
+            self._conn.execute("DELETE FROM batch_shards WHERE job_name = ? AND shard_index = ?", (name, index))
+
+    def submitted_custom_ids(self, name: str) -> Set[str]:
+        """Requests that are in a live batch or already handled; requeued requests are not included."""
+        return {
+            row[0]
+            for row in self._read(
+                "SELECT custom_id FROM batch_requests WHERE job_name = ? AND state != 'requeued'", (name,)
+            )
+        }
+
+    def next_shard_index(self, name: str) -> int:
+        rows = self._read("SELECT COALESCE(MAX(shard_index), -1) FROM batch_shards WHERE job_name = ?", (name,))
+        return rows[0][0] + 1
+
+    def add_shard(self, name: str, index: int, mappings: List[Tuple[str, str]], submission_id: str) -> None:
+        """Record a shard, its submission marker and its request mappings before it is uploaded."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO batch_shards (job_name, shard_index, status, submission_id) VALUES (?, ?, 'uploading', ?)",
+                (name, index, submission_id),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO batch_requests (job_name, custom_id, shard_index, ref) VALUES (?, ?, ?, ?)",
+                [(name, custom_id, index, ref) for custom_id, ref in mappings],
+            )
+
+    def requeue_pending(self, name: str, index: int) -> int:
+        """Mark requests of a finished shard that got no result line for resubmission."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE batch_requests SET state = 'requeued' WHERE job_name = ? AND shard_index = ? AND state = 'pending'",
+                (name, index),
+            ).rowcount
+
+    def update_shard(self, name: str, index: int, **fields: Any) -> None:
+        columns = ", ".join(f"{column} = ?" for column in fields)
+        self._write(
+            f"UPDATE batch_shards SET {columns} WHERE job_name = ? AND shard_index = ?",
+            (*fields.values(), name, index),
+        )
+
+    def shards(self, name: str) -> List[BatchShard]:
+        rows = self._read(
+            "SELECT job_name, shard_index, batch_id, status, output_file_id, error_file_id, processed "
+            "FROM batch_shards WHERE job_name = ? ORDER BY shard_index",
+            (name,),
+        )
+        return [BatchShard(*row[:6], processed=bool(row[6])) for row in rows]
+
+    def request_ref(self, name: str, custom_id: str) -> Optional[Tuple[str, str]]:
+        """Return (reference, state) for a request."""
+        rows = self._read(
+            "SELECT ref, state FROM batch_requests WHERE job_name = ? AND custom_id = ?", (name, custom_id)
+        )
+        return (rows[0][0], rows[0][1]) if rows else None
+
+    def set_request_state(self, name: str, custom_id: str, state: str) -> None:
+        self._write(
+            "UPDATE batch_requests SET state = ? WHERE job_name = ? AND custom_id = ?", (state, name, custom_id)
+        )
+
+    def request_counts(self, name: str) -> Dict[str, int]:
+        rows = self._read("SELECT state, COUNT(*) FROM batch_requests WHERE job_name = ? GROUP BY state", (name,))
+        return {state: count for state, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class BatchOrchestrator:
+    """
+    Submit, wait for and consume OpenAI batch jobs without blocking the event loop.
+
+    Store calls run in a worker thread (``asyncio.to_thread``), as SQLite I/O blocks.
+
+    Usage:
+        orchestrator = BatchOrchestrator(OpenAIBatchService(), BatchJobStore(path))
+        summary = await orchestrator.run("nightly-2024-01-01", items, handle_result)
+    """
+
+    def __init__(
+        self,
+        service: OpenAIBatchService,
+        store: BatchJobStore,
+        poll_interval: float = 30.0,
+        completion_window: str = "24h",
+        max_requests_per_batch: int = MAX_REQUESTS_PER_BATCH,
+        max_bytes_per_batch: int = MAX_BATCH_FILE_BYTES,
+        max_resubmits: int = 1,
+    ):
+        self.service = service
+        self.store = store
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.max_requests_per_batch = max_requests_per_batch
+        self.max_bytes_per_batch = max_bytes_per_batch
+        self.max_resubmits = max_resubmits
+
+    async def _db(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def _recover_unsubmitted_shards(self, job_name: str) -> None:
+        """
+        Resolve shards recorded before a crash but without a batch ID.
+
+        The upload may have created a batch before the crash; it is found by
+        the submission marker in its metadata and adopted instead of uploading
+        the shard again. Shards without a batch are discarded and resubmitted.
+        """
+        for index, submission_id in await self._db(self.store.unsubmitted_shards, job_name):
+            batch = None
+            if submission_id:
+                batch = await self.service.find_batch({"job": job_name, "submission": submission_id})
+            if batch is not None:
+                await self._db(
+                    self.store.update_shard,
+                    job_name,
+                    index,
+                    batch_id=batch["id"],
+                    status=batch.get("status") or "validating",
+                )
+                logger.info(f"Batch job '{job_name}' shard {index}: adopted batch {batch['id']} created before restart")
+            else:
+                await self._db(self.store.discard_shard, job_name, index)
+
+    async def submit(self, job_name: str, items: Iterable[BatchItem]) -> List[BatchShard]:
+        """
+        Upload the job's requests as one or more batches.
+
+        When the job already exists, requests that were submitted before are
+        skipped, so the same call can be repeated safely after a crash.
+        """
+        resumed = await self._db(self.store.ensure_job, job_name)
+        if resumed:
+            await self._recover_unsubmitted_shards(job_name)
+            logger.info(f"Resuming batch job '{job_name}'")
+        submitted = await self._db(self.store.submitted_custom_ids, job_name)
+        pending = (item for item in items if item[1]["custom_id"] not in submitted)
+
+        index = await self._db(self.store.next_shard_index, job_name)
+        for shard in shard_requests(pending, self.max_requests_per_batch, self.max_bytes_per_batch):
+            # The marker is stored before the upload, so a restart can find a batch created before a crash
+            submission_id = uuid.uuid4().hex
+            await self._db(self.store.add_shard, job_name, index, shard.mappings, submission_id)
+            batch = await self.service.enqueue_batch_file(
+                shard.file_bytes,
+                self.completion_window,
+                {"job": job_name, "shard": str(index), "submission": submission_id},
+            )
+            await self._db(
+                self.store.update_shard,
+                job_name,
+                index,
+                batch_id=batch["id"],
+                status=batch.get("status") or "validating",
+            )
+            logger.info(
+                f"Batch job '{job_name}' shard {index}: {len(shard.mappings)} requests "
+                f"({len(shard.file_bytes)} bytes) -> {batch['id']}"
+            )
+            index += 1
+
+        await self._db(self.store.set_job_status, job_name, "submitted")
+        return await self._db(self.store.shards, job_name)
+
+    async def wait(self, job_name: str, timeout: Optional[float] = None) -> List[BatchShard]:
+        """Poll every unfinished shard until all reach a terminal state."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        while True:
+            shards = await self._db(self.store.shards, job_name)
+            open_shards = [shard for shard in shards if not shard.terminal and shard.batch_id]
+            for shard in open_shards:
+                batch = await self.service.retrieve_batch(shard.batch_id)
+                status = batch.get("status") or shard.status
+                await self._db(
+                    self.store.update_shard,
+                    job_name,
+                    shard.shard_index,
+                    status=status,
+                    output_file_id=batch.get("output_file_id"),
+                    error_file_id=batch.get("error_file_id"),
+                )
+                if status in TERMINAL_BATCH_STATUSES:
+                    logger.info(f"Batch job '{job_name}' shard {shard.shard_index} finished with status {status}")
+            shards = await self._db(self.store.shards, job_name)
+            if all(shard.terminal for shard in shards):
+                await self._db(self.store.set_job_status, job_name, "ready")
+                return shards
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(f"Batch job '{job_name}' did not complete within {timeout}s")
+            await asyncio.sleep(self.poll_interval)
+
+    async def process_results(self, job_name: str, handler: ResultHandler) -> Dict[str, int]:
+        """
+        Stream result lines of finished shards into `handler(reference, line)`.
+
+        Each request is marked done (or failed) as soon as it is handled, so a
+        restarted run only sees lines that have not been handled yet. Requests
+        of a finished shard without any result line (the batch failed, expired
+        or was cancelled) are requeued for the next ``submit``.
+        """
+        summary = {"succeeded": 0, "failed": 0, "skipped": 0, "requeued": 0}
+        for shard in await self._db(self.store.shards, job_name):
+            if shard.processed or not shard.terminal:
+                continue
+            for file_id in (shard.output_file_id, shard.error_file_id):
+                if not file_id:
+                    continue
+                async for line in self.service.iter_file_lines(file_id):
+                    await self._handle_line(job_name, line, handler, summary)
+            requeued = await self._db(self.store.requeue_pending, job_name, shard.shard_index)
+            if requeued:
+                logger.warning(
+                    f"Batch job '{job_name}' shard {shard.shard_index} ({shard.status}) left {requeued} "
+                    f"requests unanswered; requeued"
+                )
+                summary["requeued"] += requeued
+            await self._db(self.store.update_shard, job_name, shard.shard_index, processed=1)
+
+        counts = await self._db(self.store.request_counts, job_name)
+        if not counts.get("pending") and not counts.get("requeued"):
+            await self._db(self.store.set_job_status, job_name, "completed")
+        logger.info(f"Batch job '{job_name}' results processed: {summary}")
+        return summary
+
+    async def _handle_line(
+        self, job_name: str, line: Dict[str, Any], handler: ResultHandler, summary: Dict[str, int]
+    ) -> None:
+        custom_id = line.get("custom_id")
+        mapping = await self._db(self.store.request_ref, job_name, custom_id) if custom_id else None
+        if mapping is None:
+            logger.warning(f"Batch job '{job_name}' returned unknown custom_id {custom_id}")
+            summary["skipped"] += 1
+            return
+        ref, state = mapping
+        if state != "pending":
+            summary["skipped"] += 1
+            return
+
+        response = line.get("response") or {}
+        if line.get("error") or (response.get("status_code") and response["status_code"] != 200):
+            logger.error(f"Batch request {custom_id} failed: {line.get('error') or response.get('body')}")
+            await self._db(self.store.set_request_state, job_name, custom_id, "failed")
+            summary["failed"] += 1
+            return
+
+        try:
+            await handler(ref, line)
+        except Exception as e:
+            logger.error(f"Handler failed for batch request {custom_id} ({ref}): {e}", exc_info=True)
+            await self._db(self.store.set_request_state, job_name, custom_id, "failed")
+            summary["failed"] += 1
+            return
+        await self._db(self.store.set_request_state, job_name, custom_id, "done")
+        summary["succeeded"] += 1
+
+    async def run(
+        self,
+        job_name: str,
+        items: Iterable[BatchItem],
+        handler: ResultHandler,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, int]:
+        """
+        Submit (or resume) a job, wait for it and stream its results into `handler`.
+
+        Requests requeued because their batch failed, expired or was cancelled
+        are submitted again, up to ``max_resubmits`` more rounds.
+        """
+        summary = {"succeeded": 0, "failed": 0, "skipped": 0, "requeued": 0}
+        if await self._db(self.store.job_status, job_name) == "completed":
+            logger.info(f"Batch job '{job_name}' already completed; nothing to do")
+            return summary
+        items = list(items)
+        for attempt in range(self.max_resubmits + 1):
+            await self.submit(job_name, items)
+            await self.wait(job_name, timeout=timeout)
+            round_summary = await self.process_results(job_name, handler)
+            for key in ("succeeded", "failed", "skipped"):
+                summary[key] += round_summary[key]
+            # Only requests still requeued after the last round are reported
+            summary["requeued"] = round_summary["requeued"]
+            if not round_summary["requeued"]:
+                break
+            if attempt < self.max_resubmits:
+                logger.info(f"Batch job '{job_name}': resubmitting {round_summary['requeued']} requeued requests")
+        return summary
+
+
+def create_batch_orchestrator() -> BatchOrchestrator:
+    """Build an orchestrator from settings."""
+    from app.config.settings import settings
+
+    return BatchOrchestrator(
+        OpenAIBatchService(),
+        BatchJobStore(settings.OPENAI_BATCH_STATE_PATH),
+        poll_interval=settings.OPENAI_BATCH_POLL_INTERVAL,
+    )
@@ -1,33 +1,37 @@
 from __future__ import annotations
 
+import asyncio
 import io
 import json
 import logging
 import time
-from typing import Any, Dict, Iterable, List, Optional
-
-from openai import OpenAI
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 from app.config.settings import settings
+from app.integrations.llm_gateway import LLMGateway, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "cancelled", "expired"}
+
 
 class OpenAIBatchService:
     """Helper for submitting and retrieving OpenAI Batch API jobs.
 
     Usage pattern:
       1) Build requests as JSON objects using build_chat_request or build_responses_request
-      2) enqueue_batch(requests, endpoint="/v1/responses")
-      3) poll_until_complete(batch_id)
-      4) download_results(batch)
+      2) await enqueue_batch(requests)
+      3) await poll_until_complete(batch_id)
+      4) await download_results(batch)
     """
 
-    def __init__(self, api_key: Optional[str] = None) -> None:
-        api_key = api_key or settings.OPENAI_API_KEY
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY is required for batch operations")
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, gateway: Optional[LLMGateway] = None) -> None:
+        if gateway is None:
+            if not settings.OPENAI_API_KEY:
+                raise ValueError("OPENAI_API_KEY is required for batch operations")
+            gateway = get_llm_gateway()
+        # Uploads, batch calls and result downloads share the gateway's client and retry policy
+        self.gateway = gateway
 
     @staticmethod
     def build_chat_request(
@@ -82,7 +86,7 @@ class OpenAIBatchService:
             buffer.write("\n")
         return buffer.getvalue().encode("utf-8")
 
-    def enqueue_batch(
+    async def enqueue_batch(
         self,
         requests: Iterable[Dict[str, Any]],
         completion_window: str = "24h",
@@ -91,33 +95,74 @@ class OpenAIBatchService:
 
         Returns the created batch object dict.
         """
-        file_bytes = self._serialize_requests_to_bytes(requests)
-        upload = self.client.files.create(file=("requests.jsonl", io.BytesIO(file_bytes)), purpose="batch")
-        batch = self.client.batches.create(
-            input_file_id=upload.id,
-            completion_window=completion_window,
-        )
+        return await self.enqueue_batch_file(self._serialize_requests_to_bytes(requests), completion_window)
+
+    async def enqueue_batch_file(
+        self,
+        file_bytes: bytes,
+        completion_window: str = "24h",
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Upload an already serialized JSONL request file and create a batch from it."""
+        upload = await self.gateway.upload_file(file_bytes, filename="requests.jsonl", purpose="batch")
+        params: Dict[str, Any] = {"input_file_id": upload.id, "completion_window": completion_window}
+        if metadata:
+            params["metadata"] = metadata
+        batch = await self.gateway.create_batch(**params)
         logger.info(f"Enqueued OpenAI batch {batch.id} with file {upload.id}")
         return batch.to_dict() if hasattr(batch, "to_dict") else batch
 
-    def poll_until_complete(
+    async def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Fetch the current state of a batch."""
+        batch = await self.gateway.retrieve_batch(batch_id)
+        return batch.to_dict() if hasattr(batch, "to_dict") else batch
+
+    async def find_batch(self, metadata: Dict[str, str], max_batches: int = 1000) -> Optional[Dict[str, Any]]:
+        """Most recent batch whose metadata contains all of ``metadata``, searching up to ``max_batches``."""
+        after: Optional[str] = None
+        seen = 0
+        while seen < max_batches:
+            page = await self.gateway.list_batches(limit=100, **({"after": after} if after else {}))
+            batches = [batch.to_dict() if hasattr(batch, "to_dict") else batch for batch in page.data]
+            for batch in batches:
+                if all((batch.get("metadata") or {}).get(key) == value for key, value in metadata.items()):
+                    return batch
+            seen += len(batches)
+            if not batches or not page.has_next_page():
+                return None
+            after = batches[-1]["id"]
+        return None
+
+    async def poll_until_complete(
         self,
         batch_id: str,
         poll_interval_seconds: float = 5.0,
         timeout_seconds: float = 60 * 60 * 24,
     ) -> Dict[str, Any]:
         """Poll batch status until it reaches a terminal state or timeout."""
-        start = time.time()
+        start = time.monotonic()
         while True:
-            batch = self.client.batches.retrieve(batch_id)
-            status = getattr(batch, "status", None) or getattr(batch, "state", None)
-            if status in {"completed", "failed", "cancelled", "expired"}:
-                return batch.to_dict() if hasattr(batch, "to_dict") else batch
-            if time.time() - start > timeout_seconds:
+            batch = await self.retrieve_batch(batch_id)
+            if batch.get("status") in TERMINAL_BATCH_STATUSES:
+                return batch
+            if time.monotonic() - start > timeout_seconds:
                 raise TimeoutError(f"Batch {batch_id} did not complete within timeout")
-            time.sleep(poll_interval_seconds)
+            await asyncio.sleep(poll_interval_seconds)
 
-    def download_results(self, batch: Dict[str, Any] | Any) -> List[Dict[str, Any]]:
+    async def iter_file_lines(self, file_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a batch output/error file and yield one parsed JSON object per line.
+
+        The file is read incrementally, so large outputs are never held in memory at once.
+        """
+        async for line in self.gateway.iter_file_lines(file_id):
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+    async def download_results(self, batch: Dict[str, Any] | Any) -> List[Dict[str, Any]]:
         """Download and parse output file results for a completed batch."""
         if hasattr(batch, "output_file_id"):
             output_file_id = batch.output_file_id
@@ -126,14 +171,32 @@ class OpenAIBatchService:
         if not output_file_id:
             logger.warning("No output_file_id found on batch; returning empty results")
             return []
-        file_content = self.client.files.content(output_file_id)
-        # file_content can be a stream; ensure bytes
-        data_bytes = file_content.read() if hasattr(file_content, "read") else file_content
-        lines = (data_bytes.decode("utf-8")).splitlines()
-        results: List[Dict[str, Any]] = []
-        for line in lines:
-            try:
-                results.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-        return results
+        return [line async for line in self.iter_file_lines(output_file_id)]
+
+    @staticmethod
+    def extract_response_text(line: Dict[str, Any]) -> Optional[str]:
+        """Return the model output text of one result line (responses or chat completions format)."""
+        body = None
+        if isinstance(line.get("response"), dict):
+            body = line["response"].get("body")
+        if not body:
+            body = line.get("body")
+        content_text = None
+        if isinstance(body, dict):
+            content_text = body.get("output_text")
+            if not content_text and isinstance(body.get("output"), list):
+                # Responses API: output -> message items -> output_text content parts
+                for item in body["output"]:
+                    for part in item.get("content") or []:
+                        if part.get("type") == "output_text" and part.get("text"):
+                            content_text = part["text"]
+                            break
+                    if content_text:
+                        break
+            if not content_text and body.get("choices"):
+                choices = body["choices"]
+                if choices and isinstance(choices, list):
+                    content_text = choices[0].get("message", {}).get("content")
+        if not content_text and isinstance(line.get("output"), dict):
+            content_text = line["output"].get("text")
+        return content_text
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
 
 from app.config.settings import settings
+from app.core.adaptive_concurrency import get_github_concurrency_limiter
 
 # TODO: Import DailyReportService if direct interaction is needed, or pass data through other means
 from app.core.exceptions import (  # New imports for context and future use
@@ -18,9 +19,11 @@ from app.core.exceptions import (  # New imports for context and future use
     PermissionDeniedError,
     ResourceNotFoundError,
 )
+from app.core.singleflight import get_singleflight
 from app.integrations.commit_analysis import CommitAnalyzer
+from app.integrations.diff_provider import create_commit_diff_provider
 from app.integrations.github_integration import GitHubIntegration
-from app.models.commit import Commit
+from app.models.commit import ANALYSIS_VERSION, Commit, split_analysis_payload
 from app.models.daily_report import DailyReport
 from app.models.user import User
 from app.repositories.commit_repository import CommitRepository
@@ -43,6 +46,8 @@ class CommitAnalysisService:
         # Alias retained for backward compatibility with callers/tests that expect `ai_integration`
         self.ai_integration = self.commit_analyzer
         self.github_integration = GitHubIntegration()
+        # GitHub REST API by default; a local git mirror when COMMIT_DIFF_SOURCE=git_mirror
+        self.diff_provider = create_commit_diff_provider(self.github_integration)
         self.daily_report_service = DailyReportService()  # Uncommented and initialized
 
         # Simplified point calculation weights
@@ -123,10 +128,13 @@ class CommitAnalysisService:
                         f"Attempting to fetch diff from GitHub. Original repo input: '{commit_data.get('repository')}', Derived/Used repo: '{repository}', Commit SHA: '{commit_hash}'"
                     )
 
-                    # Run blocking GitHub request off the event loop
-                    diff_data = await asyncio.to_thread(
-                        self.github_integration.get_commit_diff, repository, commit_hash
-                    )
+                    # Run the blocking fetch off the event loop; GitHub requests are bounded by the adaptive limit
+                    if self.diff_provider is self.github_integration:
+                        diff_data = await get_github_concurrency_limiter().call(
+                            asyncio.to_thread, self.github_integration.get_commit_diff, repository, commit_hash
+                        )
+                    else:
+                        diff_data = await asyncio.to_thread(self.diff_provider.get_commit_diff, repository, commit_hash)
 
                     if diff_data:
                         logger.info(
@@ -433,7 +441,7 @@ class CommitAnalysisService:
                 # Continue without author mapping if it fails
 
             # 4. Prepare commit data for saving
-            # Store ALL analysis data in ai_analysis_notes as JSON for full flexibility
+            # Full analysis payload; impact fields go to typed columns, the rest to the ai_analysis JSONB column
             analysis_notes_data = {
                 # Traditional hours-based scoring
                 "estimated_hours": ai_hours,
@@ -476,7 +484,7 @@ class CommitAnalysisService:
                 # Metadata
                 "model_used": model_used,
                 "analyzed_at": analyzed_at.isoformat() if isinstance(analyzed_at, datetime) else analyzed_at,
-                "analysis_version": "2.0",  # Version tracking for future changes
+                "analysis_version": ANALYSIS_VERSION,  # Version tracking for future changes
             }
 
             commit_to_save = Commit(
@@ -494,8 +502,8 @@ class CommitAnalysisService:
                 seniority_rationale=seniority_rationale,
                 model_used=model_used,
                 analyzed_at=analyzed_at,
-                # Store ALL analysis data in ai_analysis_notes as JSON
-                ai_analysis_notes=json.dumps(analysis_notes_data),
+                # Typed impact columns plus the remaining detail as JSONB
+                **split_analysis_payload(analysis_notes_data),
                 # Populate fields from EOD/Code Quality integration
                 eod_report_id=eod_report.id if eod_report else None,
                 eod_report_summary=(
@@ -734,7 +742,24 @@ class CommitAnalysisService:
     async def process_commit(
         self, commit_data_input: Union[CommitPayload, Dict[str, Any]], scan_docs: Optional[bool] = None
     ) -> Optional[Commit]:
-        """Process a commit for analysis, potentially fetching diff data first."""
+        """Process a commit for analysis, potentially fetching diff data first.
+
+        Duplicate deliveries of the same commit that arrive while it is still
+        being processed wait for the in-flight run instead of analyzing it again.
+        """
+        if isinstance(commit_data_input, dict):
+            commit_hash = commit_data_input.get("commit_hash")
+        else:
+            commit_hash = getattr(commit_data_input, "commit_hash", None)
+        if not commit_hash:
+            return await self._process_commit(commit_data_input, scan_docs)
+        return await get_singleflight("process_commit").do(
+            commit_hash, self._process_commit, commit_data_input, scan_docs
+        )
+
+    async def _process_commit(
+        self, commit_data_input: Union[CommitPayload, Dict[str, Any]], scan_docs: Optional[bool] = None
+    ) -> Optional[Commit]:
         try:
             # Support both Dict and CommitPayload cases
             if isinstance(commit_data_input, dict):
@@ -0,0 +1,531 @@
+"""
+Deterministic pre-classifier for trivial commits.
+
+Some commits get the same score from the hours and impact rubrics every
+time:
+
+- merge commits
+- lockfile-only updates
+- version bumps
+- whitespace/formatting-only changes
+- typo fixes
+- small documentation-only changes
+
+``HeuristicCommitClassifier`` recognises these from file paths, the commit
+message and the ``ChangeAnalyzer`` view of the diff. It scores them locally
+by applying the rubric anchors (``COMMIT_HOURS_RUBRIC_V1``) directly. Results
+carry ``model_used="heuristic-vN"``, so they can be told apart from model
+output and re-scored when the rules change. Anything it is not sure about
+returns None and goes to the LLM.
+
+``replay_heuristics`` runs the classifier over commits that were already
+analyzed by the LLM and reports how often the two agree and the share of API
+calls that would have been saved (see scripts/replay_commit_heuristics.py).
+"""
+
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from pathlib import PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.change_analyzer import ChangeAnalyzer, StructuredChange
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a rule or score changes, so stored heuristic results can be told apart
+HEURISTIC_VERSION = 2
+
+# Anchor values from the hours rubric
+ANCHOR_HOURS = {"A": 0.5, "B": 2.5, "C": 6.0, "D": 12.0, "E": 20.0}
+_ANCHORS = "ABCDE"
+
+# Content rules parse the diff; larger commits always go to the LLM
+MAX_PARSED_LINES = 2000
+# Docs and formatting commits are scored from the line-based anchors up to this size
+MAX_RUBRIC_LINES = 500
+# The rubric forces anchor E from this many files on
+FILE_COUNT_OVERRIDE = 25
+MAX_TYPO_LINES = 20
+MAX_VERSION_LINES = 20
+
+LOCKFILES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "poetry.lock",
+    "pipfile.lock",
+    "uv.lock",
+    "cargo.lock",
+    "go.sum",
+    "gemfile.lock",
+    "composer.lock",
+}
+VERSION_FILES = {
+    "package.json",
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "cargo.toml",
+    "chart.yaml",
+    "version",
+    "version.txt",
+    "version.py",
+    "_version.py",
+    "__version__.py",
+    "manifest.json",
+    "pom.xml",
+}
+DOC_EXTENSIONS = {".md", ".mdx", ".rst", ".adoc"}
+DOC_NAMES = {"license", "authors", "contributors", "notice"}
+# Files where leading indentation is syntax (blocks, nesting, recipe lines)
+INDENT_EXTENSIONS = {".py", ".pyi", ".yaml", ".yml", ".mk"}
+INDENT_NAMES = {"makefile", "gnumakefile"}
+
+MERGE_MESSAGE = re.compile(r"^Merge (pull request|branch|remote-tracking branch|tag)\b")
+TYPO_MESSAGE = re.compile(r"\b(typos?|spelling|misspell\w*)\b", re.IGNORECASE)
+REFACTOR_MESSAGE = re.compile(r"\b(refactor|rename|move|cleanup)\b", re.IGNORECASE)
+# String literals (whitespace inside them is content), words, and single punctuation characters
+CODE_TOKEN = re.compile(r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`[^`\n]*`|\w+|\S)""")
+OPEN_BRACKETS = {"(", "[", "{"}
+CLOSE_BRACKETS = {")", "]", "}"}
+VERSION_LINE = re.compile(
+    r"""^\s*(["']?(version|__version__|VERSION)["']?\s*[:=]\s*["']?v?\d+(\.\d+)+\S*["']?,?"""
+    r"""|<version>[^<]+</version>|v?\d+(\.\d+)+\S*)\s*$"""
+)
+
+
+def _file_name(path: str) -> str:
+    return PurePosixPath(path).name.lower()
+
+
+def is_lockfile(path: str) -> bool:
+    return _file_name(path) in LOCKFILES
+
+
+def is_changelog(path: str) -> bool:
+    return _file_name(path).startswith(("changelog", "changes", "history", "release"))
+
+
+def is_doc_file(path: str) -> bool:
+    posix = PurePosixPath(path)
+    if posix.suffix.lower() in DOC_EXTENSIONS or posix.stem.lower() in DOC_NAMES:
+        return True
+    return bool(posix.parts) and posix.parts[0].lower() in ("docs", "doc") and posix.suffix.lower() == ".txt"
+
+
+def is_indent_sensitive(path: str) -> bool:
+    posix = PurePosixPath(path)
+    return posix.suffix.lower() in INDENT_EXTENSIONS or posix.name.lower() in INDENT_NAMES
+
+
+def code_tokens(lines: List[str], keep_indent: bool = False) -> List[str]:
+    """
+    Tokens of ``lines`` with the whitespace between them dropped.
+
+    A string literal is one token, so whitespace inside it still counts. With
+    ``keep_indent``, every line that starts outside brackets also contributes
+    its indentation, so re-wrapping inside brackets is formatting but moving
+    a statement in or out of a block is not.
+    """
+    tokens: List[str] = []
+    depth = 0
+    for line in lines:
+        if keep_indent and depth == 0 and line.strip():
+            tokens.append(f"<indent {line[: len(line) - len(line.lstrip())]!r}>")
+        for token in CODE_TOKEN.findall(line):
+            tokens.append(token)
+            if token in OPEN_BRACKETS:
+                depth += 1
+            elif token in CLOSE_BRACKETS:
+                depth = max(depth - 1, 0)
+    return tokens
+
+
+def to_git_diff(diff: str) -> str:
+    """
+    Normalise commit diff text to ``git diff`` format for ``DiffParser``.
+
+    Commit analysis receives GitHub patches laid out as ``File:`` /
+    ``Status:`` / ``Changes:`` sections (see CommitAnalysisService); those
+    headers are rewritten, already unified diffs pass through unchanged.
+    """
+    if "diff --git " in diff:
+        return diff
+    lines = []
+    for line in diff.split("\n"):
+        if line.startswith("File: "):
+            path = line[6:].strip()
+            lines.append(f"diff --git a/{path} b/{path}")
+        elif line.startswith("Status: "):
+            status = line[8:].strip()
+            if status == "added":
+                lines.append("new file mode 100644")
+            elif status == "removed":
+                lines.append("deleted file mode 100644")
+        elif line.startswith("Changes: ") or line == "(No patch data available)":
+            continue
+        else:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _changed_lines(change: StructuredChange) -> Tuple[List[str], List[str]]:
+    added = [line[1:] for line in change.diff_lines if line.startswith("+") and not line.startswith("+++")]
+    removed = [line[1:] for line in change.diff_lines if line.startswith("-") and not line.startswith("---")]
+    return added, removed
+
+
+def _round_half_hour(hours: float) -> float:
+    return max(ANCHOR_HOURS["A"], math.floor(hours * 2 + 0.5) / 2)
+
+
+def _line_anchor(total_lines: int) -> str:
+    if total_lines < 50:
+        return "A"
+    if total_lines < 200:
+        return "B"
+    if total_lines < 500:
+        return "C"
+    return "D"
+
+
+@dataclass
+class HeuristicVerdict:
+    """A commit scored by one heuristic rule, in the shape of the hours and impact model outputs."""
+
+    rule: str
+    hours: Dict[str, Any]
+    impact: Dict[str, Any]
+    model_used: str = f"heuristic-v{HEURISTIC_VERSION}"
+
+
+@dataclass
+class _Commit:
+    message: str
+    files: List[str]
+    total_lines: int
+    changes: Optional[List[StructuredChange]] = None
+    complete: bool = False  # every changed file has a parsed patch
+
+
+class HeuristicCommitClassifier:
+    """
+    Scores trivial commits locally; returns None for everything else.
+
+    Rules are tried cheapest first: path and message checks before the diff
+    is parsed, and the diff is only parsed for commits small enough that a
+    content rule could match.
+    """
+
+    def __init__(self, change_analyzer: Optional[ChangeAnalyzer] = None):
+        self.change_analyzer = change_analyzer or ChangeAnalyzer()
+        self.model_used = f"heuristic-v{HEURISTIC_VERSION}"
+
+    def classify(self, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        """Score ``commit_data`` (the CommitAnalyzer input) if a rule confidently applies."""
+        commit = self._commit(commit_data)
+        for rule in (self._merge, self._lockfiles, self._version_bump, self._formatting, self._typo, self._docs):
+            verdict = rule(commit, commit_data)
+            if verdict is not None:
+                return verdict
+        return None
+
+    def _commit(self, commit_data: Dict[str, Any]) -> _Commit:
+        files = [f for f in commit_data.get("files_changed") or [] if f]
+        total_lines = (commit_data.get("additions") or 0) + (commit_data.get("deletions") or 0)
+        return _Commit(message=(commit_data.get("message") or "").strip(), files=files, total_lines=total_lines)
+
+    def _parse(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[List[StructuredChange]]:
+        """Parsed diff, or None when the commit is too large or its patches are incomplete."""
+        if commit.changes is None:
+            diff = commit_data.get("diff") or ""
+            if not diff or commit.total_lines > MAX_PARSED_LINES or "(No patch data available)" in diff:
+                commit.changes = []
+            else:
+                commit.changes = self.change_analyzer.analyze_diff(to_git_diff(diff))
+                parsed = {change.file_path for change in commit.changes}
+                commit.complete = bool(parsed) and all(f in parsed for f in commit.files)
+                if not commit.files:
+                    commit.files = sorted(parsed)
+                if not commit.total_lines:
+                    commit.total_lines = sum(len(a) + len(r) for a, r in map(_changed_lines, commit.changes))
+        return commit.changes if commit.complete else None
+
+    # Rules
+
+    def _merge(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        if not MERGE_MESSAGE.match(commit.message) and len(commit_data.get("parents") or []) < 2:
+            return None
+        return self._verdict(
+            "merge",
+            commit,
+            rationale="Merge commit; the merged work is scored on its own commits",
+            simplicity=["Merge commit"],
+        )
+
+    def _lockfiles(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        if not commit.files or not all(is_lockfile(f) for f in commit.files):
+            return None
+        return self._verdict(
+            "lockfile_only",
+            commit,
+            rationale="Generated dependency lockfile update",
+            simplicity=["Only changes configs, constants, or data files"],
+        )
+
+    def _version_bump(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        manifests = [f for f in commit.files if _file_name(f) in VERSION_FILES]
+        if not manifests or not all(
+            _file_name(f) in VERSION_FILES or is_lockfile(f) or is_changelog(f) for f in commit.files
+        ):
+            return None
+        changes = self._parse(commit, commit_data)
+        if changes is None:
+            return None
+        version_lines = 0
+        for change in changes:
+            if _file_name(change.file_path) not in VERSION_FILES:
+                continue
+            added, removed = _changed_lines(change)
+            lines = [line for line in added + removed if line.strip()]
+            if not lines or not all(VERSION_LINE.match(line) for line in lines):
+                return None
+            version_lines += len(lines)
+        if version_lines > MAX_VERSION_LINES:
+            return None
+        return self._verdict(
+            "version_bump",
+            commit,
+            rationale="Version bump",
+            simplicity=["Only changes configs, constants, or data files"],
+        )
+
+    def _formatting(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        if commit.total_lines >= MAX_RUBRIC_LINES or len(commit.files) >= FILE_COUNT_OVERRIDE:
+            return None
+        changes = self._parse(commit, commit_data)
+        if not changes:
+            return None
+        for change in changes:
+            added, removed = _changed_lines(change)
+            if not added or not removed:
+                return None
+            keep_indent = is_indent_sensitive(change.file_path)
+            if code_tokens(added, keep_indent) != code_tokens(removed, keep_indent):
+                return None
+        simplicity = ["Message has refactor/rename/move/cleanup"] if REFACTOR_MESSAGE.search(commit.message) else []
+        return self._rubric_verdict(
+            "formatting_only",
+            commit,
+            rationale="Whitespace and formatting only",
+            simplicity=simplicity,
+            multiplier=("Formatting/refactoring only: -30%", 0.7),
+        )
+
+    def _typo(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        if not TYPO_MESSAGE.search(commit.message) or commit.total_lines > MAX_TYPO_LINES:
+            return None
+        changes = self._parse(commit, commit_data)
+        if not changes:
+            return None
+        for change in changes:
+            added, removed = _changed_lines(change)
+            if not added or len(added) != len(removed) or change.new_features:
+                return None
+            if any(SequenceMatcher(None, old, new).ratio() < 0.8 for old, new in zip(removed, added)):
+                return None
+        return self._verdict(
+            "typo_fix",
+            commit,
+            rationale="Trivial change",
+            simplicity=["Only changes configs, constants, or data files"],
+        )
+
+    def _docs(self, commit: _Commit, commit_data: Dict[str, Any]) -> Optional[HeuristicVerdict]:
+        if not commit.files or not all(is_doc_file(f) for f in commit.files):
+            return None
+        if commit.total_lines >= MAX_RUBRIC_LINES or len(commit.files) >= FILE_COUNT_OVERRIDE:
+            return None
+        return self._rubric_verdict(
+            "docs_only",
+            commit,
+            rationale="Documentation only",
+            simplicity=[">70% of changes are tests, docs, or comments"],
+            multiplier=("Documentation only: -50%", 0.5),
+            business_value=2,
+            complexity_cap="doc",
+            checklist={"documentation_updated": True},
+        )
+
+    # Scoring
+
+    def _verdict(self, rule: str, commit: _Commit, rationale: str, simplicity: List[str]) -> HeuristicVerdict:
+        """Anchor A, no multipliers: the rubric's "Minimal (0.5h) - Typos, configs, small fixes"."""
+        return self._build(rule, commit, "A", "A", [], rationale, simplicity)
+
+    def _rubric_verdict(
+        self,
+        rule: str,
+        commit: _Commit,
+        rationale: str,
+        simplicity: List[str],
+        multiplier: Tuple[str, float],
+        **impact: Any,
+    ) -> HeuristicVerdict:
+        """Line-based anchor, simplicity downgrade and a multiplier, as in the rubric's steps 1-3."""
+        initial = _line_anchor(commit.total_lines)
+        final = _ANCHORS[max(_ANCHORS.index(initial) - 1, 0)] if simplicity else initial
+        return self._build(rule, commit, initial, final, [multiplier], rationale, simplicity, **impact)
+
+    def _build(
+        self,
+        rule: str,
+        commit: _Commit,
+        initial: str,
+        final: str,
+        multipliers: List[Tuple[str, float]],
+        rationale: str,
+        simplicity: List[str],
+        business_value: int = 1,
+        complexity_cap: str = "none",
+        checklist: Optional[Dict[str, bool]] = None,
+    ) -> HeuristicVerdict:
+        base_hours = ANCHOR_HOURS[final]
+        hours = base_hours
+        for _, factor in multipliers:
+            hours *= factor
+        hours_result = {
+            "total_lines": commit.total_lines,
+            "total_files": len(commit.files),
+            "initial_anchor": initial,
+            "major_change_checks": [],
+            "major_change_count": 0,
+            "file_count_override": False,
+            "simplicity_reduction_checks": simplicity,
+            "final_anchor": final,
+            "base_hours": base_hours,
+            "multipliers_applied": [name for name, _ in multipliers],
+            "complexity_score": 1,
+            "complexity_cap_applied": complexity_cap,
+            "estimated_hours": _round_half_hour(hours),
+            "risk_level": "low",
+            "seniority_score": 10,
+            "seniority_rationale": rationale,
+            "key_changes": [commit.message.split("\n", 1)[0] or rationale],
+        }
+        checklist = checklist or {}
+        impact_result = {
+            "classification": {"primary_category": "maintenance", "is_test_heavy": False, "special_flags": [rule]},
+            "business_value": {
+                "score": business_value,
+                "decision_path": "DEVELOPERS/MAINTAINERS ONLY → Pure cleanup",
+                "evidence": rationale,
+            },
+            "technical_complexity": {"score": 1, "evidence": rationale},
+            "code_quality_points": {
+                "score": sum(1 for checked in checklist.values() if checked),
+                "checklist": checklist,
+            },
+            "risk_penalty": {"score": 0, "reasoning": "No behaviour change"},
+        }
+        return HeuristicVerdict(rule=rule, hours=hours_result, impact=impact_result, model_used=self.model_used)
+
+
+@dataclass
+class ReplayReport:
+    """Agreement between heuristic verdicts and stored model analyses."""
+
+    commits: int = 0
+    classified: int = 0
+    hours_agree: int = 0
+    impact_agree: int = 0
+    risk_agree: int = 0
+    hours_abs_error: float = 0.0
+    classify_seconds: float = 0.0
+    rules: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    disagreements: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        classified = self.classified or 1
+        return {
+            "commits": self.commits,
+            "classified": self.classified,
+            # Each classified commit skips its model call(s) entirely
+            "api_calls_saved_fraction": round(self.classified / self.commits, 4) if self.commits else 0.0,
+            "hours_agreement": round(self.hours_agree / classified, 4),
+            "impact_agreement": round(self.impact_agree / classified, 4),
+            "risk_agreement": round(self.risk_agree / classified, 4),
+            "hours_mean_abs_error": round(self.hours_abs_error / classified, 3),
+            "avg_classify_us": round(self.classify_seconds / self.commits * 1e6, 1) if self.commits else 0.0,
+            "rules": self.rules,
+            "disagreements": self.disagreements,
+        }
+
+
+def replay_heuristics(
+    samples: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+    classifier: Optional[HeuristicCommitClassifier] = None,
+    hours_tolerance: float = 0.5,
+    impact_tolerance: float = 3.0,
+    max_disagreements: int = 20,
+) -> ReplayReport:
+    """
+    Run the classifier over ``(commit_data, stored_analysis)`` pairs.
+
+    ``stored_analysis`` is the model's result for the commit, with
+    ``estimated_hours``, ``impact_score`` and ``risk_level``. Hours agree
+    within ``hours_tolerance`` (or 25% for larger estimates), impact scores
+    within ``impact_tolerance`` points.
+    """
+    classifier = classifier or HeuristicCommitClassifier()
+    report = ReplayReport()
+    for commit_data, stored in samples:
+        report.commits += 1
+        started = time.perf_counter()
+        verdict = classifier.classify(commit_data)
+        report.classify_seconds += time.perf_counter() - started
+        if verdict is None:
+            continue
+        report.classified += 1
+        rule = report.rules.setdefault(verdict.rule, {"classified": 0, "hours_agree": 0, "impact_agree": 0})
+        rule["classified"] += 1
+
+        hours = verdict.hours["estimated_hours"]
+        stored_hours = float(stored.get("estimated_hours") or 0.0)
+        error = abs(hours - stored_hours)
+        report.hours_abs_error += error
+        hours_ok = error <= max(hours_tolerance, 0.25 * stored_hours)
+
+        impact = verdict.impact
+        impact_score = (
+            impact["business_value"]["score"] * 2
+            + impact["technical_complexity"]["score"] * 1.5
+            + impact["code_quality_points"]["score"]
+            - impact["risk_penalty"]["score"]
+        )
+        stored_impact = stored.get("impact_score")
+        impact_ok = stored_impact is None or abs(impact_score - float(stored_impact)) <= impact_tolerance
+
+        report.hours_agree += hours_ok
+        report.impact_agree += impact_ok
+        report.risk_agree += stored.get("risk_level") in (None, verdict.hours["risk_level"])
+        rule["hours_agree"] += hours_ok
+        rule["impact_agree"] += impact_ok
+        if not (hours_ok and impact_ok) and len(report.disagreements) < max_disagreements:
+            report.disagreements.append(
+                {
+                    "commit_hash": commit_data.get("commit_hash"),
+                    "rule": verdict.rule,
+                    "hours": hours,
+                    "stored_hours": stored_hours,
+                    "impact_score": impact_score,
+                    "stored_impact_score": stored_impact,
+                }
+            )
+    return report
@@ -1,21 +1,71 @@
+import hashlib
+import json
 import logging
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
+from app.config.settings import settings
 from app.core.exceptions import ExternalServiceError
 from app.integrations.ai_integration_v2 import AIIntegrationV2
+from app.integrations.prompts import DAILY_WORK_PROMPT
 from app.models.commit import Commit
 from app.models.daily_commit_analysis import DailyCommitAnalysis, DailyCommitAnalysisCreate, DailyCommitAnalysisUpdate
 from app.models.daily_report import DailyReport
-from app.repositories.commit_repository import CommitRepository
+from app.repositories.commit_repository import COMMIT_SUMMARY_COLUMNS, CommitRepository
 from app.repositories.daily_commit_analysis_repository import DailyCommitAnalysisRepository
 from app.repositories.daily_report_repository import DailyReportRepository
 from app.repositories.user_repository import UserRepository
+from app.services.batch_orchestrator import create_batch_orchestrator
+from app.services.batch_service import OpenAIBatchService
 
 logger = logging.getLogger(__name__)
 
+# Summary columns plus the key changes of each commit's stored analysis, reused in the daily prompt
+DAILY_COMMIT_COLUMNS = COMMIT_SUMMARY_COLUMNS + ("key_changes",)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def commit_fingerprint(commit: Commit) -> str:
+    """Digest of what the daily analysis uses from one commit: its SHA and its stored per-commit analysis."""
+    return _digest(
+        [
+            commit.commit_hash,
+            commit.ai_estimated_hours,
+            commit.complexity_score,
+            commit.risk_level,
+            commit.impact_score,
+            commit.analysis_version,
+        ]
+    )
+
+
+def report_fingerprint(daily_report: Optional[DailyReport]) -> Optional[str]:
+    if daily_report is None:
+        return None
+    return _digest([daily_report.raw_text_input, daily_report.clarified_tasks_summary, daily_report.additional_hours])
+
+
+def daily_input_fingerprints(commits: List[Commit], daily_report: Optional[DailyReport]) -> Dict[str, Any]:
+    """
+    Fingerprints of a day's analysis inputs, stored with the result.
+
+    ``input_fingerprint`` covers every commit, the report and the prompt
+    version; an unchanged value means a new AI call would see the same input.
+    """
+    commit_fingerprints = {commit.commit_hash: commit_fingerprint(commit) for commit in commits}
+    report = report_fingerprint(daily_report)
+    return {
+        "input_fingerprint": _digest([DAILY_WORK_PROMPT.key, sorted(commit_fingerprints.items()), report]),
+        "commit_fingerprints": commit_fingerprints,
+        "report_fingerprint": report,
+        "prompt_version": DAILY_WORK_PROMPT.key,
+    }
+
 
 class DailyCommitAnalysisService:
     """Service for managing daily work analyses (commits + optional daily report)."""
@@ -35,30 +85,23 @@ class DailyCommitAnalysisService:
         - If a daily report exists for the date, include it and add explicit deduplication instruction.
         - If no commits and no report exist, create a zero-hour analysis for consistency.
         - If an analysis already exists and force_reanalysis=False, return it.
+        - When reanalyzing, the existing analysis is kept if its inputs (commits, their stored
+          analyses, the report, the prompt version) are unchanged, and a few new commits are
+          folded into it with a delta prompt instead of re-sending the whole day.
         """
         try:
             logger.info(
                 f"Starting unified daily analysis for user {user_id} on {analysis_date} (force={force_reanalysis})"
             )
 
-            # Check for existing analysis unless forcing reanalysis
-            if not force_reanalysis:
-                existing = await self.repository.get_by_user_and_date(user_id, analysis_date)
-                if existing:
-                    logger.info(f"Analysis already exists for user {user_id} on {analysis_date}: {existing.id}")
-                    return existing
+            # Return an existing analysis unless forcing reanalysis
+            existing = await self.repository.get_by_user_and_date(user_id, analysis_date)
+            if existing and not force_reanalysis:
+                logger.info(f"Analysis already exists for user {user_id} on {analysis_date}: {existing.id}")
+                return existing
 
             # Gather inputs
-            commits = await self._get_user_commits_for_date(user_id, analysis_date)
-
-            # Check if user has a daily report (in case Slack submitted earlier or later)
-            try:
-                daily_report = await self.daily_report_repo.get_daily_reports_by_user_and_date(
-                    user_id, datetime.combine(analysis_date, datetime.min.time())
-                )
-            except Exception as e:
-                logger.warning(f"Could not fetch daily report for {user_id} on {analysis_date}: {e}")
-                daily_report = None
+            commits, daily_report = await self._gather_inputs(user_id, analysis_date)
 
             # If no work found at all, create a zero-hour entry for consistency
             if not commits and not daily_report:
@@ -67,60 +110,26 @@ class DailyCommitAnalysisService:
                 )
                 return await self._create_zero_hour_analysis(user_id, analysis_date, None, "automatic")
 
+            previous = (existing.ai_analysis or {}) if existing else {}
+            fingerprints = daily_input_fingerprints(commits, daily_report)
+            if existing and previous.get("input_fingerprint") == fingerprints["input_fingerprint"]:
+                logger.info(f"Inputs unchanged for user {user_id} on {analysis_date}; keeping analysis {existing.id}")
+                return existing
+
             # Build AI context (adds deduplication instruction if report present)
             context = await self._prepare_analysis_context(commits, daily_report, user_id, analysis_date)
 
-            # Analyze via AI
-            ai_result = await self.ai_integration.analyze_daily_work(context)
-
-            # Create or update analysis record
-            # Normalize repository field name across possible commit schema variants
-            repositories = list(
-                set(
-                    (getattr(c, "repository", None) or getattr(c, "repository_name", None) or None)
-                    for c in commits
-                    if (getattr(c, "repository", None) or getattr(c, "repository_name", None))
-                )
-            )
-
-            total_added = sum((getattr(c, "additions", None) or getattr(c, "lines_added", 0) or 0) for c in commits)
-            total_deleted = sum((getattr(c, "deletions", None) or getattr(c, "lines_deleted", 0) or 0) for c in commits)
-
-            analysis_data = DailyCommitAnalysisCreate(
-                user_id=user_id,
-                analysis_date=analysis_date,
-                total_estimated_hours=Decimal(str(ai_result.get("total_estimated_hours", 0))),
-                commit_count=len(commits),
-                daily_report_id=daily_report.id if daily_report else None,
-                analysis_type="with_report" if daily_report else "automatic",
-                ai_analysis=ai_result,
-                complexity_score=ai_result.get("average_complexity_score"),
-                seniority_score=ai_result.get("average_seniority_score"),
-                repositories_analyzed=repositories,
-                total_lines_added=total_added,
-                total_lines_deleted=total_deleted,
-            )
-
-            existing = await self.repository.get_by_user_and_date(user_id, analysis_date)
-            if existing and force_reanalysis:
-                update_data = DailyCommitAnalysisUpdate(
-                    total_estimated_hours=analysis_data.total_estimated_hours,
-                    ai_analysis=analysis_data.ai_analysis,
-                    complexity_score=analysis_data.complexity_score,
-                    seniority_score=analysis_data.seniority_score,
-                    daily_report_id=analysis_data.daily_report_id,
-                )
-                analysis = await self.repository.update(existing.id, update_data)
+            # Analyze via AI: only the new commits when the rest of the day is unchanged
+            new_commits = self._delta_commits(previous, fingerprints)
+            if new_commits:
+                logger.info(f"Updating analysis {existing.id} with {len(new_commits)} new commit(s)")
+                ai_result = await self.ai_integration.analyze_daily_work_delta(previous, context, new_commits)
             else:
-                analysis = await self.repository.create(analysis_data)
+                ai_result = await self.ai_integration.analyze_daily_work(context)
 
-            # Link commits to analysis (non-blocking if unimplemented)
-            await self._link_commits_to_analysis(commits, analysis.id)
-
-            logger.info(
-                f"✓ Unified daily analysis complete: {analysis.id} with {analysis.total_estimated_hours} hours (type={analysis.analysis_type})"
+            return await self._save_analysis(
+                user_id, analysis_date, commits, daily_report, ai_result, existing=existing
             )
-            return analysis
 
         except Exception as e:
             logger.error(f"Error in unified daily analysis: {e}", exc_info=True)
@@ -147,10 +156,14 @@ class DailyCommitAnalysisService:
                 service_name="Daily Commit Analysis", original_message=f"Failed to analyze commits: {str(e)}"
             )
 
-    async def run_midnight_analysis(self) -> Dict[str, int]:
+    async def run_midnight_analysis(self, use_batch: Optional[bool] = None) -> Dict[str, int]:
         """
         Run analysis for all users who have commits but no daily report.
         This should be called by a cron job at midnight.
+
+        Args:
+            use_batch: Submit the analyses through the OpenAI Batch API instead of
+                one request per user. Defaults to settings.DAILY_ANALYSIS_USE_OPENAI_BATCH.
         """
         try:
             yesterday = date.today() - timedelta(days=1)
@@ -165,6 +178,11 @@ class DailyCommitAnalysisService:
 
             logger.info(f"Found {len(users_needing_analysis)} users needing analysis")
 
+            if use_batch is None:
+                use_batch = settings.DAILY_ANALYSIS_USE_OPENAI_BATCH
+            if use_batch:
+                return await self._run_batch_analysis(users_needing_analysis, yesterday)
+
             # Analyze each user
             analyzed = 0
             failed = 0
@@ -185,6 +203,68 @@ class DailyCommitAnalysisService:
             logger.error(f"Error in midnight analysis: {e}", exc_info=True)
             raise
 
+    async def _run_batch_analysis(self, user_ids: List[UUID], analysis_date: date) -> Dict[str, int]:
+        """Analyze a day for many users through one resumable OpenAI batch job.
+
+        The job is named after the date, so re-running after a crash resumes the
+        already submitted batches instead of paying for them again.
+        """
+        analyzed = 0
+        failed = 0
+        inputs: Dict[str, Tuple[List[Commit], Optional[DailyReport], Dict]] = {}
+        items = []
+
+        for user_id in user_ids:
+            try:
+                commits, daily_report = await self._gather_inputs(user_id, analysis_date)
+                if not commits and not daily_report:
+                    await self._create_zero_hour_analysis(user_id, analysis_date, None, "automatic")
+                    analyzed += 1
+                    continue
+                context = await self._prepare_analysis_context(commits, daily_report, user_id, analysis_date)
+                inputs[str(user_id)] = (commits, daily_report, context)
+                items.append(
+                    (
+                        str(user_id),
+                        OpenAIBatchService.build_chat_request(
+                            custom_id=f"daily-{user_id}-{analysis_date.isoformat()}",
+                            model=self.ai_integration.model,
+                            messages=self.ai_integration.build_daily_work_messages(context),
+                            response_format={"type": "json_object"},
+                            temperature=0.4,
+                        ),
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to prepare batch analysis for user {user_id}: {e}")
+                failed += 1
+
+        async def handle_result(ref: str, line: Dict) -> None:
+            user_id = UUID(ref)
+            if ref not in inputs:
+                # Submitted by an earlier (interrupted) run
+                commits, daily_report = await self._gather_inputs(user_id, analysis_date)
+                context = await self._prepare_analysis_context(commits, daily_report, user_id, analysis_date)
+                inputs[ref] = (commits, daily_report, context)
+            commits, daily_report, context = inputs[ref]
+            ai_result = self.ai_integration.parse_daily_work_response(
+                OpenAIBatchService.extract_response_text(line), context
+            )
+            if ai_result.get("error"):
+                raise ValueError(ai_result["error"])
+            await self._save_analysis(user_id, analysis_date, commits, daily_report, ai_result)
+
+        orchestrator = create_batch_orchestrator()
+        try:
+            summary = await orchestrator.run(f"daily-analysis-{analysis_date.isoformat()}", items, handle_result)
+        finally:
+            orchestrator.store.close()
+
+        analyzed += summary["succeeded"]
+        failed += summary["failed"]
+        logger.info(f"✓ Midnight batch analysis complete: {analyzed} analyzed, {failed} failed")
+        return {"analyzed": analyzed, "failed": failed}
+
     async def get_user_analysis_history(
         self, user_id: UUID, start_date: date, end_date: date
     ) -> List[DailyCommitAnalysis]:
@@ -205,18 +285,117 @@ class DailyCommitAnalysisService:
 
     # Private helper methods
 
+    @staticmethod
+    def _delta_commits(previous: Dict[str, Any], fingerprints: Dict[str, Any]) -> List[str]:
+        """
+        SHAs of the commits added since ``previous`` was analyzed, when a delta update is possible.
+
+        Empty (full analysis) unless the previous result succeeded with the same prompt and report,
+        none of its commits changed or disappeared, and at most DAILY_ANALYSIS_MAX_DELTA_COMMITS are new.
+        """
+        previous_commits = previous.get("commit_fingerprints")
+        if not previous_commits or previous.get("error"):
+            return []
+        if previous.get("prompt_version") != fingerprints["prompt_version"]:
+            return []
+        if previous.get("report_fingerprint") != fingerprints["report_fingerprint"]:
+            return []
+        current = fingerprints["commit_fingerprints"]
+        if any(current.get(sha) != digest for sha, digest in previous_commits.items()):
+            return []
+        new_commits = [sha for sha in current if sha not in previous_commits]
+        if len(new_commits) > settings.DAILY_ANALYSIS_MAX_DELTA_COMMITS:
+            return []
+        return new_commits
+
     async def _get_user_commits_for_date(self, user_id: UUID, commit_date: date) -> List[Commit]:
         """Fetch all commits for a user on a specific date"""
         try:
             # Use the existing commit repository method
             commits = await self.commit_repo.get_commits_by_user_in_range(
-                author_id=user_id, start_date=commit_date, end_date=commit_date
+                author_id=user_id, start_date=commit_date, end_date=commit_date, columns=DAILY_COMMIT_COLUMNS
             )
             return commits
         except Exception as e:
             logger.error(f"Error fetching commits: {e}", exc_info=True)
             return []
 
+    async def _gather_inputs(self, user_id: UUID, analysis_date: date) -> Tuple[List[Commit], Optional[DailyReport]]:
+        """Fetch the commits and (optional) daily report for a user's day."""
+        commits = await self._get_user_commits_for_date(user_id, analysis_date)
+
+        # Check if user has a daily report (in case Slack submitted earlier or later)
+        try:
+            daily_report = await self.daily_report_repo.get_daily_reports_by_user_and_date(
+                user_id, datetime.combine(analysis_date, datetime.min.time())
+            )
+        except Exception as e:
+            logger.warning(f"Could not fetch daily report for {user_id} on {analysis_date}: {e}")
+            daily_report = None
+        return commits, daily_report
+
+    async def _save_analysis(
+        self,
+        user_id: UUID,
+        analysis_date: date,
+        commits: List[Commit],
+        daily_report: Optional[DailyReport],
+        ai_result: Dict,
+        existing: Optional[DailyCommitAnalysis] = None,
+    ) -> DailyCommitAnalysis:
+        """Create the analysis record for an AI result, or update ``existing``."""
+        if not ai_result.get("error"):
+            # Failed results carry no fingerprint, so the next run retries them in full
+            ai_result = {**ai_result, **daily_input_fingerprints(commits, daily_report)}
+
+        # Create or update analysis record
+        # Normalize repository field name across possible commit schema variants
+        repositories = list(
+            set(
+                (getattr(c, "repository", None) or getattr(c, "repository_name", None) or None)
+                for c in commits
+                if (getattr(c, "repository", None) or getattr(c, "repository_name", None))
+            )
+        )
+
+        total_added = sum((getattr(c, "additions", None) or getattr(c, "lines_added", 0) or 0) for c in commits)
+        total_deleted = sum((getattr(c, "deletions", None) or getattr(c, "lines_deleted", 0) or 0) for c in commits)
+
+        analysis_data = DailyCommitAnalysisCreate(
+            user_id=user_id,
+            analysis_date=analysis_date,
+            total_estimated_hours=Decimal(str(ai_result.get("total_estimated_hours", 0))),
+            commit_count=len(commits),
+            daily_report_id=daily_report.id if daily_report else None,
+            analysis_type="with_report" if daily_report else "automatic",
+            ai_analysis=ai_result,
+            complexity_score=ai_result.get("average_complexity_score"),
+            seniority_score=ai_result.get("average_seniority_score"),
+            repositories_analyzed=repositories,
+            total_lines_added=total_added,
+            total_lines_deleted=total_deleted,
+        )
+
+        if existing:
+            update_data = DailyCommitAnalysisUpdate(
+                total_estimated_hours=analysis_data.total_estimated_hours,
+                ai_analysis=analysis_data.ai_analysis,
+                complexity_score=analysis_data.complexity_score,
+                seniority_score=analysis_data.seniority_score,
+                daily_report_id=analysis_data.daily_report_id,
+            )
+            analysis = await self.repository.update(existing.id, update_data)
+        else:
+            analysis = await self.repository.create(analysis_data)
+
+        # Link commits to analysis (non-blocking if unimplemented)
+        await self._link_commits_to_analysis(commits, analysis.id)
+
+        logger.info(
+            f"✓ Unified daily analysis complete: {analysis.id} with {analysis.total_estimated_hours} hours (type={analysis.analysis_type})"
+        )
+        return analysis
+
     async def _prepare_analysis_context(
         self, commits: List[Commit], daily_report: Optional[DailyReport], user_id: UUID, analysis_date: date
     ) -> Dict:
@@ -242,6 +421,8 @@ class DailyCommitAnalysisService:
                     "additions": additions,
                     "deletions": deletions,
                     "ai_estimated_hours": float(commit.ai_estimated_hours) if commit.ai_estimated_hours else None,
+                    # Stored per-commit analysis, summarised in the prompt instead of re-deriving it
+                    "analysis": self._commit_analysis_summary(commit),
                 }
             )
 
@@ -285,6 +466,17 @@ class DailyCommitAnalysisService:
 
         return context
 
+    @staticmethod
+    def _commit_analysis_summary(commit: Commit) -> Dict[str, Any]:
+        summary = {
+            "complexity": commit.complexity_score,
+            "risk": commit.risk_level,
+            "impact": commit.impact_score,
+            "category": commit.impact_category,
+            "key_changes": commit.key_changes,
+        }
+        return {key: value for key, value in summary.items() if value not in (None, [], "")}
+
     async def _create_zero_hour_analysis(
         self, user_id: UUID, analysis_date: date, daily_report_id: Optional[UUID], analysis_type: str
     ) -> DailyCommitAnalysis:
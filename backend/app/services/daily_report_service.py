@@ -13,6 +13,7 @@ from app.integrations.ai_integration_v2 import AIIntegrationV2
 from app.models.daily_report import AiAnalysis, DailyReport, DailyReportCreate, DailyReportUpdate
 from app.repositories.commit_repository import CommitRepository
 from app.repositories.daily_report_repository import DailyReportRepository
+from app.repositories.query_builder import Page
 from app.services.deduplication_service import DeduplicationService
 
 # from app.services.user_service import UserService # Assuming a user service exists to validate user_id
@@ -87,8 +88,28 @@ class DailyReportService:
         # TODO: Add pagination
         return await self.report_repository.get_daily_reports_by_user_id(user_id)
 
-    async def get_reports_for_user_paginated(self, user_id: UUID, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
-        """Get paginated daily reports for a specific user."""
+    def _keyset_page_response(self, page: Page[DailyReport], page_size: int) -> Dict[str, Any]:
+        return {
+            "items": page.items,
+            "page_size": page_size,
+            "has_next": page.has_next,
+            "next_cursor": page.next_cursor,
+        }
+
+    async def get_reports_for_user_paginated(
+        self, user_id: UUID, page: int = 1, page_size: int = 10, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get paginated daily reports for a specific user.
+
+        With ``cursor`` the page is read by keyset pagination (no count or offset scan);
+        offset pages also return a ``next_cursor`` so clients can switch over.
+        """
+        if cursor:
+            keyset_page = await self.report_repository.get_daily_reports_page(
+                user_id=user_id, cursor=cursor, limit=page_size
+            )
+            return self._keyset_page_response(keyset_page, page_size)
+
         offset = (page - 1) * page_size
 
         # Get total count
@@ -112,6 +133,7 @@ class DailyReportService:
             "total_pages": total_pages,
             "has_next": has_next,
             "has_previous": has_previous,
+            "next_cursor": self.report_repository.cursor_after(reports[-1]) if has_next and reports else None,
         }
 
     async def get_user_report_for_date(
@@ -145,8 +167,14 @@ class DailyReportService:
         # TODO: Add pagination for admin view
         return await self.report_repository.get_all_daily_reports()
 
-    async def get_all_reports_paginated(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+    async def get_all_reports_paginated(
+        self, page: int = 1, page_size: int = 10, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get all daily reports with pagination. For admin use."""
+        if cursor:
+            keyset_page = await self.report_repository.get_daily_reports_page(cursor=cursor, limit=page_size)
+            return self._keyset_page_response(keyset_page, page_size)
+
         offset = (page - 1) * page_size
 
         # Get total count
@@ -168,6 +196,7 @@ class DailyReportService:
             "total_pages": total_pages,
             "has_next": has_next,
             "has_previous": has_previous,
+            "next_cursor": self.report_repository.cursor_after(reports[-1]) if has_next and reports else None,
         }
 
     async def process_report_with_ai(self, report: DailyReport) -> DailyReport:
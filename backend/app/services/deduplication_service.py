@@ -194,7 +194,9 @@ class DeduplicationService:
             files_changed = getattr(commit, "files_changed", None) or getattr(commit, "changed_files", None) or []
             ts = getattr(commit, "commit_timestamp", None) or getattr(commit, "commit_date", None)
             repository = getattr(commit, "repository", None) or getattr(commit, "repository_name", None)
-            ai_analysis_payload = getattr(commit, "ai_analysis_notes", None)
+            ai_analysis_payload = (
+                commit.analysis_details() if isinstance(commit, Commit) else getattr(commit, "ai_analysis_notes", None)
+            )
             items.append(
                 WorkItem(
                     source="commit",
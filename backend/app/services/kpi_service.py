@@ -7,10 +7,11 @@ from uuid import UUID
 from pydantic import BaseModel, Field
 
 from app.core.exceptions import ResourceNotFoundError
+from app.core.singleflight import coalesce
 from app.models.pull_request import PullRequest
 from app.models.user import User, UserRole
 from app.repositories.daily_report_repository import DailyReportRepository
-from app.repositories.pull_request_repository import PullRequestRepository
+from app.repositories.pull_request_repository import PR_METRIC_COLUMNS, PullRequestRepository
 from app.repositories.user_repository import UserRepository
 
 logger = logging.getLogger(__name__)
@@ -125,7 +126,7 @@ class KpiService:
             baseline_start = (baseline_end - timedelta(days=self.baseline_window_days)).date()
             baseline_end_date = baseline_end.date()
             prs = await self.pull_request_repo.get_pull_requests_by_user_in_range(
-                user_id, baseline_start, baseline_end_date
+                user_id, baseline_start, baseline_end_date, columns=PR_METRIC_COLUMNS
             )
         except Exception as exc:  # pragma: no cover - defensive guard
             logger.warning("Failed to load baseline PRs for user %s: %s", user_id, exc, exc_info=True)
@@ -276,6 +277,10 @@ class KpiService:
     # Public API used by routes
     # ------------------------------------------------------------------
     async def get_user_performance_summary(self, user_id: UUID, period_days: int = 7) -> Dict[str, Any]:
+        # Dashboards loading the same summary at once share a single computation
+        return await coalesce("kpi_user_summary", self._get_user_performance_summary, user_id, period_days)
+
+    async def _get_user_performance_summary(self, user_id: UUID, period_days: int) -> Dict[str, Any]:
         user = await self.user_repo.get_user_by_id(user_id)
         if not user:
             logger.warning("User %s not found when building KPI summary", user_id)
@@ -289,6 +294,13 @@ class KpiService:
 
     async def get_user_performance_summary_range(
         self, user_id: UUID, start_dt: datetime, end_dt: datetime
+    ) -> Dict[str, Any]:
+        return await coalesce(
+            "kpi_user_summary_range", self._get_user_performance_summary_range, user_id, start_dt, end_dt
+        )
+
+    async def _get_user_performance_summary_range(
+        self, user_id: UUID, start_dt: datetime, end_dt: datetime
     ) -> Dict[str, Any]:
         user = await self.user_repo.get_user_by_id(user_id)
         if not user:
@@ -391,6 +403,11 @@ class KpiService:
 
     async def get_bulk_widget_summaries(
         self, start_date_dt: datetime, end_date_dt: datetime
+    ) -> List[UserWidgetSummary]:
+        return await coalesce("kpi_widget_summaries", self._get_bulk_widget_summaries, start_date_dt, end_date_dt)
+
+    async def _get_bulk_widget_summaries(
+        self, start_date_dt: datetime, end_date_dt: datetime
     ) -> List[UserWidgetSummary]:
         try:
             relevant_users: List[User] = await self.user_repo.list_users_by_role(UserRole.EMPLOYEE)
@@ -403,7 +420,7 @@ class KpiService:
 
         user_ids = [user.id for user in relevant_users]
         pr_map = await self.pull_request_repo.get_pull_requests_for_users_in_range(
-            user_ids, start_date_dt.date(), end_date_dt.date()
+            user_ids, start_date_dt.date(), end_date_dt.date(), columns=PR_METRIC_COLUMNS
         )
 
         summaries: List[UserWidgetSummary] = []
@@ -48,19 +48,19 @@ class RaciService:
         """Create a new RACI matrix with validation."""
         warnings = []
 
-        # Validate that the creator exists
-        creator = await self.user_repo.get_user_by_id(created_by)
-        if not creator:
+        # Check the creator and every linked user in one query
+        existing_user_ids = await self.user_repo.get_existing_user_ids(
+            [created_by, *(role.user_id for role in payload.roles)]
+        )
+        if created_by not in existing_user_ids:
             raise ResourceNotFoundError(resource_name="Creator User", resource_id=str(created_by))
 
         # Validate role assignments against real users if user_id is specified
         for role in payload.roles:
-            if role.user_id:
-                user = await self.user_repo.get_user_by_id(role.user_id)
-                if not user:
-                    warn_msg = f"User ID {role.user_id} for role '{role.name}' not found. Role will be created but not linked to a user."
-                    logger.warning(warn_msg)
-                    warnings.append(warn_msg)
+            if role.user_id and role.user_id not in existing_user_ids:
+                warn_msg = f"User ID {role.user_id} for role '{role.name}' not found. Role will be created but not linked to a user."
+                logger.warning(warn_msg)
+                warnings.append(warn_msg)
 
         # Validate that all assignments reference valid activities and roles
         activity_ids = {activity.id for activity in payload.activities}
@@ -104,13 +104,12 @@ class RaciService:
 
         # Validate role assignments against real users if user_id is specified
         if payload.roles:
+            existing_user_ids = await self.user_repo.get_existing_user_ids(role.user_id for role in payload.roles)
             for role in payload.roles:
-                if role.user_id:
-                    user = await self.user_repo.get_user_by_id(role.user_id)
-                    if not user:
-                        warn_msg = f"User ID {role.user_id} for role '{role.name}' not found. Role will be updated but not linked to a user."
-                        logger.warning(warn_msg)
-                        warnings.append(warn_msg)
+                if role.user_id and role.user_id not in existing_user_ids:
+                    warn_msg = f"User ID {role.user_id} for role '{role.name}' not found. Role will be updated but not linked to a user."
+                    logger.warning(warn_msg)
+                    warnings.append(warn_msg)
 
         # Validate assignments if provided
         if payload.assignments and payload.activities and payload.roles:
@@ -189,11 +188,10 @@ class RaciService:
                 errors.append(f"Activity '{activity.name}' has no Accountable (A) assignment")
 
         # Check for user references that don't exist
+        existing_user_ids = await self.user_repo.get_existing_user_ids(role.user_id for role in matrix.roles)
         for role in matrix.roles:
-            if role.user_id:
-                user = await self.user_repo.get_user_by_id(role.user_id)
-                if not user:
-                    errors.append(f"Role '{role.name}' references non-existent user ID: {role.user_id}")
+            if role.user_id and role.user_id not in existing_user_ids:
+                errors.append(f"Role '{role.name}' references non-existent user ID: {role.user_id}")
 
         return len(errors) == 0, errors
 
@@ -1,17 +1,38 @@
 import asyncio
 import logging
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Sequence
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 import requests
 
 from app.config.settings import settings
 from app.core.exceptions import ConfigurationError
+from app.core.swr_cache import StaleWhileRevalidateCache
 from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Assembled dashboard payloads, keyed per ISO week and shared by every service instance in this process
+_dashboard_cache: Optional[StaleWhileRevalidateCache] = None
+
+
+def get_dashboard_cache() -> StaleWhileRevalidateCache:
+    """Get (or lazily create) the dashboard cache."""
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        _dashboard_cache = StaleWhileRevalidateCache(
+            "zapier_dashboard",
+            fresh_ttl=settings.ZAPIER_CACHE_FRESH_SECONDS,
+            stale_ttl=settings.ZAPIER_CACHE_STALE_SECONDS,
+        )
+    return _dashboard_cache
+
+
+def invalidate_dashboard_cache() -> int:
+    """Drop cached weekly data and overviews so the next request reads Supabase again."""
+    return get_dashboard_cache().invalidate()
+
 
 @dataclass
 class ZapierWeeklyData:
@@ -55,6 +76,7 @@ class ZapierIntegrationService:
             "weekly_analytics": getattr(settings, "ZAPIER_WEEKLY_ANALYTICS_URL", None),
             "objectives": getattr(settings, "ZAPIER_OBJECTIVES_URL", None),
         }
+        self._query_semaphore = asyncio.Semaphore(settings.ZAPIER_QUERY_CONCURRENCY)
 
     async def _run_supabase(self, fn):
         """Run blocking Supabase calls in a thread to keep async endpoints responsive."""
@@ -105,116 +127,131 @@ class ZapierIntegrationService:
                     return float(metric_value[key])
         return None
 
+    async def _run_queries(self, queries: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """
+        Run independent Supabase queries concurrently, at most ZAPIER_QUERY_CONCURRENCY at a time.
+
+        Returns the responses keyed like ``queries``. The first failing query raises.
+        """
+
+        async def run(fn):
+            async with self._query_semaphore:
+                return await self._run_supabase(fn)
+
+        responses = await asyncio.gather(*(run(fn) for fn in queries.values()))
+        return dict(zip(queries.keys(), responses))
+
     async def get_dashboard_overview(self) -> Dict[str, Any]:
         """Builds dashboard overview data from Supabase tables with sensible fallbacks."""
         try:
-            now = datetime.now(timezone.utc)
+            year, week, _ = datetime.now(timezone.utc).isocalendar()
+            return await get_dashboard_cache().get_or_load(("overview", year, week), self._load_dashboard_overview)
+        except Exception as e:
+            logger.error(f"Error building dashboard overview: {e}")
+            return {}
 
-            # Active projects from objectives (status active)
-            active_resp = await self._run_supabase(
-                lambda: self.supabase.table("objectives")
+    async def _load_dashboard_overview(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+
+        def latest_metric(metric_name: str):
+            return lambda: (
+                self.supabase.table("analytics")
+                .select("metric_value,timestamp")
+                .eq("metric_name", metric_name)
+                .order("timestamp", desc=True)
+                .limit(1)
+                .execute()
+            )
+
+        responses = await self._run_queries(
+            {
+                # Active projects from objectives (status active)
+                "active": lambda: self.supabase.table("objectives")
                 .select("id,title,owner,team,due_date,progress,status,updated_at")
                 .eq("status", "active")
                 .order("updated_at", desc=True)
                 .limit(50)
-                .execute()
-            )
-
-            archived_resp = await self._run_supabase(
-                lambda: self.supabase.table("objectives")
+                .execute(),
+                "archived": lambda: self.supabase.table("objectives")
                 .select("id,title,owner,team,due_date,progress,status,updated_at,original_due_date")
                 .eq("status", "archived")
                 .order("updated_at", desc=True)
                 .limit(50)
-                .execute()
-            )
-
-            def map_objectives(rows):
-                projects = []
-                for row in rows or []:
-                    projects.append(
-                        {
-                            "id": str(row.get("id")),
-                            "name": row.get("title") or "Untitled objective",
-                            "owner": {
-                                "name": row.get("owner") or "Unassigned",
-                                "initials": ((row.get("owner") or "")[:2].upper()),
-                            },
-                            "team": row.get("team") or "General",
-                            "progress": row.get("progress") or 0,
-                            "status": row.get("status") or "working on it",
-                            "dueDate": row.get("due_date") or None,
-                            "originalDueDate": row.get("original_due_date") or row.get("due_date"),
-                            "keyResults": [],
-                        }
-                    )
-                return projects
-
-            active_projects = map_objectives(getattr(active_resp, "data", [])) if active_resp else []
-            archived_projects = map_objectives(getattr(archived_resp, "data", [])) if archived_resp else []
-
-            # Issues list from analytics metric "issues" (expects list of strings)
-            issues_resp = await self._run_supabase(
-                lambda: self.supabase.table("analytics")
-                .select("metric_value,timestamp")
-                .eq("metric_name", "issues")
-                .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-            issues_list: List[str] = []
-            if issues_resp and issues_resp.data:
-                mv = issues_resp.data[0].get("metric_value")
-                if isinstance(mv, list):
-                    issues_list = [str(x) for x in mv]
-                elif isinstance(mv, dict):
-                    issues_list = [str(v) for v in mv.values()]
-
-            # Insights
-            insights_resp = await self._run_supabase(
-                lambda: self.supabase.table("analytics")
-                .select("metric_value,timestamp")
-                .eq("metric_name", "insights_weekly")
-                .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-            weekly_insights = None
-            if insights_resp and insights_resp.data:
-                mv = insights_resp.data[0].get("metric_value")
-                if isinstance(mv, str):
-                    weekly_insights = mv
-                elif isinstance(mv, dict):
-                    weekly_insights = mv.get("text") or mv.get("value")
-
-            # Team stats derived from active/archived objectives per team
-            team_stats: Dict[str, Dict[str, int]] = {}
-            for proj in active_projects:
-                team = proj.get("team", "General")
-                team_stats.setdefault(team, {"active": 0, "archived": 0})
-                team_stats[team]["active"] += 1
-            for proj in archived_projects:
-                team = proj.get("team", "General")
-                team_stats.setdefault(team, {"active": 0, "archived": 0})
-                team_stats[team]["archived"] += 1
+                .execute(),
+                # Issues list from analytics metric "issues" (expects list of strings)
+                "issues": latest_metric("issues"),
+                "insights": latest_metric("insights_weekly"),
+            }
+        )
+        active_resp, archived_resp = responses["active"], responses["archived"]
+        issues_resp, insights_resp = responses["issues"], responses["insights"]
 
-            return {
-                "dashboard": {
-                    "lastUpdated": now.isoformat(),
-                    "kpis": {
-                        "csat": {"current": 0, "previous": 0, "trend": "neutral", "change": 0},
-                        "socialMedia": {"totalViews": 0, "platforms": []},
-                        "retention": {"week0": 100, "week1": 0, "week2": 0, "week1Target": 17.0},
-                    },
-                    "projects": {"active": active_projects, "archived": archived_projects},
-                    "issues": {"customerSupport": issues_list},
-                    "insights": {"weekly": weekly_insights or ""},
-                    "teamStats": team_stats,
-                }
+        def map_objectives(rows):
+            projects = []
+            for row in rows or []:
+                projects.append(
+                    {
+                        "id": str(row.get("id")),
+                        "name": row.get("title") or "Untitled objective",
+                        "owner": {
+                            "name": row.get("owner") or "Unassigned",
+                            "initials": ((row.get("owner") or "")[:2].upper()),
+                        },
+                        "team": row.get("team") or "General",
+                        "progress": row.get("progress") or 0,
+                        "status": row.get("status") or "working on it",
+                        "dueDate": row.get("due_date") or None,
+                        "originalDueDate": row.get("original_due_date") or row.get("due_date"),
+                        "keyResults": [],
+                    }
+                )
+            return projects
+
+        active_projects = map_objectives(getattr(active_resp, "data", [])) if active_resp else []
+        archived_projects = map_objectives(getattr(archived_resp, "data", [])) if archived_resp else []
+
+        issues_list: List[str] = []
+        if issues_resp and issues_resp.data:
+            mv = issues_resp.data[0].get("metric_value")
+            if isinstance(mv, list):
+                issues_list = [str(x) for x in mv]
+            elif isinstance(mv, dict):
+                issues_list = [str(v) for v in mv.values()]
+
+        # Insights
+        weekly_insights = None
+        if insights_resp and insights_resp.data:
+            mv = insights_resp.data[0].get("metric_value")
+            if isinstance(mv, str):
+                weekly_insights = mv
+            elif isinstance(mv, dict):
+                weekly_insights = mv.get("text") or mv.get("value")
+
+        # Team stats derived from active/archived objectives per team
+        team_stats: Dict[str, Dict[str, int]] = {}
+        for proj in active_projects:
+            team = proj.get("team", "General")
+            team_stats.setdefault(team, {"active": 0, "archived": 0})
+            team_stats[team]["active"] += 1
+        for proj in archived_projects:
+            team = proj.get("team", "General")
+            team_stats.setdefault(team, {"active": 0, "archived": 0})
+            team_stats[team]["archived"] += 1
+
+        return {
+            "dashboard": {
+                "lastUpdated": now.isoformat(),
+                "kpis": {
+                    "csat": {"current": 0, "previous": 0, "trend": "neutral", "change": 0},
+                    "socialMedia": {"totalViews": 0, "platforms": []},
+                    "retention": {"week0": 100, "week1": 0, "week2": 0, "week1Target": 17.0},
+                },
+                "projects": {"active": active_projects, "archived": archived_projects},
+                "issues": {"customerSupport": issues_list},
+                "insights": {"weekly": weekly_insights or ""},
+                "teamStats": team_stats,
             }
-        except Exception as e:
-            logger.error(f"Error building dashboard overview: {e}")
-            return {}
+        }
 
     def _mock_week_data(self) -> ZapierWeeklyData:
         """Fallback mock data to keep the dashboard usable if Supabase/Zapier data is unavailable."""
@@ -260,168 +297,152 @@ class ZapierIntegrationService:
             if not self.supabase:
                 raise ConfigurationError("Supabase client not configured")
 
-            today = datetime.now(timezone.utc)
-            # Normalize week boundaries to midnight to avoid dropping early-week data
-            week_start = (today - timedelta(days=today.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
-            prev_week_start = week_start - timedelta(days=7)
-            week_end = week_start + timedelta(days=7)
+            year, week, _ = datetime.now(timezone.utc).isocalendar()
+            return await get_dashboard_cache().get_or_load(
+                ("week_data", year, week), lambda: self._load_week_data(year, week)
+            )
 
-            week_start_iso = self._iso(week_start)
-            week_end_iso = self._iso(week_end)
-            prev_week_start_iso = self._iso(prev_week_start)
-            prev_week_end_iso = week_start_iso
+        except Exception as e:
+            logger.error(f"Error fetching current week data from Zapier/Supabase: {e}")
+            return self._mock_week_data()
 
-            # Wins (latest titles/descriptions this week)
-            wins_resp = await self._run_supabase(
-                lambda: self.supabase.table("wins")
-                .select("title,description,timestamp")
-                .gte("timestamp", week_start_iso)
-                .lt("timestamp", week_end_iso)
-                .order("timestamp", desc=True)
-                .limit(10)
-                .execute()
-            )
-            wins = []
-            if wins_resp and getattr(wins_resp, "data", None):
-                for row in wins_resp.data:
-                    title = row.get("title") or row.get("description")
-                    if title:
-                        wins.append(title)
-
-            # CSAT scores
-            current_csat_resp = await self._run_supabase(
-                lambda: self.supabase.table("user_feedback")
-                .select("csat_score,timestamp")
-                .gte("timestamp", week_start_iso)
-                .lt("timestamp", week_end_iso)
+    async def _load_week_data(self, year: int, week: int) -> ZapierWeeklyData:
+        today = datetime.now(timezone.utc)
+        # Week boundaries at Monday midnight UTC, taken from the cache key so a refresh near the
+        # end of the week still loads the week it is cached under
+        week_start = datetime.combine(date.fromisocalendar(year, week, 1), datetime.min.time(), tzinfo=timezone.utc)
+        prev_week_start = week_start - timedelta(days=7)
+        week_end = week_start + timedelta(days=7)
+
+        week_start_iso = self._iso(week_start)
+        week_end_iso = self._iso(week_end)
+        prev_week_start_iso = self._iso(prev_week_start)
+        prev_week_end_iso = week_start_iso
+
+        def in_range(table: str, columns: str, start_iso: str, end_iso: str):
+            return lambda: (
+                self.supabase.table(table)
+                .select(columns)
+                .gte("timestamp", start_iso)
+                .lt("timestamp", end_iso)
                 .execute()
             )
-            previous_csat_resp = await self._run_supabase(
-                lambda: self.supabase.table("user_feedback")
-                .select("csat_score,timestamp")
-                .gte("timestamp", prev_week_start_iso)
-                .lt("timestamp", prev_week_end_iso)
-                .execute()
-            )
-            current_csat = self._average([row.get("csat_score") for row in (current_csat_resp.data or [])])
-            previous_csat = self._average([row.get("csat_score") for row in (previous_csat_resp.data or [])])
-            csat_change_percentage = self._percent_change(current_csat, previous_csat)
 
-            # Feedback summary (latest snippets)
-            feedback_resp = await self._run_supabase(
-                lambda: self.supabase.table("user_feedback")
-                .select("feedback_text,timestamp")
+        def latest_metric(metric_name: str, columns: str = "metric_value,timestamp"):
+            return lambda: (
+                self.supabase.table("analytics")
+                .select(columns)
+                .eq("metric_name", metric_name)
                 .order("timestamp", desc=True)
-                .limit(5)
+                .limit(1)
                 .execute()
             )
-            feedback_texts = [
-                row.get("feedback_text") for row in (feedback_resp.data or []) if row.get("feedback_text")
-            ]
-            user_feedback_summary = " \u2022 ".join(feedback_texts) if feedback_texts else "No feedback yet"
-
-            # Social media views (current vs previous week)
-            social_resp = await self._run_supabase(
-                lambda: self.supabase.table("social_media_metrics")
-                .select("views,timestamp")
+
+        responses = await self._run_queries(
+            {
+                # Wins (latest titles/descriptions this week)
+                "wins": lambda: self.supabase.table("wins")
+                .select("title,description,timestamp")
                 .gte("timestamp", week_start_iso)
                 .lt("timestamp", week_end_iso)
-                .execute()
-            )
-            prev_social_resp = await self._run_supabase(
-                lambda: self.supabase.table("social_media_metrics")
-                .select("views,timestamp")
-                .gte("timestamp", prev_week_start_iso)
-                .lt("timestamp", prev_week_end_iso)
-                .execute()
-            )
-            social_media_views = sum([row.get("views", 0) or 0 for row in (social_resp.data or [])])
-            prev_social_views = sum([row.get("views", 0) or 0 for row in (prev_social_resp.data or [])])
-            social_views_change_percentage = self._percent_change(social_media_views, prev_social_views)
-
-            # Retention data from analytics table
-            weekly_retention_resp = await self._run_supabase(
-                lambda: self.supabase.table("analytics")
-                .select("metric_value,timestamp")
-                .eq("metric_name", "weekly_retention")
-                .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-            weekly_retention = {}
-            if weekly_retention_resp and weekly_retention_resp.data:
-                value = weekly_retention_resp.data[0].get("metric_value")
-                if isinstance(value, dict):
-                    weekly_retention = value
-
-            monthly_retention_resp = await self._run_supabase(
-                lambda: self.supabase.table("analytics")
-                .select("metric_value,timestamp")
-                .eq("metric_name", "monthly_retention")
                 .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-            monthly_retention = {}
-            if monthly_retention_resp and monthly_retention_resp.data:
-                value = monthly_retention_resp.data[0].get("metric_value")
-                if isinstance(value, dict):
-                    monthly_retention = value
-
-            # Shipping metrics
-            shipping_resp = await self._run_supabase(
-                lambda: self.supabase.table("analytics")
-                .select("metric_value,timestamp")
-                .eq("metric_name", "average_shipping_time")
-                .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-            average_shipping_time = None
-            if shipping_resp and shipping_resp.data:
-                average_shipping_time = self._extract_numeric_metric(shipping_resp.data[0].get("metric_value"))
-
-            # Weeks since last logistics mistake (uses analytics metric_name "logistics_mistake")
-            logistics_resp = await self._run_supabase(
-                lambda: self.supabase.table("analytics")
-                .select("timestamp")
-                .eq("metric_name", "logistics_mistake")
+                .limit(10)
+                .execute(),
+                # CSAT scores
+                "current_csat": in_range("user_feedback", "csat_score,timestamp", week_start_iso, week_end_iso),
+                "previous_csat": in_range(
+                    "user_feedback", "csat_score,timestamp", prev_week_start_iso, prev_week_end_iso
+                ),
+                # Feedback summary (latest snippets)
+                "feedback": lambda: self.supabase.table("user_feedback")
+                .select("feedback_text,timestamp")
                 .order("timestamp", desc=True)
-                .limit(1)
-                .execute()
-            )
-            weeks_since_logistics_mistake = 0
-            logistics_ts = None
-            if logistics_resp and logistics_resp.data:
-                logistics_ts = self._parse_datetime(logistics_resp.data[0].get("timestamp"))
-            if logistics_ts:
-                delta_days = (today - logistics_ts).days
-                weeks_since_logistics_mistake = max(delta_days // 7, 0)
-
-            # Social platform breakdown placeholders (can be extended when data present)
-            tiktok_views = instagram_views = youtube_views = facebook_views = 0
-
-            return ZapierWeeklyData(
-                wins=wins,
-                csat_score=current_csat or 0,
-                csat_change_percentage=csat_change_percentage,
-                user_feedback_summary=user_feedback_summary,
-                social_media_views=social_media_views,
-                social_views_change_percentage=social_views_change_percentage,
-                tiktok_views=tiktok_views,
-                instagram_views=instagram_views,
-                youtube_views=youtube_views,
-                facebook_views=facebook_views,
-                average_shipping_time=average_shipping_time or 0,
-                weeks_since_logistics_mistake=weeks_since_logistics_mistake,
-                logistics_mistake_notes=None,
-                weekly_retention=weekly_retention,
-                monthly_retention=monthly_retention,
-            )
+                .limit(5)
+                .execute(),
+                # Social media views (current vs previous week)
+                "social": in_range("social_media_metrics", "views,timestamp", week_start_iso, week_end_iso),
+                "prev_social": in_range(
+                    "social_media_metrics", "views,timestamp", prev_week_start_iso, prev_week_end_iso
+                ),
+                # Retention data from analytics table
+                "weekly_retention": latest_metric("weekly_retention"),
+                "monthly_retention": latest_metric("monthly_retention"),
+                # Shipping metrics
+                "shipping": latest_metric("average_shipping_time"),
+                # Weeks since last logistics mistake (uses analytics metric_name "logistics_mistake")
+                "logistics": latest_metric("logistics_mistake", columns="timestamp"),
+            }
+        )
 
-        except Exception as e:
-            logger.error(f"Error fetching current week data from Zapier/Supabase: {e}")
-            return self._mock_week_data()
+        wins = []
+        wins_resp = responses["wins"]
+        if wins_resp and getattr(wins_resp, "data", None):
+            for row in wins_resp.data:
+                title = row.get("title") or row.get("description")
+                if title:
+                    wins.append(title)
+
+        current_csat = self._average([row.get("csat_score") for row in (responses["current_csat"].data or [])])
+        previous_csat = self._average([row.get("csat_score") for row in (responses["previous_csat"].data or [])])
+        csat_change_percentage = self._percent_change(current_csat, previous_csat)
+
+        feedback_texts = [
+            row.get("feedback_text") for row in (responses["feedback"].data or []) if row.get("feedback_text")
+        ]
+        user_feedback_summary = " \u2022 ".join(feedback_texts) if feedback_texts else "No feedback yet"
+
+        social_media_views = sum([row.get("views", 0) or 0 for row in (responses["social"].data or [])])
+        prev_social_views = sum([row.get("views", 0) or 0 for row in (responses["prev_social"].data or [])])
+        social_views_change_percentage = self._percent_change(social_media_views, prev_social_views)
+
+        weekly_retention = {}
+        weekly_retention_resp = responses["weekly_retention"]
+        if weekly_retention_resp and weekly_retention_resp.data:
+            value = weekly_retention_resp.data[0].get("metric_value")
+            if isinstance(value, dict):
+                weekly_retention = value
+
+        monthly_retention = {}
+        monthly_retention_resp = responses["monthly_retention"]
+        if monthly_retention_resp and monthly_retention_resp.data:
+            value = monthly_retention_resp.data[0].get("metric_value")
+            if isinstance(value, dict):
+                monthly_retention = value
+
+        average_shipping_time = None
+        shipping_resp = responses["shipping"]
+        if shipping_resp and shipping_resp.data:
+            average_shipping_time = self._extract_numeric_metric(shipping_resp.data[0].get("metric_value"))
+
+        weeks_since_logistics_mistake = 0
+        logistics_ts = None
+        logistics_resp = responses["logistics"]
+        if logistics_resp and logistics_resp.data:
+            logistics_ts = self._parse_datetime(logistics_resp.data[0].get("timestamp"))
+        if logistics_ts:
+            delta_days = (today - logistics_ts).days
+            weeks_since_logistics_mistake = max(delta_days // 7, 0)
+
+        # Social platform breakdown placeholders (can be extended when data present)
+        tiktok_views = instagram_views = youtube_views = facebook_views = 0
+
+        return ZapierWeeklyData(
+            wins=wins,
+            csat_score=current_csat or 0,
+            csat_change_percentage=csat_change_percentage,
+            user_feedback_summary=user_feedback_summary,
+            social_media_views=social_media_views,
+            social_views_change_percentage=social_views_change_percentage,
+            tiktok_views=tiktok_views,
+            instagram_views=instagram_views,
+            youtube_views=youtube_views,
+            facebook_views=facebook_views,
+            average_shipping_time=average_shipping_time or 0,
+            weeks_since_logistics_mistake=weeks_since_logistics_mistake,
+            logistics_mistake_notes=None,
+            weekly_retention=weekly_retention,
+            monthly_retention=monthly_retention,
+        )
 
     async def get_current_objectives(self) -> List[ZapierObjectiveData]:
         """
@@ -560,6 +581,7 @@ class ZapierIntegrationService:
         try:
             # This would trigger all your Zapier flows to refresh data
             success = True
+            invalidate_dashboard_cache()
 
             # Trigger weekly analytics refresh
             if not await self.trigger_zapier_webhook("weekly_analytics", {"action": "refresh"}):
@@ -9,6 +9,7 @@ import logging
 from datetime import datetime
 from typing import Any, Dict
 
+from app.core.adaptive_concurrency import get_openai_concurrency_limiter, watch_first_permit
 from app.core.exceptions import ExternalServiceError
 from app.schemas.github_event import CommitPayload
 from app.services.commit_analysis_service import CommitAnalysisService
@@ -17,6 +18,11 @@ from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Per-commit analysis budget, counted from the first upstream permit
+COMMIT_ANALYSIS_TIMEOUT_SECONDS = 90
+# Overall cap per commit, including upstream queueing, so a commit stuck before its first permit still ends
+COMMIT_TOTAL_TIMEOUT_SECONDS = 300
+
 
 class GitHubWebhookHandler(WebhookHandler):
     """Handler for GitHub webhook events."""
@@ -161,35 +167,50 @@ class GitHubWebhookHandler(WebhookHandler):
         processed_commits = []
         errors = []
 
-        # Process commits concurrently but with bounded concurrency to protect upstreams
-        semaphore = asyncio.Semaphore(3)
+        # Process commits concurrently, at most as many as the OpenAI limiter could ever admit so
+        # per-commit Supabase and user lookups stay bounded too; upstream calls are further bounded
+        # by their adaptive concurrency limiters (app.core.adaptive_concurrency)
+        semaphore = asyncio.Semaphore(get_openai_concurrency_limiter().config.max_limit)
 
         async def analyze_single(commit_data: Dict[str, Any]):
-            async with semaphore:
-                try:
-                    commit_payload = self._convert_to_commit_payload(
-                        commit_data, repository=repo_full_name, repo_url=repo_url, branch=branch
-                    )
+            try:
+                commit_payload = self._convert_to_commit_payload(
+                    commit_data, repository=repo_full_name, repo_url=repo_url, branch=branch
+                )
+                async with semaphore:
                     logger.info(f"Analyzing commit {commit_payload.commit_hash}")
-                    result = await asyncio.wait_for(
-                        self.commit_analysis_service.process_commit(commit_payload, scan_docs=True), timeout=90
+                    started = watch_first_permit()
+                    task = asyncio.create_task(
+                        self.commit_analysis_service.process_commit(commit_payload, scan_docs=True)
+                    )
+                    # Time queued on the upstream limiters doesn't count against the commit's timeout
+                    waiter = asyncio.create_task(started.wait())
+
+                    async def run_commit():
+                        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                        return await asyncio.wait_for(task, timeout=COMMIT_ANALYSIS_TIMEOUT_SECONDS)
+
+                    try:
+                        result = await asyncio.wait_for(run_commit(), timeout=COMMIT_TOTAL_TIMEOUT_SECONDS)
+                    finally:
+                        waiter.cancel()
+                        task.cancel()
+                if result:
+                    processed_commits.append(
+                        {
+                            "hash": commit_payload.commit_hash,
+                            "message": commit_payload.commit_message,
+                            "status": "analyzed",
+                        }
                     )
-                    if result:
-                        processed_commits.append(
-                            {
-                                "hash": commit_payload.commit_hash,
-                                "message": commit_payload.commit_message,
-                                "status": "analyzed",
-                            }
-                        )
-                    else:
-                        errors.append({"hash": commit_payload.commit_hash, "error": "Analysis failed"})
-                except asyncio.TimeoutError:
-                    logger.error(f"Commit analysis timed out for {commit_data.get('id')}")
-                    errors.append({"hash": commit_data.get("id"), "error": "Analysis timed out"})
-                except Exception as e:
-                    logger.error(f"Error processing commit {commit_data.get('id')}: {e}", exc_info=True)
-                    errors.append({"hash": commit_data.get("id"), "error": str(e)})
+                else:
+                    errors.append({"hash": commit_payload.commit_hash, "error": "Analysis failed"})
+            except asyncio.TimeoutError:
+                logger.error(f"Commit analysis timed out for {commit_data.get('id')}")
+                errors.append({"hash": commit_data.get("id"), "error": "Analysis timed out"})
+            except Exception as e:
+                logger.error(f"Error processing commit {commit_data.get('id')}: {e}", exc_info=True)
+                errors.append({"hash": commit_data.get("id"), "error": str(e)})
 
         await asyncio.gather(*(analyze_single(commit) for commit in non_merge_commits))
 
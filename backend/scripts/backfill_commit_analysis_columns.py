@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Backfill the typed commit analysis columns from legacy ai_analysis_notes.
+
+Older commit rows store the whole AI analysis as a JSON string in
+ai_analysis_notes. This script moves it into impact_score, business_value,
+impact_category, analysis_version and the ai_analysis JSONB column
+(see supabase/migrations/20251018_commit_typed_analysis_columns.sql).
+
+Rows are processed in keyset-paginated batches ordered by id. Rows that
+already have ai_analysis are skipped, so the script can be stopped and
+re-run at any time.
+
+Usage:
+    # Report what would change without writing
+    python backend/scripts/backfill_commit_analysis_columns.py --dry-run
+
+    # Backfill and drop the legacy text once converted
+    python backend/scripts/backfill_commit_analysis_columns.py --batch-size 500 --clear-legacy
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.config.supabase_client import get_supabase_client_safe
+from app.models.commit import Commit, split_analysis_payload
+
+BACKFILL_COLUMNS = "id,commit_hash,commit_timestamp,ai_analysis_notes"
+
+
+def build_backfill_row(row: Dict[str, Any], clear_legacy: bool = False) -> Dict[str, Any]:
+    """Build the upsert payload that moves a row's legacy notes into the typed columns."""
+    commit = Commit(
+        commit_hash=row["commit_hash"],
+        commit_timestamp=row["commit_timestamp"],
+        ai_analysis_notes=row.get("ai_analysis_notes"),
+    )
+    payload = {
+        "commit_hash": row["commit_hash"],
+        # Upserts validate NOT NULL columns before resolving the conflict
+        "commit_timestamp": row["commit_timestamp"],
+        **split_analysis_payload(commit.analysis_details()),
+    }
+    if clear_legacy:
+        payload["ai_analysis_notes"] = None
+    return payload
+
+
+def _fetch_batch(client, last_id: str, batch_size: int) -> List[Dict[str, Any]]:
+    query = (
+        client.table("commits")
+        .select(BACKFILL_COLUMNS)
+        .is_("ai_analysis", "null")
+        .not_.is_("ai_analysis_notes", "null")
+        .order("id")
+        .limit(batch_size)
+    )
+    if last_id:
+        query = query.gt("id", last_id)
+    return query.execute().data or []
+
+
+async def backfill(batch_size: int, dry_run: bool, clear_legacy: bool, pause: float) -> Dict[str, int]:
+    client = get_supabase_client_safe()
+    stats = {"batches": 0, "rows": 0, "with_impact": 0}
+    last_id = ""
+
+    while True:
+        rows = await asyncio.to_thread(_fetch_batch, client, last_id, batch_size)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        payloads = [build_backfill_row(row, clear_legacy) for row in rows]
+        if not dry_run:
+            await asyncio.to_thread(client.table("commits").upsert(payloads, on_conflict="commit_hash").execute)
+
+        stats["batches"] += 1
+        stats["rows"] += len(payloads)
+        stats["with_impact"] += sum(1 for payload in payloads if payload["impact_score"] is not None)
+        print(f"  📦 Batch {stats['batches']}: {len(payloads)} rows (through id {last_id})")
+
+        if pause:
+            await asyncio.sleep(pause)
+
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill typed commit analysis columns from ai_analysis_notes")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per batch (default: 500)")
+    parser.add_argument("--dry-run", action="store_true", help="Read and convert rows without writing")
+    parser.add_argument(
+        "--clear-legacy", action="store_true", help="Set ai_analysis_notes to NULL once a row is converted"
+    )
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    mode = "DRY RUN" if args.dry_run else "WRITE"
+    print(f"🔄 Backfilling commit analysis columns ({mode}, batch size {args.batch_size})")
+    stats = await backfill(args.batch_size, args.dry_run, args.clear_legacy, args.pause)
+    print(f"✅ Done: {stats['rows']} rows in {stats['batches']} batches, {stats['with_impact']} with impact scores")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PostgREST and asyncpg data layers on the hot commit queries.
+
+Runs the same repository calls through both backends against the configured
+database (SUPABASE_URL for PostgREST, DATABASE_URL for asyncpg) and reports
+throughput and latency percentiles per operation.
+
+Operations:
+- get_commit_by_hash on existing hashes
+- get_commits_by_user_in_range for an author over --days
+- get_existing_commit_hashes for a batch of hashes
+- bulk_insert_commits of synthetic rows (only with --write; rows are deleted afterwards)
+
+Usage:
+    python backend/scripts/benchmark_data_layer.py --iterations 200 --concurrency 10
+    python backend/scripts/benchmark_data_layer.py --write --bulk-size 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.config.postgres_pool import close_pg_pool, pg_connection
+from app.models.commit import Commit
+from app.repositories.commit_repository import CommitRepository
+from app.repositories.pg_store import PgCommitStore
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+async def _measure(call: Callable[[int], Awaitable[object]], iterations: int, concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - started
+    return {
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": _percentile(latencies, 95),
+    }
+
+
+def _repository(backend: str) -> CommitRepository:
+    repo = CommitRepository()
+    repo._pg = PgCommitStore() if backend == "asyncpg" else None
+    return repo
+
+
+def _synthetic_commits(count: int, author_id) -> List[Commit]:
+    now = datetime.utcnow()
+    return [
+        Commit(
+            commit_hash=f"bench-{uuid.uuid4().hex}",
+            commit_timestamp=now - timedelta(minutes=i),
+            author_id=author_id,
+            repository_name="benchmark/data-layer",
+            commit_message="benchmark row",
+            lines_added=i % 50,
+            lines_deleted=i % 7,
+        )
+        for i in range(count)
+    ]
+
+
+async def _sample(limit: int):
+    async with pg_connection() as connection:
+        rows = await connection.fetch(
+            "SELECT commit_hash, author_id FROM public.commits ORDER BY commit_timestamp DESC LIMIT $1", limit
+        )
+    hashes = [row["commit_hash"] for row in rows]
+    author_id = next((row["author_id"] for row in rows if row["author_id"]), None)
+    return hashes, author_id
+
+
+async def _cleanup(prefix: str = "bench-") -> None:
+    async with pg_connection() as connection:
+        await connection.execute("DELETE FROM public.commits WHERE commit_hash LIKE $1", prefix + "%")
+
+
+async def run(args) -> None:
+    hashes, author_id = await _sample(max(args.batch, 50))
+    if not hashes:
+        print("❌ No commits found to benchmark against")
+        return
+    start_date = date.today() - timedelta(days=args.days)
+    end_date = date.today()
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for backend in ("postgrest", "asyncpg"):
+        repo = _repository(backend)
+        print(f"⏱️  {backend}: {args.iterations} iterations, concurrency {args.concurrency}")
+        results[backend] = {
+            "get_commit_by_hash": await _measure(
+                lambda i: repo.get_commit_by_hash(hashes[i % len(hashes)]), args.iterations, args.concurrency
+            ),
+            "get_existing_commit_hashes": await _measure(
+                lambda i: repo.get_existing_commit_hashes(hashes[: args.batch]), args.iterations, args.concurrency
+            ),
+        }
+        if author_id:
+            results[backend]["get_commits_by_user_in_range"] = await _measure(
+                lambda i: repo.get_commits_by_user_in_range(author_id, start_date, end_date),
+                args.iterations,
+                args.concurrency,
+            )
+        if args.write:
+            try:
+                results[backend]["bulk_insert_commits"] = await _measure(
+                    lambda i: repo.bulk_insert_commits(_synthetic_commits(args.bulk_size, author_id)),
+                    args.bulk_rounds,
+                    1,
+                )
+            finally:
+                await _cleanup()
+
+    print(f"\n{'operation':<32}{'backend':<12}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for operation in results["postgrest"]:
+        for backend in ("postgrest", "asyncpg"):
+            stats = results[backend].get(operation)
+            if stats:
+                print(
+                    f"{operation:<32}{backend:<12}{stats['ops_per_sec']:>10.1f}"
+                    f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                )
+        speedup = results["postgrest"][operation]["p50_ms"] / max(results["asyncpg"][operation]["p50_ms"], 1e-9)
+        print(f"{'':<32}{'p50 speedup':<12}{speedup:>10.1f}x")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare PostgREST and asyncpg repository latency")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per read operation (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent calls (default: 10)")
+    parser.add_argument("--batch", type=int, default=100, help="Hashes per existence check (default: 100)")
+    parser.add_argument("--days", type=int, default=30, help="Date range for the author query (default: 30)")
+    parser.add_argument("--write", action="store_true", help="Also benchmark bulk inserts (rows are removed)")
+    parser.add_argument("--bulk-size", type=int, default=500, help="Rows per bulk insert (default: 500)")
+    parser.add_argument("--bulk-rounds", type=int, default=5, help="Bulk inserts per backend (default: 5)")
+    args = parser.parse_args()
+
+    try:
+        await run(args)
+    finally:
+        await close_pg_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
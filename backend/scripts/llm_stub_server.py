@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible server for offline runs of the analysis pipeline.
+
+Replays a cassette of recorded OpenAI traffic with a configurable latency
+distribution and injected 429s, or records a new cassette by proxying to the
+real API. Point the backend (or a benchmark) at it with
+OPENAI_BASE_URL=http://127.0.0.1:8089/v1.
+
+Usage:
+    # Record: forward to OpenAI and append every request/response pair
+    python backend/scripts/llm_stub_server.py --cassette commits.cassette.jsonl --record
+
+    # Replay with recorded latency halved and 5% of requests rate limited
+    python backend/scripts/llm_stub_server.py --cassette commits.cassette.jsonl \\
+        --latency "recorded*0.5" --rate-limit-share 0.05
+
+    # Replay with a lognormal latency (median 1.8s) and a 600 requests/minute budget
+    python backend/scripts/llm_stub_server.py --cassette commits.cassette.jsonl \\
+        --latency lognormal:1800,0.6 --rpm 600
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+import uvicorn
+
+from app.integrations.llm_replay import OPENAI_API_BASE, Cassette, FaultInjector, LatencyModel, create_stub_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded OpenAI traffic from a cassette, or record one")
+    parser.add_argument("--cassette", required=True, help="Cassette JSONL file to replay from or append to")
+    parser.add_argument("--record", action="store_true", help="Proxy to the real API and record into the cassette")
+    parser.add_argument("--upstream", default=OPENAI_API_BASE, help=f"API to record from (default: {OPENAI_API_BASE})")
+    parser.add_argument(
+        "--latency", default="recorded", help="recorded[*scale], fixed:MS, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA"
+    )
+    parser.add_argument("--rate-limit-share", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Answer 429 above this many requests per minute")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--strict", action="store_true", help="Only serve exact matches (no same-prompt fallback)")
+    parser.add_argument("--seed", type=int, help="Random seed for latency and fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    try:
+        latency = LatencyModel.parse(args.latency, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.record:
+        cassette = Cassette(args.cassette)
+        if not os.getenv("OPENAI_API_KEY"):
+            print("⚠️  OPENAI_API_KEY is not set; requests must carry their own Authorization header")
+        print(f"🔴 Recording {args.upstream} into {args.cassette}")
+    elif not os.path.exists(args.cassette):
+        parser.error(f"Cassette not found: {args.cassette}")
+    else:
+        cassette = Cassette.load(args.cassette)
+        print(f"▶️  Replaying {len(cassette.interactions)} interactions from {args.cassette} (latency: {args.latency})")
+
+    faults = None
+    if args.rate_limit_share or args.rpm:
+        faults = FaultInjector(args.rate_limit_share, args.rpm, args.retry_after)
+        if args.seed is not None:
+            faults.rng.seed(args.seed)
+        print(f"  Injecting 429s: share={args.rate_limit_share}, rpm={args.rpm or 'unlimited'}")
+
+    app = create_stub_app(
+        cassette,
+        latency=latency,
+        faults=faults,
+        upstream=args.upstream if args.record else None,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        strict=args.strict,
+    )
+    print(f"  OPENAI_BASE_URL=http://{args.host}:{args.port}/v1  (counters: GET /stub/stats)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
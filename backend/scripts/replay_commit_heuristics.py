@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Replay the heuristic commit pre-classifier over stored commit analyses.
+
+Reads commits that were already scored by the model, rebuilds the
+CommitAnalyzer input for each one (diffs come from the configured
+COMMIT_DIFF_SOURCE) and runs HeuristicCommitClassifier on it. The report
+shows the share of commits the heuristics would have scored locally (the
+fraction of API calls saved), agreement with the stored model scores per
+rule, and the worst disagreements. Commits already scored by the heuristics
+are skipped.
+
+Usage:
+    # Last 30 days from Supabase
+    python backend/scripts/replay_commit_heuristics.py --days 30
+
+    # Paths and messages only (no diff fetches; content rules are skipped)
+    python backend/scripts/replay_commit_heuristics.py --days 30 --no-diffs
+
+    # Offline: JSONL of {"commit": <CommitAnalyzer input>, "analysis": <stored result>}
+    python backend/scripts/replay_commit_heuristics.py --input commits.jsonl --output report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.services.commit_heuristics import replay_heuristics
+
+REPLAY_COLUMNS = (
+    "id",
+    "commit_hash",
+    "repository_name",
+    "commit_message",
+    "commit_timestamp",
+    "lines_added",
+    "lines_deleted",
+    "changed_files",
+    "ai_estimated_hours",
+    "impact_score",
+    "risk_level",
+    "model_used",
+)
+
+Sample = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def format_diff(diff_data: Dict[str, Any]) -> str:
+    """Diff text in the layout CommitAnalysisService sends to the analyzer."""
+    diff_content = ""
+    for file in diff_data.get("files", []):
+        diff_content += f"File: {file.get('filename')}\n"
+        diff_content += f"Status: {file.get('status')}\n"
+        diff_content += f"Changes: +{file.get('additions', 0)} -{file.get('deletions', 0)}\n"
+        if file.get("patch"):
+            diff_content += file.get("patch") + "\n\n"
+        else:
+            diff_content += "(No patch data available)\n\n"
+    return diff_content
+
+
+def load_jsonl(path: str) -> List[Sample]:
+    samples = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record["commit"], record["analysis"]))
+    return samples
+
+
+async def load_stored(days: int, limit: int, fetch_diffs: bool) -> Tuple[List[Sample], int]:
+    from app.integrations.diff_provider import create_commit_diff_provider
+    from app.repositories.commit_repository import CommitRepository
+
+    repository = CommitRepository()
+    provider = create_commit_diff_provider() if fetch_diffs else None
+    samples: List[Sample] = []
+    skipped = 0
+    async for commit in repository.iter_commits(start_date=date.today() - timedelta(days=days), columns=REPLAY_COLUMNS):
+        if commit.ai_estimated_hours is None or (commit.model_used or "").startswith("heuristic-"):
+            skipped += 1
+            continue
+        commit_data = {
+            "commit_hash": commit.commit_hash,
+            "repository": commit.repository_name,
+            "message": commit.commit_message or "",
+            "files_changed": commit.changed_files or [],
+            "additions": commit.lines_added or 0,
+            "deletions": commit.lines_deleted or 0,
+        }
+        if provider is not None and commit.repository_name:
+            try:
+                diff_data = await asyncio.to_thread(
+                    provider.get_commit_diff, commit.repository_name, commit.commit_hash
+                )
+                commit_data["diff"] = format_diff(diff_data or {})
+            except Exception as e:
+                print(f"  ⚠️  Could not fetch diff for {commit.commit_hash[:8]}: {e}")
+        analysis = {
+            "estimated_hours": float(commit.ai_estimated_hours),
+            "impact_score": commit.impact_score,
+            "risk_level": commit.risk_level,
+        }
+        samples.append((commit_data, analysis))
+        if limit and len(samples) >= limit:
+            break
+    return samples, skipped
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n📊 Replayed {report['commits']} commits")
+    print(
+        f"  Scored locally:      {report['classified']} ({report['api_calls_saved_fraction']:.1%} of API calls saved)"
+    )
+    print(f"  Hours agreement:     {report['hours_agreement']:.1%} (MAE {report['hours_mean_abs_error']}h)")
+    print(f"  Impact agreement:    {report['impact_agreement']:.1%}")
+    print(f"  Risk agreement:      {report['risk_agreement']:.1%}")
+    print(f"  Classifier time:     {report['avg_classify_us']}µs per commit")
+    for rule, stats in sorted(report["rules"].items()):
+        print(
+            f"    {rule:<16} {stats['classified']:>5} commits, "
+            f"hours agree {stats['hours_agree']}, impact agree {stats['impact_agree']}"
+        )
+    for item in report["disagreements"]:
+        print(
+            f"  ✗ {str(item['commit_hash'])[:8]} {item['rule']}: {item['hours']}h vs {item['stored_hours']}h, "
+            f"impact {item['impact_score']} vs {item['stored_impact_score']}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay heuristic commit scoring against stored model analyses")
+    parser.add_argument("--input", help="JSONL of {commit, analysis} records instead of Supabase")
+    parser.add_argument("--days", type=int, default=30, help="Days of stored commits to replay (default: 30)")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many commits (default: all)")
+    parser.add_argument("--no-diffs", action="store_true", help="Do not fetch diffs; only path/message rules apply")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if args.input:
+        samples, skipped = load_jsonl(args.input), 0
+    else:
+        print(f"🔄 Loading model-scored commits from the last {args.days} days")
+        samples, skipped = await load_stored(args.days, args.limit, not args.no_diffs)
+    if skipped:
+        print(f"  Skipped {skipped} commits without a model analysis")
+
+    report = replay_heuristics(samples).to_dict()
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the webhook -> analysis -> persistence pipeline.
+
+Delivers signed GitHub push events to the webhook route at a target rate,
+with GitHub, Supabase and OpenAI replaced by local fakes with realistic
+latencies (tests/load/fakes.py), and reports sustained throughput, push
+latency percentiles, event-loop lag, memory growth and upstream traffic.
+Reports can be saved as baselines and later runs diffed against them.
+
+Usage:
+    # Default "steady" profile, compared against tests/load/baselines/steady.json
+    python backend/scripts/run_pipeline_load_test.py --compare
+
+    # Record a new baseline for the burst profile from the median of three runs
+    python backend/scripts/run_pipeline_load_test.py --profile burst --runs 3 --save-baseline
+
+    # Custom load through the full app.main middleware stack, flagging callbacks that block the loop > 50 ms
+    python backend/scripts/run_pipeline_load_test.py --rate 2 --duration 30 --commits-per-push 8 \\
+        --openai-latency lognormal:1800,0.6 --full-app --detect-blocking 50
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.config.settings import settings
+from tests.load.harness import (
+    PROFILES,
+    WEBHOOK_PATH,
+    compare_reports,
+    format_comparison,
+    load_baseline,
+    median_report,
+    run_load,
+    save_baseline,
+)
+
+
+def build_profile(args):
+    overrides = {
+        "rate": args.rate,
+        "duration": args.duration,
+        "commits_per_push": args.commits_per_push,
+        "github_latency": args.github_latency,
+        "supabase_latency": args.supabase_latency,
+        "openai_latency": args.openai_latency,
+        "analysis_mode": args.mode,
+        "model": args.model,
+        "seed": args.seed,
+    }
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    profile = PROFILES[args.profile]
+    if overrides:
+        # A modified profile gets its own baseline name
+        profile = dataclasses.replace(profile, name=args.name or f"{profile.name}-custom", **overrides)
+    elif args.name:
+        profile = dataclasses.replace(profile, name=args.name)
+    return profile
+
+
+def load_app(full_app: bool):
+    if not full_app:
+        return None
+    # GitHub deliveries carry no API key and come from many addresses; production excludes the route the same way
+    settings.AUTH_EXCLUDE_PATHS = f"{settings.AUTH_EXCLUDE_PATHS},{WEBHOOK_PATH}"
+    settings.RATE_LIMIT_EXCLUDE_PATHS = f"{settings.RATE_LIMIT_EXCLUDE_PATHS},{WEBHOOK_PATH}"
+    from app.main import app
+
+    return app
+
+
+def show_report(report):
+    profile = report["profile"]
+    runs = f" (median of {report['runs']} runs)" if report.get("runs", 1) > 1 else ""
+    print(f"\n📊 Pipeline load test: {profile['name']}{runs}")
+    print(
+        f"  Offered load: {profile['rate']} pushes/s for {profile['duration']}s, "
+        f"{profile['commits_per_push']} commits/push ({profile['analysis_mode']}, {profile['model']})"
+    )
+    print(
+        f"  Upstream latency: github={profile['github_latency']} supabase={profile['supabase_latency']} "
+        f"openai={profile['openai_latency']}"
+    )
+    pushes, commits = report["pushes"], report["commits"]
+    print(f"  Pushes: {pushes['ok']}/{pushes['sent']} ok")
+    print(
+        f"  Commits: {commits['persisted']}/{commits['sent']} persisted "
+        f"({commits['analyzed']} analyzed, {commits['failed']} failed)"
+    )
+    throughput = report["throughput"]
+    print(
+        f"  Throughput: {throughput['commits_per_second']} commits/s, "
+        f"{throughput['pushes_per_second']} pushes/s over {report['elapsed_seconds']}s"
+    )
+    latency, lag, memory = report["latency_ms"], report["loop_lag_ms"], report["memory"]
+    print(f"  Push latency (ms): p50={latency['p50']} p90={latency['p90']} p99={latency['p99']} max={latency['max']}")
+    print(f"  Event-loop lag (ms): p50={lag['p50']} p99={lag['p99']} max={lag['max']}")
+    print(
+        f"  Memory: RSS {memory['rss_start_mb']} -> {memory['rss_end_mb']} MB "
+        f"(peak {memory['rss_peak_mb']}, growth {memory['rss_growth_mb']}), "
+        f"{memory['objects_growth']:+d} objects"
+    )
+    upstream = report["upstream"]
+    print(
+        f"  Upstream requests: github={upstream['github_requests']} supabase={upstream['supabase_requests']} "
+        f"openai={upstream['openai_requests']} (429s: {upstream['openai_rate_limited']})"
+    )
+    print(f"  Adaptive limits at end: {report['concurrency_limits']}")
+    if report.get("blocking_callbacks"):
+        blocking = report["blocking_callbacks"]
+        print(f"  Callbacks blocking the loop > {blocking['threshold_ms']} ms: {blocking['count']}")
+        for event in blocking["worst"]:
+            print(f"    {event['duration_ms']:.0f} ms  {event['callback'][:140]}")
+    for error in report["errors"]:
+        print(f"  ❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the webhook -> analysis -> persistence pipeline")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="steady", help="Base load profile")
+    parser.add_argument("--name", help="Profile name for the report and baseline (default: from the profile)")
+    parser.add_argument("--rate", type=float, help="Pushes per second")
+    parser.add_argument("--duration", type=float, help="Seconds of arrivals")
+    parser.add_argument("--commits-per-push", type=int)
+    parser.add_argument("--github-latency", help="fixed:MS, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--supabase-latency")
+    parser.add_argument("--openai-latency")
+    parser.add_argument("--mode", choices=["split", "fused"], help="Commit analysis mode")
+    parser.add_argument("--model", help="Commit analysis model (reasoning models use the responses API)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--runs", type=int, default=1, help="Repeat the run and report per-metric medians")
+    parser.add_argument("--full-app", action="store_true", help="Drive app.main (all middleware) instead of the router")
+    parser.add_argument("--detect-blocking", type=float, metavar="MS", help="Report callbacks blocking the loop > MS")
+    parser.add_argument("--save-baseline", nargs="?", const="", metavar="PATH", help="Save the report as a baseline")
+    parser.add_argument("--compare", nargs="?", const="", metavar="PATH", help="Diff against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change that counts as a regression")
+    parser.add_argument("--output", help="Also write the report JSON here")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's own logs and console output")
+    args = parser.parse_args()
+
+    profile = build_profile(args)
+    app = load_app(args.full_app)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.ERROR)
+
+    runs = max(args.runs, 1)
+    print(f"🚀 Running {profile.pushes} pushes x {profile.commits_per_push} commits ({profile.name}) x {runs}...")
+
+    async def run_all():
+        # One event loop for every run, so clients cached by the first run stay usable
+        return [await run_load(profile, app=app, blocking_threshold_ms=args.detect_blocking) for _ in range(runs)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        reports = asyncio.run(run_all())
+    report = median_report(reports) if runs > 1 else reports[0]
+    show_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    regressed = False
+    if args.compare is not None:
+        baseline_name = args.compare or profile.name
+        baseline = load_baseline(baseline_name)
+        if baseline is None:
+            print(f"\n⚠️  No baseline found for {baseline_name}; save one with --save-baseline")
+        else:
+            changes = compare_reports(report, baseline, tolerance=args.tolerance)
+            print(f"\n📈 Compared with baseline from {baseline.get('recorded_at', 'unknown')}:")
+            print(format_comparison(changes))
+            regressed = any(change.regressed for change in changes)
+
+    if args.save_baseline is not None:
+        path = save_baseline(report, args.save_baseline or None)
+        print(f"\n💾 Baseline saved to {path}")
+
+    if report["pushes"]["errors"] or regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
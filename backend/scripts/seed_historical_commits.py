@@ -32,7 +32,8 @@ import argparse
 import requests
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
 import json
 from dotenv import load_dotenv
 from decimal import Decimal
@@ -50,12 +51,15 @@ os.environ.setdefault("SUPABASE_URL", os.getenv("SUPABASE_URL", "https://dummy.s
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
+from app.core.singleflight import get_singleflight
 from app.integrations.commit_analysis import CommitAnalyzer
+from app.integrations.git_mirror import GitMirrorDiffProvider
+from app.services.batch_orchestrator import create_batch_orchestrator
 from app.services.batch_service import OpenAIBatchService
 from app.config.supabase_client import get_supabase_client_safe
 from app.config.settings import settings
 from app.repositories.commit_repository import CommitRepository
-from app.models.commit import Commit
+from app.models.commit import ANALYSIS_VERSION, Commit, split_analysis_payload
 from app.repositories.user_repository import UserRepository
 from app.models.user import User, UserRole
 from app.repositories.daily_work_analysis_repository import DailyWorkAnalysisRepository
@@ -73,6 +77,8 @@ class HistoricalCommitSeeder:
         max_concurrent: int = 5,
         check_existing: bool = True,
         use_openai_batch: bool = False,
+        github_concurrency: int = 8,
+        git_mirror: Optional[GitMirrorDiffProvider] = None,
     ):
         self.github_token = github_token
         self.commit_analyzer = CommitAnalyzer()
@@ -96,6 +102,20 @@ class HistoricalCommitSeeder:
         # Semaphore for controlling concurrent API calls
         self.semaphore = asyncio.Semaphore(max_concurrent)
 
+        # GitHub fetches: pooled connections, bounded concurrency, and a cache of
+        # prefetched (details, diff) pairs keyed by SHA that is drained as commits are analyzed
+        self.github_session = requests.Session()
+        self.github_semaphore = asyncio.Semaphore(github_concurrency)
+        self._commit_cache: Dict[str, tuple] = {}
+        self._fetched_shas: set = set()
+        # Caps how far prefetching runs ahead of analysis (unconsumed commits held in memory)
+        self._prefetch_window = asyncio.Semaphore(github_concurrency * 8)
+        self._prefetch_held: set = set()
+        # SHAs whose day has been analyzed; late prefetches of these are dropped
+        self._released_shas: set = set()
+        # Optional local mirror used instead of per-commit REST calls for details and diffs
+        self.git_mirror = git_mirror
+
         # Track statistics for existing vs new commits
         self.stats = {
             "total_commits": 0,
@@ -282,11 +302,8 @@ Diff:
 
         for i, commit in enumerate(to_analyze, 1):
             sha = commit["sha"]
-            details = self.get_commit_details(repository, sha)
-            if not details:
-                continue
-            diff = self.get_commit_diff(repository, sha)
-            if not diff:
+            details, diff = await self.fetch_commit(repository, sha)
+            if not details or not diff:
                 continue
 
             if not github_username and details.get("author"):
@@ -333,75 +350,57 @@ Diff:
             requests_jsonl.append(req)
             self.stats["new_commits"] += 1
 
-        # Enqueue batch and poll until complete
-        batch_client = OpenAIBatchService()
-        batch = batch_client.enqueue_batch(requests_jsonl, completion_window="24h")
-        print(f"  📤 Enqueued batch {batch.get('id', 'unknown')} with {len(requests_jsonl)} requests")
-        batch = batch_client.poll_until_complete(batch.get("id"))
-        print(f"  📥 Batch completed with status: {batch.get('status') or batch.get('state')}")
-        results = batch_client.download_results(batch)
-
-        # Parse results and build analyses
+        # Submit (or resume) the batch job and stream results as they are read
         analyses: List[Dict] = []
-        for line in results:
-            try:
-                # Each line typically includes response with body
-                custom_id = line.get("custom_id") or line.get("id")
-                if not custom_id or not custom_id.startswith("hours-"):
-                    continue
-                sha = custom_id.split("hours-")[-1]
-                body = None
-                if isinstance(line.get("response"), dict):
-                    body = line["response"].get("body")
-                if not body:
-                    body = line.get("body")
-                content_text = None
-                if isinstance(body, dict):
-                    content_text = body.get("output_text")
-                    if not content_text and body.get("choices"):
-                        choices = body["choices"]
-                        if choices and isinstance(choices, list):
-                            content_text = choices[0].get("message", {}).get("content")
-                if not content_text and isinstance(line.get("output"), dict):
-                    content_text = line["output"].get("text")
-                if not content_text or sha not in sha_to_commitdata:
-                    continue
-                hours_result = json.loads(content_text)
-                cd = sha_to_commitdata[sha]
-                analysis = {
-                    "total_lines": hours_result.get("total_lines"),
-                    "total_files": hours_result.get("total_files"),
-                    "initial_anchor": hours_result.get("initial_anchor"),
-                    "major_change_checks": hours_result.get("major_change_checks", []),
-                    "simplicity_reduction_checks": hours_result.get("simplicity_reduction_checks", []),
-                    "final_anchor": hours_result.get("final_anchor"),
-                    "base_hours": hours_result.get("base_hours"),
-                    "multipliers_applied": hours_result.get("multipliers_applied"),
-                    "complexity_score": hours_result.get("complexity_score"),
-                    "estimated_hours": hours_result.get("estimated_hours"),
-                    "risk_level": hours_result.get("risk_level"),
-                    "seniority_score": hours_result.get("seniority_score"),
-                    "seniority_rationale": hours_result.get("seniority_rationale"),
-                    "key_changes": hours_result.get("key_changes"),
-                    # Metadata merge
-                    "analyzed_at": datetime.now().isoformat(),
-                    "commit_hash": cd.get("commit_hash"),
-                    "repository": cd.get("repository"),
-                    "model_used": model,
-                    "scoring_methods": ["hours_estimation"],
-                    # Merge original commit data
-                    "message": cd.get("message"),
-                    "commit_url": cd.get("commit_url"),
-                    "timestamp": cd.get("timestamp"),
-                    "additions": cd.get("additions"),
-                    "deletions": cd.get("deletions"),
-                    "files_changed": cd.get("files_changed"),
-                }
-                analyses.append(analysis)
-                self.stats["fresh_analyses"] += 1
-            except Exception as e:
-                print(f"    ❌ Failed to parse batch result line: {e}")
-                self.stats["failed_analyses"] += 1
+
+        async def handle_result(sha: str, line: Dict) -> None:
+            content_text = OpenAIBatchService.extract_response_text(line)
+            if not content_text or sha not in sha_to_commitdata:
+                return
+            hours_result = json.loads(content_text)
+            cd = sha_to_commitdata[sha]
+            analysis = {
+                "total_lines": hours_result.get("total_lines"),
+                "total_files": hours_result.get("total_files"),
+                "initial_anchor": hours_result.get("initial_anchor"),
+                "major_change_checks": hours_result.get("major_change_checks", []),
+                "simplicity_reduction_checks": hours_result.get("simplicity_reduction_checks", []),
+                "final_anchor": hours_result.get("final_anchor"),
+                "base_hours": hours_result.get("base_hours"),
+                "multipliers_applied": hours_result.get("multipliers_applied"),
+                "complexity_score": hours_result.get("complexity_score"),
+                "estimated_hours": hours_result.get("estimated_hours"),
+                "risk_level": hours_result.get("risk_level"),
+                "seniority_score": hours_result.get("seniority_score"),
+                "seniority_rationale": hours_result.get("seniority_rationale"),
+                "key_changes": hours_result.get("key_changes"),
+                # Metadata merge
+                "analyzed_at": datetime.now().isoformat(),
+                "commit_hash": cd.get("commit_hash"),
+                "repository": cd.get("repository"),
+                "model_used": model,
+                "scoring_methods": ["hours_estimation"],
+                # Merge original commit data
+                "message": cd.get("message"),
+                "commit_url": cd.get("commit_url"),
+                "timestamp": cd.get("timestamp"),
+                "additions": cd.get("additions"),
+                "deletions": cd.get("deletions"),
+                "files_changed": cd.get("files_changed"),
+            }
+            analyses.append(analysis)
+            self.stats["fresh_analyses"] += 1
+
+        orchestrator = create_batch_orchestrator()
+        job_name = f"seed-{repository}-{author_email}-{date.strftime('%Y-%m-%d')}"
+        items = [(req["custom_id"].split("hours-")[-1], req) for req in requests_jsonl]
+        try:
+            print(f"  📤 Submitting batch job {job_name} with {len(items)} requests")
+            summary = await orchestrator.run(job_name, items, handle_result)
+        finally:
+            orchestrator.store.close()
+        print(f"  📥 Batch job finished: {summary}")
+        self.stats["failed_analyses"] += summary["failed"]
 
         # Combine reused and new analyses
         for sha, commit in existing_commits_data.items():
@@ -462,13 +461,8 @@ Diff:
         Returns:
             Dict with analysis results in the expected format
         """
-        # Parse AI analysis notes if they exist
-        analysis_metadata = {}
-        if commit.ai_analysis_notes:
-            try:
-                analysis_metadata = json.loads(commit.ai_analysis_notes)
-            except json.JSONDecodeError:
-                analysis_metadata = {"raw_notes": commit.ai_analysis_notes}
+        # Typed impact columns plus the JSONB detail (or legacy stringified notes)
+        analysis_metadata = commit.analysis_details()
 
         # Build the analysis dictionary
         analysis = {
@@ -511,13 +505,9 @@ Diff:
         async with self.semaphore:  # Limit concurrent API calls
             sha = commit["sha"]
 
-            # Get commit details and diff
-            details = self.get_commit_details(repository, sha)
-            if not details:
-                return None
-
-            diff = self.get_commit_diff(repository, sha)
-            if not diff:
+            # Get commit details and diff (usually already prefetched)
+            details, diff = await self.fetch_commit(repository, sha)
+            if not details or not diff:
                 return None
 
             # Extract file information
@@ -667,7 +657,7 @@ Diff:
             owner, repo = repository.split("/")
             url = f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}"
 
-            response = self._make_github_request(url)
+            response = await self._github_get(url)
             if response.status_code != 200:
                 print(f"    ❌ Could not fetch commit details for filtering: {response.status_code}")
                 return None
@@ -892,7 +882,7 @@ Diff:
 
         for attempt in range(max_retries + 1):
             try:
-                response = requests.get(url, headers=headers, timeout=30)
+                response = self.github_session.get(url, headers=headers, timeout=30)
 
                 # Update rate limit info
                 if "X-RateLimit-Remaining" in response.headers:
@@ -925,93 +915,232 @@ Diff:
 
         return response
 
-    def get_branches(self, repository: str) -> List[str]:
-        """Get all branches for a repository."""
-        owner, repo = repository.split("/")
-        branches = []
-        page = 1
+    async def _github_get(
+        self, url: str, accept_header: str = "application/vnd.github.v3+json"
+    ) -> requests.Response:
+        """Run a GitHub request off the event loop, bounded by the GitHub concurrency limit."""
+        async with self.github_semaphore:
+            return await asyncio.to_thread(self._make_github_request, url, accept_header)
+
+    @staticmethod
+    def _last_page_from_link(link_header: Optional[str]) -> Optional[int]:
+        """Extract the page number of rel="last" from a GitHub Link header."""
+        if not link_header:
+            return None
+        for part in link_header.split(","):
+            if 'rel="last"' not in part:
+                continue
+            url = part.split(";")[0].strip().strip("<>")
+            page = parse_qs(urlparse(url).query).get("page")
+            if page:
+                return int(page[0])
+        return None
 
-        while True:
-            url = f"https://api.github.com/repos/{owner}/{repo}/branches?per_page=100&page={page}"
-            response = self._make_github_request(url)
+    async def _get_all_pages(self, url: str, label: str) -> List[dict]:
+        """Fetch every page of a paginated GitHub list endpoint.
 
+        The first page tells us the page count through the Link header, after
+        which the remaining pages are fetched concurrently. Results keep page order.
+        """
+        separator = "&" if "?" in url else "?"
+        first = await self._github_get(f"{url}{separator}per_page=100&page=1")
+        if first.status_code != 200:
+            print(f"⚠️  Failed to fetch {label}: {first.status_code}")
+            return []
+
+        items = list(first.json())
+        last_page = self._last_page_from_link(first.headers.get("Link"))
+        if not last_page or last_page < 2:
+            return items
+
+        async def fetch_page(page: int) -> List[dict]:
+            response = await self._github_get(f"{url}{separator}per_page=100&page={page}")
             if response.status_code != 200:
-                print(f"⚠️  Failed to fetch branches: {response.status_code}")
-                break
+                print(f"⚠️  Failed to fetch page {page} of {label}: {response.status_code}")
+                return []
+            return response.json()
 
-            page_branches = response.json()
-            if not page_branches:
-                break
+        pages = await asyncio.gather(*(fetch_page(page) for page in range(2, last_page + 1)))
+        for page_items in pages:
+            items.extend(page_items)
+        print(f"  📦 Fetched {last_page} pages of {label}: {len(items)} items")
+        return items
 
-            branches.extend([branch["name"] for branch in page_branches])
-            page += 1
+    async def get_branches(self, repository: str) -> List[str]:
+        """Get all branches for a repository."""
+        owner, repo = repository.split("/")
+        branches = await self._get_all_pages(f"https://api.github.com/repos/{owner}/{repo}/branches", "branches")
+        return [branch["name"] for branch in branches]
 
-        return branches
-    
-    def get_all_commits_fast(self, repository: str, since: datetime, until: datetime) -> List[dict]:
+    async def get_all_commits_fast(self, repository: str, since: datetime, until: datetime) -> List[dict]:
         """Get all commits from all branches in one go using the commits API."""
         owner, repo = repository.split("/")
-        all_commits = []
-        page = 1
-        
+
         # Format dates for GitHub API
         since_str = since.isoformat() + "Z"
         until_str = until.isoformat() + "Z"
-        
+
         print("⚡ Using fast commit fetching (all branches at once)...")
-        
-        while True:
-            # This endpoint returns commits from ALL branches
-            url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-            url += f"?since={since_str}&until={until_str}&per_page=100&page={page}"
-            
-            response = self._make_github_request(url)
-            
-            if response.status_code != 200:
-                if page == 1:
-                    print(f"⚠️  Failed to fetch commits: {response.status_code}")
-                break
-            
-            page_commits = response.json()
-            if not page_commits:
-                break
-            
-            all_commits.extend(page_commits)
-            print(f"  📦 Fetched page {page}: {len(page_commits)} commits (total: {len(all_commits)})")
-            page += 1
-            
-        return all_commits
 
-    def get_commits_for_branch(self, repository: str, branch: str, since: datetime, until: datetime) -> List[dict]:
+        # This endpoint returns commits from ALL branches
+        url = f"https://api.github.com/repos/{owner}/{repo}/commits?since={since_str}&until={until_str}"
+        return await self._get_all_pages(url, "commits")
+
+    async def get_commits_for_branch(
+        self, repository: str, branch: str, since: datetime, until: datetime
+    ) -> List[dict]:
         """Get all commits for a specific branch within the date range."""
         owner, repo = repository.split("/")
-        commits = []
-        page = 1
 
         # Format dates for GitHub API
         since_str = since.isoformat() + "Z"
         until_str = until.isoformat() + "Z"
 
-        while True:
-            url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-            url += f"?sha={branch}&since={since_str}&until={until_str}&per_page=100&page={page}"
-
-            response = self._make_github_request(url)
+        url = f"https://api.github.com/repos/{owner}/{repo}/commits?sha={branch}&since={since_str}&until={until_str}"
+        return await self._get_all_pages(url, f"commits for branch {branch}")
 
-            if response.status_code != 200:
-                print(f"⚠️  Failed to fetch commits for branch {branch}: {response.status_code}")
-                break
+    async def get_commits_for_branches(
+        self, repository: str, branches: List[str], since: datetime, until: datetime
+    ) -> List[dict]:
+        """Fetch several branches concurrently and deduplicate their commits by SHA."""
+        per_branch = await asyncio.gather(
+            *(self.get_commits_for_branch(repository, branch, since, until) for branch in branches)
+        )
+        all_commits = []
+        seen_shas = set()
+        for branch, commits in zip(branches, per_branch):
+            for commit in commits:
+                if commit["sha"] not in seen_shas:
+                    seen_shas.add(commit["sha"])
+                    all_commits.append(commit)
+            print(f"  📊 Branch {branch}: {len(commits)} commits ({len(all_commits)} unique total)")
+        return all_commits
 
-            page_commits = response.json()
-            if not page_commits:
-                break
+    @staticmethod
+    def _entry_from_mirror(diff_data: Dict) -> tuple:
+        """Convert a git mirror diff into the (details, diff) pair the REST path produces."""
+        details = {
+            "sha": diff_data["commit_hash"],
+            "html_url": diff_data.get("url", ""),
+            "author": None,
+            "files": diff_data.get("files", []),
+        }
+        diff = "\n".join(
+            f"diff --git a/{file['filename']} b/{file['filename']}\n{file.get('patch', '')}"
+            for file in diff_data.get("files", [])
+        )
+        return details, diff
 
-            commits.extend(page_commits)
-            page += 1
+    async def _fetch_commit_uncached(self, repository: str, sha: str) -> None:
+        if self.git_mirror is not None:
+            try:
+                diff_data = await asyncio.to_thread(self.git_mirror.get_commit_diff, repository, sha)
+                self._commit_cache[sha] = self._entry_from_mirror(diff_data)
+            except Exception as e:
+                print(f"⚠️  Failed to read commit {sha} from git mirror: {e}")
+                self._commit_cache[sha] = (None, None)
+            self._fetched_shas.add(sha)
+            return
+
+        details_response, diff_response = await asyncio.gather(
+            self._github_get(self._commit_url(repository, sha)),
+            self._github_get(self._commit_url(repository, sha), accept_header="application/vnd.github.v3.diff"),
+        )
+        details = details_response.json() if details_response.status_code == 200 else None
+        diff = diff_response.text if diff_response.status_code == 200 else None
+        if details is None:
+            print(f"⚠️  Failed to fetch details for commit {sha}: {details_response.status_code}")
+        if diff is None:
+            print(f"⚠️  Failed to fetch diff for commit {sha}: {diff_response.status_code}")
+        self._fetched_shas.add(sha)
+        self._commit_cache[sha] = (details, diff)
+
+    async def fetch_commit(self, repository: str, sha: str) -> tuple:
+        """Return (details, diff) for a commit, using a prefetched copy when available.
+
+        Entries are removed from the prefetch cache once consumed so a long
+        backfill does not keep every diff in memory.
+        """
+        if sha not in self._commit_cache:
+            await get_singleflight("seed_commit_fetch").do(
+                (repository, sha), self._fetch_commit_uncached, repository, sha
+            )
+        self._release_slot(sha)
+        return self._commit_cache.pop(sha, (None, None))
 
-            print(f"  📦 Fetched {len(page_commits)} commits from page {page} of branch {branch}")
+    def release_prefetched(self, shas: Iterable[str]) -> None:
+        """Drop prefetched commits analysis is done with, consumed or not (already stored, filtered, failed).
 
-        return commits
+        Their window slots are freed so prefetching keeps running ahead, and
+        fetches of these SHAs still in flight are discarded when they land.
+        """
+        for sha in shas:
+            self._released_shas.add(sha)
+            self._commit_cache.pop(sha, None)
+            self._release_slot(sha)
+
+    def _release_slot(self, sha: str) -> None:
+        if sha in self._prefetch_held:
+            self._prefetch_held.discard(sha)
+            self._prefetch_window.release()
+
+    async def prefetch_commits(self, repository: str, shas: List[str]) -> None:
+        """Fetch details and diffs ahead of analysis with bounded concurrency (deduplicated by SHA)."""
+        unique = [sha for sha in dict.fromkeys(shas) if sha not in self._fetched_shas]
+
+        async def prefetch(sha: str) -> None:
+            await self._prefetch_window.acquire()
+            held = False
+            try:
+                if sha not in self._fetched_shas and sha not in self._released_shas:
+                    await get_singleflight("seed_commit_fetch").do(
+                        (repository, sha), self._fetch_commit_uncached, repository, sha
+                    )
+                # Hold the window slot until analysis consumes the commit
+                if sha in self._released_shas:
+                    self._commit_cache.pop(sha, None)
+                elif sha in self._commit_cache:
+                    self._prefetch_held.add(sha)
+                    held = True
+            except Exception as e:
+                print(f"⚠️  Prefetch failed for commit {sha[:8]}: {e}")
+            finally:
+                if not held:
+                    self._prefetch_window.release()
+
+        await asyncio.gather(*(prefetch(sha) for sha in unique))
+
+    async def prefetch_commits_from_mirror(
+        self, repository: str, shas: List[str], since: datetime, until: datetime
+    ) -> None:
+        """Fill the prefetch cache from one streaming `git log --numstat -p` pass over the mirror."""
+        wanted = set(shas) - self._fetched_shas
+        loop = asyncio.get_running_loop()
+
+        async def store(diff_data: Dict) -> None:
+            await self._prefetch_window.acquire()
+            sha = diff_data["commit_hash"]
+            if sha in self._fetched_shas or sha in self._released_shas:
+                self._prefetch_window.release()
+                return
+            self._fetched_shas.add(sha)
+            self._commit_cache[sha] = self._entry_from_mirror(diff_data)
+            self._prefetch_held.add(sha)
+
+        def walk() -> None:
+            # Widen the window slightly: git filters on committer/author dates differently than the REST API
+            for diff_data in self.git_mirror.iter_commit_diffs(
+                repository, since=since - timedelta(days=1), until=until + timedelta(days=1)
+            ):
+                if diff_data["commit_hash"] in wanted:
+                    asyncio.run_coroutine_threadsafe(store(diff_data), loop).result()
+
+        await asyncio.to_thread(walk)
+
+    @staticmethod
+    def _commit_url(repository: str, sha: str) -> str:
+        owner, repo = repository.split("/")
+        return f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}"
 
     async def get_or_create_user(self, github_username: str, author_email: str, author_name: str) -> Optional[User]:
         """Get existing user by GitHub username or create a new one."""
@@ -1101,9 +1230,12 @@ Diff:
         # Extract metadata from first commit
         if commits:
             first_commit = commits[0]
-            details = self.get_commit_details(repository, first_commit["sha"])
-            if details and details.get("author"):
-                github_username = details["author"].get("login")
+            # The commit list already carries the GitHub author; avoid an extra details request
+            github_username = (first_commit.get("author") or {}).get("login")
+            if not github_username:
+                details = await asyncio.to_thread(self.get_commit_details, repository, first_commit["sha"])
+                if details and details.get("author"):
+                    github_username = details["author"].get("login")
             author_name = first_commit["commit"]["author"]["name"]
 
         # Check for existing commits if enabled - this is the key deduplication logic
@@ -1227,13 +1359,9 @@ Diff:
         for commit in commits:
             sha = commit["sha"]
 
-            # Get commit details and diff
-            details = self.get_commit_details(repository, sha)
-            if not details:
-                continue
-
-            diff = self.get_commit_diff(repository, sha)
-            if not diff:
+            # Get commit details and diff (usually already prefetched)
+            details, diff = await self.fetch_commit(repository, sha)
+            if not details or not diff:
                 continue
 
             # Extract GitHub username from author data
@@ -1351,33 +1479,19 @@ Diff:
 
         # Get commits - use fast method for all branches when possible
         if branches:
-            # Specific branches requested - use old method
-            branches_to_analyze = branches
-            all_commits = []
-            seen_shas = set()
-            
-            for branch in branches_to_analyze:
-                print(f"\n🔍 Fetching commits from branch: {branch}")
-                commits = self.get_commits_for_branch(repository, branch, since, until)
-                
-                # Deduplicate commits
-                for commit in commits:
-                    sha = commit["sha"]
-                    if sha not in seen_shas:
-                        seen_shas.add(sha)
-                        all_commits.append(commit)
-                
-                print(f"  📊 Found {len(commits)} commits ({len(all_commits)} unique total)")
+            # Specific branches requested - fetch them concurrently and deduplicate by SHA
+            print(f"\n🔍 Fetching commits from branches: {', '.join(branches)}")
+            all_commits = await self.get_commits_for_branches(repository, branches, since, until)
         elif single_branch:
             # Just use the default branch
             print(f"\n🔍 Fetching commits from main branch only...")
-            all_commits = self.get_commits_for_branch(repository, "main", since, until)
+            all_commits = await self.get_commits_for_branch(repository, "main", since, until)
             if not all_commits:  # Fallback to master if main doesn't exist
                 print("  ⚠️  'main' branch not found, trying 'master'...")
-                all_commits = self.get_commits_for_branch(repository, "master", since, until)
+                all_commits = await self.get_commits_for_branch(repository, "master", since, until)
         else:
             # Fast method - get all commits from all branches at once
-            all_commits = self.get_all_commits_fast(repository, since, until)
+            all_commits = await self.get_all_commits_fast(repository, since, until)
 
         # Update total commits statistic
         self.stats["total_commits"] = len(all_commits)
@@ -1395,6 +1509,24 @@ Diff:
         print(f"\n📊 Found {len(commits_by_author_date)} unique authors")
         print(f"📊 Total unique commits: {len(all_commits)}")
 
+        # Pipeline GitHub detail/diff fetches ahead of analysis, in the order commits will be analyzed
+        ordered_shas = [
+            commit["sha"]
+            for dates in commits_by_author_date.values()
+            for _, day_commits in sorted(dates.items())
+            for commit in day_commits
+        ]
+        if self.check_existing and not self.enable_daily_analysis and ordered_shas:
+            # Existing commits reuse their stored analysis, so their diffs are never needed
+            existing = set(await self.commit_repo.get_existing_commit_hashes(ordered_shas))
+            ordered_shas = [sha for sha in ordered_shas if sha not in existing]
+        if self.git_mirror is not None:
+            prefetch_task = asyncio.create_task(
+                self.prefetch_commits_from_mirror(repository, ordered_shas, since, until)
+            )
+        else:
+            prefetch_task = asyncio.create_task(self.prefetch_commits(repository, ordered_shas))
+
         # Analyze commits grouped by author and date
         results = {
             "repository": repository,
@@ -1415,7 +1547,11 @@ Diff:
 
             for date, commits in sorted(dates.items()):
                 day_datetime = datetime.combine(date, datetime.min.time()).replace(tzinfo=timezone.utc)
-                day_analysis = await self.analyze_commits_for_day(repository, author_email, day_datetime, commits)
+                try:
+                    day_analysis = await self.analyze_commits_for_day(repository, author_email, day_datetime, commits)
+                finally:
+                    # Commits skipped as stored or filtered, or failed, are never consumed from the cache
+                    self.release_prefetched(commit["sha"] for commit in commits)
 
                 results["summary"]["daily_summaries"].append(day_analysis)
                 results["summary"]["total_hours"] += day_analysis["total_hours"]
@@ -1427,6 +1563,11 @@ Diff:
                 if not dry_run and day_analysis["analyzed_commits"] > 0:
                     await self.store_daily_analysis(repository, day_analysis)
 
+        prefetch_task.cancel()
+        # Fetches still in flight (or a mirror walk still running) release their slots as they land
+        self.release_prefetched(ordered_shas)
+        self._commit_cache.clear()
+
         # Sort daily summaries by date
         results["summary"]["daily_summaries"].sort(key=lambda x: x["date"])
         results["summary"]["total_hours"] = round(results["summary"]["total_hours"], 1)
@@ -1585,6 +1726,7 @@ Diff:
                 "base_hours": analysis.get("base_hours"),
                 "multipliers_applied": analysis.get("multipliers_applied"),
                 # NEW: Impact scoring data
+                "impact_score": analysis.get("impact_score"),
                 "impact_business_value": analysis.get("impact_business_value"),
                 "impact_technical_complexity": analysis.get("impact_technical_complexity"),
                 "impact_code_quality_points": analysis.get("impact_code_quality_points"),
@@ -1596,7 +1738,7 @@ Diff:
                 "impact_classification": analysis.get("impact_classification"),
                 "impact_calculation_breakdown": analysis.get("impact_calculation_breakdown"),
                 # Metadata
-                "analysis_version": "2.0",
+                "analysis_version": ANALYSIS_VERSION,
                 "scoring_methods": analysis.get("scoring_methods", ["hours_estimation", "impact_points"]),
             }
 
@@ -1621,7 +1763,7 @@ Diff:
                 ai_estimated_hours=Decimal(str(analysis["estimated_hours"])),  # Convert to Decimal
                 risk_level=analysis["risk_level"],
                 seniority_score=int(float(analysis["seniority_score"])),  # Convert to int
-                ai_analysis_notes=json.dumps(analysis_metadata),  # Store all metadata as JSON
+                **split_analysis_payload(analysis_metadata),  # Typed impact columns + JSONB detail
                 code_quality_analysis=analysis_metadata,
                 lines_added=analysis.get("additions", 0),
                 lines_deleted=analysis.get("deletions", 0),
@@ -1672,6 +1814,24 @@ async def main():
         default=5,
         help="Maximum concurrent API calls (default: 5, increase for faster processing)",
     )
+    parser.add_argument(
+        "--diff-source",
+        choices=["github", "git_mirror"],
+        default="github",
+        help="Where to read commit details and diffs from: GitHub REST API or a local bare mirror",
+    )
+    parser.add_argument(
+        "--git-mirror-root",
+        type=str,
+        default=None,
+        help="Directory holding local bare mirrors (default: GIT_MIRROR_ROOT setting)",
+    )
+    parser.add_argument(
+        "--github-concurrency",
+        type=int,
+        default=8,
+        help="Maximum concurrent GitHub requests for commit discovery and diff fetching (default: 8)",
+    )
     parser.add_argument(
         "--use-openai-batch",
         action="store_true",
@@ -1712,6 +1872,12 @@ async def main():
         max_concurrent=args.max_concurrent,
         check_existing=args.check_existing,
         use_openai_batch=args.use_openai_batch,
+        github_concurrency=args.github_concurrency,
+        git_mirror=(
+            GitMirrorDiffProvider(args.git_mirror_root or settings.GIT_MIRROR_ROOT, token=github_token)
+            if args.diff_source == "git_mirror"
+            else None
+        ),
     )
 
     # Set analysis granularity and scoring method
@@ -0,0 +1,29 @@
+-- Migration to promote commonly read commit analysis fields to typed columns
+-- and keep the remaining analysis detail as JSONB instead of stringified text.
+-- Existing rows are filled in batches by scripts/backfill_commit_analysis_columns.py.
+
+-- Add typed analysis columns (nullable, so this is a metadata-only change)
+ALTER TABLE public.commits
+ADD COLUMN IF NOT EXISTS impact_score real,
+ADD COLUMN IF NOT EXISTS business_value smallint,
+ADD COLUMN IF NOT EXISTS impact_category character varying,
+ADD COLUMN IF NOT EXISTS analysis_version character varying,
+ADD COLUMN IF NOT EXISTS ai_analysis jsonb;
+
+-- Reporting queries filter by category and time range
+CREATE INDEX IF NOT EXISTS idx_commits_impact_category_timestamp
+ON public.commits USING btree (impact_category, commit_timestamp)
+WHERE impact_category IS NOT NULL;
+
+-- Rows still waiting for the backfill (dropped once the backfill has finished)
+CREATE INDEX IF NOT EXISTS idx_commits_analysis_backfill_pending
+ON public.commits USING btree (id)
+WHERE ai_analysis IS NULL AND ai_analysis_notes IS NOT NULL;
+
+-- Add comments for new columns
+COMMENT ON COLUMN public.commits.impact_score IS 'Final calculated impact score from the AI analysis';
+COMMENT ON COLUMN public.commits.business_value IS 'AI-rated business value score (1-10)';
+COMMENT ON COLUMN public.commits.impact_category IS 'Dominant impact category (capability, improvement, fix, foundation, maintenance)';
+COMMENT ON COLUMN public.commits.analysis_version IS 'Version of the analysis that produced the stored scores';
+COMMENT ON COLUMN public.commits.ai_analysis IS 'AI analysis detail not covered by a typed column';
+COMMENT ON COLUMN public.commits.ai_analysis_notes IS 'Legacy stringified AI analysis; superseded by ai_analysis';
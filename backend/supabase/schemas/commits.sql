@@ -18,7 +18,12 @@ CREATE TABLE public.commits (
     lines_added integer,
     lines_deleted integer,
     changed_files jsonb, -- Use jsonb for better performance/indexing
-    ai_analysis_notes text,
+    ai_analysis_notes text, -- Legacy; superseded by ai_analysis
+    ai_analysis jsonb,
+    impact_score real,
+    business_value smallint,
+    impact_category character varying,
+    analysis_version character varying,
     complexity_score integer,
     risk_level character varying,
     risk_factor real,
@@ -33,6 +38,7 @@ CREATE TABLE public.commits (
 CREATE INDEX idx_commits_commit_hash ON public.commits USING btree (commit_hash);
 CREATE INDEX idx_commits_commit_timestamp ON public.commits USING btree (commit_timestamp);
 CREATE INDEX idx_commits_author_id ON public.commits USING btree (author_id);
+CREATE INDEX idx_commits_impact_category_timestamp ON public.commits USING btree (impact_category, commit_timestamp) WHERE impact_category IS NOT NULL;
 
 -- Add RLS (Row Level Security)
 ALTER TABLE public.commits ENABLE ROW LEVEL SECURITY;
@@ -108,7 +114,12 @@ COMMENT ON COLUMN public.commits.updated_at IS 'Timestamp when the record was la
 COMMENT ON COLUMN public.commits.lines_added IS 'Number of lines added in the commit';
 COMMENT ON COLUMN public.commits.lines_deleted IS 'Number of lines deleted in the commit';
 COMMENT ON COLUMN public.commits.changed_files IS 'JSON array of file paths changed in the commit';
-COMMENT ON COLUMN public.commits.ai_analysis_notes IS 'Text notes from the AI analysis of the commit';
+COMMENT ON COLUMN public.commits.ai_analysis_notes IS 'Legacy stringified AI analysis; superseded by ai_analysis';
+COMMENT ON COLUMN public.commits.ai_analysis IS 'AI analysis detail not covered by a typed column';
+COMMENT ON COLUMN public.commits.impact_score IS 'Final calculated impact score from the AI analysis';
+COMMENT ON COLUMN public.commits.business_value IS 'AI-rated business value score (1-10)';
+COMMENT ON COLUMN public.commits.impact_category IS 'Dominant impact category (capability, improvement, fix, foundation, maintenance)';
+COMMENT ON COLUMN public.commits.analysis_version IS 'Version of the analysis that produced the stored scores';
 COMMENT ON COLUMN public.commits.complexity_score IS 'AI-rated complexity score (e.g., 1-10)';
 COMMENT ON COLUMN public.commits.risk_level IS 'AI-assessed risk level (e.g., low, medium, high)';
 COMMENT ON COLUMN public.commits.risk_factor IS 'Multiplier based on risk level (e.g., 1.0, 1.5, 2.0)';
@@ -220,4 +220,77 @@ CREATE TRIGGER raci_roles_updated_at
 DROP TRIGGER IF EXISTS raci_assignments_updated_at ON public.raci_assignments;
 CREATE TRIGGER raci_assignments_updated_at
   BEFORE UPDATE ON public.raci_assignments
-  FOR EACH ROW EXECUTE FUNCTION public.set_updated_at(); 
\ No newline at end of file
+  FOR EACH ROW EXECUTE FUNCTION public.set_updated_at(); 
+
+-- Transactional save of a matrix and its rows (see migrations/20251019_raci_matrix_save_rpc.sql)
+CREATE OR REPLACE FUNCTION public.save_raci_matrix(
+    p_matrix jsonb,
+    p_matrix_id uuid DEFAULT NULL,
+    p_activities jsonb DEFAULT NULL,
+    p_roles jsonb DEFAULT NULL,
+    p_assignments jsonb DEFAULT NULL
+)
+RETURNS uuid
+LANGUAGE plpgsql
+SECURITY INVOKER
+AS $$
+DECLARE
+    v_matrix_id uuid := p_matrix_id;
+BEGIN
+    IF v_matrix_id IS NULL THEN
+        INSERT INTO public.raci_matrices (name, description, matrix_type, metadata, created_by)
+        VALUES (
+            p_matrix->>'name',
+            p_matrix->>'description',
+            COALESCE((p_matrix->>'matrix_type')::raci_matrix_type, 'custom'),
+            COALESCE(p_matrix->'metadata', '{}'::jsonb),
+            (p_matrix->>'created_by')::uuid
+        )
+        RETURNING id INTO v_matrix_id;
+    ELSE
+        -- Only keys present in p_matrix are changed
+        UPDATE public.raci_matrices
+        SET name = CASE WHEN p_matrix ? 'name' THEN p_matrix->>'name' ELSE name END,
+            description = CASE WHEN p_matrix ? 'description' THEN p_matrix->>'description' ELSE description END,
+            metadata = CASE WHEN p_matrix ? 'metadata' THEN p_matrix->'metadata' ELSE metadata END,
+            is_active = CASE WHEN p_matrix ? 'is_active' THEN (p_matrix->>'is_active')::boolean ELSE is_active END,
+            updated_at = NOW()
+        WHERE id = v_matrix_id;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'RACI matrix % not found', v_matrix_id USING ERRCODE = 'P0002';
+        END IF;
+    END IF;
+
+    -- A NULL section is left untouched; an array (even empty) replaces the stored rows.
+    -- Deleting activities or roles cascades to the assignments that reference them.
+    IF p_assignments IS NOT NULL THEN
+        DELETE FROM public.raci_assignments WHERE matrix_id = v_matrix_id;
+    END IF;
+    IF p_activities IS NOT NULL THEN
+        DELETE FROM public.raci_activities WHERE matrix_id = v_matrix_id;
+        INSERT INTO public.raci_activities (matrix_id, activity_id, name, description, order_index)
+        SELECT v_matrix_id, a.activity_id, a.name, a.description, COALESCE(a.order_index, 0)
+        FROM jsonb_to_recordset(p_activities) AS a(activity_id text, name text, description text, order_index integer);
+    END IF;
+    IF p_roles IS NOT NULL THEN
+        DELETE FROM public.raci_roles WHERE matrix_id = v_matrix_id;
+        INSERT INTO public.raci_roles (matrix_id, role_id, name, title, user_id, is_person, order_index)
+        SELECT v_matrix_id, r.role_id, r.name, r.title, r.user_id, COALESCE(r.is_person, FALSE), COALESCE(r.order_index, 0)
+        FROM jsonb_to_recordset(p_roles)
+            AS r(role_id text, name text, title text, user_id uuid, is_person boolean, order_index integer);
+    END IF;
+    IF p_assignments IS NOT NULL THEN
+        INSERT INTO public.raci_assignments (matrix_id, activity_id, role_id, role, notes)
+        SELECT v_matrix_id, s.activity_id, s.role_id, s.role::raci_role_type, s.notes
+        FROM jsonb_to_recordset(p_assignments) AS s(activity_id text, role_id text, role text, notes text);
+    END IF;
+
+    RETURN v_matrix_id;
+END;
+$$;
+
+COMMENT ON FUNCTION public.save_raci_matrix IS 'Create (p_matrix_id NULL) or update a RACI matrix and replace the given activity, role and assignment sets atomically';
+
+GRANT EXECUTE ON FUNCTION public.save_raci_matrix TO authenticated;
+GRANT EXECUTE ON FUNCTION public.save_raci_matrix TO service_role;
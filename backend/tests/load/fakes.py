@@ -0,0 +1,432 @@
+"""
+Local fakes of the services the commit pipeline calls, for load tests.
+
+``UpstreamFakes`` serves all three from one FastAPI app (run it with
+``LLMStubServer`` in a background thread), each under its own prefix and
+each with its own ``LatencyModel``:
+
+- ``/github``: GitHub REST ``GET /repos/{owner}/{repo}/commits/{sha}`` with
+  synthetic files and patches derived from the SHA
+- ``/supabase``: an in-memory PostgREST (``/rest/v1/{table}``) covering the
+  filters, upserts, updates and single-object reads the repositories use
+- ``/openai``: the record/replay stub from ``app.integrations.llm_replay``,
+  answering every commit prompt with a synthesized hours + impact analysis
+"""
+
+import asyncio
+import fnmatch
+import hashlib
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.integrations.llm_replay import Cassette, LatencyModel, create_stub_app
+
+# A JWT-shaped key; the fake does not check it
+FAKE_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.load-test"
+
+# Columns that reject duplicates, besides the primary key (supabase/schemas)
+UNIQUE_COLUMNS = {"commits": ("commit_hash",), "users": ("slack_id",)}
+
+_SOURCE_DIRS = ("app/api", "app/services", "app/repositories", "app/integrations", "frontend/src/components")
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def synthetic_commit(owner: str, repo: str, sha: str) -> Dict[str, Any]:
+    """GitHub's commit resource for ``sha``: 1-8 source files with small, model-worthy patches."""
+    rng = random.Random(sha)
+    files = []
+    for index in range(rng.randint(1, 8)):
+        added = rng.randint(4, 120)
+        removed = rng.randint(0, added // 2)
+        name = f"{rng.choice(_SOURCE_DIRS)}/module_{sha[:4]}_{index}.py"
+        lines = [f"@@ -{index * 10 + 1},{removed} +{index * 10 + 1},{added} @@ class Handler{index}:"]
+        lines += [f"-    legacy_value_{line} = compute_{line}(payload)" for line in range(removed)]
+        lines += [f"+    value_{line} = await compute_{line}(payload, retries={line % 3})" for line in range(added)]
+        files.append(
+            {
+                "filename": name,
+                "status": "modified",
+                "additions": added,
+                "deletions": removed,
+                "changes": added + removed,
+                "patch": "\n".join(lines),
+            }
+        )
+    author = {"name": f"Developer {sha[:6]}", "email": f"dev-{sha[:6]}@example.com", "date": _now()}
+    return {
+        "sha": sha,
+        "html_url": f"https://github.com/{owner}/{repo}/commit/{sha}",
+        "commit": {
+            "author": author,
+            "committer": author,
+            "message": f"Update handlers for {sha[:7]}",
+            "verification": {"verified": False, "reason": "unsigned", "signature": None, "payload": None},
+        },
+        "author": None,
+        "committer": None,
+        "stats": {
+            "additions": sum(f["additions"] for f in files),
+            "deletions": sum(f["deletions"] for f in files),
+            "total": sum(f["changes"] for f in files),
+        },
+        "files": files,
+    }
+
+
+def create_github_app(latency: LatencyModel) -> FastAPI:
+    """GitHub REST fake serving synthetic commits for any repository and SHA."""
+    app = FastAPI(title="GitHub fake")
+    app.state.stats = Counter()
+
+    @app.get("/repos/{owner}/{repo}/commits/{sha}")
+    async def get_commit(owner: str, repo: str, sha: str) -> Dict[str, Any]:
+        app.state.stats["requests"] += 1
+        await asyncio.sleep(latency.sample())
+        return synthetic_commit(owner, repo, sha)
+
+    return app
+
+
+def synthetic_analysis(endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A chat completions or responses API answer that satisfies every commit prompt.
+
+    The JSON carries the hours fields and the impact dimensions at the top
+    level (split mode reads each from its own call) and again under
+    ``hours``/``impact`` (the fused schema). Token usage scales with the
+    request size so gateway cost metrics stay meaningful.
+    """
+    rng = random.Random(len(json.dumps(body)))
+    hours = {
+        "total_lines": rng.randint(10, 400),
+        "total_files": rng.randint(1, 8),
+        "initial_anchor": "C",
+        "major_change_checks": [],
+        "simplicity_reduction_checks": [],
+        "final_anchor": "C",
+        "base_hours": 4.0,
+        "multipliers_applied": [],
+        "complexity_score": rng.randint(3, 7),
+        "estimated_hours": round(rng.uniform(1.0, 8.0), 1),
+        "risk_level": rng.choice(["low", "medium"]),
+        "seniority_score": rng.randint(4, 8),
+        "seniority_rationale": "Synthesized by the load-test fake",
+        "key_changes": ["Updated request handlers"],
+    }
+    impact = {
+        "classification": {"primary_category": "feature"},
+        "business_value": {"score": rng.randint(2, 8), "evidence": "synthetic"},
+        "technical_complexity": {"score": rng.randint(2, 8), "evidence": "synthetic"},
+        "code_quality_points": {"score": rng.randint(0, 3), "checklist": []},
+        "risk_penalty": {"score": rng.randint(0, 2), "reasoning": "synthetic"},
+        "calculation_breakdown": "synthetic",
+    }
+    text = json.dumps({**hours, **impact, "hours": hours, "impact": impact})
+    input_tokens, output_tokens = len(json.dumps(body)) // 4, len(text) // 4
+    model = body.get("model", "")
+    if endpoint == "responses":
+        return {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }
+            ],
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _text(value: Any) -> str:
+    """A stored value as PostgREST compares it in filters."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _ordered(left: Any, right: str) -> Tuple[Any, Any]:
+    try:
+        return float(left), float(right)
+    except (TypeError, ValueError):
+        return _text(left), right
+
+
+def _in_values(value: str) -> List[str]:
+    return [item.strip().strip('"') for item in value.strip("()").split(",") if item.strip()]
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    operator, _, value = expression.partition(".")
+    current = row.get(column)
+    if operator == "eq":
+        result = _text(current) == value
+    elif operator == "neq":
+        result = _text(current) != value
+    elif operator in ("gt", "gte", "lt", "lte"):
+        if current is None:
+            result = False
+        else:
+            left, right = _ordered(current, value)
+            result = {"gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right}[operator]
+    elif operator == "in":
+        result = _text(current) in _in_values(value)
+    elif operator == "is":
+        result = _text(current) == value
+    elif operator in ("like", "ilike"):
+        pattern, candidate = value.replace("%", "*"), _text(current)
+        if operator == "ilike":
+            pattern, candidate = pattern.lower(), candidate.lower()
+        result = fnmatch.fnmatchcase(candidate, pattern)
+    else:
+        raise ValueError(f"operator {operator} is not supported by the PostgREST fake")
+    return result != negate
+
+
+def _project(row: Dict[str, Any], select: Optional[str]) -> Dict[str, Any]:
+    if not select or select.strip() == "*":
+        return dict(row)
+    projected = {}
+    for column in select.split(","):
+        column = column.strip()
+        if column == "*":
+            projected.update(row)
+        elif column and "(" not in column:
+            alias, _, name = column.rpartition(":")
+            projected[alias or name] = row.get(name)
+    return projected
+
+
+def _postgrest_error(status: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse({"code": code, "message": message, "details": None, "hint": None}, status_code=status)
+
+
+class FakePostgrest:
+    """
+    In-memory tables behind a PostgREST-compatible API.
+
+    Rows keep whatever columns the client sends; ``id`` and the timestamp
+    columns are filled in on insert like the database defaults would.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.stats: Counter = Counter()
+        # Database functions the repositories call through rpc()
+        self.functions: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = {
+            "get_daily_report_by_user_date": self._daily_report_by_user_date,
+        }
+
+    def seed(self, table: str, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._insert(table, dict(row))
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        return self.tables.get(table, [])
+
+    def _insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", _now())
+        row.setdefault("updated_at", row["created_at"])
+        self.tables.setdefault(table, []).append(row)
+        return row
+
+    def _find_conflict(self, table: str, row: Dict[str, Any], columns: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        for existing in self.tables.get(table, []):
+            if all(row.get(column) is not None and existing.get(column) == row.get(column) for column in columns):
+                return existing
+        return None
+
+    def _filtered(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        rows = self.tables.get(table, [])
+        for column, expression in params:
+            if column not in _RESERVED_PARAMS:
+                rows = [row for row in rows if _matches(row, column, expression)]
+        return rows
+
+    def _daily_report_by_user_date(self, args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            row
+            for row in self.rows("daily_reports")
+            if str(row.get("user_id")) == args.get("p_user_id")
+            and str(row.get("report_date", "")).startswith(args.get("p_date", ""))
+        ]
+
+    def create_app(self) -> FastAPI:
+        app = FastAPI(title="PostgREST fake")
+        app.state.stats = self.stats
+
+        @app.post("/rest/v1/rpc/{function}")
+        async def call(function: str, request: Request) -> Response:
+            self.stats[f"RPC {function}"] += 1
+            self.stats["requests"] += 1
+            await asyncio.sleep(self.latency.sample())
+            if function not in self.functions:
+                return _postgrest_error(404, "PGRST202", f"Could not find the function public.{function}")
+            return JSONResponse(self.functions[function](await request.json()))
+
+        @app.api_route("/rest/v1/{table}", methods=["GET", "HEAD", "POST", "PATCH", "DELETE"])
+        async def handle(table: str, request: Request) -> Response:
+            self.stats[f"{request.method} {table}"] += 1
+            self.stats["requests"] += 1
+            await asyncio.sleep(self.latency.sample())
+            params = list(request.query_params.multi_items())
+            query = dict(params)
+            prefer = request.headers.get("prefer", "")
+            try:
+                if request.method in ("GET", "HEAD"):
+                    rows = self._select(table, params, query)
+                elif request.method == "POST":
+                    rows = self._write(table, await request.json(), query, prefer)
+                    if rows is None:
+                        return _postgrest_error(409, "23505", "duplicate key value violates unique constraint")
+                elif request.method == "PATCH":
+                    changes = await request.json()
+                    rows = self._filtered(table, params)
+                    for row in rows:
+                        row.update(changes, updated_at=changes.get("updated_at", _now()))
+                else:
+                    rows = self._filtered(table, params)
+                    doomed = {id(row) for row in rows}
+                    self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in doomed]
+            except ValueError as e:
+                return _postgrest_error(400, "PGRST100", str(e))
+
+            total = len(rows)
+            rows = [_project(row, query.get("select")) for row in rows]
+            headers = {"content-range": f"0-{max(total - 1, 0)}/{total if 'count=' in prefer else '*'}"}
+            if "vnd.pgrst.object" in request.headers.get("accept", ""):
+                if len(rows) != 1:
+                    return _postgrest_error(406, "PGRST116", f"The result contains {len(rows)} rows")
+                return JSONResponse(rows[0], headers=headers)
+            if request.method != "GET" and "return=representation" not in prefer:
+                return Response(status_code=201 if request.method == "POST" else 204, headers=headers)
+            status = 201 if request.method == "POST" else 200
+            return JSONResponse(rows, status_code=status, headers=headers)
+
+        return app
+
+    def _select(self, table: str, params: List[Tuple[str, str]], query: Dict[str, str]) -> List[Dict[str, Any]]:
+        rows = self._filtered(table, params)
+        for order in reversed([part for part in query.get("order", "").split(",") if part]):
+            column, _, direction = order.partition(".")
+            rows = sorted(rows, key=lambda row: (row.get(column) is None, _text(row.get(column))))
+            if direction.startswith("desc"):
+                rows.reverse()
+        offset = int(query.get("offset", 0))
+        limit = query.get("limit")
+        return rows[offset : offset + int(limit)] if limit is not None else rows[offset:]
+
+    def _write(self, table: str, payload: Any, query: Dict[str, str], prefer: str) -> Optional[List[Dict[str, Any]]]:
+        upsert = "resolution=merge-duplicates" in prefer
+        ignore = "resolution=ignore-duplicates" in prefer
+        conflict_columns = tuple(query.get("on_conflict", "id").split(","))
+        written = []
+        for row in payload if isinstance(payload, list) else [payload]:
+            row = dict(row)
+            existing = self._find_conflict(table, row, conflict_columns)
+            if existing is not None and (upsert or ignore):
+                if upsert:
+                    existing.update(row, updated_at=row.get("updated_at", _now()))
+                written.append(existing)
+                continue
+            unique = [("id",)] + [(column,) for column in UNIQUE_COLUMNS.get(table, ())]
+            if existing is not None or any(self._find_conflict(table, row, columns) for columns in unique):
+                return None
+            written.append(self._insert(table, row))
+        return written
+
+
+class UpstreamFakes:
+    """The GitHub, Supabase and OpenAI fakes mounted on one app, with their URLs and counters."""
+
+    def __init__(
+        self,
+        github_latency: Optional[LatencyModel] = None,
+        supabase_latency: Optional[LatencyModel] = None,
+        openai_latency: Optional[LatencyModel] = None,
+    ):
+        self.postgrest = FakePostgrest(supabase_latency or LatencyModel())
+        self.github_app = create_github_app(github_latency or LatencyModel())
+        self.openai_app = create_stub_app(Cassette(), latency=openai_latency, responder=synthetic_analysis)
+        self.app = FastAPI(title="Pipeline upstream fakes")
+        self.app.mount("/github", self.github_app)
+        self.app.mount("/supabase", self.postgrest.create_app())
+        self.app.mount("/openai", self.openai_app)
+
+    def urls(self, base_url: str) -> Dict[str, str]:
+        """Settings values for a server whose ``base_url`` ends in ``/v1`` (``LLMStubServer.base_url``)."""
+        root = base_url.rsplit("/v1", 1)[0]
+        return {
+            "GITHUB_API_URL": f"{root}/github",
+            "SUPABASE_URL": f"{root}/supabase",
+            "OPENAI_BASE_URL": f"{root}/openai/v1",
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "github_requests": self.github_app.state.stats["requests"],
+            "supabase_requests": self.postgrest.stats["requests"],
+            "openai_requests": self.openai_app.state.stats["requests"],
+            "openai_rate_limited": self.openai_app.state.stats["rate_limited"],
+        }
+
+
+def developer_rows(count: int) -> List[Dict[str, Any]]:
+    """Registered users the synthetic pushes are authored by."""
+    return [
+        {
+            "id": str(uuid.UUID(hashlib.md5(f"developer-{index}".encode()).hexdigest())),
+            "name": f"Developer {index}",
+            "email": f"developer{index}@example.com",
+            "github_username": f"developer{index}",
+            "role": "employee",
+            "is_active": True,
+        }
+        for index in range(count)
+    ]
@@ -0,0 +1,512 @@
+"""
+End-to-end load test of the commit pipeline.
+
+Drives ``POST /api/v1/webhooks/github`` -> ``GitHubWebhookHandler.process_event``
+-> ``CommitAnalysisService.process_commit`` -> ``CommitRepository.save_commit``
+in-process through httpx's ASGI transport, with GitHub, Supabase and OpenAI
+replaced by the fakes in ``tests.load.fakes``. Pushes arrive open-loop at the
+profile's rate and latency is measured from each push's scheduled arrival,
+so a stalled event loop shows up as latency instead of as a lower offered
+load.
+
+A report covers sustained throughput (commits persisted per second), push
+latency percentiles, event-loop lag (how late a 10 ms timer fires), RSS and
+Python object growth, upstream request counts, gateway token usage and,
+optionally, the callbacks that blocked the loop (``app.core.loop_blocking``).
+
+Baselines are reports saved as JSON under ``tests/load/baselines``, usually
+the ``median_report`` of a few runs; ``compare_reports`` lists the metrics
+that moved past a relative tolerance.
+
+Usage:
+    report = await run_load(PROFILES["steady"])
+    regressions = [c for c in compare_reports(report, load_baseline("steady")) if c.regressed]
+"""
+
+import asyncio
+import copy
+import gc
+import hashlib
+import hmac
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+
+from app.config.settings import settings
+from app.core.loop_blocking import detect_blocking
+from app.integrations.llm_replay import LatencyModel, LLMStubServer, usage_totals
+from tests.load.fakes import FAKE_SUPABASE_KEY, UpstreamFakes, developer_rows
+
+WEBHOOK_PATH = "/api/v1/webhooks/github"
+WEBHOOK_SECRET = "load-test-webhook-secret"
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Metric -> (direction, smallest absolute change that counts, tolerance multiplier); +1 when higher is better.
+# Tails of a short run hinge on a few slow pushes, so they get a wider band than throughput and medians
+COMPARED_METRICS: Dict[str, Tuple[int, float, float]] = {
+    "throughput.commits_per_second": (1, 0.0, 1.0),
+    "latency_ms.p50": (-1, 25.0, 1.0),
+    "latency_ms.p99": (-1, 50.0, 3.0),
+    "loop_lag_ms.p99": (-1, 10.0, 3.0),
+    "loop_lag_ms.max": (-1, 50.0, 3.0),
+    "memory.rss_growth_mb": (-1, 25.0, 1.0),
+}
+# Failure counts: any increase regresses, and combined runs keep the worst one
+ERROR_METRICS = ("pushes.errors", "commits.failed")
+
+
+@dataclass
+class LoadProfile:
+    """Offered load, push shape and upstream latencies of one run (latency specs as in ``LatencyModel.parse``)."""
+
+    name: str
+    rate: float  # pushes per second
+    duration: float  # seconds of arrivals
+    commits_per_push: int
+    developers: int = 8
+    github_latency: str = "lognormal:150,0.4"
+    supabase_latency: str = "lognormal:12,0.5"
+    openai_latency: str = "lognormal:2500,0.5"
+    analysis_mode: str = "split"
+    model: str = "gpt-5-2025-08-07"
+    seed: int = 1
+
+    @property
+    def pushes(self) -> int:
+        return max(1, round(self.rate * self.duration))
+
+
+PROFILES: Dict[str, LoadProfile] = {
+    # Seconds-long run with near-zero upstream latency: pipeline overhead only
+    "smoke": LoadProfile(
+        "smoke",
+        rate=4,
+        duration=2,
+        commits_per_push=3,
+        github_latency="fixed:5",
+        supabase_latency="fixed:1",
+        openai_latency="fixed:20",
+    ),
+    # Sustainable load: about 10 OpenAI calls in flight against a limit of 16
+    "steady": LoadProfile("steady", rate=0.5, duration=60, commits_per_push=4),
+    # Large pushes arriving faster than OpenAI drains them: queueing in the adaptive limiters
+    "burst": LoadProfile("burst", rate=2, duration=5, commits_per_push=10),
+    "fused": LoadProfile("fused", rate=0.5, duration=60, commits_per_push=4, analysis_mode="fused"),
+}
+
+
+def synthesize_push(index: int, commits: int, developers: int, seed: int = 1) -> Dict[str, Any]:
+    """A GitHub push event with ``commits`` new commits authored by the seeded developers."""
+    rng = random.Random(f"{seed}-{index}")
+    repository = f"load-test/service-{index % 4}"
+    timestamp = datetime.now(timezone.utc).isoformat()
+    entries = []
+    for position in range(commits):
+        sha = hashlib.sha1(f"{seed}-{index}-{position}".encode()).hexdigest()
+        developer = rng.randrange(developers)
+        entries.append(
+            {
+                "id": sha,
+                "message": f"Update request handlers ({index}.{position})",
+                "timestamp": timestamp,
+                "url": f"https://github.com/{repository}/commit/{sha}",
+                "author": {
+                    "name": f"Developer {developer}",
+                    "email": f"developer{developer}@example.com",
+                    "username": f"developer{developer}",
+                },
+                "added": [],
+                "removed": [],
+                "modified": [f"app/services/module_{sha[:4]}.py"],
+            }
+        )
+    return {
+        "ref": "refs/heads/main",
+        "before": "0" * 40,
+        "after": entries[-1]["id"] if entries else "0" * 40,
+        "repository": {
+            "name": repository.split("/")[1],
+            "full_name": repository,
+            "html_url": f"https://github.com/{repository}",
+        },
+        "pusher": {"name": "developer0", "email": "developer0@example.com"},
+        "commits": entries,
+        "head_commit": entries[-1] if entries else None,
+    }
+
+
+def sign_payload(body: bytes, secret: str = WEBHOOK_SECRET) -> str:
+    """``X-Hub-Signature-256`` value GitHub would send for ``body``."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def create_webhook_app() -> FastAPI:
+    """
+    The webhook router behind the request metrics middleware, as ``app.main`` mounts it.
+
+    API-key auth and client rate limiting are left out: GitHub sends neither
+    an API key nor a stable client address. ``scripts/run_pipeline_load_test.py
+    --full-app`` drives ``app.main`` instead.
+    """
+    from app.api.webhooks import router
+    from app.core.error_handlers import add_exception_handlers
+    from app.middleware.request_metrics import RequestMetricsMiddleware
+
+    app = FastAPI(title="Webhook pipeline")
+    app.add_middleware(RequestMetricsMiddleware)
+    app.include_router(router)
+    add_exception_handlers(app)
+    return app
+
+
+@contextmanager
+def pipeline_settings(urls: Dict[str, str], profile: LoadProfile) -> Iterator[None]:
+    """
+    Point the pipeline at the fakes for the duration of a run.
+
+    Settings are patched and the lazily created globals (Supabase client, LLM
+    gateway, adaptive limiters, circuit breakers, outbound rate limiters) are
+    swapped for fresh ones, so every run starts cold and nothing leaks into
+    the process afterwards.
+    """
+    from app.config import supabase_client
+    from app.core.adaptive_concurrency import concurrency_manager
+    from app.core.circuit_breaker import circuit_manager
+    from app.core.rate_limiter import rate_limiter_manager
+    from app.integrations import llm_gateway
+
+    overrides = {
+        **urls,
+        "SUPABASE_SERVICE_KEY": FAKE_SUPABASE_KEY,
+        "OPENAI_API_KEY": "sk-load-test",
+        "GITHUB_TOKEN": "ghp_load_test",
+        "GITHUB_WEBHOOK_SECRET": WEBHOOK_SECRET,
+        "COMMIT_ANALYSIS_MODEL": profile.model,
+        "COMMIT_ANALYSIS_MODE": profile.analysis_mode,
+        "COMMIT_DIFF_SOURCE": "github",
+        "DATA_BACKEND": "postgrest",
+        "REANALYZE_EXISTING_COMMITS": False,
+        # The fake OpenAI has no token quota: keep the TPM limiter in the path without it throttling
+        # (the 500k default admits only a few split-mode requests per second)
+        "OPENAI_TOKENS_PER_MINUTE": 1_000_000_000,
+    }
+    with ExitStack() as stack:
+        for name, value in overrides.items():
+            stack.enter_context(patch.object(settings, name, value))
+        stack.enter_context(patch.object(supabase_client, "_supabase_client", None))
+        stack.enter_context(patch.object(llm_gateway, "_gateway", None))
+        stack.enter_context(patch.dict(concurrency_manager._limiters, clear=True))
+        stack.enter_context(patch.dict(circuit_manager._breakers, clear=True))
+        stack.enter_context(patch.dict(rate_limiter_manager._limiters, clear=True))
+        yield
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class LoopMonitor:
+    """Samples event-loop lag and RSS while a run is in flight."""
+
+    def __init__(self, interval: float = 0.01, memory_every: int = 50):
+        self.interval = interval
+        self.memory_every = memory_every
+        self.lags: List[float] = []
+        self.rss: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - started - self.interval))
+            if len(self.lags) % self.memory_every == 0:
+                self.rss.append(rss_mb())
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+@dataclass
+class PushResult:
+    """Outcome of one webhook delivery."""
+
+    status_code: int
+    latency: float  # seconds from scheduled arrival to response
+    processed: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 202 and self.error is None and self.failed == 0
+
+
+async def _deliver(client: httpx.AsyncClient, body: bytes, delivery: str, scheduled: float) -> PushResult:
+    loop = asyncio.get_running_loop()
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": "push",
+        "X-GitHub-Delivery": delivery,
+        "X-Hub-Signature-256": sign_payload(body),
+    }
+    try:
+        response = await client.post(WEBHOOK_PATH, content=body, headers=headers)
+        content = response.json()
+    except Exception as e:
+        return PushResult(0, loop.time() - scheduled, error=f"{type(e).__name__}: {e}")
+    latency = loop.time() - scheduled
+    result = content.get("result") or {}
+    error = content.get("error") if content.get("status") != "accepted" else None
+    return PushResult(
+        response.status_code, latency, result.get("commits_processed", 0), result.get("commits_failed", 0), error
+    )
+
+
+def _percentiles(values: List[float], quantiles: Dict[str, float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+    if not ordered:
+        return {name: None for name in quantiles}
+    return {
+        name: round(ordered[min(len(ordered) - 1, int(quantile * len(ordered)))] * 1000, 1)
+        for name, quantile in quantiles.items()
+    }
+
+
+async def run_load(
+    profile: LoadProfile,
+    app: Optional[FastAPI] = None,
+    blocking_threshold_ms: Optional[float] = None,
+    warmup_pushes: int = 1,
+) -> Dict[str, Any]:
+    """
+    Run ``profile`` against ``app`` (default: ``create_webhook_app()``) and return the report.
+
+    ``warmup_pushes`` are delivered first and left out of every metric, so
+    imports and lazily created clients do not count as latency or memory
+    growth. ``blocking_threshold_ms`` runs the measured part in asyncio debug
+    mode and reports callbacks that held the loop longer than that.
+    """
+    fakes = UpstreamFakes(
+        github_latency=LatencyModel.parse(profile.github_latency, seed=profile.seed),
+        supabase_latency=LatencyModel.parse(profile.supabase_latency, seed=profile.seed),
+        openai_latency=LatencyModel.parse(profile.openai_latency, seed=profile.seed),
+    )
+    fakes.postgrest.seed("users", developer_rows(profile.developers))
+    app = app or create_webhook_app()
+
+    warmup = [
+        json.dumps(synthesize_push(-1 - i, 1, profile.developers, profile.seed)).encode() for i in range(warmup_pushes)
+    ]
+    pushes = [
+        synthesize_push(i, profile.commits_per_push, profile.developers, profile.seed) for i in range(profile.pushes)
+    ]
+    bodies = [json.dumps(push).encode() for push in pushes]
+    measured = {commit["id"] for push in pushes for commit in push["commits"]}
+
+    with LLMStubServer(fakes.app) as server, pipeline_settings(fakes.urls(server.base_url), profile):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            loop = asyncio.get_running_loop()
+            for index, body in enumerate(warmup):
+                await _deliver(client, body, f"warmup-{index}", loop.time())
+
+            gc.collect()
+            rss_start, objects_start = rss_mb(), len(gc.get_objects())
+            upstream_start, usage_start = fakes.stats(), usage_totals()
+            monitor = LoopMonitor()
+            async with AsyncExitStack() as stack:
+                recorder = None
+                if blocking_threshold_ms:
+                    recorder = await stack.enter_async_context(detect_blocking(blocking_threshold_ms))
+                monitor.start()
+                started = loop.time()
+                deliveries = []
+                for index, body in enumerate(bodies):
+                    scheduled = started + index / profile.rate
+                    if scheduled > loop.time():
+                        await asyncio.sleep(scheduled - loop.time())
+                    deliveries.append(asyncio.create_task(_deliver(client, body, f"load-{index}", scheduled)))
+                results: List[PushResult] = await asyncio.gather(*deliveries)
+                elapsed = loop.time() - started
+                await monitor.stop()
+
+            rss_end = rss_mb()
+            gc.collect()
+            objects_end = len(gc.get_objects())
+            upstream_end, usage_end = fakes.stats(), usage_totals()
+
+        from app.core.adaptive_concurrency import concurrency_manager
+
+        limits = {name: status["limit"] for name, status in concurrency_manager.get_status().items()}
+
+    persisted = sum(1 for row in fakes.postgrest.rows("commits") if row.get("commit_hash") in measured)
+    report = {
+        "profile": asdict(profile),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "pushes": {"sent": len(results), "ok": sum(1 for r in results if r.ok)},
+        "commits": {
+            "sent": len(measured),
+            "analyzed": sum(r.processed for r in results),
+            "failed": sum(r.failed for r in results),
+            "persisted": persisted,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput": {
+            "offered_pushes_per_second": profile.rate,
+            "pushes_per_second": round(len(results) / elapsed, 3),
+            "commits_per_second": round(persisted / elapsed, 3),
+        },
+        "latency_ms": _percentiles([r.latency for r in results], {"p50": 0.5, "p90": 0.9, "p99": 0.99, "max": 1.0}),
+        "loop_lag_ms": _percentiles(monitor.lags, {"p50": 0.5, "p99": 0.99, "max": 1.0}),
+        "memory": {
+            "rss_start_mb": round(rss_start, 1),
+            "rss_peak_mb": round(max(monitor.rss + [rss_start, rss_end]), 1),
+            "rss_end_mb": round(rss_end, 1),
+            "rss_growth_mb": round(rss_end - rss_start, 1),
+            "objects_growth": objects_end - objects_start,
+        },
+        "upstream": {key: upstream_end[key] - upstream_start[key] for key in upstream_end},
+        "llm_usage": {key: round(usage_end[key] - usage_start[key], 6) for key in usage_end},
+        "concurrency_limits": limits,
+        "errors": sorted({str(r.error) for r in results if r.error})[:5],
+    }
+    report["pushes"]["errors"] = report["pushes"]["sent"] - report["pushes"]["ok"]
+    if recorder is not None:
+        worst = sorted(recorder.events, key=lambda event: event.duration_ms, reverse=True)[:5]
+        report["blocking_callbacks"] = {
+            "threshold_ms": blocking_threshold_ms,
+            "count": len(recorder.events),
+            "worst": [asdict(event) for event in worst],
+        }
+    return report
+
+
+def baseline_path(name: str) -> str:
+    """Path of the baseline for profile ``name`` (or ``name`` itself when it is a path)."""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(report: Dict[str, Any], path: Optional[str] = None) -> str:
+    path = path or baseline_path(report["profile"]["name"])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def load_baseline(name: str) -> Optional[Dict[str, Any]]:
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+@dataclass
+class MetricChange:
+    """One compared metric; ``change`` is relative to the baseline (+0.25 = 25% higher)."""
+
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    change: Optional[float] = None
+    regressed: bool = False
+    notes: List[str] = field(default_factory=list)
+
+
+def _metric(report: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = report
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def median_report(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine repeated runs of one profile into a single report.
+
+    Starts from the run with the median throughput, then sets every compared
+    metric to its median across runs and every error count to its worst.
+    """
+    ordered = sorted(reports, key=lambda report: _metric(report, "throughput.commits_per_second") or 0.0)
+    combined = copy.deepcopy(ordered[len(ordered) // 2])
+    for metric in (*COMPARED_METRICS, *ERROR_METRICS):
+        values = [value for value in (_metric(report, metric) for report in reports) if value is not None]
+        if not values:
+            continue
+        section, key = metric.split(".")
+        combined[section][key] = max(values) if metric in ERROR_METRICS else round(statistics.median(values), 3)
+    combined["runs"] = len(reports)
+    return combined
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[MetricChange]:
+    """
+    Diff ``current`` against ``baseline`` over ``COMPARED_METRICS``.
+
+    A metric regresses when it moved the wrong way by more than ``tolerance``
+    (relative, scaled per metric) and by more than its absolute floor, which
+    keeps millisecond jitter on small values from failing a run. Error counts
+    regress on any increase.
+    """
+    changes = []
+    compared = {**COMPARED_METRICS, **{metric: (-1, 0.0, 0.0) for metric in ERROR_METRICS}}
+    for metric, (direction, floor, scale) in compared.items():
+        before, after = _metric(baseline, metric), _metric(current, metric)
+        entry = MetricChange(metric, before, after)
+        if before is None or after is None:
+            changes.append(entry)
+            continue
+        delta = after - before
+        entry.change = round(delta / before, 3) if before else None
+        worse = delta * direction < 0
+        beyond_tolerance = entry.change is None or abs(entry.change) > tolerance * scale
+        entry.regressed = worse and beyond_tolerance and abs(delta) > floor
+        changes.append(entry)
+    if baseline.get("profile") != current.get("profile"):
+        changes[0].notes.append("profiles differ; the comparison is indicative only")
+    return changes
+
+
+def format_comparison(changes: List[MetricChange]) -> str:
+    lines = []
+    for change in changes:
+        relative = f"{change.change:+.1%}" if change.change is not None else "n/a"
+        flag = "REGRESSED" if change.regressed else "ok"
+        lines.append(f"{change.metric:<32} {change.baseline!s:>10} -> {change.current!s:<10} {relative:>8}  {flag}")
+        lines.extend(f"  note: {note}" for note in change.notes)
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+"""
+Load tests of the webhook -> analysis -> persistence pipeline.
+
+Not part of the default run (pytest.ini collects tests/unit only):
+    pytest tests/load -m load
+"""
+
+import copy
+import logging
+import os
+
+import pytest
+
+from tests.load.harness import (
+    PROFILES,
+    compare_reports,
+    format_comparison,
+    load_baseline,
+    median_report,
+    run_load,
+    sign_payload,
+    synthesize_push,
+)
+
+pytestmark = pytest.mark.load
+
+
+@pytest.mark.asyncio
+async def test_smoke_profile_persists_every_commit_without_blocking_the_loop():
+    report = await run_load(PROFILES["smoke"], blocking_threshold_ms=100)
+
+    assert report["pushes"]["errors"] == 0, report["errors"]
+    assert report["commits"]["persisted"] == report["commits"]["sent"]
+    # One diff fetch and two model calls (hours, impact) per commit
+    assert report["upstream"]["github_requests"] == report["commits"]["sent"]
+    assert report["upstream"]["openai_requests"] == 2 * report["commits"]["sent"]
+    assert report["blocking_callbacks"]["count"] == 0, report["blocking_callbacks"]["worst"]
+
+
+@pytest.mark.asyncio
+async def test_smoke_profile_has_not_regressed_against_its_baseline(caplog):
+    baseline = load_baseline("smoke")
+    if baseline is None:
+        pytest.skip(
+            "No smoke baseline; record one with "
+            "scripts/run_pipeline_load_test.py --profile smoke --runs 3 --save-baseline"
+        )
+
+    # Baselines are recorded with the pipeline's logging quietened; per-commit INFO logs cost measurable latency
+    caplog.set_level(logging.ERROR)
+    report = median_report([await run_load(PROFILES["smoke"]) for _ in range(baseline.get("runs", 3))])
+    changes = compare_reports(report, baseline, tolerance=float(os.getenv("LOAD_TEST_TOLERANCE", "0.25")))
+
+    assert not any(change.regressed for change in changes), format_comparison(changes)
+
+
+def test_push_payloads_are_signed_like_github_deliveries():
+    push = synthesize_push(0, commits=3, developers=2)
+
+    assert len({commit["id"] for commit in push["commits"]}) == 3
+    assert push["repository"]["full_name"].count("/") == 1
+    assert sign_payload(b"{}", secret="s").startswith("sha256=")
+    assert sign_payload(b"{}", secret="s") != sign_payload(b"{}", secret="t")
+
+
+def test_comparison_flags_only_changes_beyond_tolerance_and_floor():
+    baseline = {
+        "profile": {"name": "steady"},
+        "throughput": {"commits_per_second": 2.0},
+        "latency_ms": {"p50": 3000.0, "p99": 6000.0},
+        "loop_lag_ms": {"p99": 2.0, "max": 20.0},
+        "memory": {"rss_growth_mb": 10.0},
+    }
+    current = copy.deepcopy(baseline)
+    current["throughput"]["commits_per_second"] = 1.2  # 40% slower
+    current["latency_ms"]["p99"] = 6500.0  # within tolerance
+    current["loop_lag_ms"]["p99"] = 6.0  # tripled, but under the 10 ms floor
+
+    changes = {change.metric: change for change in compare_reports(current, baseline, tolerance=0.2)}
+
+    assert changes["throughput.commits_per_second"].regressed
+    assert changes["throughput.commits_per_second"].change == -0.4
+    assert not changes["latency_ms.p99"].regressed
+    assert not changes["loop_lag_ms.p99"].regressed
+    assert not any(change.regressed for name, change in changes.items() if name != "throughput.commits_per_second")
+
+
+def test_comparison_widens_tails_and_flags_any_new_error():
+    baseline = {
+        "throughput": {"commits_per_second": 2.0},
+        "latency_ms": {"p50": 3000.0, "p99": 6000.0},
+        "pushes": {"errors": 0},
+        "commits": {"failed": 0},
+    }
+    current = copy.deepcopy(baseline)
+    current["latency_ms"]["p99"] = 9000.0  # 50% slower, inside three times the tolerance
+    current["commits"]["failed"] = 1
+
+    changes = {change.metric: change for change in compare_reports(current, baseline, tolerance=0.2)}
+
+    assert not changes["latency_ms.p99"].regressed
+    assert changes["commits.failed"].regressed
+    assert not changes["pushes.errors"].regressed
+
+
+def test_median_report_takes_medians_and_the_worst_error_count():
+    runs = [
+        {"throughput": {"commits_per_second": rate}, "latency_ms": {"p99": p99}, "commits": {"failed": failed}}
+        for rate, p99, failed in [(12.0, 100.0, 0), (13.0, 900.0, 0), (11.0, 120.0, 2)]
+    ]
+
+    combined = median_report(runs)
+
+    assert combined["runs"] == 3
+    assert combined["throughput"]["commits_per_second"] == 12.0
+    assert combined["latency_ms"]["p99"] == 120.0
+    assert combined["commits"]["failed"] == 2
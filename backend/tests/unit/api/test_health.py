@@ -5,6 +5,8 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.api.health import HealthChecker, health_checker, router
+from app.auth.dependencies import get_admin_user
+from app.core.sampling_profiler import ProfilerBusyError
 
 
 @pytest.fixture
@@ -59,7 +61,6 @@ class TestHealthChecker:
         checker = HealthChecker()
 
         with patch("app.api.health.settings") as mock_settings, patch("github.Github") as mock_github_class:
-
             mock_settings.GITHUB_TOKEN = "test-token"
 
             # Mock GitHub client and rate limit
@@ -97,7 +98,6 @@ class TestHealthChecker:
         checker = HealthChecker()
 
         with patch("app.api.health.settings") as mock_settings, patch("github.Github") as mock_github_class:
-
             mock_settings.GITHUB_TOKEN = "test-token"
 
             # Mock low rate limit
@@ -119,7 +119,6 @@ class TestHealthChecker:
         checker = HealthChecker()
 
         with patch("app.api.health.settings") as mock_settings, patch("openai.OpenAI") as mock_openai_class:
-
             mock_settings.OPENAI_API_KEY = "test-key"
 
             # Mock OpenAI client and models
@@ -223,6 +222,22 @@ class TestHealthChecker:
             assert result["status"] == "degraded"
             assert "github_api" in result["details"]
 
+    def test_check_concurrency_limiters_degraded(self):
+        """Test concurrency limiter health check when a limit is pinned at its floor."""
+        checker = HealthChecker()
+
+        with patch("app.api.health.concurrency_manager") as mock_manager:
+            mock_manager.get_status.return_value = {
+                "github_api": {"limit": 6, "config": {"min_limit": 1}},
+                "openai_api": {"limit": 1, "config": {"min_limit": 1}},
+            }
+
+            result = checker.check_concurrency_limiters()
+
+            assert result["status"] == "degraded"
+            assert "openai_api" in result["details"]
+            assert result["limiters"]["github_api"]["limit"] == 6
+
     # Documentation configuration checks removed
 
 
@@ -258,14 +273,15 @@ class TestHealthEndpoints:
             patch.object(health_checker, "check_openai_api", new_callable=AsyncMock) as mock_openai,
             patch.object(health_checker, "check_circuit_breakers") as mock_cb,
             patch.object(health_checker, "check_rate_limiters") as mock_rl,
+            patch.object(health_checker, "check_concurrency_limiters") as mock_cl,
         ):
-
             # Mock all checks as healthy
             mock_db.return_value = {"status": "healthy"}
             mock_github.return_value = {"status": "healthy"}
             mock_openai.return_value = {"status": "healthy"}
             mock_cb.return_value = {"status": "healthy"}
             mock_rl.return_value = {"status": "healthy"}
+            mock_cl.return_value = {"status": "healthy"}
             # documentation config removed
 
             health_checker.detailed_checks = True
@@ -275,7 +291,7 @@ class TestHealthEndpoints:
             data = response.json()
             assert data["status"] == "healthy"
             assert "checks" in data
-            assert len(data["checks"]) == 5
+            assert len(data["checks"]) == 6
 
     def test_detailed_health_degraded(self, client, mock_supabase):
         """Test detailed health check with degraded services."""
@@ -286,14 +302,15 @@ class TestHealthEndpoints:
             patch.object(health_checker, "check_openai_api", new_callable=AsyncMock) as mock_openai,
             patch.object(health_checker, "check_circuit_breakers") as mock_cb,
             patch.object(health_checker, "check_rate_limiters") as mock_rl,
+            patch.object(health_checker, "check_concurrency_limiters") as mock_cl,
         ):
-
             # Mock some checks as degraded
             mock_db.return_value = {"status": "healthy"}
             mock_github.return_value = {"status": "degraded"}  # Degraded
             mock_openai.return_value = {"status": "healthy"}
             mock_cb.return_value = {"status": "healthy"}
             mock_rl.return_value = {"status": "healthy"}
+            mock_cl.return_value = {"status": "healthy"}
             # documentation config removed
 
             health_checker.detailed_checks = True
@@ -311,7 +328,6 @@ class TestHealthEndpoints:
             patch("app.api.health.circuit_manager") as mock_circuit_manager,
             patch("app.api.health.rate_limiter_manager") as mock_rl_manager,
         ):
-
             mock_circuit_manager.get_status.return_value = {
                 "github_api": {"state": "closed"},
                 "openai_api": {"state": "open"},
@@ -330,6 +346,7 @@ class TestHealthEndpoints:
             assert "rate_limiters" in data
             assert data["circuit_breakers"]["total"] == 2
             assert data["circuit_breakers"]["open"] == 1
+            assert "collapsed" in data["singleflight"]
 
     def test_reset_circuit_breaker_success(self, client):
         """Test successful circuit breaker reset."""
@@ -351,3 +368,54 @@ class TestHealthEndpoints:
             response = client.post("/health/circuit-breakers/nonexistent/reset")
 
             assert response.status_code == 500
+
+    def test_loop_monitor_requires_admin(self, client):
+        """Loop monitor endpoints expose stacks and are admin only."""
+        response = client.get("/health/loop-monitor")
+
+        assert response.status_code in (401, 403)
+
+    def test_loop_monitor_toggle_and_status(self):
+        """Loop monitor can be started and stopped at runtime."""
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_admin_user] = lambda: Mock()
+
+        with TestClient(app) as admin_client:
+            started = admin_client.post("/health/loop-monitor", params={"enabled": True, "threshold_ms": 50})
+            status = admin_client.get("/health/loop-monitor").json()
+            stopped = admin_client.post("/health/loop-monitor", params={"enabled": False, "reset": True})
+
+        assert started.json()["enabled"] is True
+        assert started.json()["threshold_ms"] == 50
+        assert status["enabled"] is True
+        assert "+Inf" in status["lag_ms_buckets"]
+        assert stopped.json()["enabled"] is False
+
+    def test_profile_endpoint_returns_collapsed_stacks_and_svg(self):
+        """Profiler endpoint samples the service and renders collapsed stacks or a flamegraph."""
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_admin_user] = lambda: Mock()
+
+        with TestClient(app) as admin_client:
+            collapsed = admin_client.post("/health/profile", params={"seconds": 0.05, "include_idle": True})
+            svg = admin_client.post("/health/profile", params={"seconds": 0.05, "format": "svg"})
+
+        assert collapsed.status_code == 200
+        assert int(collapsed.headers["X-Profile-Samples"]) > 0
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.text.splitlines())
+        assert svg.headers["content-type"] == "image/svg+xml"
+        assert svg.text.startswith("<svg")
+
+    def test_profile_endpoint_rejects_concurrent_profiles(self):
+        """Only one profile runs at a time."""
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_admin_user] = lambda: Mock()
+
+        with patch("app.api.health.sampling_profiler") as mock_profiler:
+            mock_profiler.profile.side_effect = ProfilerBusyError("A profile is already running")
+            response = TestClient(app).post("/health/profile", params={"seconds": 1})
+
+        assert response.status_code == 409
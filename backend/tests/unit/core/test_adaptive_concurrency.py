@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from app.core.adaptive_concurrency import (
+    AdaptiveConcurrencyConfig,
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiterManager,
+    is_overload_error,
+)
+from app.core.circuit_breaker import CircuitBreaker, CircuitBreakerConfig, CircuitBreakerOpenError
+from app.core.exceptions import RateLimitExceededError
+
+
+@pytest.fixture
+def config():
+    """Small limiter configuration for tests."""
+    return AdaptiveConcurrencyConfig(initial_limit=2, min_limit=1, max_limit=4, name="test_upstream")
+
+
+@pytest.fixture
+def limiter(config):
+    return AdaptiveConcurrencyLimiter(config)
+
+
+class _Http429(Exception):
+    status_code = 429
+
+
+class TestOverloadClassification:
+    def test_overload_errors(self):
+        assert is_overload_error(asyncio.TimeoutError())
+        assert is_overload_error(RateLimitExceededError())
+        assert is_overload_error(_Http429())
+
+    def test_wrapped_overload_error(self):
+        try:
+            try:
+                raise _Http429()
+            except _Http429 as e:
+                raise Exception("Failed to fetch commit diff") from e
+        except Exception as wrapped:
+            assert is_overload_error(wrapped)
+
+    def test_other_errors(self):
+        assert not is_overload_error(ValueError("bad input"))
+
+
+class TestAdaptiveConcurrencyLimiter:
+    @pytest.mark.asyncio
+    async def test_bounds_in_flight_calls(self, limiter):
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(limiter.call(work) for _ in range(6)))
+
+        assert peak <= 4
+        assert limiter.in_flight == 0
+        assert limiter.status["queued"] == 0
+
+    def test_additive_increase_when_saturated(self, limiter):
+        limiter.in_flight = 2
+        for _ in range(4):
+            limiter.record_success(0.1)
+        assert limiter.current_limit == 3
+
+    def test_no_increase_when_underused(self, limiter):
+        limiter.in_flight = 0
+        for _ in range(10):
+            limiter.record_success(0.1)
+        assert limiter.current_limit == 2
+
+    def test_multiplicative_decrease_on_overload(self, limiter):
+        limiter.limit = 4.0
+        limiter.record_overload(_Http429())
+        assert limiter.current_limit == 2
+        limiter.record_overload()
+        limiter.record_overload()
+        assert limiter.current_limit == 1
+        assert limiter.status["overloads"] == 3
+
+    def test_latency_inflation_shrinks_limit_once_per_round_trip(self, limiter):
+        limiter.limit = 4.0
+        limiter.record_success(0.1)
+        for _ in range(5):
+            limiter.record_success(0.5)
+        # Smoothed latency crosses 2x the baseline on the second slow call; later ones fall in the same RTT
+        assert limiter.limit == pytest.approx(3.6)
+        assert limiter.status["latency_inflations"] == 4
+
+    def test_single_slow_call_does_not_shrink_limit(self, limiter):
+        limiter.limit = 4.0
+        for _ in range(5):
+            limiter.record_success(0.1)
+        limiter.record_success(0.25)
+        assert limiter.limit == pytest.approx(4.0)
+        assert limiter.status["latency_inflations"] == 0
+
+    def test_lognormal_latency_spread_keeps_limit(self, config, monkeypatch):
+        import random
+
+        import app.core.adaptive_concurrency as adaptive_concurrency
+
+        clock = [0.0]
+        monkeypatch.setattr(adaptive_concurrency.time, "monotonic", lambda: clock[0])
+        limiter = AdaptiveConcurrencyLimiter(
+            AdaptiveConcurrencyConfig(initial_limit=4, max_limit=16, latency_tolerance=3.0, name="llm")
+        )
+        rng = random.Random(7)
+        for _ in range(500):
+            # Saturated limiter, ~2.5s median calls completing a few at a time
+            clock[0] += 0.5
+            limiter.in_flight = limiter.current_limit
+            limiter.record_success(rng.lognormvariate(0.9, 0.5))
+        assert limiter.current_limit >= 4
+
+    @pytest.mark.asyncio
+    async def test_overload_error_recorded_and_reraised(self, limiter):
+        async def throttled():
+            raise _Http429()
+
+        with pytest.raises(_Http429):
+            await limiter.call(throttled)
+
+        assert limiter.current_limit == 1
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_order(self, config):
+        config.initial_limit = 1
+        limiter = AdaptiveConcurrencyLimiter(config)
+        order = []
+
+        async def work(index):
+            order.append(index)
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*(limiter.call(work, i) for i in range(5)))
+
+        assert order == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_queue_slot(self, config):
+        config.initial_limit = 1
+        limiter = AdaptiveConcurrencyLimiter(config)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release()
+        assert limiter.in_flight == 0
+        assert limiter.status["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_routes_through_circuit_breaker(self, config):
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1, timeout=60, name="test_upstream"))
+        limiter = AdaptiveConcurrencyLimiter(config, breaker=breaker)
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await limiter.call(failing)
+        with pytest.raises(CircuitBreakerOpenError):
+            await limiter.call(failing)
+        assert limiter.status["breaker"] == "test_upstream"
+
+
+def test_manager_reports_status(config):
+    manager = ConcurrencyLimiterManager()
+    manager.create_limiter("openai_api", config)
+
+    status = manager.get_status()
+
+    assert status["openai_api"]["limit"] == 2
+    assert manager.get_limiter("openai_api") is not None
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_blocking import LoopLagMonitor, detect_blocking
+
+
+@pytest.mark.asyncio
+async def test_detects_synchronous_sleep():
+    async with detect_blocking(threshold_ms=20) as recorder:
+        time.sleep(0.05)
+
+    assert len(recorder.events) == 1
+    assert recorder.events[0].duration_ms >= 40
+
+
+@pytest.mark.asyncio
+async def test_work_in_threads_does_not_count():
+    async with detect_blocking(threshold_ms=20) as recorder:
+        await asyncio.to_thread(time.sleep, 0.05)
+        await asyncio.sleep(0.01)
+
+    assert recorder.events == []
+
+
+@pytest.mark.asyncio
+async def test_restores_loop_settings():
+    loop = asyncio.get_running_loop()
+    debug, duration = loop.get_debug(), loop.slow_callback_duration
+
+    async with detect_blocking(threshold_ms=5):
+        assert loop.get_debug() is True
+
+    assert loop.get_debug() == debug
+    assert loop.slow_callback_duration == duration
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_monitor_captures_stack_of_blocking_call():
+    monitor = LoopLagMonitor()
+    monitor.start(threshold_ms=30, interval_ms=10)
+    try:
+        await asyncio.sleep(0.05)
+        _block_the_loop(0.15)
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    status = monitor.get_status()
+    assert status["stalls"] == 1
+    stall = status["recent_stalls"][0]
+    assert stall["duration_ms"] >= 100
+    assert any("_block_the_loop" in line for line in stall["stack"])
+    assert status["top_offenders"][0]["count"] == 1
+    assert status["lag_ms"]["max"] >= 100
+
+
+@pytest.mark.asyncio
+async def test_monitor_idle_loop_records_lag_without_stalls():
+    monitor = LoopLagMonitor()
+    monitor.start(threshold_ms=50, interval_ms=5)
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    status = monitor.get_status()
+    assert status["enabled"] is False
+    assert status["samples"] > 5
+    assert status["stalls"] == 0
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+from app.core.exceptions import ConfigurationError, RateLimitExceededError
+from app.core.rate_limit_backends import (
+    TOKEN_BUCKET_LUA,
+    InMemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    SQLiteRateLimitBackend,
+    _take_from_bucket,
+    create_rate_limit_backend,
+)
+from app.core.rate_limiter import RateLimitConfig, TokenBucketRateLimiter
+
+
+class FakeRedisServer:
+    """Local stand-in speaking just enough of the Redis protocol for the limiter."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.scripts = set()
+        self.commands = []
+        self._server = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _read_command(self, reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        return args
+
+    def _run_script(self, args):
+        key, minimum, maximum, capacity, rate = args[1], int(args[2]), int(args[3]), int(args[4]), float(args[5])
+        now = time.time()
+        tokens, updated = self.buckets.get(key, (float(capacity), now))
+        granted, left, retry_after = _take_from_bucket(tokens, updated, now, minimum, maximum, capacity, rate)
+        self.buckets[key] = (left, now)
+        return f"*3\r\n:{granted}\r\n${len(str(left))}\r\n{left}\r\n${len(str(retry_after))}\r\n{retry_after}\r\n"
+
+    async def _handle(self, reader, writer):
+        while True:
+            args = await self._read_command(reader)
+            if args is None:
+                break
+            command = args[0].upper()
+            self.commands.append(command)
+            if command == "EVALSHA":
+                if args[1] not in self.scripts:
+                    reply = "-NOSCRIPT No matching script.\r\n"
+                else:
+                    reply = self._run_script(args[2:])
+            elif command == "EVAL":
+                self.scripts.add(hashlib.sha1(args[1].encode()).hexdigest())
+                reply = self._run_script(args[2:])
+            else:
+                reply = "+OK\r\n"
+            writer.write(reply.encode())
+            await writer.drain()
+        writer.close()
+
+
+class TestTakeFromBucket:
+    """Test the shared bucket arithmetic."""
+
+    def test_grants_within_bounds(self):
+        granted, left, retry_after = _take_from_bucket(5.0, 0.0, 0.0, 1, 3, 10, 1.0)
+        assert (granted, left, retry_after) == (3, 2.0, 0.0)
+
+    def test_refills_before_taking(self):
+        granted, left, _ = _take_from_bucket(0.0, 0.0, 2.0, 2, 2, 10, 1.0)
+        assert granted == 2
+        assert left == 0.0
+
+    def test_denies_and_reports_retry_after(self):
+        granted, left, retry_after = _take_from_bucket(0.5, 0.0, 0.0, 2, 2, 10, 0.5)
+        assert granted == 0
+        assert left == 0.5
+        assert retry_after == pytest.approx(3.0)
+
+
+class TestBackends:
+    """Test the storage backends."""
+
+    @pytest.mark.asyncio
+    async def test_memory_backend(self):
+        backend = InMemoryRateLimitBackend()
+        first = await backend.take("svc", 1, 1, capacity=2, refill_rate=0.001)
+        second = await backend.take("svc", 1, 1, capacity=2, refill_rate=0.001)
+        third = await backend.take("svc", 1, 1, capacity=2, refill_rate=0.001)
+
+        assert first.granted == 1 and second.granted == 1
+        assert third.granted == 0
+        assert third.retry_after > 0
+
+    @pytest.mark.asyncio
+    async def test_sqlite_backend_shares_state(self, tmp_path):
+        path = str(tmp_path / "limits.db")
+        worker_a = SQLiteRateLimitBackend(path)
+        worker_b = SQLiteRateLimitBackend(path)
+        try:
+            assert (await worker_a.take("svc", 2, 2, capacity=3, refill_rate=0.001)).granted == 2
+            assert (await worker_b.take("svc", 1, 1, capacity=3, refill_rate=0.001)).granted == 1
+            assert (await worker_a.take("svc", 1, 1, capacity=3, refill_rate=0.001)).granted == 0
+        finally:
+            await worker_a.close()
+            await worker_b.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_loads_script_and_shares_state(self):
+        server = FakeRedisServer()
+        port = await server.start()
+        worker_a = RedisRateLimitBackend(f"redis://127.0.0.1:{port}/0")
+        worker_b = RedisRateLimitBackend(f"redis://127.0.0.1:{port}/0")
+        try:
+            assert (await worker_a.take("svc", 1, 1, capacity=2, refill_rate=0.001)).granted == 1
+            assert (await worker_b.take("svc", 1, 1, capacity=2, refill_rate=0.001)).granted == 1
+            denied = await worker_a.take("svc", 1, 1, capacity=2, refill_rate=0.001)
+        finally:
+            await worker_a.close()
+            await worker_b.close()
+            await server.stop()
+
+        assert denied.granted == 0
+        assert denied.retry_after > 0
+        assert "ratelimit:svc" in server.buckets
+        # First call falls back to EVAL, later calls hit the cached script
+        assert server.commands[:3] == ["EVALSHA", "EVAL", "EVALSHA"]
+        assert hashlib.sha1(TOKEN_BUCKET_LUA.encode()).hexdigest() in server.scripts
+
+    def test_factory(self, tmp_path):
+        assert isinstance(create_rate_limit_backend("memory"), InMemoryRateLimitBackend)
+        assert isinstance(
+            create_rate_limit_backend("sqlite", sqlite_path=str(tmp_path / "x.db")), SQLiteRateLimitBackend
+        )
+        with pytest.raises(ConfigurationError):
+            create_rate_limit_backend("redis")
+        with pytest.raises(ConfigurationError):
+            create_rate_limit_backend("memcached")
+
+
+class TestTokenBucketLeasing:
+    """Test batched token leasing in TokenBucketRateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_leases_tokens_in_batches(self):
+        backend = InMemoryRateLimitBackend()
+        calls = []
+        original_take = backend.take
+
+        async def counting_take(*args, **kwargs):
+            calls.append(kwargs)
+            return await original_take(*args, **kwargs)
+
+        backend.take = counting_take
+        limiter = TokenBucketRateLimiter(
+            RateLimitConfig(requests_per_hour=36, burst_limit=10, name="leased"), backend=backend, lease_size=5
+        )
+
+        for _ in range(10):
+            await limiter.acquire()
+
+        assert len(calls) == 2
+        with pytest.raises(RateLimitExceededError):
+            await limiter.acquire()
+        assert limiter.status["backend"] == "memory"
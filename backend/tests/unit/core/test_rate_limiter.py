@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import RateLimitExceededError
+from app.core.rate_limiter import (
+    KeyedSlidingWindowLimiter,
+    RateLimitConfig,
+    TokenBucketRateLimiter,
+    estimate_openai_tokens,
+)
+
+
+@pytest.fixture
+def limiter():
+    """Keyed limiter with a 60s window and a small key table."""
+    return KeyedSlidingWindowLimiter(window_seconds=60, max_keys=3)
+
+
+class TestKeyedSlidingWindowLimiter:
+    """Test the O(1) sliding window counter limiter."""
+
+    def test_admits_up_to_limit(self, limiter):
+        """Requests are admitted until the limit is reached."""
+        first = limiter.hit("client", limit=2, now=0.0)
+        second = limiter.hit("client", limit=2, now=1.0)
+        third = limiter.hit("client", limit=2, now=2.0)
+
+        assert first.allowed and first.remaining == 1
+        assert second.allowed and second.remaining == 0
+        assert not third.allowed
+        assert third.retry_after == pytest.approx(58.0)
+
+    def test_keys_are_independent(self, limiter):
+        """Each key has its own budget."""
+        assert limiter.hit("a", limit=1, now=0.0).allowed
+        assert not limiter.hit("a", limit=1, now=0.0).allowed
+        assert limiter.hit("b", limit=1, now=0.0).allowed
+
+    def test_previous_window_is_weighted(self, limiter):
+        """Requests from the previous window count proportionally to their overlap."""
+        for i in range(10):
+            assert limiter.hit("client", limit=10, now=float(i)).allowed
+
+        # 15s into the next window: 10 * 0.75 = 7.5 estimated, room for 2 more
+        assert limiter.hit("client", limit=10, now=75.0).allowed
+        assert limiter.hit("client", limit=10, now=75.0).allowed
+        blocked = limiter.hit("client", limit=10, now=75.0)
+        assert not blocked.allowed
+        assert 0 < blocked.retry_after <= 45.0
+
+    def test_stale_previous_window_is_dropped(self, limiter):
+        """A gap longer than one window resets the estimate."""
+        for _ in range(5):
+            limiter.hit("client", limit=5, now=0.0)
+        assert limiter.hit("client", limit=5, now=130.0).remaining == 4
+
+    def test_lru_cap_evicts_oldest(self, limiter):
+        """The key table never grows beyond max_keys."""
+        for i, key in enumerate(["a", "b", "c", "d"]):
+            limiter.hit(key, limit=1, now=float(i))
+
+        assert len(limiter) == 3
+        assert limiter.evictions == 1
+        # "a" was evicted, so it starts with a fresh budget
+        assert limiter.hit("a", limit=1, now=4.0).allowed
+
+    def test_idle_keys_expire(self, limiter):
+        """Keys idle for two windows are dropped on the next check."""
+        limiter.hit("a", limit=1, now=0.0)
+        limiter.hit("b", limit=1, now=100.0)
+        limiter.hit("c", limit=1, now=125.0)
+
+        assert len(limiter) == 2
+        assert limiter.evictions == 0
+
+    def test_invalid_max_keys(self):
+        """A zero-sized key table is rejected."""
+        with pytest.raises(ValueError):
+            KeyedSlidingWindowLimiter(max_keys=0)
+
+
+def _fast_bucket(capacity: int = 1) -> TokenBucketRateLimiter:
+    """Bucket refilling 20 tokens/second so waits stay short."""
+    return TokenBucketRateLimiter(RateLimitConfig(requests_per_hour=72000, burst_limit=capacity, name="fast"))
+
+
+class TestTokenBucketWaiting:
+    """Test the queued acquire mode of TokenBucketRateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_fail_fast_by_default(self):
+        limiter = _fast_bucket()
+        await limiter.acquire()
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            await limiter.acquire()
+        assert exc_info.value.retry_after > 0
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_in_fifo_order(self):
+        limiter = _fast_bucket()
+        await limiter.acquire()
+        order = []
+
+        async def worker(index):
+            await limiter.acquire(wait=True, timeout=2)
+            order.append(index)
+
+        await asyncio.gather(*(worker(i) for i in range(4)))
+
+        assert order == [0, 1, 2, 3]
+        status = limiter.status["queue"]
+        assert status["waits"] == 4
+        assert status["waiting"] == 0
+        assert status["max_wait_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_weighted_acquire_waits_for_enough_tokens(self):
+        limiter = _fast_bucket(capacity=4)
+        await limiter.acquire(4)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        await limiter.acquire(2, wait=True, timeout=2)
+
+        # 2 tokens at 20 tokens/second
+        assert loop.time() - started >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_without_sleeping(self):
+        limiter = _fast_bucket(capacity=4)
+        await limiter.acquire(4)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        with pytest.raises(RateLimitExceededError):
+            await limiter.acquire(4, wait=True, timeout=0.05)
+
+        assert loop.time() - started < 0.05
+        assert limiter.status["queue"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fail_fast_callers_do_not_jump_the_queue(self):
+        limiter = _fast_bucket()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire(wait=True, timeout=2))
+        await asyncio.sleep(0)
+
+        with pytest.raises(RateLimitExceededError):
+            await limiter.acquire()
+        await waiter
+
+    @pytest.mark.asyncio
+    async def test_wait_is_logged_once(self, caplog):
+        limiter = _fast_bucket(capacity=4)
+        await limiter.acquire(4)
+
+        with caplog.at_level("DEBUG", logger="app.core.rate_limiter"):
+            await limiter.acquire(4, wait=True, timeout=2)
+
+        assert not [r for r in caplog.records if r.levelname == "WARNING"]
+        assert len([r for r in caplog.records if "Rate limit reached" in r.getMessage()]) == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_weight_above_capacity(self):
+        with pytest.raises(ValueError):
+            await _fast_bucket(capacity=2).acquire(3, wait=True)
+
+
+def test_estimate_openai_tokens():
+    assert estimate_openai_tokens("x" * 400) == 100
+    assert estimate_openai_tokens("", max_output_tokens=50) == 50
+    assert estimate_openai_tokens("") == 1
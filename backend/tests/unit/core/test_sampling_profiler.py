@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.sampling_profiler import ProfilerBusyError, SamplingProfiler, render_flamegraph
+from app.middleware.route_tagging import RouteTaggingMiddleware
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RouteTaggingMiddleware)
+
+    @app.get("/items/{item_id}/offloaded")
+    async def offloaded(item_id: str):
+        await asyncio.to_thread(_spin, 0.3)
+        return {"id": item_id}
+
+    @app.get("/blocking")
+    async def blocking():
+        _spin(0.2)
+        return {}
+
+    return app
+
+
+async def _profile_during_requests(profiler: SamplingProfiler, *paths: str, **options):
+    loop = asyncio.get_running_loop()
+    transport = httpx.ASGITransport(app=_create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        profiling = asyncio.create_task(
+            asyncio.to_thread(
+                profiler.profile, 0.5, interval_ms=5, loop=loop, loop_thread_id=threading.get_ident(), **options
+            )
+        )
+        await asyncio.sleep(0.02)
+        await asyncio.gather(*(client.get(path) for path in paths))
+        return await profiling
+
+
+@pytest.mark.asyncio
+async def test_samples_worker_threads_tagged_with_route_template():
+    profile = await _profile_during_requests(SamplingProfiler(), "/items/42/offloaded")
+
+    offloaded = [stack for stack in profile.stacks if stack.startswith("GET /items/{item_id}/offloaded;")]
+    assert offloaded
+    assert any("_spin (" in stack for stack in offloaded)
+    assert profile.samples > 10
+
+
+@pytest.mark.asyncio
+async def test_route_filter_keeps_only_that_route():
+    profile = await _profile_during_requests(SamplingProfiler(), "/items/7/offloaded", "/blocking", route="/blocking")
+
+    assert profile.stacks
+    assert all(stack.startswith("GET /blocking;") for stack in profile.stacks)
+    assert any(stack.endswith("_spin (tests/unit/core/test_sampling_profiler.py)") for stack in profile.stacks)
+
+
+def test_only_one_profile_at_a_time():
+    profiler = SamplingProfiler()
+    worker = threading.Thread(target=profiler.profile, args=(0.3,))
+    worker.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(ProfilerBusyError):
+            profiler.profile(0.1)
+    finally:
+        worker.join()
+
+
+def test_idle_threads_are_skipped_unless_requested():
+    profiler = SamplingProfiler()
+    stop = threading.Event()
+    waiter = threading.Thread(target=stop.wait, name="idle-waiter")
+    waiter.start()
+    try:
+        quiet = profiler.profile(0.05, interval_ms=5)
+        everything = profiler.profile(0.05, interval_ms=5, include_idle=True)
+    finally:
+        stop.set()
+        waiter.join()
+
+    assert not any(stack.startswith("idle-waiter;") for stack in quiet.stacks)
+    assert any(stack.startswith("idle-waiter;") for stack in everything.stacks)
+
+
+def test_collapsed_and_svg_output():
+    stacks = {"main;handler (app/api/x.py);query <&> (app/repo.py)": 3, "main;handler (app/api/x.py)": 1}
+
+    svg = render_flamegraph(stacks, title="test")
+
+    assert svg.startswith("<svg") and svg.endswith("</svg>")
+    assert "query &lt;&amp;&gt; (app/repo.py) (3 samples, 75.00%)" in svg
+    assert svg.count("<rect") == 1 + 3
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight, SingleFlightManager, make_key
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent identical calls."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight("lookup")
+        calls = []
+
+        async def lookup(name):
+            calls.append(name)
+            await asyncio.sleep(0.01)
+            return f"user:{name}"
+
+        results = await asyncio.gather(*(flight.do("octocat", lookup, "octocat") for _ in range(5)))
+
+        assert results == ["user:octocat"] * 5
+        assert calls == ["octocat"]
+        status = flight.status
+        assert status["calls"] == 5
+        assert status["executions"] == 1
+        assert status["collapsed"] == 4
+        assert status["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_result_is_copied_for_each_caller(self):
+        flight = SingleFlight("commit")
+        analysis = {"hours": 2.0, "key_changes": ["Add retry"]}
+
+        async def analyze():
+            await asyncio.sleep(0.01)
+            return analysis
+
+        async def caller():
+            result = await flight.do("abc123", analyze)
+            result["key_changes"].append("mutated")
+            return result
+
+        results = await asyncio.gather(caller(), caller(), caller())
+
+        assert [result["key_changes"] for result in results] == [["Add retry", "mutated"]] * 3
+        assert analysis == {"hours": 2.0, "key_changes": ["Add retry"]}
+        assert await flight.do("abc123", analyze) is analysis
+
+    @pytest.mark.asyncio
+    async def test_exceptions_are_shared(self):
+        flight = SingleFlight("failing")
+
+        async def explode():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", explode), flight.do("k", explode), return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.status["executions"] == 1
+        assert flight.status["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        flight = SingleFlight("keys")
+
+        async def echo(value):
+            await asyncio.sleep(0)
+            return value
+
+        assert await asyncio.gather(flight.do("a", echo, 1), flight.do("b", echo, 2)) == [1, 2]
+        assert flight.status["collapsed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_results_are_not_cached_after_completion(self):
+        flight = SingleFlight("fresh")
+        counter = {"n": 0}
+
+        async def bump():
+            counter["n"] += 1
+            return counter["n"]
+
+        assert await flight.do("k", bump) == 1
+        assert await flight.do("k", bump) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        flight = SingleFlight("cancel")
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+
+def test_make_key_normalizes_arguments():
+    assert make_key("op", 1, b=2, a=1) == make_key("op", "1", a="1", b="2")
+    assert make_key("op", 1) != make_key("other", 1)
+
+
+def test_manager_reuses_groups():
+    manager = SingleFlightManager()
+    assert manager.get_group("x") is manager.get_group("x")
+    assert set(manager.get_status()) == {"x"}
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.core.swr_cache import StaleWhileRevalidateCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("supabase down")
+        return f"v{self.calls}"
+
+
+class TestStaleWhileRevalidateCache:
+    """Test fresh, stale and expired reads plus invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_value_is_served_from_cache(self):
+        cache = StaleWhileRevalidateCache("test", fresh_ttl=10, stale_ttl=60, clock=FakeClock())
+        loader = CountingLoader()
+
+        assert await cache.get_or_load("k", loader) == "v1"
+        assert await cache.get_or_load("k", loader) == "v1"
+        assert loader.calls == 1
+        assert cache.status["hits"] == 1 and cache.status["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self):
+        cache = StaleWhileRevalidateCache("test", fresh_ttl=10, stale_ttl=60, clock=FakeClock())
+        loader = CountingLoader(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+
+        assert results == ["v1"] * 5
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_is_returned_while_refreshing(self):
+        clock = FakeClock()
+        cache = StaleWhileRevalidateCache("test", fresh_ttl=10, stale_ttl=60, clock=clock)
+        loader = CountingLoader()
+        await cache.get_or_load("k", loader)
+
+        clock.now = 30
+        assert await cache.get_or_load("k", loader) == "v1"
+        await asyncio.sleep(0.01)
+
+        assert loader.calls == 2
+        assert await cache.get_or_load("k", loader) == "v2"
+        assert cache.status["stale_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self):
+        clock = FakeClock()
+        cache = StaleWhileRevalidateCache("test", fresh_ttl=10, stale_ttl=60, clock=clock)
+        await cache.get_or_load("k", CountingLoader())
+
+        clock.now = 30
+        assert await cache.get_or_load("k", CountingLoader(fail=True)) == "v1"
+        await asyncio.sleep(0.01)
+
+        assert cache.status["refresh_failures"] == 1
+        assert await cache.get_or_load("k", CountingLoader(fail=True)) == "v1"
+
+    @pytest.mark.asyncio
+    async def test_expired_value_is_reloaded_synchronously(self):
+        clock = FakeClock()
+        cache = StaleWhileRevalidateCache("test", fresh_ttl=10, stale_ttl=60, clock=clock)
+        loader = CountingLoader()
+        await cache.get_or_load("k", loader)
+
+        clock.now = 100
+        assert await cache.get_or_load("k", loader) == "v2"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_discards_entries_and_in_flight_loads(self):
+        cache = StaleWhileRevalidateCache("test", fresh_ttl=10, stale_ttl=60, clock=FakeClock())
+        await cache.get_or_load(("week", 1), CountingLoader())
+        await cache.get_or_load(("overview", 1), CountingLoader())
+
+        assert cache.invalidate(lambda key: key[0] == "week") == 1
+        assert cache.status["entries"] == 1
+
+        slow = CountingLoader(delay=0.02)
+        pending = asyncio.ensure_future(cache.get_or_load(("week", 1), slow))
+        await asyncio.sleep(0.005)
+        cache.invalidate()
+        assert await pending == "v1"
+
+        # The load that straddled the invalidation was not stored
+        assert cache.status["entries"] == 0
@@ -4,7 +4,7 @@ from uuid import uuid4
 import pytest
 from pydantic import ValidationError
 
-from app.models.commit import Commit
+from app.models.commit import Commit, split_analysis_payload
 
 
 def test_commit_model_valid():
@@ -23,3 +23,41 @@ def test_commit_model_missing_required():
         Commit(commit_timestamp=datetime.utcnow())
     with pytest.raises(ValidationError):
         Commit(commit_hash="abc123")
+
+
+def test_split_analysis_payload_promotes_typed_fields():
+    columns = split_analysis_payload(
+        {
+            "impact_score": "12.5",
+            "impact_business_value": 4,
+            "impact_classification": {"primary_category": "Capability"},
+            "analysis_version": "2.0",
+            "key_changes": ["Added feature"],
+            "base_hours": None,
+        }
+    )
+
+    assert columns["impact_score"] == 12.5
+    assert columns["business_value"] == 4
+    assert columns["impact_category"] == "capability"
+    assert columns["analysis_version"] == "2.0"
+    # Promoted keys and nulls are not duplicated into the JSONB remainder
+    assert columns["ai_analysis"] == {
+        "impact_classification": {"primary_category": "Capability"},
+        "key_changes": ["Added feature"],
+    }
+
+
+def test_analysis_details_round_trips_typed_columns():
+    payload = {"impact_score": 8.0, "impact_business_value": 6, "impact_dominant_category": "fix", "key_changes": []}
+    commit = Commit(commit_hash="abc", commit_timestamp=datetime.utcnow(), **split_analysis_payload(payload))
+
+    assert commit.analysis_details() == payload
+
+
+def test_analysis_details_reads_legacy_notes():
+    commit = Commit(commit_hash="abc", commit_timestamp=datetime.utcnow(), ai_analysis_notes='{"impact_score": 3}')
+    assert commit.analysis_details() == {"impact_score": 3}
+
+    malformed = Commit(commit_hash="abc", commit_timestamp=datetime.utcnow(), ai_analysis_notes="not json")
+    assert malformed.analysis_details() == {"raw_notes": "not json"}
@@ -0,0 +1,71 @@
+"""Regression tests: repository I/O must not run on the event loop."""
+
+import time
+from datetime import date
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.loop_blocking import detect_blocking
+from app.repositories.daily_commit_analysis_repository import DailyCommitAnalysisRepository
+from app.repositories.daily_work_analysis_repository import DailyWorkAnalysisRepository
+from app.repositories.raci_matrix_repository import RaciMatrixRepository
+
+# Simulated PostgREST round trip; far above the detection threshold if it ran on the loop
+ROUND_TRIP_SECONDS = 0.25
+# High enough that a garbage collection pause late in a full test run is not reported
+THRESHOLD_MS = 100
+
+
+def _slow_client(data):
+    """Supabase client mock whose execute() blocks like a real HTTP call."""
+
+    def execute():
+        time.sleep(ROUND_TRIP_SECONDS)
+        return MagicMock(data=data, error=None)
+
+    query = MagicMock()
+    for method in ("select", "eq", "gte", "lte", "lt", "in_", "order", "maybe_single", "insert", "update", "delete"):
+        getattr(query, method).return_value = query
+    query.execute.side_effect = execute
+    client = MagicMock()
+    client.table.return_value = query
+    return client
+
+
+def _build(repository_class, data):
+    with patch("app.repositories.base.get_supabase_client", return_value=_slow_client(data)):
+        return repository_class()
+
+
+@pytest.mark.asyncio
+async def test_daily_commit_analysis_repository_does_not_block():
+    repo = _build(DailyCommitAnalysisRepository, [])
+
+    async with detect_blocking(threshold_ms=THRESHOLD_MS) as recorder:
+        await repo.get_user_analyses_in_range(uuid4(), date(2025, 1, 1), date(2025, 1, 7))
+        await repo.get_by_user_and_date(uuid4(), date(2025, 1, 1))
+
+    assert recorder.events == []
+
+
+@pytest.mark.asyncio
+async def test_daily_work_analysis_repository_does_not_block():
+    repo = _build(DailyWorkAnalysisRepository, None)
+
+    async with detect_blocking(threshold_ms=THRESHOLD_MS) as recorder:
+        assert await repo.get_by_user_and_date(uuid4(), date(2025, 1, 1)) is None
+
+    assert recorder.events == []
+
+
+@pytest.mark.asyncio
+async def test_raci_repository_does_not_block():
+    repo = _build(RaciMatrixRepository, [])
+
+    async with detect_blocking(threshold_ms=THRESHOLD_MS) as recorder:
+        assert await repo.get_all_matrices() == []
+        assert await repo.delete_matrix(uuid4()) is False
+
+    assert recorder.events == []
@@ -8,7 +8,7 @@ import pytest
 
 from app.core.exceptions import DatabaseError
 from app.models.commit import Commit
-from app.repositories.commit_repository import CommitRepository
+from app.repositories.commit_repository import COMMIT_SUMMARY_COLUMNS, CommitRepository
 
 
 @pytest.fixture
@@ -327,3 +327,28 @@ async def test_convert_commit_to_analysis_malformed_json():
     # Should handle malformed JSON gracefully
     assert "key_changes" in analysis
     assert isinstance(analysis["key_changes"], list)
+
+
+@pytest.mark.asyncio
+async def test_get_commits_by_user_in_range_selects_summary_columns(mock_supabase_client):
+    """List reads project the summary columns instead of select("*")."""
+    repo = CommitRepository(client=mock_supabase_client)
+    mock_response = MagicMock()
+    mock_response.error = None
+    mock_response.data = [
+        {
+            "commit_hash": "abc",
+            "commit_timestamp": datetime.now(timezone.utc).isoformat(),
+            "impact_score": 9.5,
+            "impact_category": "fix",
+        }
+    ]
+
+    with patch("asyncio.to_thread", new_callable=AsyncMock) as mock_to_thread:
+        mock_to_thread.return_value = mock_response
+        result = await repo.get_commits_by_user_in_range(uuid4(), datetime.now().date(), datetime.now().date())
+
+    selected = mock_supabase_client.table.return_value.select.call_args[0][0]
+    assert selected == ",".join(COMMIT_SUMMARY_COLUMNS)
+    assert "ai_analysis" not in selected.split(",")
+    assert result[0].impact_score == 9.5
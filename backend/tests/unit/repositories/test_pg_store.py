@@ -0,0 +1,137 @@
+import os
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.models.commit import Commit
+from app.repositories.commit_repository import CommitRepository
+from app.repositories.pg_store import PgCommitStore, PgTable, coerce_value
+
+COMMIT_TYPES = {
+    "id": "uuid",
+    "commit_hash": "character varying",
+    "commit_timestamp": "timestamp without time zone",
+    "author_id": "uuid",
+    "lines_added": "integer",
+    "ai_estimated_hours": "numeric(5,1)",
+    "impact_score": "real",
+    "ai_analysis": "jsonb",
+}
+
+
+def test_coerce_value_matches_column_types():
+    aware = datetime(2025, 1, 2, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    assert coerce_value(aware, "timestamp without time zone") == datetime(2025, 1, 2, 10, 0)
+    assert coerce_value("2025-01-02T10:00:00Z", "timestamp with time zone") == datetime(
+        2025, 1, 2, 10, 0, tzinfo=timezone.utc
+    )
+    assert coerce_value(date(2025, 1, 2), "timestamp with time zone").tzinfo == timezone.utc
+    assert coerce_value("2025-01-02T00:00:00", "date") == date(2025, 1, 2)
+    assert isinstance(coerce_value(str(uuid4()), "uuid"), UUID)
+    assert coerce_value("2.5", "numeric(5,1)") == Decimal("2.5")
+    assert coerce_value(Decimal("7.5"), "real") == 7.5
+    assert coerce_value({"a": 1}, "jsonb") == {"a": 1}
+    assert coerce_value(None, "uuid") is None
+
+
+def _fake_connection(rows):
+    connection = MagicMock()
+    connection.fetch = AsyncMock(return_value=rows)
+
+    @asynccontextmanager
+    async def _acquire():
+        yield connection
+
+    return connection, _acquire
+
+
+class TestPgCommitStore:
+    @pytest.mark.asyncio
+    async def test_upsert_drops_unknown_columns_and_coerces(self):
+        store = PgCommitStore()
+        connection, acquire = _fake_connection([{"commit_hash": "abc", "id": uuid4()}])
+        with patch.object(PgTable, "column_types", AsyncMock(return_value=COMMIT_TYPES)), patch(
+            "app.repositories.pg_store.pg_connection", acquire
+        ):
+            row = await store.upsert_commit(
+                {"commit_hash": "abc", "lines_added": "3", "not_a_column": 1, "ai_estimated_hours": "1.5"}
+            )
+
+        sql, *args = connection.fetch.call_args.args
+        assert sql == (
+            'INSERT INTO "public"."commits" ("commit_hash", "lines_added", "ai_estimated_hours") '
+            'VALUES ($1, $2, $3) ON CONFLICT ("commit_hash") DO UPDATE SET '
+            '"lines_added" = EXCLUDED."lines_added", "ai_estimated_hours" = EXCLUDED."ai_estimated_hours" RETURNING *'
+        )
+        assert args == ["abc", 3, Decimal("1.5")]
+        # UUIDs come back as strings, like PostgREST rows
+        assert isinstance(row["id"], str)
+
+    @pytest.mark.asyncio
+    async def test_existing_hashes_is_one_array_query(self):
+        store = PgCommitStore()
+        connection, acquire = _fake_connection([{"commit_hash": "a"}])
+        with patch("app.repositories.pg_store.pg_connection", acquire):
+            assert await store.existing_hashes(["a", "b", "c"]) == ["a"]
+
+        connection.fetch.assert_awaited_once()
+        assert connection.fetch.call_args.args[1] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_commit_repository_delegates_to_pg_store():
+    client = MagicMock()
+    repo = CommitRepository(client=client)
+    repo._pg = MagicMock()
+    repo._pg.get_by_hash = AsyncMock(
+        return_value={"commit_hash": "abc", "commit_timestamp": datetime(2025, 1, 2), "ai_estimated_hours": 2.46}
+    )
+
+    commit = await repo.get_commit_by_hash("abc")
+
+    assert commit.ai_estimated_hours == Decimal("2.5")
+    client.from_.assert_not_called()
+
+
+PG_TEST_DSN = os.getenv("PG_TEST_DATABASE_URL")
+
+
+@pytest.mark.skipif(not PG_TEST_DSN, reason="PG_TEST_DATABASE_URL is not set")
+@pytest.mark.asyncio
+async def test_round_trip_against_local_postgres():
+    """Runs against a disposable local database with the commits schema applied."""
+    pytest.importorskip("asyncpg")
+    from app.config import postgres_pool
+
+    pool = await postgres_pool.create_pg_pool(PG_TEST_DSN, min_size=1, max_size=2)
+    with patch.object(postgres_pool, "_pool", pool):
+        repo = CommitRepository(client=MagicMock())
+        repo._pg = PgCommitStore()
+        prefix = f"pgtest-{uuid4().hex[:8]}"
+        commits = [
+            Commit(commit_hash=f"{prefix}-{i}", commit_timestamp=datetime(2025, 1, 2, 10, i), lines_added=i)
+            for i in range(3)
+        ]
+        try:
+            inserted = await repo.bulk_insert_commits(commits)
+            # Conflicting hashes are skipped rather than failing the batch
+            again = await repo.bulk_insert_commits(commits[:1])
+            existing = await repo.get_existing_commit_hashes([c.commit_hash for c in commits] + ["missing"])
+
+            async with postgres_pool.pg_transaction():
+                await repo.save_commit(commits[0].model_copy(update={"lines_added": 42}))
+            fetched = await repo.get_commit_by_hash(commits[0].commit_hash)
+        finally:
+            async with pool.acquire() as connection:
+                await connection.execute("DELETE FROM public.commits WHERE commit_hash LIKE $1", prefix + "%")
+            await pool.close()
+
+    assert len(inserted) == 3
+    assert again == []
+    assert sorted(existing) == sorted(c.commit_hash for c in commits)
+    assert fetched.lines_added == 42
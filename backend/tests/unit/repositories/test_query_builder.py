@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.exceptions import BadRequestError
+from app.repositories.query_builder import KeysetQuery, decode_cursor, encode_cursor, project
+
+
+def _build_mock_client(*pages):
+    """Supabase client mock whose chained query returns the given pages of rows in order."""
+    query = MagicMock()
+    for method in ("select", "eq", "gt", "gte", "lt", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.side_effect = [MagicMock(data=rows) for rows in pages]
+
+    client = MagicMock()
+    client.table.return_value = query
+    return client, query
+
+
+def _rows(*ids):
+    return [{"id": row_id, "commit_timestamp": f"2025-01-{row_id:02d}T00:00:00+00:00"} for row_id in ids]
+
+
+def test_cursor_round_trip_and_validation():
+    cursor = encode_cursor("2025-01-02T00:00:00+00:00", "abc")
+
+    assert decode_cursor(cursor) == ("2025-01-02T00:00:00+00:00", "abc")
+    assert "=" not in cursor
+    with pytest.raises(BadRequestError):
+        decode_cursor("not-a-cursor")
+
+
+def test_project_adds_sort_columns():
+    assert project(None) == "*"
+    assert project(("commit_hash",), "commit_timestamp", "id") == "commit_hash,commit_timestamp,id"
+    assert project(("id", "commit_hash"), None, "id") == "id,commit_hash"
+
+
+class TestKeysetQuery:
+    """Test keyset pagination on (timestamp, id)."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_returns_next_cursor_when_more_rows_exist(self):
+        client, query = _build_mock_client(_rows(9, 8, 7))
+        keyset = KeysetQuery(client, "commits", columns=("commit_hash",), timestamp_column="commit_timestamp")
+
+        page = await keyset.where("eq", "author_id", "u1").fetch_page(limit=2)
+
+        assert [row["id"] for row in page.items] == [9, 8]
+        assert decode_cursor(page.next_cursor) == ("2025-01-08T00:00:00+00:00", 8)
+        query.select.assert_called_once_with("commit_hash,commit_timestamp,id")
+        query.limit.assert_called_once_with(3)
+        query.eq.assert_called_once_with("author_id", "u1")
+
+    @pytest.mark.asyncio
+    async def test_cursor_becomes_tuple_comparison(self):
+        client, query = _build_mock_client(_rows(7))
+        keyset = KeysetQuery(client, "commits", timestamp_column="commit_timestamp")
+
+        page = await keyset.fetch_page(cursor=encode_cursor("2025-01-08T00:00:00+00:00", 8), limit=2)
+
+        assert page.next_cursor is None
+        query.or_.assert_called_once_with(
+            'commit_timestamp.lt."2025-01-08T00:00:00+00:00",'
+            'and(commit_timestamp.eq."2025-01-08T00:00:00+00:00",id.lt."8")'
+        )
+
+    @pytest.mark.asyncio
+    async def test_iterate_walks_every_page(self):
+        client, query = _build_mock_client(_rows(5, 4, 3), _rows(3, 2, 1), _rows(1))
+        keyset = KeysetQuery(client, "commits", timestamp_column="commit_timestamp", row_factory=lambda r: r["id"])
+
+        ids = [row_id async for row_id in keyset.iterate(batch_size=2)]
+
+        assert ids == [5, 4, 3, 2, 1]
+        assert query.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_id_only_pagination(self):
+        client, query = _build_mock_client([{"id": "b"}])
+        keyset = KeysetQuery(client, "users", timestamp_column=None, descending=False)
+
+        await keyset.fetch_page(cursor=encode_cursor(None, "a"), limit=10)
+
+        query.gt.assert_called_once_with("id", "a")
+        query.order.assert_called_once_with("id", desc=False)
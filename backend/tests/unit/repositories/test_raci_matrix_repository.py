@@ -0,0 +1,152 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.models.raci_matrix import CreateRaciMatrixPayload, RaciActivity, RaciAssignment, RaciMatrixType, RaciRole
+from app.repositories.raci_matrix_repository import RaciMatrixRepository
+
+
+def _matrix_row(matrix_id):
+    return {
+        "id": matrix_id,
+        "name": f"Matrix {matrix_id[:4]}",
+        "description": None,
+        "matrix_type": "custom",
+        "metadata": {},
+        "is_active": True,
+        "created_by": None,
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": None,
+    }
+
+
+class FakeSupabase:
+    """Records every executed request as (table, operation, payload) and answers from canned table data."""
+
+    def __init__(self, tables=None, rpc_error=None, rpc_result=None):
+        self.tables = tables or {}
+        self.rpc_error = rpc_error
+        self.rpc_result = rpc_result
+        self.requests = []
+
+    def table(self, name):
+        fake = self
+        query = MagicMock()
+        state = {"op": "select", "payload": None}
+
+        def chain(op=None):
+            def method(*args, **kwargs):
+                if op:
+                    state["op"], state["payload"] = op, args[0] if args else None
+                return query
+
+            return method
+
+        for method in ("select", "eq", "in_", "order"):
+            setattr(query, method, chain())
+        for op in ("insert", "upsert", "update", "delete"):
+            setattr(query, op, chain(op))
+
+        def execute():
+            fake.requests.append((name, state["op"], state["payload"]))
+            if state["op"] == "insert" and name == "raci_matrices":
+                return MagicMock(data=[{"id": str(uuid4())}])
+            return MagicMock(data=fake.tables.get(name, []) if state["op"] == "select" else [{}])
+
+        query.execute = execute
+        return query
+
+    def rpc(self, name, params):
+        query = MagicMock()
+
+        def execute():
+            self.requests.append(("rpc", name, params))
+            if self.rpc_error:
+                raise self.rpc_error
+            return MagicMock(data=self.rpc_result)
+
+        query.execute = execute
+        return query
+
+
+def _payload():
+    return CreateRaciMatrixPayload(
+        name="Release",
+        matrix_type=RaciMatrixType.CUSTOM,
+        activities=[RaciActivity(id=f"a{i}", name=f"Activity {i}") for i in range(3)],
+        roles=[RaciRole(id=f"r{i}", name=f"Role {i}") for i in range(2)],
+        assignments=[RaciAssignment(activity_id="a0", role_id="r0", role="R")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_all_matrices_uses_constant_number_of_queries():
+    ids = [str(uuid4()) for _ in range(5)]
+    client = FakeSupabase(
+        {
+            "raci_matrices": [_matrix_row(matrix_id) for matrix_id in ids],
+            "raci_activities": [
+                {"matrix_id": ids[1], "activity_id": "a1", "name": "A", "description": None, "order_index": 0}
+            ],
+            "raci_assignments": [
+                {"matrix_id": ids[1], "activity_id": "a1", "role_id": "r1", "role": "R", "notes": None}
+            ],
+        }
+    )
+    repo = RaciMatrixRepository(client=client)
+
+    matrices = await repo.get_all_matrices()
+
+    assert len(matrices) == 5
+    assert len(client.requests) == 4
+    by_id = {str(matrix.id): matrix for matrix in matrices}
+    assert [activity.id for activity in by_id[ids[1]].activities] == ["a1"]
+    assert by_id[ids[0]].activities == [] and by_id[ids[0]].assignments == []
+
+
+@pytest.mark.asyncio
+async def test_create_matrix_saves_through_one_rpc():
+    matrix_id = str(uuid4())
+    client = FakeSupabase({"raci_matrices": [_matrix_row(matrix_id)]}, rpc_result=matrix_id)
+    repo = RaciMatrixRepository(client=client)
+
+    matrix = await repo.create_matrix(_payload(), created_by=None)
+
+    assert str(matrix.id) == matrix_id
+    writes = [request for request in client.requests if request[1] != "select"]
+    assert len(writes) == 1
+    _, name, params = writes[0]
+    assert name == "save_raci_matrix"
+    assert params["p_matrix_id"] is None
+    assert len(params["p_activities"]) == 3 and len(params["p_roles"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_matrix_falls_back_to_multi_row_inserts(monkeypatch):
+    monkeypatch.setattr(RaciMatrixRepository, "_save_rpc_available", True)
+    missing = APIError({"code": "PGRST202", "message": "Could not find the function"})
+    client = FakeSupabase({"raci_matrices": [_matrix_row(str(uuid4()))]}, rpc_error=missing)
+    repo = RaciMatrixRepository(client=client)
+
+    await repo.create_matrix(_payload(), created_by=None)
+
+    inserts = [
+        (table, len(rows) if isinstance(rows, list) else 1) for table, op, rows in client.requests if op == "insert"
+    ]
+    assert inserts == [("raci_matrices", 1), ("raci_activities", 3), ("raci_roles", 2), ("raci_assignments", 1)]
+    assert RaciMatrixRepository._save_rpc_available is False
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_assignments_is_one_upsert():
+    client = FakeSupabase({"raci_matrices": [{"id": "m"}]})
+    repo = RaciMatrixRepository(client=client)
+
+    count = await repo.bulk_update_assignments(uuid4(), ["a1", "a2", "a3"], ["r1", "r2"], "C", None, False)
+
+    assert count == 6
+    upserts = [rows for table, op, rows in client.requests if op == "upsert"]
+    assert len(upserts) == 1 and len(upserts[0]) == 6
+    assert not [request for request in client.requests if request[1] in ("insert", "delete")]
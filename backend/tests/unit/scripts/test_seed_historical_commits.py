@@ -0,0 +1,97 @@
+"""Prefetch window of the historical commit seeder."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts.seed_historical_commits import HistoricalCommitSeeder
+
+REPOSITORY = "org/repo"
+
+
+@pytest.fixture
+def seeder():
+    with (
+        patch("scripts.seed_historical_commits.get_supabase_client_safe", return_value=MagicMock()),
+        patch("scripts.seed_historical_commits.CommitRepository"),
+        patch("scripts.seed_historical_commits.DailyWorkAnalysisRepository"),
+        patch("scripts.seed_historical_commits.CommitAnalyzer"),
+    ):
+        # github_concurrency=1: prefetching runs at most 8 commits ahead of analysis
+        seeder = HistoricalCommitSeeder(github_token="token", github_concurrency=1)
+    seeder.fetched = []
+    seeder.gate = None
+
+    async def fetch(repository, sha):
+        seeder.fetched.append(sha)
+        if seeder.gate is not None:
+            await seeder.gate.wait()
+        if sha.startswith("bad"):
+            raise RuntimeError("GitHub unavailable")
+        seeder._fetched_shas.add(sha)
+        seeder._commit_cache[sha] = ({"sha": sha}, f"diff {sha}")
+
+    seeder._fetch_commit_uncached = fetch
+    return seeder
+
+
+def _free_slots(seeder):
+    return seeder._prefetch_window._value
+
+
+@pytest.mark.asyncio
+async def test_prefetch_stays_within_window_until_commits_are_consumed(seeder):
+    shas = [f"c{i:02d}" for i in range(12)]
+    task = asyncio.create_task(seeder.prefetch_commits(REPOSITORY, shas))
+    await asyncio.sleep(0.01)
+
+    assert seeder.fetched == shas[:8]
+    assert _free_slots(seeder) == 0
+
+    assert await seeder.fetch_commit(REPOSITORY, "c00") == ({"sha": "c00"}, "diff c00")
+    await asyncio.sleep(0.01)
+    assert seeder.fetched == shas[:9]
+
+    for sha in shas[1:]:
+        await seeder.fetch_commit(REPOSITORY, sha)
+    await task
+    assert _free_slots(seeder) == 8 and not seeder._commit_cache
+
+
+@pytest.mark.asyncio
+async def test_released_commits_free_their_slots_without_being_consumed(seeder):
+    shas = [f"c{i:02d}" for i in range(12)]
+    task = asyncio.create_task(seeder.prefetch_commits(REPOSITORY, shas))
+    await asyncio.sleep(0.01)
+
+    # A day whose commits were all skipped (already stored or filtered) never calls fetch_commit
+    seeder.release_prefetched(shas[:8])
+    await task
+
+    assert seeder.fetched == shas
+    assert set(seeder._commit_cache) == set(shas[8:])
+    seeder.release_prefetched(shas[8:])
+    assert _free_slots(seeder) == 8 and not seeder._prefetch_held
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_does_not_hold_a_slot(seeder):
+    await seeder.prefetch_commits(REPOSITORY, ["bad1", "c01", "bad2"])
+
+    assert set(seeder._prefetch_held) == {"c01"}
+    assert _free_slots(seeder) == 7
+
+
+@pytest.mark.asyncio
+async def test_fetch_landing_after_release_is_dropped(seeder):
+    seeder.gate = asyncio.Event()
+    task = asyncio.create_task(seeder.prefetch_commits(REPOSITORY, ["c01", "c02"]))
+    await asyncio.sleep(0.01)
+
+    seeder.release_prefetched(["c01"])
+    seeder.gate.set()
+    await task
+
+    assert set(seeder._commit_cache) == {"c02"}
+    assert _free_slots(seeder) == 7
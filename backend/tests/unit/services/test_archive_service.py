@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.archive_service import ArchiveService
+from app.services.archive_storage import ArchiveStore
+
+
+class FakeTable:
+    """Tiny in-memory PostgREST table supporting the filters the archiver uses."""
+
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+        self.filters, self.op, self.payload = [], "select", None
+        self._order, self._limit, self._count = None, None, False
+
+    def select(self, columns, count=None):
+        self._count = count is not None
+        return self
+
+    def filter(self, column, operator, value):
+        assert operator == "lt"
+        self.filters.append(lambda row: str(row[column]) < value)
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    @property
+    def not_(self):
+        return SimpleNamespace(is_=lambda column, value: self._not_null(column))
+
+    def _not_null(self, column):
+        self.filters.append(lambda row: row.get(column) is not None)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: str(row[column]) > value)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def order(self, column):
+        self._order = column
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def update(self, data):
+        self.op, self.payload = "update", data
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self.op, self.payload = "upsert", rows
+        return self
+
+    def execute(self):
+        self.db.calls.append((self.name, self.op))
+        rows = self.db.tables[self.name]
+        if self.op == "upsert":
+            rows.extend(dict(row) for row in self.payload)
+            return SimpleNamespace(data=self.payload, count=None)
+        matched = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=matched, count=None)
+        if self.op == "delete":
+            self.db.tables[self.name] = [row for row in rows if row not in matched]
+            return SimpleNamespace(data=matched, count=None)
+        if self._order:
+            matched.sort(key=lambda row: str(row[self._order]))
+        if self._limit is not None:
+            matched = matched[: self._limit]
+        return SimpleNamespace(data=[dict(row) for row in matched], count=len(matched) if self._count else None)
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.calls = []
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+def _commits(n, days_old=900):
+    timestamp = (datetime.now() - timedelta(days=days_old)).isoformat()
+    return [{"id": str(uuid4()), "commit_timestamp": timestamp, "archived_at": None} for _ in range(n)]
+
+
+def _service(db, tmp_path, batch_size=10):
+    return ArchiveService(db, store=ArchiveStore(str(tmp_path)), batch_size=batch_size, batch_sleep_seconds=0)
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_runs_in_primary_key_batches(tmp_path):
+    db = FakeSupabase({"commits": _commits(25) + _commits(5, days_old=1)})
+    service = _service(db, tmp_path)
+
+    result = await service.archive_old_data("commits", dry_run=False)
+
+    assert result["commits"]["records_archived"] == 25
+    assert result["commits"]["batches"] == 3
+    assert db.calls.count(("commits", "update")) == 3
+    assert sum(1 for row in db.tables["commits"] if row["archived_at"]) == 25
+    assert service.store.load_checkpoint("commits").completed
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_checkpoint(tmp_path):
+    db = FakeSupabase({"commits": _commits(25)})
+    service = _service(db, tmp_path)
+    original_execute = service._execute
+    updates = 0
+
+    async def flaky_execute(query):
+        nonlocal updates
+        if query.op == "update":
+            updates += 1
+            if updates == 2:
+                raise RuntimeError("statement timeout")
+        return await original_execute(query)
+
+    service._execute = flaky_execute
+    with pytest.raises(Exception):
+        await service.archive_old_data("commits", dry_run=False)
+    assert service.store.load_checkpoint("commits").rows == 10
+
+    result = await service.archive_old_data("commits", dry_run=False)
+
+    assert result["commits"]["resumed"] is True
+    assert result["commits"]["records_archived"] == 15
+    assert all(row["archived_at"] for row in db.tables["commits"])
+
+
+@pytest.mark.asyncio
+async def test_move_to_archive_writes_files_and_restores_requested_ids(tmp_path):
+    rows = _commits(23)
+    db = FakeSupabase({"commits": [dict(row) for row in rows], "daily_reports": [], "tasks": [], "docs": []})
+    service = _service(db, tmp_path)
+    service.update_retention_policy("commits", 24, archive_method="move_to_archive")
+
+    result = await service.archive_old_data("commits", dry_run=False)
+
+    assert result["commits"]["records_archived"] == 23
+    assert db.tables["commits"] == []
+    manifest = service.store.load_manifest("commits")
+    assert [part.rows for part in manifest] == [10, 10, 3]
+    assert all((tmp_path / "commits" / part.file).name.endswith(".ndjson.gz") for part in manifest)
+
+    wanted = sorted(row["id"] for row in rows)[:2] + [str(uuid4())]
+    restored = await service.restore_archived_data("commits", wanted)
+
+    assert restored["records_restored"] == 2
+    assert sorted(row["id"] for row in db.tables["commits"]) == wanted[:2]
+
+    stats = await service.get_archive_statistics()
+    assert stats["commits"]["file_archived_records"] == 23
+    assert stats["commits"]["archive_files"] == 3
@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.batch_orchestrator import BatchJobStore, BatchOrchestrator, shard_requests
+from app.services.batch_service import OpenAIBatchService
+
+
+class FakeBatchService:
+    """In-memory stand-in for OpenAIBatchService that completes batches on the second poll."""
+
+    def __init__(self):
+        self.batches = {}
+        self.metadata = {}
+        self.files = {}
+        self.polls = {}
+
+    async def enqueue_batch_file(self, file_bytes, completion_window="24h", metadata=None):
+        batch_id = f"batch_{len(self.batches)}"
+        requests = [json.loads(line) for line in file_bytes.decode().splitlines()]
+        self.batches[batch_id] = requests
+        self.metadata[batch_id] = metadata or {}
+        return {"id": batch_id, "status": "validating"}
+
+    async def find_batch(self, metadata):
+        for batch_id, batch_metadata in reversed(self.metadata.items()):
+            if all(batch_metadata.get(key) == value for key, value in metadata.items()):
+                return {"id": batch_id, "status": "validating", "metadata": batch_metadata}
+        return None
+
+    async def retrieve_batch(self, batch_id):
+        self.polls[batch_id] = self.polls.get(batch_id, 0) + 1
+        if self.polls[batch_id] < 2:
+            return {"id": batch_id, "status": "in_progress"}
+        output_id = f"file_{batch_id}"
+        self.files[output_id] = [
+            {
+                "custom_id": req["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": json.dumps({"echo": req["custom_id"]})}}]},
+                },
+            }
+            for req in self.batches[batch_id]
+        ]
+        return {"id": batch_id, "status": "completed", "output_file_id": output_id}
+
+    async def iter_file_lines(self, file_id):
+        for line in self.files[file_id]:
+            yield line
+
+
+def _items(count):
+    return [
+        (
+            f"sha{i}",
+            OpenAIBatchService.build_chat_request(f"hours-sha{i}", "gpt-test", [{"role": "user", "content": "x"}]),
+        )
+        for i in range(count)
+    ]
+
+
+def test_shard_requests_respects_request_and_byte_limits():
+    shards = list(shard_requests(_items(5), max_requests=2))
+    assert [len(shard.mappings) for shard in shards] == [2, 2, 1]
+    assert shards[0].mappings[0] == ("hours-sha0", "sha0")
+
+    line_size = len(shards[0].file_bytes) // 2
+    by_bytes = list(shard_requests(_items(3), max_bytes=line_size + 10))
+    assert [len(shard.mappings) for shard in by_bytes] == [1, 1, 1]
+
+
+class TestBatchOrchestrator:
+    """Test submission, polling and streaming of batch jobs."""
+
+    @pytest.mark.asyncio
+    async def test_run_streams_results_to_handler(self, tmp_path):
+        service = FakeBatchService()
+        store = BatchJobStore(str(tmp_path / "batches.db"))
+        orchestrator = BatchOrchestrator(service, store, poll_interval=0, max_requests_per_batch=2)
+        seen = {}
+
+        async def handler(ref, line):
+            seen[ref] = json.loads(OpenAIBatchService.extract_response_text(line))["echo"]
+
+        summary = await orchestrator.run("job", _items(3), handler)
+        store.close()
+
+        assert summary == {"succeeded": 3, "failed": 0, "skipped": 0, "requeued": 0}
+        assert seen == {"sha0": "hours-sha0", "sha1": "hours-sha1", "sha2": "hours-sha2"}
+        assert len(service.batches) == 2
+
+    @pytest.mark.asyncio
+    async def test_resume_after_crash_skips_submitted_and_handled_requests(self, tmp_path):
+        path = str(tmp_path / "batches.db")
+        service = FakeBatchService()
+        handled = []
+
+        async def crashing_handler(ref, line):
+            if ref == "sha1":
+                raise asyncio.CancelledError()
+            handled.append(ref)
+
+        first = BatchOrchestrator(service, BatchJobStore(path), poll_interval=0)
+        with pytest.raises(asyncio.CancelledError):
+            await first.run("job", _items(3), crashing_handler)
+        first.store.close()
+        assert handled == ["sha0"]
+
+        async def handler(ref, line):
+            handled.append(ref)
+
+        second = BatchOrchestrator(service, BatchJobStore(path), poll_interval=0)
+        summary = await second.run("job", _items(3), handler)
+
+        # No second upload, and sha0 is not handled twice
+        assert len(service.batches) == 1
+        assert handled == ["sha0", "sha1", "sha2"]
+        assert summary["succeeded"] == 2
+        assert second.store.job_status("job") == "completed"
+        second.store.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_lines_are_counted(self, tmp_path):
+        service = FakeBatchService()
+        orchestrator = BatchOrchestrator(service, BatchJobStore(str(tmp_path / "b.db")), poll_interval=0)
+        await orchestrator.submit("job", _items(1))
+        service.files["errors"] = [{"custom_id": "hours-sha0", "error": {"message": "bad request"}}]
+
+        async def failed(batch_id):
+            return {"id": batch_id, "status": "failed", "error_file_id": "errors"}
+
+        service.retrieve_batch = failed
+
+        await orchestrator.wait("job")
+        summary = await orchestrator.process_results("job", handler=None)
+        orchestrator.store.close()
+
+        assert summary == {"succeeded": 0, "failed": 1, "skipped": 0, "requeued": 0}
+
+    @pytest.mark.asyncio
+    async def test_requests_of_expired_batches_are_resubmitted(self, tmp_path):
+        service = FakeBatchService()
+        orchestrator = BatchOrchestrator(service, BatchJobStore(str(tmp_path / "b.db")), poll_interval=0)
+        complete = service.retrieve_batch
+
+        async def first_batch_expires(batch_id):
+            if batch_id == "batch_0":
+                return {"id": batch_id, "status": "expired"}
+            return await complete(batch_id)
+
+        service.retrieve_batch = first_batch_expires
+        handled = []
+
+        async def handler(ref, line):
+            handled.append(ref)
+
+        summary = await orchestrator.run("job", _items(2), handler)
+
+        assert len(service.batches) == 2
+        assert sorted(handled) == ["sha0", "sha1"]
+        assert summary == {"succeeded": 2, "failed": 0, "skipped": 0, "requeued": 0}
+        assert orchestrator.store.job_status("job") == "completed"
+        orchestrator.store.close()
+
+    @pytest.mark.asyncio
+    async def test_unanswered_requests_keep_job_open_when_resubmits_run_out(self, tmp_path):
+        service = FakeBatchService()
+        orchestrator = BatchOrchestrator(
+            service, BatchJobStore(str(tmp_path / "b.db")), poll_interval=0, max_resubmits=0
+        )
+
+        async def cancelled(batch_id):
+            return {"id": batch_id, "status": "cancelled"}
+
+        service.retrieve_batch = cancelled
+
+        summary = await orchestrator.run("job", _items(2), handler=None)
+
+        assert summary["requeued"] == 2
+        assert orchestrator.store.job_status("job") != "completed"
+        assert orchestrator.store.submitted_custom_ids("job") == set()
+        orchestrator.store.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_adopts_batch_created_before_crash(self, tmp_path):
+        path = str(tmp_path / "batches.db")
+        service = FakeBatchService()
+        first = BatchOrchestrator(service, BatchJobStore(path), poll_interval=0)
+
+        def crash_before_recording(*args, **kwargs):
+            raise asyncio.CancelledError()
+
+        first.store.update_shard = crash_before_recording
+        with pytest.raises(asyncio.CancelledError):
+            await first.submit("job", _items(2))
+        first.store.close()
+        assert len(service.batches) == 1
+
+        handled = []
+
+        async def handler(ref, line):
+            handled.append(ref)
+
+        second = BatchOrchestrator(service, BatchJobStore(path), poll_interval=0)
+        summary = await second.run("job", _items(2), handler)
+        second.store.close()
+
+        # The batch uploaded before the crash is reused instead of uploading a duplicate
+        assert len(service.batches) == 1
+        assert sorted(handled) == ["sha0", "sha1"]
+        assert summary["succeeded"] == 2
+
+
+def test_extract_response_text_formats():
+    chat = {"response": {"body": {"choices": [{"message": {"content": "{}"}}]}}}
+    responses = {"response": {"body": {"output": [{"content": [{"type": "output_text", "text": '{"a": 1}'}]}]}}}
+    assert OpenAIBatchService.extract_response_text(chat) == "{}"
+    assert OpenAIBatchService.extract_response_text(responses) == '{"a": 1}'
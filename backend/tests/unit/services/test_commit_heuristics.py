@@ -0,0 +1,153 @@
+"""
+Unit tests for the heuristic commit pre-classifier.
+"""
+
+from app.services.commit_heuristics import HEURISTIC_VERSION, HeuristicCommitClassifier, replay_heuristics
+
+
+def _commit(message, files, diff="", additions=1, deletions=1, **extra):
+    return {
+        "commit_hash": "abc123",
+        "repository": "org/repo",
+        "message": message,
+        "files_changed": files,
+        "additions": additions,
+        "deletions": deletions,
+        "diff": diff,
+        **extra,
+    }
+
+
+def _patch(filename, patch, status="modified"):
+    """A file section in the layout CommitAnalysisService sends to the analyzer."""
+    return f"File: {filename}\nStatus: {status}\nChanges: +1 -1\n{patch}\n\n"
+
+
+class TestHeuristicCommitClassifier:
+    """Test which commits are scored locally."""
+
+    def setup_method(self):
+        self.classifier = HeuristicCommitClassifier()
+
+    def test_merge_commit(self):
+        verdict = self.classifier.classify(
+            _commit("Merge pull request #12 from org/feature", ["app/a.py"] * 3, additions=900)
+        )
+
+        assert verdict.rule == "merge"
+        assert verdict.model_used == f"heuristic-v{HEURISTIC_VERSION}"
+        assert verdict.hours["final_anchor"] == "A"
+        assert verdict.hours["estimated_hours"] == 0.5
+
+    def test_lockfile_only_commit(self):
+        verdict = self.classifier.classify(
+            _commit("Update deps", ["frontend/package-lock.json", "backend/poetry.lock"], additions=3000)
+        )
+
+        assert verdict.rule == "lockfile_only"
+        assert verdict.hours["estimated_hours"] == 0.5
+
+    def test_version_bump(self):
+        diff = _patch(
+            "package.json", '@@ -2,3 +2,3 @@\n   "name": "app",\n-  "version": "1.2.3",\n+  "version": "1.2.4",'
+        )
+        diff += _patch("CHANGELOG.md", "@@ -1,1 +1,3 @@\n+## 1.2.4\n+- Fix login")
+
+        verdict = self.classifier.classify(_commit("Release 1.2.4", ["package.json", "CHANGELOG.md"], diff))
+
+        assert verdict.rule == "version_bump"
+
+    def test_manifest_dependency_change_falls_through(self):
+        diff = _patch("package.json", '@@ -5,1 +5,2 @@\n+    "left-pad": "^1.3.0",')
+
+        assert self.classifier.classify(_commit("Add left-pad", ["package.json"], diff)) is None
+
+    def test_formatting_only_commit(self):
+        patch = "@@ -1,2 +1,3 @@\n-    total = compute(a,b,\n-      c)\n+    total = compute(\n+        a, b, c\n+    )"
+
+        verdict = self.classifier.classify(
+            _commit("Run black", ["app/a.py"], _patch("app/a.py", patch), additions=3, deletions=2)
+        )
+
+        assert verdict.rule == "formatting_only"
+        assert verdict.hours["multipliers_applied"] == ["Formatting/refactoring only: -30%"]
+        assert verdict.hours["estimated_hours"] == 0.5
+
+    def test_reindenting_a_python_statement_is_not_formatting(self):
+        patch = "@@ -3,3 +3,3 @@\n     if user.is_admin:\n         log(user)\n-        audit()\n+    audit()"
+
+        verdict = self.classifier.classify(_commit("Reformat", ["app/a.py"], _patch("app/a.py", patch)))
+
+        assert verdict is None
+
+    def test_dedent_only_in_yaml_is_not_formatting(self):
+        patch = "@@ -4,2 +4,2 @@\n-  image: app\n-    ports: [80]\n+  image: app\n+  ports: [80]"
+
+        verdict = self.classifier.classify(_commit("Fix indentation", ["deploy.yml"], _patch("deploy.yml", patch)))
+
+        assert verdict is None
+
+    def test_whitespace_inside_a_string_is_not_formatting(self):
+        patch = '@@ -1,1 +1,1 @@\n-const MESSAGE = "access denied";\n+const MESSAGE = "accessdenied";'
+
+        verdict = self.classifier.classify(_commit("Tidy", ["src/auth.ts"], _patch("src/auth.ts", patch)))
+
+        assert verdict is None
+
+    def test_reindenting_outside_indent_sensitive_files_is_formatting(self):
+        patch = "@@ -1,2 +1,2 @@\n-if (ok) {\n-audit();\n+if (ok) {\n+    audit();"
+
+        verdict = self.classifier.classify(_commit("Indent", ["src/auth.ts"], _patch("src/auth.ts", patch)))
+
+        assert verdict.rule == "formatting_only"
+
+    def test_typo_fix(self):
+        patch = '@@ -3,1 +3,1 @@\n-    raise ValueError("Recieved invalid data")\n+    raise ValueError("Received invalid data")'
+
+        verdict = self.classifier.classify(_commit("Fix typo in error", ["app/a.py"], _patch("app/a.py", patch)))
+
+        assert verdict.rule == "typo_fix"
+        assert verdict.hours["seniority_rationale"] == "Trivial change"
+
+    def test_typo_message_with_logic_change_falls_through(self):
+        patch = (
+            "@@ -3,1 +3,1 @@\n-    return total / count\n+    return sum(values) / max(len(values), 1) if values else 0"
+        )
+
+        assert self.classifier.classify(_commit("Fix typo", ["app/a.py"], _patch("app/a.py", patch))) is None
+
+    def test_docs_only_commit_uses_line_anchor_and_multiplier(self):
+        verdict = self.classifier.classify(
+            _commit("Document setup", ["README.md", "docs/setup.rst"], additions=280, deletions=20)
+        )
+
+        assert verdict.rule == "docs_only"
+        assert (verdict.hours["initial_anchor"], verdict.hours["final_anchor"]) == ("C", "B")
+        assert verdict.hours["estimated_hours"] == 1.5  # 2.5h × 0.5, rounded to the half hour
+        assert verdict.impact["code_quality_points"]["score"] == 1
+
+    def test_code_change_falls_through(self):
+        patch = "@@ -1,0 +1,2 @@\n+def retry(fn):\n+    return fn()"
+
+        assert self.classifier.classify(_commit("Add retry", ["app/a.py"], _patch("app/a.py", patch))) is None
+
+    def test_missing_patch_falls_through_for_content_rules(self):
+        diff = "File: app/a.py\nStatus: modified\nChanges: +1 -1\n(No patch data available)\n\n"
+
+        assert self.classifier.classify(_commit("Fix typo", ["app/a.py"], diff)) is None
+
+
+def test_replay_reports_agreement_and_calls_saved():
+    samples = [
+        (_commit("Update deps", ["yarn.lock"]), {"estimated_hours": 0.5, "impact_score": 4.0, "risk_level": "low"}),
+        (_commit("Merge branch 'main'", ["app/a.py"]), {"estimated_hours": 12.0, "impact_score": 20.0}),
+        (_commit("Add retry", ["app/a.py"]), {"estimated_hours": 2.5, "impact_score": 15.0}),
+    ]
+
+    report = replay_heuristics(samples).to_dict()
+
+    assert report["commits"] == 3 and report["classified"] == 2
+    assert report["api_calls_saved_fraction"] == round(2 / 3, 4)
+    assert report["hours_agreement"] == 0.5
+    assert report["rules"]["lockfile_only"] == {"classified": 1, "hours_agree": 1, "impact_agree": 1}
+    assert [item["rule"] for item in report["disagreements"]] == ["merge"]
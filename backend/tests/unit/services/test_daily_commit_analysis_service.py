@@ -8,7 +8,7 @@ import pytest
 from app.models.commit import Commit
 from app.models.daily_commit_analysis import DailyCommitAnalysis
 from app.models.daily_report import DailyReport
-from app.services.daily_commit_analysis_service import DailyCommitAnalysisService
+from app.services.daily_commit_analysis_service import DailyCommitAnalysisService, daily_input_fingerprints
 
 
 @pytest.fixture
@@ -378,3 +378,113 @@ def test_init_service():
         assert service.daily_report_repo is not None
         assert service.user_repo is not None
         assert service.ai_integration is not None
+
+
+@pytest.mark.asyncio
+async def test_run_midnight_analysis_batch_mode(service, sample_commits):
+    """Batch mode submits one request per user with work and saves streamed results"""
+
+    busy_user, idle_user = uuid4(), uuid4()
+    service.repository.get_users_without_analysis = AsyncMock(return_value=[busy_user, idle_user])
+    service._gather_inputs = AsyncMock(side_effect=[(sample_commits, None), ([], None)])
+    service._create_zero_hour_analysis = AsyncMock()
+    service._prepare_analysis_context = AsyncMock(return_value={"total_commits": 2})
+    service._save_analysis = AsyncMock()
+    service.ai_integration.model = "gpt-test"
+    service.ai_integration.build_daily_work_messages = Mock(return_value=[{"role": "user", "content": "x"}])
+    service.ai_integration.parse_daily_work_response = Mock(return_value={"total_estimated_hours": 3.0})
+
+    async def fake_run(job_name, items, handler):
+        assert [ref for ref, _ in items] == [str(busy_user)]
+        await handler(str(busy_user), {"response": {"body": {"choices": [{"message": {"content": "{}"}}]}}})
+        return {"succeeded": 1, "failed": 0, "skipped": 0}
+
+    orchestrator = Mock()
+    orchestrator.run = fake_run
+    with patch("app.services.daily_commit_analysis_service.create_batch_orchestrator", return_value=orchestrator):
+        result = await service.run_midnight_analysis(use_batch=True)
+
+    assert result == {"analyzed": 2, "failed": 0}
+    service._create_zero_hour_analysis.assert_called_once()
+    service._save_analysis.assert_called_once()
+    assert service._save_analysis.call_args[0][4] == {"total_estimated_hours": 3.0}
+
+
+def _analyzed_day(sample_user_id, sample_date, ai_analysis):
+    return DailyCommitAnalysis(
+        id=uuid4(),
+        user_id=sample_user_id,
+        analysis_date=sample_date,
+        total_estimated_hours=Decimal("3.5"),
+        commit_count=2,
+        analysis_type="with_report",
+        ai_analysis=ai_analysis,
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+
+
+def _reanalysis_mocks(service, existing, commits, daily_report, ai_result):
+    service.repository.get_by_user_and_date = AsyncMock(return_value=existing)
+    service.repository.update = AsyncMock(return_value=existing)
+    service._get_user_commits_for_date = AsyncMock(return_value=commits)
+    service.daily_report_repo.get_daily_reports_by_user_and_date = AsyncMock(return_value=daily_report)
+    service.user_repo.get_by_id = AsyncMock(return_value=Mock(name="Developer"))
+    service.ai_integration.analyze_daily_work = AsyncMock(return_value=ai_result)
+    service.ai_integration.analyze_daily_work_delta = AsyncMock(return_value=ai_result)
+    service._link_commits_to_analysis = AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_reanalysis_with_unchanged_inputs_skips_ai(
+    service, sample_user_id, sample_date, sample_commits, sample_daily_report, sample_ai_analysis
+):
+    fingerprints = daily_input_fingerprints(sample_commits, sample_daily_report)
+    existing = _analyzed_day(sample_user_id, sample_date, {**sample_ai_analysis, **fingerprints})
+    _reanalysis_mocks(service, existing, sample_commits, sample_daily_report, sample_ai_analysis)
+
+    result = await service.analyze_for_report(sample_user_id, sample_date, sample_daily_report)
+
+    assert result is existing
+    service.ai_integration.analyze_daily_work.assert_not_called()
+    service.ai_integration.analyze_daily_work_delta.assert_not_called()
+    service.repository.update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reanalysis_with_new_commit_sends_delta(
+    service, sample_user_id, sample_date, sample_commits, sample_daily_report, sample_ai_analysis
+):
+    fingerprints = daily_input_fingerprints(sample_commits[:1], sample_daily_report)
+    existing = _analyzed_day(sample_user_id, sample_date, {**sample_ai_analysis, **fingerprints})
+    _reanalysis_mocks(service, existing, sample_commits, sample_daily_report, sample_ai_analysis)
+
+    await service.analyze(sample_user_id, sample_date, force_reanalysis=True)
+
+    service.ai_integration.analyze_daily_work.assert_not_called()
+    previous, context, new_commits = service.ai_integration.analyze_daily_work_delta.call_args[0]
+    assert new_commits == ["def456"]
+    assert previous["work_summary"] == sample_ai_analysis["work_summary"]
+    assert context["total_commits"] == 2
+
+    saved = service.repository.update.call_args[0][1].ai_analysis
+    assert (
+        saved["commit_fingerprints"]
+        == daily_input_fingerprints(sample_commits, sample_daily_report)["commit_fingerprints"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_reanalysis_after_report_change_runs_full_analysis(
+    service, sample_user_id, sample_date, sample_commits, sample_daily_report, sample_ai_analysis
+):
+    fingerprints = daily_input_fingerprints(sample_commits[:1], sample_daily_report)
+    existing = _analyzed_day(sample_user_id, sample_date, {**sample_ai_analysis, **fingerprints})
+    edited_report = sample_daily_report.model_copy(update={"additional_hours": Decimal("2.0")})
+    _reanalysis_mocks(service, existing, sample_commits, edited_report, sample_ai_analysis)
+
+    await service.analyze(sample_user_id, sample_date, force_reanalysis=True)
+
+    service.ai_integration.analyze_daily_work_delta.assert_not_called()
+    service.ai_integration.analyze_daily_work.assert_called_once()
+    service.repository.update.assert_called_once()
@@ -0,0 +1,107 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import zapier_integration_service as zapier_module
+from app.services.zapier_integration_service import ZapierIntegrationService, ZapierWeeklyData
+
+QUERY_SECONDS = 0.05
+
+
+class SlowSupabase:
+    """Supabase client mock whose execute() blocks like a PostgREST round trip and tracks concurrency."""
+
+    def __init__(self):
+        self.executions = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        query = MagicMock()
+        for method in ("select", "eq", "gte", "lt", "order", "limit"):
+            getattr(query, method).return_value = query
+        query.execute.side_effect = self._execute
+        return query
+
+    def _execute(self):
+        with self._lock:
+            self.executions += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(QUERY_SECONDS)
+        with self._lock:
+            self.active -= 1
+        return MagicMock(data=[])
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(zapier_module, "_dashboard_cache", None)
+    monkeypatch.setattr(zapier_module.settings, "ZAPIER_QUERY_CONCURRENCY", 4)
+    monkeypatch.setattr(zapier_module.settings, "ZAPIER_CACHE_FRESH_SECONDS", 60.0)
+    monkeypatch.setattr(zapier_module.settings, "ZAPIER_CACHE_STALE_SECONDS", 900.0)
+    yield
+
+
+@pytest.mark.asyncio
+async def test_week_data_queries_run_concurrently_with_bound():
+    client = SlowSupabase()
+    service = ZapierIntegrationService(client)
+
+    start = time.perf_counter()
+    data = await service.get_current_week_data()
+    elapsed = time.perf_counter() - start
+
+    assert isinstance(data, ZapierWeeklyData)
+    assert data.user_feedback_summary == "No feedback yet"
+    assert client.executions == 10
+    assert client.max_active == 4
+    # Ten sequential round trips would take 10 * QUERY_SECONDS
+    assert elapsed < 6 * QUERY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_week_data_is_cached_across_service_instances():
+    client = SlowSupabase()
+
+    first = await ZapierIntegrationService(client).get_current_week_data()
+    second = await ZapierIntegrationService(client).get_current_week_data()
+
+    assert second is first
+    assert client.executions == 10
+
+
+@pytest.mark.asyncio
+async def test_refresh_invalidates_cached_dashboard(monkeypatch):
+    client = SlowSupabase()
+    service = ZapierIntegrationService(client)
+    monkeypatch.setattr(service, "trigger_zapier_webhook", MagicMock(side_effect=_async_value(True)))
+
+    await service.get_dashboard_overview()
+    assert client.executions == 4
+    await service.get_dashboard_overview()
+    assert client.executions == 4
+
+    assert await service.refresh_dashboard_data() is True
+    await service.get_dashboard_overview()
+    assert client.executions == 8
+
+
+@pytest.mark.asyncio
+async def test_failed_load_falls_back_without_caching():
+    client = SlowSupabase()
+    client._execute = MagicMock(side_effect=RuntimeError("boom"))
+    service = ZapierIntegrationService(client)
+
+    assert await service.get_dashboard_overview() == {}
+    assert zapier_module.get_dashboard_cache().status["entries"] == 0
+
+
+def _async_value(value):
+    async def result(*args, **kwargs):
+        return value
+
+    return result
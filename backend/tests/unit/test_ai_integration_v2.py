@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, Mock, patch
 import pytest
 
 from app.integrations.ai_integration_v2 import AIIntegrationV2
+from app.integrations.llm_gateway import LLMGateway, LLMGatewayMetrics
 
 
 class TestAIIntegrationV2:
@@ -22,12 +23,12 @@ class TestAIIntegrationV2:
 
     @pytest.fixture
     def mock_openai_client(self):
-        """Mock OpenAI client."""
-        with patch("app.integrations.ai_integration_v2.AsyncOpenAI") as mock_constructor:
-            client = AsyncMock()
-            mock_constructor.return_value = client
-            # Return a tuple with both the constructor and client instance
-            yield (mock_constructor, client)
+        """Mock OpenAI client behind a gateway without a limiter."""
+        client = AsyncMock()
+        gateway = LLMGateway(client=client, metrics=LLMGatewayMetrics())
+        with patch("app.integrations.ai_integration_v2.get_llm_gateway", return_value=gateway) as mock_factory:
+            # Return a tuple with both the gateway factory and client instance
+            yield (mock_factory, client)
 
     @pytest.fixture
     def ai_integration(self, mock_settings, mock_openai_client):
@@ -328,6 +329,37 @@ class TestAIIntegrationV2:
         assert len(result["recommendations"]) == 2
         assert "analyzed_at" in result
 
+    def test_daily_work_delta_messages_send_only_new_commits(self, ai_integration):
+        """Delta prompt carries the previous result and the new commits' stored analyses, not the whole day."""
+        context = {
+            "user_name": "John Doe",
+            "analysis_date": "2024-01-15",
+            "total_commits": 2,
+            "repositories": ["repo1"],
+            "total_lines_changed": 80,
+            "commits": [
+                {"hash": "aaaa1111", "repository": "repo1", "message": "Old commit", "additions": 50, "deletions": 10},
+                {
+                    "hash": "bbbb2222",
+                    "repository": "repo1",
+                    "message": "New commit",
+                    "additions": 15,
+                    "deletions": 5,
+                    "ai_estimated_hours": 1.0,
+                    "analysis": {"complexity": 3, "risk": "low", "key_changes": ["Add retry"]},
+                },
+            ],
+        }
+        previous = {"total_estimated_hours": 3.0, "work_summary": "Earlier work", "recommendations": ["x"]}
+
+        messages = ai_integration.build_daily_work_delta_messages(previous, context, ["bbbb2222ffff"])
+        user = messages[-1]["content"]
+
+        assert "New commit" in user and "Old commit" not in user
+        assert "Earlier work" in user and "recommendations" not in user
+        assert "Add retry" in user
+        assert "daily_delta_v1" in messages[0]["content"] + user
+
     @pytest.mark.asyncio
     async def test_error_handling_json_decode(self, ai_integration, mock_openai_client):
         """Test error handling for JSON decode errors."""
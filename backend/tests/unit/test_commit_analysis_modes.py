@@ -0,0 +1,132 @@
+"""Split vs fused commit analysis modes."""
+
+import contextlib
+import io
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.integrations.commit_analysis import CommitAnalyzer
+from app.integrations.llm_gateway import LLMGateway, LLMGatewayMetrics
+
+HOURS = {
+    "total_lines": 40,
+    "total_files": 2,
+    "initial_anchor": "B",
+    "final_anchor": "B",
+    "base_hours": 1.5,
+    "complexity_score": 3,
+    "estimated_hours": 1.5,
+    "risk_level": "low",
+    "seniority_score": 6,
+    "seniority_rationale": "Clean change",
+    "key_changes": ["Add retry"],
+}
+IMPACT = {
+    "classification": {"primary_category": "feature"},
+    "business_value": {"score": 4, "evidence": "internal"},
+    "technical_complexity": {"score": 3, "evidence": "small"},
+    "code_quality_points": {"score": 2, "checklist": {"tests_included": True}},
+    "risk_penalty": {"score": 0, "reasoning": "none"},
+}
+
+
+def _analyzer(outputs):
+    requests = []
+
+    async def create(**params):
+        requests.append(params)
+        content = outputs.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    gateway = LLMGateway(client=client, metrics=LLMGatewayMetrics())
+    with patch("app.integrations.commit_analysis.get_llm_gateway", return_value=gateway):
+        analyzer = CommitAnalyzer()
+    analyzer.commit_analysis_model = "gpt-4o"
+    return analyzer, requests
+
+
+def _commit():
+    return {
+        "repository": "org/repo",
+        "commit_hash": "abc123",
+        "message": "Add retry",
+        "files_changed": ["app/a.py", "tests/test_a.py"],
+        "additions": 30,
+        "deletions": 10,
+        "diff": "+UNIQUE_DIFF_MARKER",
+    }
+
+
+@pytest.mark.asyncio
+async def test_fused_mode_scores_both_in_one_request():
+    analyzer, requests = _analyzer([json.dumps({"hours": HOURS, "impact": IMPACT})])
+    analyzer.analysis_mode = "fused"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await analyzer.analyze_commit_diff(_commit())
+
+    assert len(requests) == 1
+    assert requests[0]["messages"][1]["content"].count("UNIQUE_DIFF_MARKER") == 1
+    assert result["analysis_mode"] == "fused"
+    assert result["estimated_hours"] == 1.5
+    assert result["impact_score"] == 4 * 2 + 3 * 1.5 + 2 - 0
+    assert result["impact_code_quality_checklist"] == {"tests_included": True}
+    assert "error" not in result
+
+
+@pytest.mark.asyncio
+async def test_fused_output_failing_schema_falls_back_to_split():
+    invalid = json.dumps({"hours": {**HOURS, "risk_level": "extreme"}, "impact": IMPACT})
+    analyzer, requests = _analyzer([invalid, json.dumps(HOURS), json.dumps(IMPACT)])
+    analyzer.analysis_mode = "fused"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await analyzer.analyze_commit_diff(_commit())
+
+    assert len(requests) == 3
+    assert result["analysis_mode"] == "split"
+    assert result["risk_level"] == "low"
+    assert analyzer.gateway.metrics.get_status()["gpt-4o"]["commit_fused.v1"]["parse_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_split_mode_sends_hours_and_impact_prompts():
+    analyzer, requests = _analyzer([json.dumps(HOURS), json.dumps(IMPACT)])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await analyzer.analyze_commit_diff(_commit())
+
+    assert analyzer.analysis_mode == "split"
+    assert len(requests) == 2
+    assert result["analysis_mode"] == "split"
+    assert result["impact_business_value"] == 4
+
+
+@pytest.mark.asyncio
+async def test_split_mode_validates_each_output_against_its_schema():
+    analyzer, _ = _analyzer([json.dumps({**HOURS, "risk_level": "extreme"}), json.dumps(IMPACT)])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await analyzer.analyze_commit_diff(_commit())
+
+    assert result["error"] is True
+    assert "risk_level" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_trivial_commit_is_scored_without_a_model_call():
+    analyzer, requests = _analyzer([])
+    commit = {**_commit(), "message": "Bump lockfile", "files_changed": ["package-lock.json"], "diff": ""}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await analyzer.analyze_commit_diff(commit)
+
+    assert requests == []
+    assert result["analysis_mode"] == "heuristic"
+    assert result["model_used"].startswith("heuristic-v")
+    assert result["estimated_hours"] == 0.5
+    assert result["impact_score"] == 1 * 2 + 1 * 1.5
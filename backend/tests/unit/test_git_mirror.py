@@ -0,0 +1,117 @@
+import shutil
+import subprocess
+
+import pytest
+
+from app.integrations.git_mirror import GitCommandError, GitMirrorDiffProvider, parse_git_log
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+REPOSITORY = "octo/widgets"
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=Dev", "-c", "user.email=dev@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def _commit(repo, message):
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", message)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    repo = tmp_path / "remotes" / REPOSITORY
+    repo.mkdir(parents=True)
+    _git(repo, "init", "-q", "-b", "main")
+    (repo / "app.py").write_text("def main():\n    return 1\n")
+    (repo / "old_name.py").write_text("VALUE = 1\n" * 20)
+    (repo / "gone.txt").write_text("bye\n")
+    _commit(repo, "Initial commit")
+    return repo
+
+
+@pytest.fixture
+def provider(tmp_path):
+    return GitMirrorDiffProvider(
+        str(tmp_path / "mirrors"),
+        remote_url_template=str(tmp_path / "remotes" / "{repository}"),
+        fetch_interval=3600,
+    )
+
+
+class TestGitMirrorDiffProvider:
+    """Test mirror creation and diff extraction against a local upstream repository."""
+
+    def test_get_commit_diff_matches_github_shape(self, upstream, provider):
+        (upstream / "app.py").write_text("def main():\n    return 2\n\n\ndef helper():\n    pass\n")
+        (upstream / "new_file.py").write_text("print('hi')\n")
+        (upstream / "blob.bin").write_bytes(b"\x00\x01\x02")
+        (upstream / "gone.txt").unlink()
+        _git(upstream, "mv", "old_name.py", "new_name.py")
+        sha = _commit(upstream, "Refactor app\n\nLonger body")
+
+        diff = provider.get_commit_diff(REPOSITORY, sha)
+
+        files = {file["filename"]: file for file in diff["files"]}
+        assert diff["commit_hash"] == sha
+        assert diff["message"] == "Refactor app\n\nLonger body"
+        assert diff["author"]["email"] == "dev@example.com"
+        assert diff["source"] == "git_mirror"
+        assert files["app.py"]["status"] == "modified"
+        assert files["app.py"]["additions"] == 5
+        assert files["app.py"]["patch"].startswith("@@")
+        assert "+def helper():" in files["app.py"]["patch"]
+        assert files["new_file.py"]["status"] == "added"
+        assert files["gone.txt"]["status"] == "removed"
+        assert files["new_name.py"]["status"] == "renamed"
+        assert files["blob.bin"]["changes"] == 0
+        assert diff["additions"] == sum(file["additions"] for file in diff["files"])
+        assert set(diff["files_changed"]) == set(files)
+
+    def test_fetches_commits_pushed_after_clone(self, upstream, provider):
+        provider.ensure_mirror(REPOSITORY)
+        (upstream / "app.py").write_text("def main():\n    return 3\n")
+        sha = _commit(upstream, "Later change")
+
+        assert provider.get_commit_diff(REPOSITORY, sha)["commit_hash"] == sha
+
+    def test_unknown_commit_raises(self, upstream, provider):
+        with pytest.raises(GitCommandError):
+            provider.get_commit_diff(REPOSITORY, "0" * 40)
+
+    def test_iter_commit_diffs_streams_history(self, upstream, provider):
+        (upstream / "app.py").write_text("def main():\n    return 4\n")
+        second = _commit(upstream, "Second")
+
+        diffs = list(provider.iter_commit_diffs(REPOSITORY))
+
+        assert [diff["commit_hash"] for diff in diffs][0] == second
+        assert [diff["message"] for diff in diffs] == ["Second", "Initial commit"]
+        assert diffs[1]["files_changed"] == ["app.py", "gone.txt", "old_name.py"]
+
+    def test_token_is_not_written_to_mirror_config(self, upstream, tmp_path):
+        provider = GitMirrorDiffProvider(
+            str(tmp_path / "mirrors"), remote_url_template=str(tmp_path / "remotes" / "{repository}"), token="secret"
+        )
+        path = provider.ensure_mirror(REPOSITORY)
+
+        assert "secret" not in (tmp_path / "mirrors" / "octo__widgets.git" / "config").read_text()
+        assert path.endswith("octo__widgets.git")
+
+
+def test_parse_git_log_handles_commits_without_files():
+    output = ["\x1eabc\x1fA\x1fa@x\x1f2024-01-01T00:00:00Z\x1fC\x1fc@x\x1f2024-01-01T00:00:00Z\x1fEmpty\n", "\x1f\n"]
+
+    [commit] = list(parse_git_log(output, REPOSITORY))
+
+    assert commit["commit_hash"] == "abc"
+    assert commit["message"] == "Empty"
+    assert commit["files"] == []
@@ -0,0 +1,352 @@
+"""Tests for the LLM gateway, run against a local fake OpenAI server."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.exceptions import RateLimitExceededError
+from app.core.rate_limiter import RateLimitConfig, TokenBucketRateLimiter
+from app.integrations.llm_gateway import (
+    GatewayConfig,
+    LLMGateway,
+    LLMGatewayMetrics,
+    estimate_cost,
+    parse_structured,
+)
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": 1000,
+            "completion_tokens": 100,
+            "total_tokens": 1100,
+            "prompt_tokens_details": {"cached_tokens": 400},
+        },
+    }
+
+
+class FakeOpenAIServer:
+    """OpenAI-compatible HTTP server answering from a script of (status, body, delay) tuples."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                server.requests.append((self.path, json.loads(body)))
+                status, payload, delay = server.script.pop(0) if server.script else (200, _completion("{}"), 0)
+                time.sleep(delay)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (deadline tests)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _gateway(server, **config):
+    config = GatewayConfig(base_url=server.base_url, retry_base_delay=0.01, retry_max_delay=0.05, **config)
+    return LLMGateway(api_key="test-key", config=config, metrics=LLMGatewayMetrics())
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limited_call_and_records_usage():
+    error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+    server = FakeOpenAIServer([(429, error, 0), (500, {"error": {"message": "boom"}}, 0)])
+    try:
+        gateway = _gateway(server)
+        result = await gateway.generate_json(
+            {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]}, prompt="test"
+        )
+    finally:
+        server.close()
+
+    assert result == {}
+    assert len(server.requests) == 3
+    assert server.requests[0][0] == "/v1/chat/completions"
+    stats = gateway.metrics.get_status()["gpt-4o"]["test"]
+    assert stats["retries"] == 2
+    assert stats["requests"] == 1
+    assert stats["input_tokens"] == 1000 and stats["cached_tokens"] == 400 and stats["output_tokens"] == 100
+    assert stats["cost_usd"] == pytest.approx(estimate_cost("gpt-4o", 1000, 400, 100))
+
+
+@pytest.mark.asyncio
+async def test_every_request_is_charged_to_the_token_limiter():
+    error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+    server = FakeOpenAIServer([(429, error, 0)])
+    token_limiter = TokenBucketRateLimiter(RateLimitConfig(requests_per_hour=3600, burst_limit=1000, name="tpm"))
+    try:
+        gateway = _gateway(server)
+        gateway.token_limiter = token_limiter
+        await gateway.generate_json(
+            {"model": "gpt-4o", "messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 200},
+            prompt="test",
+        )
+    finally:
+        server.close()
+
+    # 100 prompt tokens + 200 output tokens, for the rejected request and its retry
+    assert len(server.requests) == 2
+    assert token_limiter.status["available_tokens"] == pytest.approx(400, abs=5)
+
+
+def _fast_client(delays, calls):
+    async def create(**params):
+        delay = delays[len(calls)]
+        calls.append(params)
+        await asyncio.sleep(delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"n": %d}' % len(calls)))])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _tpm_bucket(capacity, tokens_per_second):
+    return TokenBucketRateLimiter(
+        RateLimitConfig(requests_per_hour=tokens_per_second * 3600, burst_limit=capacity, name="tpm")
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_wait_is_bounded_and_not_counted_as_latency():
+    calls = []
+    token_limiter = _tpm_bucket(capacity=100, tokens_per_second=500)
+    gateway = LLMGateway(client=_fast_client([0, 0], calls), metrics=LLMGatewayMetrics(), token_limiter=token_limiter)
+    params = {"model": "gpt-4o", "messages": [{"role": "user", "content": "x" * 400}]}
+
+    await token_limiter.acquire(100)
+    await gateway.generate_json(params)  # waits ~0.2s for 100 tokens
+
+    assert gateway.metrics.latency_quantile("gpt-4o", "adhoc", 0.99) < 0.1
+
+    gateway.config.token_wait_timeout = 0.05
+    await token_limiter.acquire(100, wait=True)
+    with pytest.raises(RateLimitExceededError):
+        await gateway.generate_json(params)
+    assert len(calls) == 1
+    assert gateway.metrics.get_status()["gpt-4o"]["adhoc"]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_skipped_without_quota_to_spare():
+    calls = []
+    token_limiter = _tpm_bucket(capacity=150, tokens_per_second=1)
+    gateway = LLMGateway(
+        client=_fast_client([0.3, 0.01], calls),
+        config=GatewayConfig(hedge_enabled=True, hedge_min_samples=5),
+        metrics=LLMGatewayMetrics(),
+        token_limiter=token_limiter,
+    )
+    for _ in range(5):
+        gateway.metrics.record_success("gpt-4o", "adhoc", 0.05)
+
+    result = await gateway.generate_json({"model": "gpt-4o", "messages": [{"role": "user", "content": "x" * 400}]})
+
+    # The primary took 100 of the 150 tokens; a duplicate would need another 100
+    assert len(calls) == 1
+    assert result == {"n": 1}
+    assert gateway.metrics.get_status()["gpt-4o"]["adhoc"]["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    server = FakeOpenAIServer([(400, {"error": {"message": "bad request"}}, 0)])
+    try:
+        gateway = _gateway(server)
+        with pytest.raises(Exception) as excinfo:
+            await gateway.chat(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+    finally:
+        server.close()
+
+    assert getattr(excinfo.value, "status_code", None) == 400
+    assert len(server.requests) == 1
+    assert gateway.metrics.get_status()["gpt-4o"]["adhoc"]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_covers_the_whole_call():
+    server = FakeOpenAIServer([(200, _completion("{}"), 1.0)])
+    try:
+        gateway = _gateway(server, deadline=0.2)
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await gateway.chat(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+    finally:
+        server.close()
+
+    assert time.monotonic() - started < 0.9
+
+
+@pytest.mark.asyncio
+async def test_hedges_call_slower_than_p95():
+    delays = [1.0, 0.01]
+    calls = []
+
+    async def create(**params):
+        delay = delays[len(calls)]
+        calls.append(params)
+        await asyncio.sleep(delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"n": %d}' % len(calls)))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    gateway = LLMGateway(
+        client=client, config=GatewayConfig(hedge_enabled=True, hedge_min_samples=5), metrics=LLMGatewayMetrics()
+    )
+    for _ in range(5):
+        gateway.metrics.record_success("gpt-4o", "adhoc", 0.05)
+
+    started = time.monotonic()
+    result = await gateway.generate_json({"model": "gpt-4o", "messages": []})
+
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 2
+    assert result == {"n": 2}
+    stats = gateway.metrics.get_status()["gpt-4o"]["adhoc"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+class _Hours(BaseModel):
+    estimated_hours: float
+
+
+def test_parse_structured_strips_fences_and_validates():
+    assert parse_structured('```json\n{"estimated_hours": 2}\n```') == {"estimated_hours": 2}
+    assert parse_structured('```\n{"estimated_hours": 2}```', _Hours).estimated_hours == 2.0
+    with pytest.raises(ValueError):
+        parse_structured('{"estimated_hours": "lots"}', _Hours)
+
+
+def test_estimate_cost_matches_longest_model_prefix():
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0, 0) == pytest.approx(0.15)
+    assert estimate_cost("gpt-4o-2024-08-06", 1_000_000, 1_000_000, 0) == pytest.approx(1.25)
+    assert estimate_cost("unknown-model", 10, 0, 10) is None
+
+
+class _FakeStream:
+    """Async iterator over chat completion chunks that records how far it was read."""
+
+    def __init__(self, pieces, usage=None, error=None):
+        self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p))]) for p in pieces]
+        self.chunks.append(SimpleNamespace(choices=[], usage=usage))
+        self.error = error
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.read == len(self.chunks) - 1 and self.error is not None:
+            raise self.error
+        if self.read >= len(self.chunks):
+            raise StopAsyncIteration
+        self.read += 1
+        return self.chunks[self.read - 1]
+
+    async def close(self):
+        self.closed = True
+
+
+def _streaming_gateway(stream):
+    requests = []
+
+    async def create(**params):
+        requests.append(params)
+        return stream
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return LLMGateway(client=client, metrics=LLMGatewayMetrics()), requests
+
+
+class _Fused(BaseModel):
+    hours: float
+    risk: str
+    notes: str = ""
+
+
+def _pieces(text, size=4):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.asyncio
+async def test_stream_json_stops_once_required_fields_arrive():
+    stream = _FakeStream(_pieces('```json\n{"hours": 2, "risk": "low", "notes": "long trailing text..."}\n```'))
+    gateway, requests = _streaming_gateway(stream)
+
+    result = await gateway.stream_json({"model": "gpt-4o", "messages": []}, prompt="test", schema=_Fused)
+
+    assert requests[0]["stream"] is True and requests[0]["stream_options"] == {"include_usage": True}
+    assert result.cut_off and not result.complete
+    assert result.value.hours == 2.0 and result.value.risk == "low"
+    assert stream.closed and stream.read < len(stream.chunks)
+    stats = gateway.metrics.get_status()["gpt-4o"]["test"]
+    assert stats["streams"] == 1 and stats["early_cutoffs"] == 1 and stats["salvaged"] == 0
+    assert stats["p50_first_field_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_stream_json_reads_usage_after_a_complete_object():
+    usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=50, prompt_tokens_details=None)
+    stream = _FakeStream(_pieces('{"hours": 2, "risk": "low"}'), usage=usage)
+    gateway, _ = _streaming_gateway(stream)
+
+    result = await gateway.generate_json({"model": "gpt-4o", "messages": []}, schema=_Fused, stream=True)
+
+    assert result.hours == 2.0
+    assert stream.read == len(stream.chunks)
+    assert gateway.metrics.get_status()["gpt-4o"]["adhoc"]["output_tokens"] == 50
+
+
+@pytest.mark.asyncio
+async def test_stream_json_salvages_output_cut_by_a_dropped_connection():
+    stream = _FakeStream(_pieces('{"hours": 2, "risk": "low", "notes": "cut'), error=ConnectionResetError())
+    gateway, _ = _streaming_gateway(stream)
+
+    result = await gateway.stream_json({"model": "gpt-4o", "messages": []}, schema=_Fused, stop_early=False)
+
+    assert not result.complete and not result.cut_off
+    assert result.value.hours == 2.0 and result.value.notes == ""
+    assert gateway.metrics.get_status()["gpt-4o"]["adhoc"]["salvaged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_generate_json_rejects_invalid_fields_early():
+    stream = _FakeStream(_pieces('{"hours": "lots", "risk": "low"}'))
+    gateway, _ = _streaming_gateway(stream)
+
+    with pytest.raises(ValueError):
+        await gateway.generate_json({"model": "gpt-4o", "messages": []}, schema=_Fused, stream=True)
+
+    assert stream.closed and stream.read < len(stream.chunks)
+    assert gateway.metrics.get_status()["gpt-4o"]["adhoc"]["parse_errors"] == 1
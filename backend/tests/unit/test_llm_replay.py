@@ -0,0 +1,162 @@
+"""Tests for the record/replay stub, driven through the LLM gateway."""
+
+import json
+
+import pytest
+
+from app.integrations.llm_gateway import GatewayConfig, LLMGateway, LLMGatewayMetrics
+from app.integrations.llm_replay import (
+    Cassette,
+    FaultInjector,
+    Interaction,
+    LatencyModel,
+    LLMStubServer,
+    create_stub_app,
+    measure_throughput,
+)
+
+PARAMS = {
+    "model": "gpt-4o",
+    "messages": [{"role": "system", "content": "Score commits"}, {"role": "user", "content": "commit abc"}],
+}
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": 100, "total_tokens": 1100},
+    }
+
+
+def _cassette(path=None):
+    cassette = Cassette(path)
+    cassette.add(Interaction("chat/completions", PARAMS, 200, 0.8, response=_completion('{"hours": 2}')))
+    return cassette
+
+
+def _gateway(base_url, metrics=None, **config):
+    config = GatewayConfig(base_url=base_url, retry_base_delay=0.01, retry_max_delay=0.05, **config)
+    return LLMGateway(api_key="test", config=config, metrics=metrics or LLMGatewayMetrics())
+
+
+@pytest.mark.asyncio
+async def test_replays_recorded_response_for_same_request():
+    app = create_stub_app(_cassette(), latency=LatencyModel.parse("fixed:0"))
+    with LLMStubServer(app) as server:
+        gateway = _gateway(server.base_url)
+        assert await gateway.generate_json(PARAMS) == {"hours": 2}
+
+        # Same prompt template, different commit: served from the same template's recordings
+        other = {**PARAMS, "messages": [PARAMS["messages"][0], {"role": "user", "content": "commit def"}]}
+        assert await gateway.generate_json(other) == {"hours": 2}
+        assert server.stats["exact"] == 1 and server.stats["fallback"] == 1
+
+
+@pytest.mark.asyncio
+async def test_strict_replay_rejects_unrecorded_requests():
+    app = create_stub_app(_cassette(), latency=LatencyModel.parse("fixed:0"), strict=True)
+    with LLMStubServer(app) as server:
+        gateway = _gateway(server.base_url)
+        other = {**PARAMS, "messages": [PARAMS["messages"][0], {"role": "user", "content": "commit def"}]}
+        with pytest.raises(Exception):
+            await gateway.generate_json(other)
+        assert server.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_request_is_answered_from_non_streamed_recording():
+    app = create_stub_app(_cassette(), latency=LatencyModel.parse("fixed:0"))
+    with LLMStubServer(app) as server:
+        gateway = _gateway(server.base_url)
+        result = await gateway.stream_json(PARAMS)
+
+    assert result.value == {"hours": 2}
+    assert result.complete
+
+
+@pytest.mark.asyncio
+async def test_injected_rate_limits_are_retried():
+    faults = FaultInjector(rate_limit_share=0.5, retry_after=0)
+    faults.rng.seed(7)
+    metrics = LLMGatewayMetrics()
+    app = create_stub_app(_cassette(), latency=LatencyModel.parse("fixed:0"), faults=faults)
+    with LLMStubServer(app) as server:
+        gateway = _gateway(server.base_url, metrics=metrics, max_retries=10)
+        for _ in range(6):
+            assert await gateway.generate_json(PARAMS) == {"hours": 2}
+        stats = server.stats
+
+    assert stats["rate_limited"] > 0
+    assert metrics.get_status()["gpt-4o"]["adhoc"]["retries"] == stats["rate_limited"]
+
+
+def test_requests_above_the_per_minute_budget_are_rejected():
+    faults = FaultInjector(requests_per_minute=2)
+    assert [faults.should_reject(now=t) for t in (0, 1, 2, 61)] == [False, False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_records_through_proxy_then_replays(tmp_path):
+    path = str(tmp_path / "commits.cassette.jsonl")
+    upstream_app = create_stub_app(_cassette(), latency=LatencyModel.parse("fixed:0"))
+    with LLMStubServer(upstream_app) as upstream:
+        recording = Cassette(path)
+        recording.add_workload({"commit_hash": "abc"})
+        recording.add_workload({"commit_hash": "abc"})
+        with LLMStubServer(create_stub_app(recording, upstream=upstream.base_url)) as proxy:
+            assert await _gateway(proxy.base_url).generate_json(PARAMS) == {"hours": 2}
+            assert proxy.stats["recorded"] == 1
+
+    replayed = Cassette.load(path)
+    assert replayed.workload == [{"commit_hash": "abc"}]
+    assert len(replayed.interactions) == 1
+    assert replayed.match("chat/completions", PARAMS, strict=True)[0].latency >= 0
+    assert json.loads(replayed.interactions[0].response["choices"][0]["message"]["content"]) == {"hours": 2}
+
+
+def test_latency_specs():
+    assert LatencyModel.parse("recorded*0.5").sample(2.0) == 1.0
+    assert LatencyModel.parse("fixed:800").sample(5.0) == 0.8
+    assert 0.2 <= LatencyModel.parse("uniform:200,400", seed=1).sample() <= 0.4
+    assert LatencyModel.parse("lognormal:1000,0.5", seed=1).sample() > 0
+    for spec in ("gaussian:1", "fixed", "uniform:1", "fixed:x"):
+        with pytest.raises(ValueError):
+            LatencyModel.parse(spec)
+
+
+@pytest.mark.asyncio
+async def test_measure_throughput_reports_rate_latency_and_cost():
+    metrics = LLMGatewayMetrics()
+    app = create_stub_app(_cassette(), latency=LatencyModel.parse("fixed:20"))
+    with LLMStubServer(app) as server:
+        gateway = _gateway(server.base_url, metrics=metrics)
+
+        async def run(item):
+            if item["fail"]:
+                return {"error": True}
+            return await gateway.generate_json(PARAMS)
+
+        items = [{"fail": False}] * 8 + [{"fail": True}]
+        report = (await measure_throughput(items, run, concurrency=4, metrics=metrics)).to_dict()
+
+    assert report["succeeded"] == 8 and report["failed"] == 1
+    assert report["items_per_second"] > 0
+    assert report["p99_latency_ms"] >= report["p50_latency_ms"] >= 20
+    assert report["usage"]["requests"] == 8
+    assert report["cost_per_item_usd"] == pytest.approx(report["usage"]["cost_usd"] / 8)
+
+
+@pytest.mark.asyncio
+async def test_responder_answers_requests_missing_from_the_cassette():
+    app = create_stub_app(
+        Cassette(), latency=LatencyModel.parse("fixed:0"), responder=lambda endpoint, body: _completion('{"hours": 3}')
+    )
+    with LLMStubServer(app) as server:
+        gateway = _gateway(server.base_url)
+        assert await gateway.generate_json(PARAMS) == {"hours": 3}
+        assert (await gateway.stream_json(PARAMS)).value == {"hours": 3}
+        assert server.stats["synthesized"] == 2 and server.stats["misses"] == 0
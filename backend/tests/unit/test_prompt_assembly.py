@@ -0,0 +1,117 @@
+"""Unit tests for cache-friendly prompt assembly."""
+
+import contextlib
+import io
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.integrations.ai_integration_v2 import AIIntegrationV2
+from app.integrations.commit_analysis import CommitAnalyzer
+from app.integrations.llm_gateway import LLMGateway, LLMGatewayMetrics
+from app.integrations.prompt_assembly import PromptBlock, PromptCacheStats, PromptTemplate, prompt_cache_stats
+from app.integrations.prompts import COMMIT_HOURS_PROMPT, COMMIT_IMPACT_PROMPT, DAILY_WORK_PROMPT
+
+
+def _commit(message, diff):
+    return {
+        "repository": "org/repo",
+        "author_name": "Dev",
+        "author_email": "dev@example.com",
+        "message": message,
+        "files_changed": ["app/main.py"],
+        "additions": 3,
+        "deletions": 1,
+        "diff": diff,
+        "commit_hash": "abc123",
+    }
+
+
+def _chat_response(content, prompt_tokens=2000, cached_tokens=1536):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens, prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)
+        ),
+    )
+
+
+class TestPromptTemplate:
+    def test_block_token_counts_are_precomputed(self):
+        block = PromptBlock(name="rubric", version=1, text="word " * 400)
+        template = PromptTemplate(name="t", version=1, system="sys", blocks=(block,))
+
+        assert block.token_count > 0
+        assert template.prefix_tokens >= block.token_count
+        assert template.key == "t.v1"
+
+    def test_variable_data_never_precedes_static_prefix(self):
+        first = COMMIT_IMPACT_PROMPT.chat_messages(CommitAnalyzer._format_commit_section(_commit("a", "+x"), "## C"))
+        second = COMMIT_IMPACT_PROMPT.chat_messages(CommitAnalyzer._format_commit_section(_commit("b", "-y"), "## C"))
+
+        assert first[0] == second[0]
+        assert first[1]["content"].startswith(COMMIT_IMPACT_PROMPT.prefix)
+        assert second[1]["content"].startswith(COMMIT_IMPACT_PROMPT.prefix)
+        assert "org/repo" not in COMMIT_IMPACT_PROMPT.prefix
+
+    def test_responses_input_keeps_system_text_first(self):
+        content = COMMIT_HOURS_PROMPT.responses_input("## Commit to Analyze")[0]["content"]
+
+        assert content.startswith(COMMIT_HOURS_PROMPT.system + "\n\n" + COMMIT_HOURS_PROMPT.prefix)
+
+    def test_daily_work_messages_share_prefix(self):
+        context = {"user_name": "Dev", "analysis_date": "2025-01-02", "commits": [], "repositories": ["org/repo"]}
+        with patch("app.integrations.ai_integration_v2.get_llm_gateway"):
+            messages = AIIntegrationV2().build_daily_work_messages(context)
+
+        assert messages[0]["content"] == DAILY_WORK_PROMPT.system
+        assert messages[1]["content"].startswith(DAILY_WORK_PROMPT.prefix)
+        assert "Developer: Dev" in messages[1]["content"][len(DAILY_WORK_PROMPT.prefix) :]
+
+
+class TestPromptCacheStats:
+    def test_records_chat_and_responses_usage(self):
+        stats = PromptCacheStats()
+        stats.record(COMMIT_HOURS_PROMPT, SimpleNamespace(prompt_tokens=2000, prompt_tokens_details=None))
+        stats.record(
+            COMMIT_HOURS_PROMPT,
+            {"input_tokens": 2000, "input_tokens_details": {"cached_tokens": 1500}},
+        )
+
+        status = stats.get_status()["commit_hours.v1"]
+        assert status["requests"] == 2
+        assert status["requests_with_cache_hit"] == 1
+        assert status["cached_token_rate"] == 0.375
+        assert status["prefix_tokens"] == COMMIT_HOURS_PROMPT.prefix_tokens
+
+    def test_ignores_missing_or_mock_usage(self):
+        stats = PromptCacheStats()
+        stats.record(COMMIT_HOURS_PROMPT, None)
+        stats.record(COMMIT_HOURS_PROMPT, Mock())
+
+        assert stats.get_status() == {}
+
+
+@pytest.mark.asyncio
+async def test_commit_analyzer_records_cached_tokens_per_prompt_version():
+    prompt_cache_stats.reset()
+    requests = []
+
+    async def fake_create(**params):
+        requests.append(params)
+        return _chat_response('{"business_value": {"score": 3}, "estimated_hours": 1.0}')
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create)))
+    gateway = LLMGateway(client=client, metrics=LLMGatewayMetrics())
+    with patch("app.integrations.commit_analysis.get_llm_gateway", return_value=gateway):
+        analyzer = CommitAnalyzer()
+    analyzer.commit_analysis_model = "gpt-4o"
+    with contextlib.redirect_stdout(io.StringIO()):
+        await analyzer.analyze_commit_diff(_commit("Fix typo", "+a"))
+
+    status = prompt_cache_stats.get_status()
+    assert status["commit_hours.v1"]["cached_tokens"] == 1536
+    assert status["commit_impact.v2"]["requests"] == 1
+    assert all(params["messages"][1]["content"].endswith("+a") for params in requests)
+    prompt_cache_stats.reset()
@@ -0,0 +1,88 @@
+"""Tests for the incremental JSON parser used on streamed model output."""
+
+import json
+
+from app.integrations.streaming_json import IncrementalJSONParser
+from app.schemas.commit_analysis import FusedCommitAnalysis, HoursEstimate
+
+HOURS = {
+    "complexity_score": 3,
+    "estimated_hours": 1.5,
+    "risk_level": "low",
+    "seniority_score": 6,
+    "seniority_rationale": 'Clean change, with "quotes" and {braces}',
+    "key_changes": ["Add retry", "Add [tests]"],
+}
+
+
+def _feed(parser, text, size=3):
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+
+
+def test_fields_arrive_one_by_one_and_validate():
+    ticks = iter(range(100))
+    parser = IncrementalJSONParser(HoursEstimate, clock=lambda: next(ticks))
+    text = "```json\n" + json.dumps(HOURS, indent=2) + "\n```"
+
+    parser.feed(text[:40])
+    assert list(parser.fields) == ["complexity_score"]
+    _feed(parser, text[40:])
+
+    assert parser.closed and not parser.failed
+    assert parser.fields == HOURS
+    assert parser.first_field_seconds == parser.field_times["complexity_score"]
+    value, _ = parser.result()
+    assert value.key_changes == ["Add retry", "Add [tests]"]
+
+
+def test_done_once_required_fields_are_present():
+    parser = IncrementalJSONParser(HoursEstimate)
+    text = json.dumps(HOURS)
+    _feed(parser, text[: text.index('"seniority_rationale"')])
+
+    assert parser.done and not parser.closed
+    value, fields = parser.result()
+    assert value.estimated_hours == 1.5 and "key_changes" not in fields
+
+
+def test_single_character_deltas_parse_the_same_as_one_chunk():
+    text = json.dumps({**HOURS, "key_changes": [f"Change {i}" for i in range(2000)]})
+    parser = IncrementalJSONParser(HoursEstimate)
+    _feed(parser, text, size=1)
+
+    assert parser.closed and not parser.failed
+    assert len(parser.fields["key_changes"]) == 2000
+    # Text of finished members is dropped rather than kept and re-joined
+    assert parser._base == len(text) - 1
+
+
+def test_invalid_field_fails_as_soon_as_it_arrives():
+    parser = IncrementalJSONParser(HoursEstimate)
+    parser.feed('{"complexity_score": 3, "risk_level": "extreme", "estimated_hours": ')
+
+    assert parser.failed and "risk_level" in parser.errors
+    assert "risk_level" not in parser.fields
+
+
+def test_truncated_output_is_salvaged_to_last_complete_element():
+    impact = {"classification": {"primary_category": "feature"}, "business_value": {"score": 4}}
+    text = json.dumps({"hours": HOURS, "impact": impact})
+    parser = IncrementalJSONParser(FusedCommitAnalysis)
+    _feed(parser, text[: text.index('"business_value"') + 25])
+
+    value, fields = parser.result()
+    assert value is None
+    assert fields["hours"] == HOURS
+    assert fields["impact"] == {"classification": {"primary_category": "feature"}}
+
+
+def test_without_schema_partial_object_is_returned():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1, "b": [1, 2, 3], "c": {"d": "unterminated')
+
+    value, fields = parser.result()
+    assert value == {"a": 1, "b": [1, 2, 3], "c": {}}
+    assert not parser.done
+
+    assert IncrementalJSONParser().result() == (None, {})
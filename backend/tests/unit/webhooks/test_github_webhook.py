@@ -2,12 +2,14 @@
 Unit tests for GitHub webhook handler.
 """
 
+import asyncio
 import hashlib
 import hmac
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from app.core.adaptive_concurrency import AdaptiveConcurrencyConfig, AdaptiveConcurrencyLimiter
 from app.schemas.github_event import CommitPayload
 from app.webhooks.base import WebhookVerificationError
 from app.webhooks.github import GitHubWebhookHandler
@@ -226,6 +228,96 @@ class TestGitHubWebhookHandler:
         assert result["commits_failed"] == 1
         assert "Test error" in result["errors"][0]["error"]
 
+    @staticmethod
+    def _push_with_commits(sample_push_event, count):
+        template = sample_push_event["commits"][0]
+        return {**sample_push_event, "commits": [{**template, "id": f"commit{i}"} for i in range(count)]}
+
+    @pytest.mark.asyncio
+    async def test_process_push_event_bounds_concurrent_commits(self, handler, sample_push_event):
+        """Large pushes run at most as many commits at once as the OpenAI limiter can admit."""
+        running = peak = 0
+
+        async def process_commit(payload, scan_docs=True):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"status": "analyzed"}
+
+        handler.commit_analysis_service = Mock(process_commit=process_commit)
+        limiter = AdaptiveConcurrencyLimiter(AdaptiveConcurrencyConfig(initial_limit=2, max_limit=3))
+
+        with patch("app.webhooks.github.get_openai_concurrency_limiter", return_value=limiter):
+            result = await handler.process_event("push", self._push_with_commits(sample_push_event, 10))
+
+        assert result["commits_processed"] == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_process_push_event_timeout_excludes_upstream_queueing(self, handler, sample_push_event):
+        """Time spent waiting for an upstream permit doesn't count against the commit timeout."""
+        limiter = AdaptiveConcurrencyLimiter(AdaptiveConcurrencyConfig(initial_limit=1, max_limit=16))
+
+        async def process_commit(payload, scan_docs=True):
+            async with limiter.permit():
+                await asyncio.sleep(0.03)
+            return {"status": "analyzed"}
+
+        handler.commit_analysis_service = Mock(process_commit=process_commit)
+
+        with patch("app.webhooks.github.COMMIT_ANALYSIS_TIMEOUT_SECONDS", 0.05):
+            result = await handler.process_event("push", self._push_with_commits(sample_push_event, 4))
+
+        # Serialized on one permit, the last commit waits ~0.09s before it starts
+        assert result["commits_processed"] == 4
+        assert result["commits_failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_process_push_event_timeout_once_running(self, handler, sample_push_event):
+        """A commit that holds a permit and stalls still times out."""
+        limiter = AdaptiveConcurrencyLimiter(AdaptiveConcurrencyConfig(initial_limit=1, max_limit=16))
+
+        async def process_commit(payload, scan_docs=True):
+            async with limiter.permit():
+                await asyncio.sleep(1)
+
+        handler.commit_analysis_service = Mock(process_commit=process_commit)
+
+        with patch("app.webhooks.github.COMMIT_ANALYSIS_TIMEOUT_SECONDS", 0.05):
+            result = await handler.process_event("push", sample_push_event)
+
+        assert result["errors"] == [{"hash": "commit123", "error": "Analysis timed out"}]
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_process_push_event_overall_timeout_covers_upstream_queueing(self, handler, sample_push_event):
+        """A commit that never gets its first upstream permit is still cut off by the overall cap."""
+        limiter = AdaptiveConcurrencyLimiter(AdaptiveConcurrencyConfig(initial_limit=1, max_limit=16))
+        held = asyncio.Event()
+
+        async def hold_permit():
+            async with limiter.permit():
+                held.set()
+                await asyncio.sleep(1)
+
+        async def process_commit(payload, scan_docs=True):
+            async with limiter.permit():
+                return {"status": "analyzed"}
+
+        handler.commit_analysis_service = Mock(process_commit=process_commit)
+        holder = asyncio.create_task(hold_permit())
+        await held.wait()
+
+        try:
+            with patch("app.webhooks.github.COMMIT_TOTAL_TIMEOUT_SECONDS", 0.05):
+                result = await asyncio.wait_for(handler.process_event("push", sample_push_event), timeout=0.5)
+        finally:
+            holder.cancel()
+
+        assert result["errors"] == [{"hash": "commit123", "error": "Analysis timed out"}]
+
     @pytest.mark.asyncio
     async def test_process_push_event_no_commits(self, handler):
         """Test push event with no commits."""
@@ -2,7 +2,8 @@
 """
 Analyze and visualize benchmark results from commit analysis benchmarking.
 This script reads the JSON files created by benchmark_commit_analysis.py
-and provides summary statistics and comparisons.
+and provides summary statistics and comparisons, plus the throughput of
+offline replay runs (throughput_*.json).
 """
 
 import json
@@ -81,6 +82,49 @@ def analyze_single_benchmark(data: Dict[str, Any]) -> Dict[str, Any]:
     
     return analysis
 
+def load_throughput_files(directory: Path) -> List[Dict[str, Any]]:
+    """Load the replay runs (throughput_*.json), oldest first"""
+    results = []
+    for file in sorted(directory.glob("throughput_*.json"), key=lambda x: x.stat().st_mtime):
+        try:
+            with open(file, 'r') as f:
+                data = json.load(f)
+                data['filename'] = file.name
+                results.append(data)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not load {file.name}: {e}[/yellow]")
+    return results
+
+def display_throughput_summary(runs: List[Dict[str, Any]]):
+    """Display commits/s, tail latency and cost per commit of each replay run"""
+    table = Table(title="Replay Throughput Runs", box=box.ROUNDED)
+    table.add_column("Run", style="dim", width=19)
+    table.add_column("Concurrency", style="cyan", width=11)
+    table.add_column("Latency", style="white", width=18)
+    table.add_column("Commits/s", style="green", width=10)
+    table.add_column("p50 ms", style="blue", width=9)
+    table.add_column("p99 ms", style="blue", width=9)
+    table.add_column("USD/commit", style="magenta", width=10)
+    table.add_column("429s", style="red", width=6)
+    
+    def fmt(value, digits):
+        return "N/A" if value is None else f"{value:,.{digits}f}"
+    
+    for run in runs:
+        report = run.get('throughput', {})
+        config = run.get('config', {})
+        table.add_row(
+            run.get('timestamp', 'Unknown')[:19],
+            str(config.get('concurrency', '?')),
+            str(config.get('latency', '?')),
+            fmt(report.get('items_per_second'), 2),
+            fmt(report.get('p50_latency_ms'), 0),
+            fmt(report.get('p99_latency_ms'), 0),
+            fmt(report.get('cost_per_item_usd'), 5),
+            str(run.get('stub', {}).get('rate_limited', 0)),
+        )
+    console.print(table)
+
 def display_benchmark_summary(benchmarks: List[Dict[str, Any]]):
     """Display summary of all benchmarks"""
     console.print("\n[bold]Benchmark Results Summary[/bold]\n")
@@ -243,10 +287,17 @@ def main():
         console.print("[yellow]Run benchmark_commit_analysis.py first to generate results[/yellow]")
         sys.exit(1)
     
+    # Replay runs only carry throughput numbers; show them first
+    throughput_runs = load_throughput_files(results_dir)
+    if throughput_runs:
+        display_throughput_summary(throughput_runs)
+    
     # Load all benchmark files
     benchmarks = load_benchmark_files(results_dir)
     
     if not benchmarks:
+        if throughput_runs:
+            sys.exit(0)
         console.print("[red]No benchmark files found[/red]")
         sys.exit(1)
     
@@ -11,8 +11,12 @@ Features:
 - Saves detailed results to JSON file
 - Interactive commit selection
 - Beautiful Rich terminal UI
+- Offline replay: --record saves the OpenAI traffic and analyzed commits to a
+  cassette, --replay re-runs them one at a time against a local stub and
+  reports commits/s, p50/p99 and cost per commit (see --help)
 """
 
+import argparse
 import os
 import sys
 import time
@@ -61,6 +65,8 @@ BACKEND_IMPORTS_AVAILABLE = False
 try:
     from app.config.database import get_supabase_client
     from app.services.commit_analysis_service import CommitAnalysisService
+    from app.integrations.llm_gateway import llm_metrics
+    from app.integrations.llm_replay import capture_workload
     import asyncio
     BACKEND_IMPORTS_AVAILABLE = True
 except ImportError as e:
@@ -70,6 +76,7 @@ except ImportError as e:
 # Configuration
 BENCHMARK_CONFIG = {
     "runs_per_commit": 10,
+    "mode_comparison_runs": 3,  # Runs per analysis mode when comparing split vs fused
     "output_dir": Path(__file__).parent.parent / "benchmark_results",
     "github_token": os.getenv("GITHUB_TOKEN"),
     "github_username": None,  # Will be fetched
@@ -79,10 +86,12 @@ BENCHMARK_CONFIG = {
 class CommitAnalysisBenchmark:
     """Main benchmarking orchestrator class"""
     
-    def __init__(self):
+    def __init__(self, cassette=None):
         self.console = console
         self.config = BENCHMARK_CONFIG
         self.results = []
+        # Set when recording: analyzer inputs are stored as the cassette workload
+        self.cassette = cassette
         self.current_benchmark_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Create output directory
@@ -104,9 +113,14 @@ class CommitAnalysisBenchmark:
                 if not commit_data:
                     break
                     
-                benchmark_results = self.benchmark_commit(commit_data)
-                self.analyze_results(benchmark_results)
-                self.save_results(benchmark_results)
+                if Confirm.ask("Compare split vs fused analysis modes for this commit?", default=False):
+                    comparison = self.compare_analysis_modes(commit_data)
+                    self.show_mode_comparison(comparison)
+                    self.save_mode_comparison(comparison)
+                else:
+                    benchmark_results = self.benchmark_commit(commit_data)
+                    self.analyze_results(benchmark_results)
+                    self.save_results(benchmark_results)
                 
                 if not Confirm.ask("\n[bold yellow]Would you like to benchmark another commit?[/bold yellow]", default=True):
                     break
@@ -137,6 +151,10 @@ through the model multiple times.
 - Min/max ranges for each metric
 - Reasoning consistency
 
+**Mode comparison (optional, per commit):**
+- Split mode (hours and impact as two requests) vs fused mode (one request)
+- Tokens, cost and latency per analysis, and score drift between the modes
+
 **Impact Points v2.0 Formula:**
 Impact = (Business Value × 2) + (Technical Complexity × 1.5) + Quality Points - Risk Penalty
 
@@ -270,6 +288,8 @@ Results will be saved to: `benchmark_results/benchmark_{self.current_benchmark_i
         # Initialize services
         db = get_supabase_client()
         commit_service = CommitAnalysisService(db)
+        if self.cassette is not None:
+            capture_workload(commit_service.commit_analyzer, self.cassette)
         
         # Progress tracking
         with Progress(
@@ -335,11 +355,10 @@ Results will be saved to: `benchmark_results/benchmark_{self.current_benchmark_i
                             }
                         }
                         
-                        # Parse comprehensive analysis data from ai_analysis_notes
-                        if analyzed_commit.ai_analysis_notes:
+                        # Comprehensive analysis data (typed columns plus ai_analysis, or legacy notes)
+                        analysis_data = analyzed_commit.analysis_details()
+                        if analysis_data:
                             try:
-                                analysis_data = json.loads(analyzed_commit.ai_analysis_notes)
-                                
                                 # Update traditional hours with new anchor fields if available
                                 if analysis_data.get('total_lines') is not None:
                                     run_result["traditional_hours"].update({
@@ -766,6 +785,180 @@ Results will be saved to: `benchmark_results/benchmark_{self.current_benchmark_i
             "successful_runs": len([r for r in benchmark_results["runs"] if "error" not in r])
         })
     
+    @staticmethod
+    def _llm_usage_totals() -> Dict[str, float]:
+        """Sum of the LLM gateway counters over all models and prompts"""
+        totals = {"requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+        for prompts in llm_metrics.get_status().values():
+            for stats in prompts.values():
+                for key in totals:
+                    totals[key] += stats.get(key) or 0
+        return totals
+    
+    def compare_analysis_modes(self, commit_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the same commit through split and fused mode and record tokens, latency and scores"""
+        runs = self.config["mode_comparison_runs"]
+        self.console.print(f"\n[bold]Comparing analysis modes on commit {commit_data['sha'][:7]}...[/bold]")
+        self.console.print(f"This will run {runs} analyses per mode (split, fused)...\n")
+        
+        analysis_data = {
+            "repository": commit_data["repository"],
+            "commit_hash": commit_data["sha"],
+            "author": {
+                "name": commit_data["author"],
+                "email": "benchmark@example.com",
+                "login": self.config["github_username"]
+            },
+            "message": commit_data["message"],
+            "timestamp": commit_data["date"],
+            "url": commit_data["url"]
+        }
+        
+        async def run_all() -> Dict[str, List[Dict[str, Any]]]:
+            # One event loop for every run, so the gateway's pooled connections are reused
+            commit_service = CommitAnalysisService(get_supabase_client())
+            if self.cassette is not None:
+                capture_workload(commit_service.commit_analyzer, self.cassette)
+            results = {}
+            for mode in ("split", "fused"):
+                commit_service.commit_analyzer.analysis_mode = mode
+                results[mode] = []
+                for run_idx in range(runs):
+                    self.console.print(f"[dim]{mode} run {run_idx + 1}/{runs}...[/dim]")
+                    before = self._llm_usage_totals()
+                    start_time = time.time()
+                    try:
+                        analyzed_commit = await commit_service.analyze_commit(
+                            commit_hash=commit_data["sha"],
+                            commit_data=dict(analysis_data),
+                            fetch_diff=True
+                        )
+                    except Exception as e:
+                        results[mode].append({"run_index": run_idx + 1, "error": str(e)})
+                        continue
+                    latency = time.time() - start_time
+                    after = self._llm_usage_totals()
+                    if not analyzed_commit:
+                        results[mode].append({"run_index": run_idx + 1, "error": "Analysis failed"})
+                        continue
+                    
+                    notes = analyzed_commit.analysis_details()
+                    results[mode].append({
+                        "run_index": run_idx + 1,
+                        "latency_seconds": latency,
+                        "requested_mode": mode,
+                        "analysis_mode": notes.get("analysis_mode", mode),
+                        "usage": {key: after[key] - before[key] for key in after},
+                        "scores": {
+                            "estimated_hours": analyzed_commit.ai_estimated_hours,
+                            "complexity_score": analyzed_commit.complexity_score,
+                            "seniority_score": analyzed_commit.seniority_score,
+                            "business_value": notes.get("impact_business_value"),
+                            "technical_complexity": notes.get("impact_technical_complexity"),
+                            "impact_score": notes.get("impact_score"),
+                        },
+                    })
+            return results
+        
+        return {
+            "commit_data": commit_data,
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "runs_per_mode": runs,
+                "model": os.getenv("COMMIT_ANALYSIS_MODEL", "gpt-4"),
+            },
+            "modes": asyncio.run(run_all()),
+        }
+    
+    @staticmethod
+    def _mode_summary(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Means over the successful runs of one mode"""
+        ok = [r for r in runs if "error" not in r]
+        
+        def mean(values):
+            values = [float(v) for v in values if v is not None]
+            return statistics.mean(values) if values else None
+        
+        latencies = sorted(r["latency_seconds"] for r in ok)
+        return {
+            "successful_runs": len(ok),
+            "failed_runs": len(runs) - len(ok),
+            # Runs where fused mode fell back to split (schema validation failed)
+            "fallbacks": len([r for r in ok if r["analysis_mode"] != r["requested_mode"]]),
+            "latency_mean": mean(latencies),
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "requests": mean(r["usage"]["requests"] for r in ok),
+            "input_tokens": mean(r["usage"]["input_tokens"] for r in ok),
+            "cached_tokens": mean(r["usage"]["cached_tokens"] for r in ok),
+            "output_tokens": mean(r["usage"]["output_tokens"] for r in ok),
+            "cost_usd": mean(r["usage"]["cost_usd"] for r in ok),
+            "scores": {
+                key: mean(r["scores"][key] for r in ok)
+                for key in ("estimated_hours", "complexity_score", "seniority_score", "business_value", "technical_complexity", "impact_score")
+            },
+        }
+    
+    def show_mode_comparison(self, comparison: Dict[str, Any]):
+        """Display tokens, latency and score drift of fused vs split mode"""
+        split = self._mode_summary(comparison["modes"]["split"])
+        fused = self._mode_summary(comparison["modes"]["fused"])
+        comparison["summary"] = {"split": split, "fused": fused}
+        
+        def fmt(value, digits=1):
+            return "-" if value is None else f"{value:,.{digits}f}"
+        
+        def change(a, b):
+            if a is None or b is None or not a:
+                return "-"
+            return f"{(b - a) / a * 100:+.1f}%"
+        
+        cost_table = Table(title="Split vs Fused - Cost and Latency (mean per analysis)", box=box.ROUNDED)
+        cost_table.add_column("Metric", style="cyan")
+        cost_table.add_column("Split", style="green")
+        cost_table.add_column("Fused", style="yellow")
+        cost_table.add_column("Change", style="magenta")
+        for label, key, digits in [
+            ("LLM requests", "requests", 1),
+            ("Input tokens", "input_tokens", 0),
+            ("Cached input tokens", "cached_tokens", 0),
+            ("Output tokens", "output_tokens", 0),
+            ("Cost (USD)", "cost_usd", 5),
+            ("Latency mean (s)", "latency_mean", 2),
+            ("Latency p50 (s)", "latency_p50", 2),
+        ]:
+            cost_table.add_row(label, fmt(split[key], digits), fmt(fused[key], digits), change(split[key], fused[key]))
+        cost_table.add_row("Successful / failed runs", f"{split['successful_runs']} / {split['failed_runs']}", f"{fused['successful_runs']} / {fused['failed_runs']}", "")
+        cost_table.add_row("Fused fallbacks to split", "", str(fused["fallbacks"]), "")
+        self.console.print(cost_table)
+        
+        drift_table = Table(title="Score Drift - Fused vs Split (mean scores)", box=box.ROUNDED)
+        drift_table.add_column("Score", style="cyan")
+        drift_table.add_column("Split", style="green")
+        drift_table.add_column("Fused", style="yellow")
+        drift_table.add_column("Drift", style="magenta")
+        for key, split_value in split["scores"].items():
+            fused_value = fused["scores"][key]
+            drift = "-" if split_value is None or fused_value is None else f"{fused_value - split_value:+.2f} ({change(split_value, fused_value)})"
+            drift_table.add_row(key.replace("_", " ").title(), fmt(split_value, 2), fmt(fused_value, 2), drift)
+        self.console.print(drift_table)
+    
+    def save_mode_comparison(self, comparison: Dict[str, Any]):
+        """Save the mode comparison to a JSON file"""
+        filename = self.config["output_dir"] / f"mode_comparison_{self.current_benchmark_id}_commit_{comparison['commit_data']['sha'][:7]}.json"
+        
+        with open(filename, 'w') as f:
+            json.dump(comparison, f, indent=2, cls=DecimalEncoder)
+        
+        self.console.print(f"\n[green]✓ Mode comparison saved to: {filename.relative_to(Path.cwd())}[/green]")
+        
+        runs = sum(len(r) for r in comparison["modes"].values())
+        self.results.append({
+            "commit": comparison["commit_data"]["sha"][:7],
+            "filename": str(filename),
+            "runs": runs,
+            "successful_runs": sum(len([r for r in mode_runs if "error" not in r]) for mode_runs in comparison["modes"].values())
+        })
+    
     def show_final_summary(self):
         """Display final summary of all benchmarks"""
         if not self.results:
@@ -800,6 +993,13 @@ All results saved in: `{self.config['output_dir'].relative_to(Path.cwd())}/`
 
 def main():
     """Main entry point"""
+    # Record/replay support lives with the parallel benchmark
+    from benchmark_commit_analysis_parallel import add_replay_arguments, replay_main, start_recording
+    
+    parser = argparse.ArgumentParser(description="Commit analysis consistency benchmark")
+    add_replay_arguments(parser, default_concurrency=1)
+    args = parser.parse_args()
+    
     # Check if running from correct directory
     if not Path("backend").exists() or not Path("frontend").exists():
         console.print("[red]Error: Please run this script from the project root directory[/red]")
@@ -824,9 +1024,18 @@ def main():
         console.print("Please run the script again")
         sys.exit(0)
     
+    if args.replay:
+        replay_main(args, label="serial" if args.concurrency == 1 else "concurrent")
+        return
+    
     # Run benchmark
-    benchmark = CommitAnalysisBenchmark()
-    benchmark.run()
+    recorder = start_recording(args.record) if args.record else None
+    benchmark = CommitAnalysisBenchmark(cassette=recorder.app.state.cassette if recorder else None)
+    try:
+        benchmark.run()
+    finally:
+        if recorder:
+            recorder.stop()
 
 
 if __name__ == "__main__":
@@ -11,8 +11,14 @@ Features:
 - Rate limiting protection
 - Same statistical analysis as serial version
 - 3-5x faster execution
+- Offline replay: record OpenAI traffic into a cassette (--record), then rerun
+  the recorded commits against a local stub (--replay) with configurable
+  latency and injected 429s, reporting commits/s, p50/p99 and cost per commit
 """
 
+import argparse
+import contextlib
+import io
 import os
 import sys
 import time
@@ -55,6 +61,10 @@ BACKEND_IMPORTS_AVAILABLE = False
 try:
     from app.config.database import get_supabase_client
     from app.services.commit_analysis_service import CommitAnalysisService
+    from app.config.settings import settings
+    from app.integrations.llm_replay import (
+        OPENAI_API_BASE, Cassette, FaultInjector, LatencyModel, LLMStubServer, create_stub_app, measure_throughput
+    )
     BACKEND_IMPORTS_AVAILABLE = True
 except ImportError as e:
     console.print(f"[yellow]Warning: Could not import backend modules: {e}[/yellow]")
@@ -76,13 +86,113 @@ PARALLEL_CONFIG = {
     "github_username": None,
 }
 
+def start_recording(cassette_path: str) -> "LLMStubServer":
+    """Route OpenAI calls through a local proxy that records them into a cassette"""
+    server = LLMStubServer(create_stub_app(
+        Cassette(cassette_path), upstream=OPENAI_API_BASE, api_key=os.getenv("OPENAI_API_KEY")
+    )).start()
+    settings.OPENAI_BASE_URL = server.base_url
+    console.print(f"[red]● Recording OpenAI traffic into {cassette_path}[/red]")
+    return server
+
+
+def run_replay_benchmark(
+    cassette_path: str,
+    concurrency: int,
+    latency: str = "recorded",
+    rate_limit_share: float = 0.0,
+    rpm: int = 0,
+    repeat: int = 1,
+    strict: bool = False,
+) -> Dict[str, Any]:
+    """Analyze the cassette's recorded commits against the local stub and measure throughput"""
+    cassette = Cassette.load(cassette_path)
+    if not cassette.workload:
+        raise ValueError(f"{cassette_path} has no recorded commits; record one with --record first")
+    
+    faults = FaultInjector(rate_limit_share, rpm) if rate_limit_share or rpm else None
+    app = create_stub_app(cassette, latency=LatencyModel.parse(latency), faults=faults, strict=strict)
+    workload = cassette.workload * repeat
+    console.print(
+        f"\n[bold]Replaying {len(workload)} commit analyses from {cassette_path} "
+        f"({len(cassette.interactions)} recorded calls, concurrency {concurrency}, latency {latency})...[/bold]"
+    )
+    
+    with LLMStubServer(app) as server:
+        # The gateway is created on first use, so it picks up the stub's address
+        settings.OPENAI_BASE_URL = server.base_url
+        settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "replay"
+        from app.integrations.commit_analysis import CommitAnalyzer
+        analyzer = CommitAnalyzer()
+        with contextlib.redirect_stdout(io.StringIO()):  # the analyzer prints every step
+            report = asyncio.run(measure_throughput(workload, analyzer.analyze_commit_diff, concurrency))
+        stub_stats = server.stats
+    
+    return {
+        "benchmark_type": "throughput",
+        "timestamp": datetime.now().isoformat(),
+        "cassette": cassette_path,
+        "config": {
+            "concurrency": concurrency,
+            "latency": latency,
+            "rate_limit_share": rate_limit_share,
+            "requests_per_minute": rpm,
+            "repeat": repeat,
+            "strict": strict,
+            "model": settings.commit_analysis_model,
+            "analysis_mode": analyzer.analysis_mode,
+        },
+        "throughput": report.to_dict(),
+        "stub": stub_stats,
+    }
+
+
+def show_throughput(results: Dict[str, Any]):
+    """Display throughput, tail latency and cost of a replay run"""
+    report = results["throughput"]
+    stub = results["stub"]
+    
+    def fmt(value, suffix="", digits=1):
+        return "-" if value is None else f"{value:,.{digits}f}{suffix}"
+    
+    table = Table(title="Replay Benchmark - Throughput", box=box.ROUNDED)
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Commits analyzed / failed", f"{report['succeeded']} / {report['failed']}")
+    table.add_row("Concurrency", str(report["concurrency"]))
+    table.add_row("Wall time", fmt(report["elapsed_seconds"], "s", 2))
+    table.add_row("[bold]Commits/s[/bold]", f"[bold]{fmt(report['items_per_second'], '', 2)}[/bold]")
+    table.add_row("Latency p50", fmt(report["p50_latency_ms"], " ms"))
+    table.add_row("Latency p99", fmt(report["p99_latency_ms"], " ms"))
+    table.add_row("[bold]Cost per commit[/bold]", f"[bold]{fmt(report['cost_per_item_usd'], ' USD', 5)}[/bold]")
+    table.add_row("LLM requests / retries", f"{report['usage']['requests']:.0f} / {report['usage']['retries']:.0f}")
+    table.add_row("Injected 429s", str(stub["rate_limited"]))
+    table.add_row("Cassette exact / fallback / miss", f"{stub['exact']} / {stub['fallback']} / {stub['misses']}")
+    console.print(table)
+    if stub["fallback"] or stub["misses"]:
+        console.print("[yellow]Some prompts changed since recording; re-record for exact replays[/yellow]")
+
+
+def save_throughput(results: Dict[str, Any], label: str) -> Path:
+    """Save a replay run next to the consistency benchmarks"""
+    output_dir = PARALLEL_CONFIG["output_dir"]
+    output_dir.mkdir(exist_ok=True)
+    filename = output_dir / f"throughput_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{label}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2, cls=DecimalEncoder)
+    console.print(f"\n[green]✓ Results saved to: {filename}[/green]")
+    return filename
+
+
 class ParallelCommitAnalysisBenchmark:
     """Parallel benchmarking orchestrator using asyncio"""
     
-    def __init__(self):
+    def __init__(self, cassette: Optional["Cassette"] = None):
         self.console = console
         self.config = PARALLEL_CONFIG
         self.results = []
+        # Set when recording: the analyzed commits are stored as the cassette workload
+        self.cassette = cassette
         self.current_benchmark_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.config["output_dir"].mkdir(exist_ok=True)
         
@@ -112,6 +222,8 @@ class ParallelCommitAnalysisBenchmark:
                 "deletions": commit_data.get("deletions", 0),
                 "diff": commit_data.get("diff", "")
             }
+            if self.cassette is not None:
+                self.cassette.add_workload(analysis_data)
             
             # Run separate analyses directly for better isolation
             analysis_result = await commit_analyzer.benchmark_separate_analyses(analysis_data)
@@ -560,8 +672,37 @@ All results saved in: `{self.config['output_dir'].relative_to(Path.cwd())}/`
         self.console.print(Panel(Markdown(summary_text), title="Session Summary", border_style="green"))
 
 
+def add_replay_arguments(parser: argparse.ArgumentParser, default_concurrency: int):
+    """Record/replay options shared with the serial benchmark"""
+    parser.add_argument("--record", metavar="CASSETTE", help="Record OpenAI traffic and analyzed commits into CASSETTE")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Re-run CASSETTE's commits against a local stub (no network)")
+    parser.add_argument("--concurrency", type=int, default=default_concurrency, help="Commits analyzed at once when replaying")
+    parser.add_argument("--latency", default="recorded", help="Stub latency: recorded[*scale], fixed:MS, uniform:MIN,MAX, lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--rate-limit-share", type=float, default=0.0, help="Share of stub responses that are 429s")
+    parser.add_argument("--rpm", type=int, default=0, help="Stub answers 429 above this many requests per minute")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the recorded commits this many times")
+    parser.add_argument("--strict", action="store_true", help="Fail requests whose prompt changed since recording")
+
+
+def replay_main(args: argparse.Namespace, label: str):
+    """Non-interactive replay run"""
+    try:
+        results = run_replay_benchmark(
+            args.replay, args.concurrency, args.latency, args.rate_limit_share, args.rpm, args.repeat, args.strict
+        )
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    show_throughput(results)
+    save_throughput(results, label)
+
+
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Parallel commit analysis benchmark")
+    add_replay_arguments(parser, default_concurrency=PARALLEL_CONFIG["max_concurrent_requests"])
+    args = parser.parse_args()
+    
     if not Path("backend").exists() or not Path("frontend").exists():
         console.print("[red]Error: Please run from project root[/red]")
         sys.exit(1)
@@ -572,9 +713,18 @@ def main():
         console.print("[dim]  cd backend && source venv/bin/activate[/dim]")
         sys.exit(1)
     
+    if args.replay:
+        replay_main(args, label="parallel")
+        return
+    
     # Run benchmark
-    benchmark = ParallelCommitAnalysisBenchmark()
-    benchmark.run()
+    recorder = start_recording(args.record) if args.record else None
+    benchmark = ParallelCommitAnalysisBenchmark(cassette=recorder.app.state.cassette if recorder else None)
+    try:
+        benchmark.run()
+    finally:
+        if recorder:
+            recorder.stop()
 
 
 if __name__ == "__main__":
@@ -500,12 +500,10 @@ focusing on business value delivered rather than time spent coding.
                 
                 self.console.print(table)
                 
-                # Parse and display impact scoring from ai_analysis_notes
-                if analyzed_commit.ai_analysis_notes:
+                # Display impact scoring (typed columns plus ai_analysis, or legacy notes)
+                impact_data = analyzed_commit.analysis_details()
+                if impact_data:
                     try:
-                        import json
-                        impact_data = json.loads(analyzed_commit.ai_analysis_notes)
-                        
                         # Display impact scoring table
                         impact_table = Table(title="Commit Analysis - Impact Points Method", box=box.ROUNDED)
                         impact_table.add_column("Metric", style="cyan")